@@ -4,6 +4,7 @@ from sqlmodel import Session
 from auth.domain.entities import User, UserCreate
 from shared.security import get_password_hash, verify_password
 from shared.exceptions import ConflictException
+from shared.cache import invalidation_bus, user_scope
 
 class AuthService:
     def __init__(self, db_session: Session):
@@ -26,6 +27,7 @@ class AuthService:
         self.db_session.add(db_user)
         self.db_session.commit()
         self.db_session.refresh(db_user)
+        invalidation_bus.publish(user_scope(db_user.email))  # drops a cached "no such user"
         return db_user
 
     def authenticate_user(self, email: str, password: str) -> Optional[User]:
@@ -0,0 +1,20 @@
+# src/batch/api/routers.py
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from auth.domain.entities import User
+from batch.domain.entities import BatchRequest, BatchResponse
+from batch.domain.services import BatchExecutor
+from shared.dependencies import get_current_active_user, oauth2_scheme
+from shared.exceptions import BadRequestException
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(batch: BatchRequest, request: Request,
+                    token: str = Depends(oauth2_scheme),
+                    current_user: User = Depends(get_current_active_user)):
+    """Runs several API calls in one round trip, authenticated once; responses come back in request order."""
+    executor = BatchExecutor(request.app.router, request.scope, token, current_user)
+    try:
+        return {"responses": await executor.run(batch.requests)}
+    except BadRequestException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.detail)
\ No newline at end of file
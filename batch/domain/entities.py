@@ -0,0 +1,23 @@
+# src/batch/domain/entities.py
+from typing import Any, Dict, List, Optional
+from sqlmodel import Field, SQLModel
+
+
+class BatchSubRequest(SQLModel):
+    id: Optional[str] = None # Echoed back to match responses; defaults to the position
+    method: str = "GET"
+    path: str # With query string, e.g. "/menu/3/items?category=Postre"
+    headers: Dict[str, str] = {} # Authorization is always the batch's own
+    body: Optional[Any] = None # Sent as JSON
+
+class BatchRequest(SQLModel):
+    requests: List[BatchSubRequest] = Field(min_length=1)
+
+class BatchSubResponse(SQLModel):
+    id: str
+    status: int
+    headers: Dict[str, str]
+    body: Optional[Any] = None # Parsed JSON, or text for other content types
+
+class BatchResponse(SQLModel):
+    responses: List[BatchSubResponse]
\ No newline at end of file
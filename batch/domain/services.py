@@ -0,0 +1,170 @@
+# src/batch/domain/services.py
+import asyncio
+import json
+import os
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from fastapi.middleware.asyncexitstack import AsyncExitStackMiddleware
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+
+from auth.domain.entities import User
+from batch.domain.entities import BatchSubRequest
+from shared.admission import admission_control, busy_detail, classify
+from shared.database import engine, batch_session
+from shared.dependencies import batch_user
+from shared.exceptions import BadRequestException
+
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+# Read sub-requests run on up to this many concurrent lanes, each with one session.
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+READ_METHODS = {"GET", "HEAD"}
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Nested batches and never-ending streams cannot be answered inside a batch.
+EXCLUDED_SUFFIXES = ("/batch", "/availability/stream")
+# Parent scope entries a sub-request inherits (exception handlers make HTTPException work past the middleware).
+INHERITED_SCOPE_KEYS = ("type", "asgi", "http_version", "scheme", "server", "client", "root_path", "app",
+                        "starlette.exception_handlers")
+
+
+class BatchExecutor:
+    """
+    Runs the sub-requests of a POST /batch in-process against the app's router.
+
+    The batch authenticates once: its user is handed to every sub-request's
+    get_current_user. Sub-requests go straight to the router, past the
+    middleware, so a batch is profiled and timed as one request; admission
+    control is applied here instead, each sub-request taking (or being shed
+    from) a slot of its own route class, so a batch of bookings counts as
+    that many bookings.
+    Consecutive reads run concurrently on up to ``max_concurrency`` lanes,
+    each reusing one session (and so one pooled connection) for all its
+    reads; a write runs alone with its own session once the reads before it
+    are done, so a batch reads its own writes. Responses keep request order.
+    """
+
+    def __init__(self, router, parent_scope: Dict[str, Any], token: str, user: User,
+                 max_concurrency: int = BATCH_MAX_CONCURRENCY):
+        # The exit stack closes each sub-request's dependencies when its response is done.
+        self.app = AsyncExitStackMiddleware(router)
+        self.parent_scope = parent_scope
+        self.token = token
+        self.user = user
+        self.max_concurrency = max(1, max_concurrency)
+
+    async def run(self, requests: List[BatchSubRequest]) -> List[Dict[str, Any]]:
+        if len(requests) > BATCH_MAX_REQUESTS:
+            raise BadRequestException(detail=f"A batch can hold at most {BATCH_MAX_REQUESTS} requests.")
+        for sub in requests:
+            sub.method = sub.method.upper()
+            if sub.method not in READ_METHODS | WRITE_METHODS:
+                raise BadRequestException(detail=f"Unsupported method '{sub.method}'.")
+            path = sub.path.partition("?")[0]
+            if not path.startswith("/") or path.rstrip("/").endswith(EXCLUDED_SUFFIXES):
+                raise BadRequestException(detail=f"Path '{sub.path}' cannot be used in a batch.")
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        token = batch_user.set((self.token, self.user))
+        try:
+            reads: List[int] = []
+            for index, sub in enumerate(requests):
+                if sub.method in READ_METHODS:
+                    reads.append(index)
+                    continue
+                await self._run_reads(requests, reads, results)
+                reads = []
+                results[index] = await self._dispatch(index, sub)
+            await self._run_reads(requests, reads, results)
+        finally:
+            batch_user.reset(token)
+        return results
+
+    async def _run_reads(self, requests: List[BatchSubRequest], indexes: List[int],
+                         results: List[Optional[Dict[str, Any]]]):
+        pending = deque(indexes)
+
+        async def lane():
+            session = Session(engine)
+            token = batch_session.set(session)
+            try:
+                while pending:
+                    index = pending.popleft()
+                    results[index] = await self._dispatch(index, requests[index])
+                    if results[index]["status"] >= 500:
+                        await run_in_threadpool(session.rollback)
+            finally:
+                batch_session.reset(token)
+                await run_in_threadpool(session.close)
+
+        await asyncio.gather(*[lane() for _ in range(min(len(indexes), self.max_concurrency))])
+
+    async def _dispatch(self, index: int, sub: BatchSubRequest) -> Dict[str, Any]:
+        path, _, query = sub.path.partition("?")
+        body = b"" if sub.body is None else json.dumps(sub.body).encode()
+        headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in sub.headers.items()
+            if name.lower() not in ("authorization", "content-length", "content-type", "host")
+        ]
+        headers.append((b"authorization", f"Bearer {self.token}".encode("latin-1")))
+        headers.append((b"host", dict(self.parent_scope["headers"]).get(b"host", b"localhost")))
+        if body:
+            headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        scope = {key: self.parent_scope[key] for key in INHERITED_SCOPE_KEYS if key in self.parent_scope}
+        scope.update({
+            "method": sub.method, "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+            "headers": headers, "state": dict(self.parent_scope.get("state", {})),
+        })
+
+        received = False
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await asyncio.Future()  # never disconnects; waiters are cancelled when the response ends
+
+        response = {"status": 500, "headers": [], "body": []}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+
+        name = classify(sub.method, path)
+        try:
+            if name is None or name not in admission_control.classes:
+                await self.app(scope, receive, send)
+            elif not await admission_control.run(name, lambda: self.app(scope, receive, send)):
+                response = _error(503, busy_detail(name))
+        except HTTPException as e:  # raised by the router itself, e.g. for unknown paths
+            response = _error(e.status_code, e.detail)
+        except Exception:
+            response = _error(500, "Internal Server Error")
+        return _sub_response(sub.id or str(index), response)
+
+
+def _error(status_code: int, detail: str) -> Dict[str, Any]:
+    return {"status": status_code, "headers": [(b"content-type", b"application/json")],
+            "body": [json.dumps({"detail": detail}).encode()]}
+
+
+def _sub_response(sub_id: str, response: Dict[str, Any]) -> Dict[str, Any]:
+    headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in response["headers"]
+               if name.lower() != b"content-length"}
+    raw = b"".join(response["body"])
+    body: Any = None
+    if raw:
+        text = raw.decode("utf-8", errors="replace")
+        if headers.get("content-type", "").startswith("application/json"):
+            try:
+                body = json.loads(text)
+            except ValueError:
+                return _sub_response(sub_id, _error(502, "The response body is not valid JSON."))
+        else:
+            body = text
+    return {"id": sub_id, "status": response["status"], "headers": headers, "body": body}
\ No newline at end of file
@@ -0,0 +1,414 @@
+# src/benchmarks/loadtest.py
+"""
+HTTP load-test harness for the El Buen Sabor API.
+
+Starts ``main:app`` under uvicorn against a throwaway SQLite database, seeds it
+with restaurants, tables, menu items and users, and then drives a weighted mix
+of scenarios (logins, menu browsing, bookings, cancellations and admin
+dashboards) over real HTTP from a pool of async workers. Latency percentiles and
+throughput are reported per route, and the process exits with status 1 when any
+configured SLO is violated.
+
+Example:
+    python -m benchmarks.loadtest --concurrency 32 --duration 30 \\
+        --mix login=1,browse=6,book=2,cancel=1,dashboard=1 \\
+        --slo "GET /restaurants/:p95=150" --slo "*:p99=1000" --max-error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, time as dt_time, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+ADMIN_EMAIL = "admin@loadtest.local"
+CLIENT_PASSWORD = "loadtest-password"
+DEFAULT_MIX = "login=1,browse=6,book=2,cancel=1,dashboard=1"
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+@dataclass
+class RouteStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: Dict[int, int] = field(default_factory=dict)
+
+    def record(self, latency_ms: float, status_code: Optional[int]):
+        self.latencies_ms.append(latency_ms)
+        if status_code is None or status_code >= 500:
+            self.errors += 1
+        if status_code is not None:
+            self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+
+
+class LoadReport:
+    """Latency samples per route label, summarized into percentiles and throughput."""
+
+    def __init__(self):
+        self.routes: Dict[str, RouteStats] = {}
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+
+    def record(self, route: str, latency_ms: float, status_code: Optional[int]):
+        self.routes.setdefault(route, RouteStats()).record(latency_ms, status_code)
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return max(end - self.started_at, 1e-9)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for route, stats in sorted(self.routes.items()):
+            latencies = sorted(stats.latencies_ms)
+            count = len(latencies)
+            result[route] = {
+                "count": count,
+                "errors": stats.errors,
+                "error_rate": round(stats.errors / count, 4) if count else 0.0,
+                "throughput_rps": round(count / self.elapsed, 2),
+                "p50_ms": round(percentile(latencies, 50), 2),
+                "p95_ms": round(percentile(latencies, 95), 2),
+                "p99_ms": round(percentile(latencies, 99), 2),
+                "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+                "statuses": {str(code): n for code, n in sorted(stats.statuses.items())},
+            }
+        return result
+
+
+@dataclass
+class SLO:
+    route: str  # route label, or "*" for every route
+    metric: str  # p50 / p95 / p99 (milliseconds) or error_rate (fraction)
+    threshold: float
+
+    @classmethod
+    def parse(cls, spec: str) -> "SLO":
+        """Parses ``"<route>:<metric>=<threshold>"``, e.g. ``"GET /restaurants/:p95=150"``."""
+        route, _, rule = spec.rpartition(":")
+        metric, _, threshold = rule.partition("=")
+        if not route or metric not in ("p50", "p95", "p99", "error_rate") or not threshold:
+            raise argparse.ArgumentTypeError(f"Invalid SLO '{spec}'. Expected '<route>:<p50|p95|p99|error_rate>=<value>'.")
+        return cls(route=route, metric=metric, threshold=float(threshold))
+
+    def violations(self, summary: Dict[str, Dict[str, float]]) -> List[str]:
+        key = self.metric if self.metric == "error_rate" else f"{self.metric}_ms"
+        routes = summary.keys() if self.route == "*" else [self.route]
+        found = []
+        for route in routes:
+            stats = summary.get(route)
+            if stats is None:
+                if self.route != "*":
+                    found.append(f"{route}: no samples recorded")
+                continue
+            if stats[key] > self.threshold:
+                found.append(f"{route}: {key}={stats[key]} exceeds {self.threshold}")
+        return found
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parses a traffic mix such as ``"login=1,browse=6"`` into scenario weights."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario '{name}'. Must be one of {sorted(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("The traffic mix needs at least one scenario with a positive weight.")
+    return mix
+
+
+@dataclass
+class Fixture:
+    """Identifiers of the seeded data the scenarios pick from."""
+    restaurants: List[Tuple[int, dt_time, dt_time]]
+    tables: Dict[int, List[Tuple[int, int]]]  # restaurant_id -> [(table_id, capacity)]
+    menu_items: Dict[int, List[int]]  # restaurant_id -> [menu_item_id]
+    clients: List[Tuple[int, str]]  # [(user_id, email)]
+
+
+def seed_database(restaurants: int, tables_per_restaurant: int, items_per_restaurant: int, clients: int) -> Fixture:
+    """Creates the schema and bulk-inserts the load-test data set into ``DATABASE_URL``."""
+    # Imported lazily: shared.database reads DATABASE_URL at import time.
+    import main  # noqa: F401 - registers every SQLModel table on the metadata
+    from sqlmodel import Session
+    from auth.domain.entities import User
+    from menu.domain.entities import MenuItem
+    from restaurants.domain.entities import Restaurant, Table
+    from shared.database import create_db_and_tables, engine
+    from shared.security import get_password_hash
+
+    create_db_and_tables()
+    hashed_password = get_password_hash(CLIENT_PASSWORD)
+    categories = ["Entrada", "Principal", "Postre", "Bebida"]
+    with Session(engine) as session:
+        session.add(User(email=ADMIN_EMAIL, name="Load Admin", role="admin", hashed_password=hashed_password))
+        users = [User(email=f"client{i}@loadtest.local", name=f"Client {i}", role="client",
+                      hashed_password=hashed_password) for i in range(clients)]
+        session.add_all(users)
+        db_restaurants = [Restaurant(name=f"Restaurant {i}", location=f"Zona {i % 10}",
+                                     opening_time=dt_time(12, 0), closing_time=dt_time(23, 0))
+                          for i in range(restaurants)]
+        session.add_all(db_restaurants)
+        session.flush()
+        db_tables = [Table(restaurant_id=restaurant.id, table_number=n + 1, capacity=2 + (n % 6) * 2,
+                           location="interior" if n % 2 else "terraza")
+                     for restaurant in db_restaurants for n in range(tables_per_restaurant)]
+        db_items = [MenuItem(restaurant_id=restaurant.id, name=f"Plato {n}", description=f"Plato de la casa {n}",
+                             category=categories[n % len(categories)])
+                    for restaurant in db_restaurants for n in range(items_per_restaurant)]
+        session.add_all(db_tables)
+        session.add_all(db_items)
+        session.commit()
+
+        fixture = Fixture(
+            restaurants=[(r.id, r.opening_time, r.closing_time) for r in db_restaurants],
+            tables={},
+            menu_items={},
+            clients=[(u.id, u.email) for u in users],
+        )
+        for table in db_tables:
+            fixture.tables.setdefault(table.restaurant_id, []).append((table.id, table.capacity))
+        for item in db_items:
+            fixture.menu_items.setdefault(item.restaurant_id, []).append(item.id)
+    return fixture
+
+
+class Worker:
+    """One simulated client connection; runs scenarios picked from the traffic mix."""
+
+    def __init__(self, client: httpx.AsyncClient, fixture: Fixture, report: LoadReport,
+                 tokens: Dict[str, str], rng: random.Random):
+        self.client = client
+        self.fixture = fixture
+        self.report = report
+        self.tokens = tokens
+        self.rng = rng
+        self.user_id, self.email = rng.choice(fixture.clients)
+        self.booked: List[int] = []
+
+    async def request(self, route: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.report.record(route, (time.perf_counter() - start) * 1000, None)
+            return None
+        self.report.record(route, (time.perf_counter() - start) * 1000, response.status_code)
+        return response
+
+    async def token_for(self, email: str) -> Optional[str]:
+        if email not in self.tokens:
+            await self.login(email)
+        return self.tokens.get(email)
+
+    async def login(self, email: Optional[str] = None):
+        email = email or self.email
+        response = await self.request("POST /auth/token", "POST", "/auth/token",
+                                      data={"username": email, "password": CLIENT_PASSWORD})
+        if response is not None and response.status_code == 200:
+            self.tokens[email] = response.json()["access_token"]
+
+    async def auth_headers(self, email: Optional[str] = None) -> Dict[str, str]:
+        token = await self.token_for(email or self.email)
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    async def browse(self):
+        restaurant_id, _, _ = self.rng.choice(self.fixture.restaurants)
+        await self.request("GET /restaurants/", "GET", "/restaurants/")
+        await self.request("GET /restaurants/{restaurant_id}", "GET", f"/restaurants/{restaurant_id}")
+        await self.request("GET /restaurants/{restaurant_id}/tables", "GET", f"/restaurants/{restaurant_id}/tables")
+        await self.request("GET /menu/{restaurant_id}/items", "GET", f"/menu/{restaurant_id}/items")
+
+    async def book(self):
+        restaurant_id, opening, closing = self.rng.choice(self.fixture.restaurants)
+        table_id, capacity = self.rng.choice(self.fixture.tables[restaurant_id])
+        day = datetime.combine(datetime.now().date() + timedelta(days=self.rng.randint(2, 60)), opening)
+        reservation_time = day + timedelta(hours=self.rng.randint(0, max(closing.hour - opening.hour - 3, 0)))
+        items = self.fixture.menu_items.get(restaurant_id, [])
+        payload = {
+            "user_id": self.user_id,
+            "restaurant_id": restaurant_id,
+            "table_id": table_id,
+            "num_guests": self.rng.randint(2, capacity),
+            "reservation_time": reservation_time.isoformat(),
+            "duration_hours": 2,
+            "preordered_menu_items": self.rng.sample(items, k=min(len(items), self.rng.randint(0, 3))),
+        }
+        response = await self.request("POST /reservations/", "POST", "/reservations/",
+                                      json=payload, headers=await self.auth_headers())
+        if response is not None and response.status_code == 201:
+            self.booked.append(response.json()["id"])
+        await self.request("GET /reservations/me", "GET", "/reservations/me", headers=await self.auth_headers())
+
+    async def cancel(self):
+        if not self.booked:
+            await self.book()
+        if self.booked:
+            reservation_id = self.booked.pop(self.rng.randrange(len(self.booked)))
+            await self.request("DELETE /reservations/{reservation_id}", "DELETE", f"/reservations/{reservation_id}",
+                               headers=await self.auth_headers())
+
+    async def dashboard(self):
+        headers = await self.auth_headers(ADMIN_EMAIL)
+        for path in ("/dashboard/reservations", "/dashboard/dishes", "/dashboard/occupancy"):
+            await self.request(f"GET {path}", "GET", path, headers=headers)
+
+
+SCENARIOS: Dict[str, Callable[[Worker], Awaitable[None]]] = {
+    "login": Worker.login,
+    "browse": Worker.browse,
+    "book": Worker.book,
+    "cancel": Worker.cancel,
+    "dashboard": Worker.dashboard,
+}
+
+
+async def run_load(base_url: str, fixture: Fixture, mix: Dict[str, float], concurrency: int,
+                   duration: float, warmup: float, seed: int) -> LoadReport:
+    """Runs ``concurrency`` workers against ``base_url`` for ``warmup + duration`` seconds."""
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    tokens: Dict[str, str] = {}
+    report = LoadReport()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        async def worker_loop(worker: Worker, deadline: float):
+            while time.perf_counter() < deadline:
+                scenario = SCENARIOS[worker.rng.choices(names, weights)[0]]
+                await scenario(worker)
+
+        if warmup > 0:
+            warmup_report = LoadReport()
+            deadline = time.perf_counter() + warmup
+            await asyncio.gather(*(worker_loop(Worker(client, fixture, warmup_report, tokens, random.Random(seed + i)),
+                                               deadline) for i in range(concurrency)))
+
+        report.started_at = time.perf_counter()
+        deadline = report.started_at + duration
+        await asyncio.gather(*(worker_loop(Worker(client, fixture, report, tokens, random.Random(seed + 1000 + i)),
+                                           deadline) for i in range(concurrency)))
+        report.finished_at = time.perf_counter()
+    return report
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_url: str, port: int, workers: int, log_path: str) -> subprocess.Popen:
+    """Launches uvicorn serving ``main:app`` on localhost and waits until it answers."""
+    env = dict(os.environ, DATABASE_URL=database_url)
+    log_file = open(log_path, "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        env=env, stdout=log_file, stderr=subprocess.STDOUT,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}; see {log_path}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1.0).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"uvicorn did not become ready within 30s; see {log_path}")
+
+
+def print_summary(summary: Dict[str, Dict[str, float]], elapsed: float):
+    header = f"{'route':<42} {'count':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'err%':>6}"
+    print(header)
+    print("-" * len(header))
+    total = 0
+    for route, stats in summary.items():
+        total += stats["count"]
+        print(f"{route:<42} {stats['count']:>7} {stats['throughput_rps']:>8} {stats['p50_ms']:>8} "
+              f"{stats['p95_ms']:>8} {stats['p99_ms']:>8} {stats['max_ms']:>8} {stats['error_rate'] * 100:>6.2f}")
+    print("-" * len(header))
+    print(f"{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Mixed-traffic HTTP load test against a local uvicorn + SQLite.")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"Scenario weights, e.g. '{DEFAULT_MIX}'.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Number of concurrent simulated clients.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured run time in seconds.")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured warm-up time in seconds.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of uvicorn worker processes.")
+    parser.add_argument("--restaurants", type=int, default=20)
+    parser.add_argument("--tables", type=int, default=10, help="Tables per restaurant.")
+    parser.add_argument("--menu-items", type=int, default=30, help="Menu items per restaurant.")
+    parser.add_argument("--clients", type=int, default=50, help="Number of client accounts.")
+    parser.add_argument("--database", help="SQLite file to use (default: a temporary file).")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--slo", type=SLO.parse, action="append", default=[],
+                        help="Latency/error objective '<route>:<p50|p95|p99|error_rate>=<value>'; repeatable.")
+    parser.add_argument("--max-error-rate", type=float, help="Shorthand for --slo '*:error_rate=<value>'.")
+    parser.add_argument("--json", dest="json_path", help="Also write the summary as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    slos: List[SLO] = list(args.slo)
+    if args.max_error_rate is not None:
+        slos.append(SLO(route="*", metric="error_rate", threshold=args.max_error_rate))
+
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    database_path = os.path.abspath(args.database or os.path.join(workdir, "loadtest.db"))
+    if os.path.exists(database_path):
+        os.remove(database_path)
+    database_url = f"sqlite:///{database_path}"
+    os.environ["DATABASE_URL"] = database_url
+
+    print(f"Seeding {database_path} ...")
+    fixture = seed_database(args.restaurants, args.tables, args.menu_items, args.clients)
+    port = free_port()
+    log_path = os.path.join(workdir, "uvicorn.log")
+    server = start_server(database_url, port, args.workers, log_path)
+    print(f"Driving http://127.0.0.1:{port} with {args.concurrency} clients for {args.duration}s "
+          f"(warm-up {args.warmup}s, server log {log_path})")
+    try:
+        report = asyncio.run(run_load(f"http://127.0.0.1:{port}", fixture, args.mix, args.concurrency,
+                                      args.duration, args.warmup, args.seed))
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    summary = report.summary()
+    print_summary(summary, report.elapsed)
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump({"elapsed_s": round(report.elapsed, 3), "routes": summary}, fh, indent=2)
+
+    violations = [violation for slo in slos for violation in slo.violations(summary)]
+    for violation in violations:
+        print(f"SLO violated: {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
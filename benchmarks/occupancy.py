@@ -0,0 +1,65 @@
+# src/benchmarks/occupancy.py
+"""
+Cost of the occupancy timeline computation on synthetic data.
+
+Generates random reservation intervals for N restaurants over a number of days
+and times ``dashboard.domain.occupancy`` (difference arrays plus cumsum, then
+utilization and the optional hour-of-day fold). The database query is not part
+of the measurement.
+
+Example:
+    python -m benchmarks.occupancy --restaurants 1000 --days 365 --per-day 20
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from dashboard.domain.occupancy import occupancy_matrices, utilization, fold_hour_of_day
+
+
+def synthetic_intervals(restaurants: int, days: int, per_day: int, seed: int = 7):
+    """Random evening-heavy reservations lasting 1 to 3 hours."""
+    rng = np.random.default_rng(seed)
+    n = restaurants * days * per_day
+    rows = rng.integers(0, restaurants, n)
+    day = rng.integers(0, days, n)
+    hour = np.clip(rng.normal(20, 2.5, n), 11, 23)
+    starts = day * 86400.0 + np.round(hour * 4) * 900
+    ends = starts + rng.integers(1, 4, n) * 3600.0
+    guests = rng.integers(1, 9, n).astype(np.float64)
+    return rows, starts, ends, guests
+
+
+def run(restaurants: int, days: int, per_day: int, bucket_minutes: int, repeat: int) -> None:
+    rows, starts, ends, guests = synthetic_intervals(restaurants, days, per_day)
+    seats_capacity = np.full(restaurants, 80)
+    tables_capacity = np.full(restaurants, 20)
+    n_buckets = days * 1440 // bucket_minutes
+    print(f"{len(rows):,} reservations, {restaurants} restaurants x {n_buckets:,} buckets")
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        seats, tables = occupancy_matrices(rows, starts, ends, guests, restaurants, 0.0, n_buckets, bucket_minutes * 60)
+        seat_utilization = utilization(seats, seats_capacity)
+        utilization(tables, tables_capacity)
+        fold_hour_of_day(seat_utilization, 0, max(1, 60 // bucket_minutes))
+        timings.append(time.perf_counter() - started)
+    print(f"median {statistics.median(timings) * 1000:.1f} ms, best {min(timings) * 1000:.1f} ms over {repeat} runs")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--per-day", type=int, default=20, help="Reservations per restaurant and day")
+    parser.add_argument("--bucket-minutes", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.restaurants, args.days, args.per_day, args.bucket_minutes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
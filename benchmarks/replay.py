@@ -0,0 +1,436 @@
+# src/benchmarks/replay.py
+"""
+Replays recorded production traffic against a local instance.
+
+``run`` seeds a throwaway SQLite database the same way as the load test,
+starts ``main:app`` under uvicorn and re-drives the traces written by
+``shared.recorder`` (TRAFFIC_RECORDING=true) at their original pace, scaled by
+``--speed``, or as fast as ``--concurrency`` allows. Recorded ids and users are
+mapped onto the seeded data by a keyed hash and bodies are synthesized from
+their recorded shapes, so the same traces and seed send exactly the same
+requests to every build. ``compare`` reports per-route latency differences
+between two ``run --json`` results.
+
+Example:
+    python -m benchmarks.replay run data/traffic --speed 4 --json before.json
+    (check out the other build)
+    python -m benchmarks.replay run data/traffic --speed 4 --json after.json
+    python -m benchmarks.replay compare before.json after.json --max-regression 10
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.loadtest import (
+    ADMIN_EMAIL, CLIENT_PASSWORD, Fixture, LoadReport, free_port, print_summary, seed_database, start_server,
+)
+
+# Traces whose bodies cannot be rebuilt from a shape: uploads, and batches of arbitrary sub-requests.
+SKIPPED_ROUTES = {("POST", "/batch"), ("POST", "/menu/import")}
+# Tokens are renewed well before ACCESS_TOKEN_EXPIRE_MINUTES so long replays keep working.
+TOKEN_REFRESH_SECONDS = 600
+MENU_CATEGORIES = ["Entrada", "Principal", "Postre", "Bebida"]
+COMPARE_METRICS = ("p50", "p95", "p99")
+
+
+def load_traces(paths: List[str]) -> List[Dict[str, Any]]:
+    """Traces from the given files and directories (their ``*.jsonl`` files), in start order."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".jsonl"))
+        else:
+            files.append(path)
+    traces = []
+    for file in files:
+        with open(file) as fh:
+            for line in fh:
+                if line.strip():
+                    try:
+                        traces.append(json.loads(line))
+                    except ValueError:  # a line cut short when the recorder was killed
+                        continue
+    traces.sort(key=lambda trace: trace["ts"])
+    return traces
+
+
+def parse_speed(value: str) -> float:
+    """``max`` (0, no pacing) or a factor applied to the recorded pace, e.g. ``2`` for twice as fast."""
+    if value == "max":
+        return 0.0
+    speed = float(value)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("Speed must be positive, or 'max'.")
+    return speed
+
+
+class TraceMapper:
+    """
+    Turns a recorded trace into a concrete request against the seeded data.
+
+    Every choice is drawn from a hash of the seed and the recorded value (or
+    from a generator seeded with the trace's position), never from replay
+    responses, so the request list only depends on the traces and the seed.
+    """
+
+    def __init__(self, fixture: Fixture, reservations: Dict[str, List[int]], traces: List[Dict[str, Any]], seed: int):
+        self.fixture = fixture
+        self.reservations = reservations
+        self.seed = seed
+        self.tables = sorted((table_id, capacity, restaurant_id)
+                             for restaurant_id, tables in fixture.tables.items() for table_id, capacity in tables)
+        self.items = sorted(item_id for items in fixture.menu_items.values() for item_id in items)
+        # A user's role, also for their login traces, which are made before they hold a token.
+        self.roles = {trace["user"]: trace["role"] for trace in traces
+                      if trace.get("user") and trace["role"] in ("admin", "client")}
+
+    def _pick(self, key: Any, values: List[Any]) -> Any:
+        digest = hashlib.sha256(f"{self.seed}:{key}".encode()).hexdigest()
+        return values[int(digest, 16) % len(values)]
+
+    def account(self, trace: Dict[str, Any]) -> Optional[Tuple[str, int]]:
+        """(email, user id) of the seeded account standing in for the trace's user, if any."""
+        user = trace.get("user")
+        if user is None:
+            return None
+        if self.roles.get(user, trace["role"]) == "admin":
+            return ADMIN_EMAIL, 0
+        user_id, email = self._pick(user, self.fixture.clients)
+        return email, user_id
+
+    def restaurant(self, key: Any) -> int:
+        return self._pick(f"restaurant:{key}", self.fixture.restaurants)[0]
+
+    def map_id(self, name: str, value: Any, account: Optional[Tuple[str, int]] = None) -> Any:
+        if name == "restaurant_id":
+            return self.restaurant(value)
+        if name == "table_id":
+            return self._pick(f"table:{value}", self.tables)[0]
+        if name == "item_id":
+            return self._pick(f"item:{value}", self.items)
+        if name == "reservation_id":
+            # One of the caller's own reservations, so ownership checks pass as they did when recorded.
+            owned = self.reservations.get(account[0]) if account else None
+            candidates = owned or sorted(id for ids in self.reservations.values() for id in ids)
+            if candidates:
+                return self._pick(f"reservation:{value}", candidates)
+        return value
+
+    def request(self, index: int, trace: Dict[str, Any]) -> Dict[str, Any]:
+        rng = random.Random(f"{self.seed}:{index}")
+        account = self.account(trace)
+        params = {name: self.map_id(name, value, account) for name, value in trace["path_params"].items()}
+        path = trace["route"]
+        for name, value in params.items():
+            path = path.replace(f"{{{name}}}", str(value))
+        query = [(key, self.map_id(key, value) if key == "restaurant_id" and value.isdigit() else
+                  f"replay-{index}" if value == "<redacted>" else value) for key, value in trace["query"]]
+        context = {"restaurant_id": params.get("restaurant_id") or next(
+            (value for key, value in query if key == "restaurant_id"), None) or rng.choice(self.fixture.restaurants)[0]}
+        request: Dict[str, Any] = {"method": trace["method"], "url": path, "params": query}
+        shape = trace.get("body")
+        if trace.get("content_type") == "application/x-www-form-urlencoded" and shape is not None:
+            email = account[0] if account else f"replay-{index}@replay.local"
+            request["data"] = {key: email if key == "username" else CLIENT_PASSWORD if key == "password"
+                               else f"replay-{key}" for key in shape}
+        elif shape is not None:
+            request["json"] = self._synthesize(shape, rng, context, account, index)
+        return request
+
+    def _synthesize(self, shape: Any, rng: random.Random, context: Dict[str, Any],
+                    account: Optional[Tuple[str, int]], index: int, key: str = "") -> Any:
+        if isinstance(shape, dict):
+            # Ids first, so that tables, guests and dishes agree with the restaurant.
+            ordered = sorted(shape, key=lambda name: (not name.endswith("_id"), name != "restaurant_id"))
+            body = {name: self._synthesize(shape[name], rng, context, account, index, name) for name in ordered}
+            return {name: body[name] for name in shape}
+        if isinstance(shape, list):
+            if key == "preordered_menu_items":
+                items = self.fixture.menu_items.get(context["restaurant_id"], [])
+                return rng.sample(items, k=min(len(items), len(shape)))
+            if key == "allergens":
+                return []
+            return [self._synthesize(item, rng, context, account, index, key) for item in shape]
+        if key == "user_id":  # admins book on behalf of a client
+            return account[1] if account and account[0] != ADMIN_EMAIL else rng.choice(self.fixture.clients)[0]
+        if key == "restaurant_id":
+            return context["restaurant_id"]
+        if key == "table_id":
+            tables = self.fixture.tables.get(context["restaurant_id"]) or [(table[0], table[1]) for table in self.tables]
+            context["table_id"], context["capacity"] = rng.choice(tables)
+            return context["table_id"]
+        if key == "num_guests":
+            return rng.randint(1, context.get("capacity", 4))
+        if key == "duration_hours":
+            return 2
+        # Fields the services validate beyond their type.
+        if key == "category":
+            return rng.choice(MENU_CATEGORIES)
+        if key in ("opening_time", "closing_time"):
+            return "12:00" if key == "opening_time" else "23:00"
+        if key == "table_number":
+            return 1000 + index
+        if key == "capacity":
+            return rng.randint(2, 12)
+        if key in ("latitude", "longitude"):
+            return round(rng.uniform(-60, 60), 4)
+        if key == "password":
+            return CLIENT_PASSWORD
+        if shape == "email":
+            return f"replay-{self.seed}-{index}@replay.local"
+        if shape in ("datetime", "date"):
+            opening = next((r[1] for r in self.fixture.restaurants if r[0] == context["restaurant_id"]),
+                           self.fixture.restaurants[0][1])
+            moment = datetime.combine(datetime.now().date() + timedelta(days=rng.randint(2, 60)), opening) + \
+                timedelta(hours=rng.randint(0, 7))
+            return moment.isoformat() if shape == "datetime" else moment.date().isoformat()
+        if shape == "time":
+            return f"{rng.randint(8, 14):02d}:00"
+        if shape == "int":
+            return rng.randint(1, 10)
+        if shape == "float":
+            return round(rng.uniform(1, 100), 2)
+        if shape == "bool":
+            return rng.random() < 0.5
+        if shape == "null":
+            return None
+        return f"Replay {key or 'value'} {self.seed}-{index}"
+
+
+class Tokens:
+    """Bearer tokens of the seeded accounts; logins made here are not part of the measurements."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def headers(self, email: str) -> Dict[str, str]:
+        lock = self._locks.setdefault(email, asyncio.Lock())
+        async with lock:
+            token, issued = self._tokens.get(email, (None, 0.0))
+            if token is None or time.monotonic() - issued > TOKEN_REFRESH_SECONDS:
+                response = await self.client.post("/auth/token", data={"username": email, "password": CLIENT_PASSWORD})
+                response.raise_for_status()
+                token = response.json()["access_token"]
+                self._tokens[email] = (token, time.monotonic())
+        return {"Authorization": f"Bearer {token}"}
+
+
+async def seed_reservations(client: httpx.AsyncClient, tokens: Tokens, fixture: Fixture,
+                            count: int) -> Dict[str, List[int]]:
+    """
+    Books ``count`` reservations over HTTP, one client after another, for
+    traces that modify or cancel one; returns their ids by client email.
+    """
+    await asyncio.gather(*(tokens.headers(email) for _, email in fixture.clients[:count]))
+    reservations: Dict[str, List[int]] = {}
+    start = datetime.now().date() + timedelta(days=90)
+    for n in range(count):
+        user_id, email = fixture.clients[n % len(fixture.clients)]
+        restaurant_id, opening, _ = fixture.restaurants[n % len(fixture.restaurants)]
+        table_id, capacity = fixture.tables[restaurant_id][n % len(fixture.tables[restaurant_id])]
+        payload = {
+            "user_id": user_id, "restaurant_id": restaurant_id, "table_id": table_id, "num_guests": min(2, capacity),
+            "reservation_time": datetime.combine(start + timedelta(days=n), opening).isoformat(),
+            "duration_hours": 2, "preordered_menu_items": [],
+        }
+        response = await client.post("/reservations/", json=payload, headers=await tokens.headers(email))
+        if response.status_code == 201:
+            reservations.setdefault(email, []).append(response.json()["id"])
+    return reservations
+
+
+async def replay(base_url: str, fixture: Fixture, traces: List[Dict[str, Any]], speed: float, concurrency: int,
+                 reservations: int, seed: int) -> Tuple[LoadReport, Dict[str, int]]:
+    """Sends every trace to ``base_url`` at ``speed`` times the recorded pace (0 for no pacing)."""
+    report = LoadReport()
+    counters = {"sent": 0, "skipped": 0, "max_lag_ms": 0}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        tokens = Tokens(client)
+        mapper = TraceMapper(fixture, await seed_reservations(client, tokens, fixture, reservations), traces, seed)
+        accounts = {account[0] for account in map(mapper.account, traces) if account is not None}
+        await asyncio.gather(*(tokens.headers(email) for email in accounts))
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(index: int, trace: Dict[str, Any]):
+            label = f"{trace['method']} {trace['route']}"
+            request = mapper.request(index, trace)
+            account = mapper.account(trace)
+            headers = {}
+            if trace["role"] == "invalid":
+                headers = {"Authorization": "Bearer invalid"}
+            elif account is not None and trace["role"] != "anonymous":
+                headers = await tokens.headers(account[0])
+            started = time.perf_counter()
+            try:
+                response = await client.request(headers=headers, **request)
+            except httpx.HTTPError:
+                report.record(label, (time.perf_counter() - started) * 1000, None)
+                return
+            report.record(label, (time.perf_counter() - started) * 1000, response.status_code)
+
+        async def paced(index: int, trace: Dict[str, Any], due: float):
+            async with semaphore:
+                counters["max_lag_ms"] = max(counters["max_lag_ms"], round((time.perf_counter() - due) * 1000))
+                await send(index, trace)
+
+        replayable = []
+        for index, trace in enumerate(traces):
+            if (trace["method"], trace["route"]) in SKIPPED_ROUTES or "{" in trace["route"] and not trace["path_params"]:
+                counters["skipped"] += 1
+            else:
+                replayable.append((index, trace))
+        counters["sent"] = len(replayable)
+
+        report.started_at = time.perf_counter()
+        if speed:
+            first = replayable[0][1]["ts"] if replayable else 0.0
+            tasks = []
+            for index, trace in replayable:
+                due = report.started_at + (trace["ts"] - first) / speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(paced(index, trace, due)))
+            await asyncio.gather(*tasks)
+        else:
+            pending = iter(replayable)
+
+            async def worker():
+                for index, trace in pending:
+                    await send(index, trace)
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        report.finished_at = time.perf_counter()
+    return report, counters
+
+
+def recorded_summary(traces: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """The recorded latencies and statuses per route, to put next to the replayed ones."""
+    recorded = LoadReport()
+    for trace in traces:
+        recorded.record(f"{trace['method']} {trace['route']}", trace["duration_ms"], trace["status"])
+    if traces:
+        recorded.started_at, recorded.finished_at = traces[0]["ts"], traces[-1]["ts"]
+    return recorded.summary()
+
+
+def run(args: argparse.Namespace) -> int:
+    traces = load_traces(args.traces)
+    if args.limit:
+        traces = traces[:args.limit]
+    if not traces:
+        print("No traces found.")
+        return 1
+
+    workdir = tempfile.mkdtemp(prefix="replay-")
+    database_path = os.path.join(workdir, "replay.db")
+    database_url = f"sqlite:///{database_path}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["TRAFFIC_RECORDING"] = "false"  # the replayed instance must not record the replay
+    print(f"Seeding {database_path} ...")
+    fixture = seed_database(args.restaurants, args.tables, args.menu_items, args.clients)
+    port = free_port()
+    log_path = os.path.join(workdir, "uvicorn.log")
+    server = start_server(database_url, port, args.workers, log_path)
+    pace = "maximum speed" if not args.speed else f"{args.speed}x the recorded pace"
+    print(f"Replaying {len(traces)} traces against http://127.0.0.1:{port} at {pace} (server log {log_path})")
+    try:
+        report, counters = asyncio.run(replay(f"http://127.0.0.1:{port}", fixture, traces, args.speed,
+                                              args.concurrency, args.reservations, args.seed))
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    summary = report.summary()
+    print_summary(summary, report.elapsed)
+    print(f"{counters['skipped']} traces skipped; replay fell behind schedule by up to {counters['max_lag_ms']} ms")
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump({"elapsed_s": round(report.elapsed, 3), "speed": args.speed or "max", "seed": args.seed,
+                       **counters, "routes": summary, "recorded": recorded_summary(traces)}, fh, indent=2)
+    return 0
+
+
+def _delta(before: float, after: float) -> float:
+    return round((after - before) / before * 100, 1) if before else 0.0
+
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.before) as fh:
+        before = json.load(fh)["routes"]
+    with open(args.after) as fh:
+        after = json.load(fh)["routes"]
+    header = f"{'route':<42} {'count':>7}" + "".join(
+        f" {metric + ' before':>11} {metric + ' after':>10} {'delta':>8}" for metric in COMPARE_METRICS)
+    print(header)
+    print("-" * len(header))
+    regressions = []
+    for route in sorted(before.keys() | after.keys()):
+        if route not in before or route not in after:
+            print(f"{route:<42} only in {'after' if route in after else 'before'}")
+            continue
+        line = f"{route:<42} {after[route]['count']:>7}"
+        for metric in COMPARE_METRICS:
+            old, new = before[route][f"{metric}_ms"], after[route][f"{metric}_ms"]
+            line += f" {old:>11} {new:>10} {_delta(old, new):>+7}%"
+        print(line)
+        old, new = before[route][f"{args.metric}_ms"], after[route][f"{args.metric}_ms"]
+        if args.max_regression is not None and new - old > args.min_delta_ms and _delta(old, new) > args.max_regression:
+            regressions.append(f"{route}: {args.metric} {old} -> {new} ms ({_delta(old, new):+}%)")
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    return 1 if regressions else 0
+
+
+COMMANDS = {
+    "run": run,
+    "compare": compare,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.replay", description="Replay recorded traffic.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Replay traces against a freshly seeded local instance.")
+    run_parser.add_argument("traces", nargs="+", help="Trace files or directories of *.jsonl files.")
+    run_parser.add_argument("--speed", type=parse_speed, default=1.0,
+                            help="Multiple of the recorded pace (1 = original), or 'max' for no pacing.")
+    run_parser.add_argument("--concurrency", type=int, default=64, help="Maximum requests in flight.")
+    run_parser.add_argument("--limit", type=int, help="Only replay the first N traces.")
+    run_parser.add_argument("--workers", type=int, default=1, help="Number of uvicorn worker processes.")
+    run_parser.add_argument("--restaurants", type=int, default=20)
+    run_parser.add_argument("--tables", type=int, default=10, help="Tables per restaurant.")
+    run_parser.add_argument("--menu-items", type=int, default=30, help="Menu items per restaurant.")
+    run_parser.add_argument("--clients", type=int, default=50, help="Number of client accounts.")
+    run_parser.add_argument("--reservations", type=int, default=100,
+                            help="Reservations booked before the replay for traces that modify or cancel one.")
+    run_parser.add_argument("--seed", type=int, default=1234)
+    run_parser.add_argument("--json", dest="json_path", help="Write the per-route summary as JSON to this path.")
+    compare_parser = subparsers.add_parser("compare", help="Per-route latency differences between two runs.")
+    compare_parser.add_argument("before", help="JSON summary of the baseline build.")
+    compare_parser.add_argument("after", help="JSON summary of the candidate build.")
+    compare_parser.add_argument("--metric", choices=COMPARE_METRICS, default="p95",
+                                help="Percentile checked against --max-regression.")
+    compare_parser.add_argument("--max-regression", type=float,
+                                help="Exit with status 1 when a route's metric grows by more than this many percent.")
+    compare_parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                                help="Ignore regressions smaller than this many milliseconds.")
+    args = parser.parse_args(argv)
+    return COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,130 @@
+# src/benchmarks/serialization.py
+"""
+Per-row cost of list endpoint serialization, before and after the Core fast path.
+
+"orm" reproduces what a list endpoint did before: load SQLModel instances into
+the session identity map, validate each one against the ``response_model`` and
+render the JSON with the standard library encoder. "core" is the path the
+endpoints use now: select the public columns as plain rows and encode them with
+orjson (``shared.serialization``). Both run against an in-memory SQLite database
+so the numbers isolate Python-side cost.
+
+Example:
+    python -m benchmarks.serialization --rows 10000 --listing menu
+    python -m benchmarks.serialization --rows 10000 --listing reservations
+"""
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from auth.domain.entities import User  # noqa: F401 - needed for foreign keys
+from menu.domain.entities import MenuItem, MenuItemPublic
+from reservations.domain.entities import Reservation, ReservationPublic
+from restaurants.domain.entities import Restaurant, Table  # noqa: F401 - needed for foreign keys
+from shared.serialization import encode_rows, public_columns
+
+LISTINGS = {
+    "menu": (MenuItem, MenuItemPublic),
+    "reservations": (Reservation, ReservationPublic),
+}
+
+
+def seed(engine, listing: str, rows: int):
+    """Bulk-inserts ``rows`` menu items or reservations for restaurant 1."""
+    start = datetime(2024, 1, 1, 12, 0)
+    with Session(engine) as session:
+        if listing == "menu":
+            session.add_all(MenuItem(restaurant_id=1, name=f"Plato {i}", description=f"Descripción del plato {i}",
+                                     category="Principal", image_url=f"https://img.example/{i}.jpg")
+                            for i in range(rows))
+        else:
+            session.add_all(Reservation(user_id=1 + i % 50, restaurant_id=1, table_id=1 + i % 20, num_guests=2 + i % 6,
+                                        reservation_time=start + timedelta(hours=i),
+                                        end_time=start + timedelta(hours=i + 2), notes="Mesa cerca de la ventana",
+                                        special_requests=["silla para bebé"], allergens=["gluten"])
+                            for i in range(rows))
+        session.commit()
+
+
+def orm_path(engine, listing: str) -> bytes:
+    table_model, public_model = LISTINGS[listing]
+    adapter = TypeAdapter(List[public_model])
+    with Session(engine) as session:
+        items = session.exec(select(table_model).where(table_model.restaurant_id == 1)).all()
+        validated = adapter.validate_python(items, from_attributes=True)
+        return json.dumps(adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+
+def core_path(engine, listing: str) -> bytes:
+    table_model, public_model = LISTINGS[listing]
+    with Session(engine) as session:
+        result = session.exec(
+            select(*public_columns(table_model, public_model)).where(table_model.restaurant_id == 1)
+        )
+        return encode_rows(list(result.keys()), result.all())
+
+
+def measure(fn: Callable[[], bytes], repeat: int) -> Dict[str, float]:
+    """Median CPU time and peak traced allocation over ``repeat`` runs."""
+    cpu, peaks = [], []
+    for _ in range(repeat):
+        gc.collect()
+        tracemalloc.start()
+        started = time.process_time()
+        payload = fn()
+        cpu.append(time.process_time() - started)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    # Timings above include tracemalloc overhead; rerun untraced for the CPU figure.
+    untraced = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.process_time()
+        fn()
+        untraced.append(time.process_time() - started)
+    return {"cpu_s": statistics.median(untraced), "peak_bytes": statistics.median(peaks), "payload_bytes": len(payload)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare ORM + response_model vs Core + orjson list serialization.")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--listing", choices=sorted(LISTINGS), default="menu")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    seed(engine, args.listing, args.rows)
+
+    if json.loads(orm_path(engine, args.listing)) != json.loads(core_path(engine, args.listing)):
+        print("Payload mismatch between the ORM and Core paths.", file=sys.stderr)
+        return 1
+
+    results = {
+        "orm": measure(lambda: orm_path(engine, args.listing), args.repeat),
+        "core": measure(lambda: core_path(engine, args.listing), args.repeat),
+    }
+    print(f"{args.rows} {args.listing} rows, median of {args.repeat} runs")
+    print(f"{'path':<6} {'total ms':>10} {'us/row':>8} {'peak KiB':>10} {'B/row':>8} {'payload KiB':>12}")
+    for name, result in results.items():
+        print(f"{name:<6} {result['cpu_s'] * 1000:>10.1f} {result['cpu_s'] / args.rows * 1e6:>8.2f} "
+              f"{result['peak_bytes'] / 1024:>10.0f} {result['peak_bytes'] / args.rows:>8.0f} "
+              f"{result['payload_bytes'] / 1024:>12.0f}")
+    speedup = results["orm"]["cpu_s"] / max(results["core"]["cpu_s"], 1e-9)
+    memory = results["orm"]["peak_bytes"] / max(results["core"]["peak_bytes"], 1)
+    print(f"core path: {speedup:.1f}x less CPU, {memory:.1f}x lower peak memory")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -1,34 +1,67 @@
 # src/dashboard/api/routers.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from datetime import date, timedelta
 from shared.dependencies import get_current_active_user, require_role
 from dashboard.domain.services import DashboardService
+from dashboard.domain.cache import dashboard_cache
+from dashboard.domain.jobs import report_jobs
+from dashboard.domain.entities import ReservationDailyStatsPublic, ReportJobCreate, ReportJobPublic
+from shared.exceptions import BadRequestException, ServiceUnavailableException
 from shared.database import get_session
 from auth.api.routers import require_role
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
+SERIES_KEYS = {"day": "daily_reservations", "week": "weekly_reservations", "month": "monthly_reservations"}
+
+def cached(db: Session, method: str, **params):
+    """Serves a DashboardService result through the dashboard cache."""
+    return dashboard_cache.get(method, params, lambda session: getattr(DashboardService(session), method)(**params), db)
+
 @router.get("/reservations", response_model=Dict[str, Any],
             dependencies=[Depends(require_role(["admin"]))])
-def get_reservations_stats(db: Session = Depends(get_session)):
-    """Provides total reservations by day/week (Admin only)."""
-    service = DashboardService(db)
+def get_reservations_stats(db: Session = Depends(get_session),
+                           date_from: Optional[date] = Query(None, alias="from", description="First day (YYYY-MM-DD)"),
+                           date_to: Optional[date] = Query(None, alias="to", description="Last day, inclusive (YYYY-MM-DD)"),
+                           restaurant_id: Optional[int] = Query(None, description="Filter by restaurant ID"),
+                           granularity: List[str] = Query(["day", "week"], description="day, week and/or month")):
+    """Provides total reservations by day/week/month (Admin only)."""
     try:
-        daily_stats = service.get_reservations_by_period("day")
-        weekly_stats = service.get_reservations_by_period("week")
-        return {"daily_reservations": daily_stats, "weekly_reservations": weekly_stats}
+        series = cached(db, "get_reservation_counts", granularities=granularity, date_from=date_from,
+                        date_to=date_to, restaurant_id=restaurant_id)
+        return {SERIES_KEYS[g]: counts for g, counts in series.items()}
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+@router.get("/reservations/daily", response_model=List[ReservationDailyStatsPublic],
+            dependencies=[Depends(require_role(["admin"]))])
+def get_daily_reservation_stats(db: Session = Depends(get_session),
+                                date_from: Optional[date] = Query(None, alias="from", description="First day (YYYY-MM-DD)"),
+                                date_to: Optional[date] = Query(None, alias="to", description="Last day, inclusive (YYYY-MM-DD)"),
+                                restaurant_id: Optional[int] = Query(None, description="Filter by restaurant ID")):
+    """Provides reservation counts by status, guests and tables used per restaurant and day (Admin only)."""
+    def load(session: Session):
+        rows = DashboardService(session).get_daily_stats(date_from, date_to, restaurant_id)
+        return [ReservationDailyStatsPublic.model_validate(row) for row in rows]
+    return dashboard_cache.get("get_daily_stats", {"date_from": date_from, "date_to": date_to,
+                                                   "restaurant_id": restaurant_id}, load, db)
+
 @router.get("/dishes", response_model=List[Dict[str, Any]],
             dependencies=[Depends(require_role(["admin"]))])
-def get_top_dishes(db: Session = Depends(get_session)):
-    """Provides the top 5 most pre-ordered dishes (Admin only)."""
-    service = DashboardService(db)
+def get_top_dishes(db: Session = Depends(get_session),
+                   limit: int = Query(5, ge=1, le=50, description="Number of dishes to return"),
+                   window: int = Query(90, description="Window in days: 7, 30 or 90"),
+                   restaurant_id: Optional[int] = Query(None, description="Restrict to one restaurant")):
+    """Provides the most pre-ordered dishes over a sliding window (Admin only)."""
     try:
-        top_dishes = service.get_top_preordered_dishes()
+        top_dishes = cached(db, "get_top_preordered_dishes", limit=limit, window_days=window, restaurant_id=restaurant_id)
         return top_dishes
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -36,9 +69,54 @@ def get_top_dishes(db: Session = Depends(get_session)):
             dependencies=[Depends(require_role(["admin"]))])
 def get_occupancy_stats(db: Session = Depends(get_session)):
     """Provides occupancy percentage per restaurant (Admin only)."""
-    service = DashboardService(db)
     try:
-        occupancy_data = service.get_restaurant_occupancy()
+        occupancy_data = cached(db, "get_restaurant_occupancy")
         return occupancy_data
     except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/occupancy/timeline", response_model=Dict[str, Any],
+            dependencies=[Depends(require_role(["admin"]))])
+def get_occupancy_timeline(db: Session = Depends(get_session),
+                           date_from: Optional[date] = Query(None, alias="from", description="First day (YYYY-MM-DD), defaults to today"),
+                           date_to: Optional[date] = Query(None, alias="to", description="Last day, inclusive (YYYY-MM-DD), defaults to a week later"),
+                           bucket_minutes: int = Query(60, description="Bucket size in minutes; must divide a day"),
+                           restaurant_id: Optional[int] = Query(None, description="Filter by restaurant ID"),
+                           fold: Optional[str] = Query(None, description="'hour_of_day' for a 24-column heatmap")):
+    """Provides seat and table utilization per restaurant and time bucket (Admin only)."""
+    date_from = date_from or date.today()
+    date_to = date_to or date_from + timedelta(days=6)
+    try:
+        return cached(db, "get_occupancy_timeline", date_from=date_from, date_to=date_to,
+                      bucket_minutes=bucket_minutes, restaurant_id=restaurant_id, fold=fold)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/cache/metrics", response_model=Dict[str, Any],
+            dependencies=[Depends(require_role(["admin"]))])
+def get_cache_metrics():
+    """Provides hit, miss and refresh-time metrics of the dashboard cache (Admin only)."""
+    return dashboard_cache.metrics()
+
+@router.post("/jobs", response_model=ReportJobPublic, status_code=status.HTTP_202_ACCEPTED,
+             dependencies=[Depends(require_role(["admin"]))])
+def create_report_job(job_create: ReportJobCreate):
+    """Queues a long-running report (occupancy_timeline, reservation_counts, dish_rankings) in the worker pool (Admin only)."""
+    try:
+        return report_jobs.submit(job_create.kind, job_create.params)
+    except BadRequestException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.detail)
+    except ServiceUnavailableException as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=e.detail,
+                            headers={"Retry-After": str(e.retry_after)})
+
+@router.get("/jobs/{job_id}", response_model=ReportJobPublic,
+            dependencies=[Depends(require_role(["admin"]))])
+def get_report_job(job_id: str):
+    """Provides the status of a report job and its result once finished (Admin only)."""
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report job not found")
+    return job
\ No newline at end of file
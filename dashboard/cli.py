@@ -0,0 +1,54 @@
+# src/dashboard/cli.py
+"""
+Admin commands for the dashboard module.
+
+    python -m dashboard.cli rebuild-rollup
+    python -m dashboard.cli rebuild-dish-sketch
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from sqlmodel import Session
+
+import auth.domain.entities  # noqa: F401 - registers every table on the metadata
+import menu.domain.entities  # noqa: F401
+import restaurants.domain.entities  # noqa: F401
+from dashboard.domain.rollups import ReservationRollup
+from dashboard.domain.popularity import dish_popularity
+from shared.database import create_db_and_tables, engine, shard_router
+
+
+def rebuild_rollup() -> int:
+    """Rebuilds reservation_daily_stats from scratch (backfill and repair), on every shard."""
+    create_db_and_tables()
+    rows = sum(shard_router.fan_out(lambda session: ReservationRollup(session).rebuild()))
+    print(f"reservation_daily_stats rebuilt: {rows} restaurant-day rows.")
+    return 0
+
+
+def rebuild_dish_sketch() -> int:
+    """Rebuilds and persists the dish popularity sketch from reservation history."""
+    with Session(engine) as session:
+        dish_popularity.rebuild(session)
+    print(f"Dish popularity sketch rebuilt and written to {dish_popularity.path}.")
+    return 0
+
+
+COMMANDS = {
+    "rebuild-rollup": rebuild_rollup,
+    "rebuild-dish-sketch": rebuild_dish_sketch,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m dashboard.cli", description="Dashboard admin commands.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild-rollup", help="Rebuild the reservation_daily_stats rollup from reservations.")
+    subparsers.add_parser("rebuild-dish-sketch", help="Rebuild the dish popularity sketch from reservations.")
+    args = parser.parse_args(argv)
+    return COMMANDS[args.command]()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
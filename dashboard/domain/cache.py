@@ -0,0 +1,186 @@
+# src/dashboard/domain/cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from sqlmodel import Session
+
+from shared.cache import ALL_SCOPES, invalidation_bus
+from shared.database import engine
+
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "30"))
+DASHBOARD_CACHE_MAX_STALE = float(os.getenv("DASHBOARD_CACHE_MAX_STALE", "300"))
+DASHBOARD_CACHE_WRITE_THRESHOLD = int(os.getenv("DASHBOARD_CACHE_WRITE_THRESHOLD", "50"))
+DASHBOARD_CACHE_MAX_ENTRIES = int(os.getenv("DASHBOARD_CACHE_MAX_ENTRIES", "128"))
+
+Loader = Callable[[Session], Any]
+
+
+class _Entry:
+    __slots__ = ("value", "computed_at", "writes_seen", "refreshing")
+
+    def __init__(self, value: Any, computed_at: float, writes_seen: int):
+        self.value = value
+        self.computed_at = computed_at
+        self.writes_seen = writes_seen
+        self.refreshing = False
+
+
+class DashboardCache:
+    """
+    TTL cache for dashboard results with stale-while-revalidate.
+
+    * Fresh entries (younger than ``ttl`` and fewer than ``write_threshold``
+      reservation writes since they were computed) are served as is.
+    * Stale entries (older than ``ttl`` but within ``max_stale``, or invalidated
+      by writes) are still served while a single background task recomputes
+      them on its own session.
+    * Missing or expired entries are computed by the caller; concurrent callers
+      for the same key wait for that one computation instead of repeating it.
+    """
+
+    def __init__(self, ttl: float = DASHBOARD_CACHE_TTL, max_stale: float = DASHBOARD_CACHE_MAX_STALE,
+                 write_threshold: int = DASHBOARD_CACHE_WRITE_THRESHOLD,
+                 max_entries: int = DASHBOARD_CACHE_MAX_ENTRIES, session_factory: Callable[[], Session] = None):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.write_threshold = write_threshold
+        self.max_entries = max_entries
+        self.session_factory = session_factory or (lambda: Session(engine))
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._metrics = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0,
+                         "evictions": 0, "refresh_seconds_total": 0.0, "refresh_seconds_max": 0.0}
+
+    @staticmethod
+    def make_key(method: str, params: Dict[str, Any]) -> Tuple:
+        return (method,) + tuple(
+            (name, tuple(value) if isinstance(value, list) else value) for name, value in sorted(params.items())
+        )
+
+    def get(self, method: str, params: Dict[str, Any], loader: Loader, session: Session) -> Any:
+        """Returns the cached result for ``method(**params)``, computing it with ``loader`` when needed."""
+        key = self.make_key(method, params)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.computed_at
+                if age < self.ttl + self.max_stale:
+                    self._entries.move_to_end(key)
+                    if age < self.ttl and self._writes - entry.writes_seen < self.write_threshold:
+                        self._metrics["hits"] += 1
+                        return entry.value
+                    self._metrics["stale_hits"] += 1
+                    if not entry.refreshing:
+                        entry.refreshing = True
+                        self._pool().submit(self._refresh, key, loader)
+                    return entry.value
+            self._metrics["misses"] += 1
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            return future.result()
+        try:
+            value = self._compute(key, loader, session)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def note_writes(self, count: int = 1):
+        """Counts reservation writes; entries older than ``write_threshold`` writes turn stale."""
+        with self._lock:
+            self._writes += count
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["entries"] = len(self._entries)
+            metrics["refreshing"] = sum(1 for entry in self._entries.values() if entry.refreshing)
+            metrics["writes"] = self._writes
+        lookups = metrics["hits"] + metrics["stale_hits"] + metrics["misses"]
+        metrics["hit_ratio"] = round((metrics["hits"] + metrics["stale_hits"]) / lookups, 4) if lookups else 0.0
+        computed = metrics["refreshes"] + metrics["misses"]
+        metrics["refresh_seconds_avg"] = round(metrics["refresh_seconds_total"] / computed, 6) if computed else 0.0
+        metrics["settings"] = {"ttl": self.ttl, "max_stale": self.max_stale,
+                               "write_threshold": self.write_threshold, "max_entries": self.max_entries}
+        return metrics
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="dashboard-cache")
+        return self._executor
+
+    def _compute(self, key: Hashable, loader: Loader, session: Session) -> Any:
+        with self._lock:
+            writes_seen = self._writes
+        started = time.monotonic()
+        value = loader(session)
+        finished = time.monotonic()
+        with self._lock:
+            self._record_timing(finished - started)
+            self._store(key, _Entry(value, finished, writes_seen))
+        return value
+
+    def _refresh(self, key: Hashable, loader: Loader):
+        try:
+            with self.session_factory() as session:
+                self._compute(key, loader, session)
+            with self._lock:
+                self._metrics["refreshes"] += 1
+        except Exception:
+            with self._lock:
+                self._metrics["refresh_errors"] += 1
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+
+    def _record_timing(self, seconds: float):
+        self._metrics["refresh_seconds_total"] += seconds
+        self._metrics["refresh_seconds_max"] = max(self._metrics["refresh_seconds_max"], seconds)
+
+    def _store(self, key: Hashable, entry: _Entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._metrics["evictions"] += 1
+
+
+dashboard_cache = DashboardCache()
+
+
+def _count_reservation_writes(scopes, local: bool):
+    # Reservation writes from every worker age the cached dashboards.
+    if ALL_SCOPES in scopes:  # this worker missed some, however many there were
+        dashboard_cache.clear()
+        return
+    writes = sum(1 for scope in scopes if scope.endswith(":reservations"))
+    if writes:
+        dashboard_cache.note_writes(writes)
+
+
+invalidation_bus.subscribe(_count_reservation_writes)
\ No newline at end of file
@@ -0,0 +1,72 @@
+# src/dashboard/domain/entities.py
+from datetime import date, datetime
+from typing import Any, Dict, List, Literal, Optional
+from sqlmodel import Field, SQLModel
+
+
+class ReservationDailyStats(SQLModel, table=True):
+    """Per restaurant and day rollup of reservations, maintained by ReservationService writes."""
+    __tablename__ = "reservation_daily_stats"
+
+    restaurant_id: int = Field(foreign_key="restaurant.id", primary_key=True)
+    day: date = Field(primary_key=True, index=True)
+    pending_count: int = 0
+    confirmed_count: int = 0
+    cancelled_count: int = 0
+    completed_count: int = 0
+    total_guests: int = 0 # Guests of non-cancelled reservations
+    tables_used: int = 0 # Distinct tables with a non-cancelled reservation
+
+
+class ReservationDailyStatsPublic(SQLModel):
+    restaurant_id: int
+    day: date
+    pending_count: int
+    confirmed_count: int
+    cancelled_count: int
+    completed_count: int
+    total_guests: int
+    tables_used: int
+
+
+class ReportJobCreate(SQLModel):
+    kind: str # occupancy_timeline, reservation_counts or dish_rankings
+    params: Dict[str, Any] = {}
+
+
+class OccupancyTimelineParams(SQLModel):
+    model_config = {"extra": "forbid"}
+
+    date_from: date
+    date_to: date
+    bucket_minutes: int = Field(default=60, gt=0, le=1440)
+    restaurant_id: Optional[int] = None
+    fold: Optional[Literal["hour_of_day"]] = None
+
+
+class ReservationCountsParams(SQLModel):
+    model_config = {"extra": "forbid"}
+
+    granularities: List[Literal["day", "week", "month"]] = Field(default=["day", "week", "month"], min_length=1)
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    restaurant_id: Optional[int] = None
+
+
+class DishRankingsParams(SQLModel):
+    model_config = {"extra": "forbid"}
+
+    limit: int = Field(default=10, ge=1, le=1000)
+    restaurant_id: Optional[int] = None
+
+
+class ReportJobPublic(SQLModel):
+    id: str
+    kind: str
+    params: Dict[str, Any]
+    status: str # queued, running, succeeded or failed
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    result: Optional[Any] = None
\ No newline at end of file
@@ -0,0 +1,198 @@
+# src/dashboard/domain/jobs.py
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional, Type
+
+from pydantic import ValidationError
+from sqlmodel import Session, SQLModel
+
+import auth.domain.entities  # noqa: F401 - registers every table on the metadata in worker processes
+import menu.domain.entities  # noqa: F401
+import restaurants.domain.entities  # noqa: F401
+from dashboard.domain.entities import DishRankingsParams, OccupancyTimelineParams, ReservationCountsParams
+from dashboard.domain.services import DashboardService
+from shared.database import engine
+from shared.exceptions import BadRequestException, ServiceUnavailableException
+
+DASHBOARD_JOB_WORKERS = int(os.getenv("DASHBOARD_JOB_WORKERS", "2"))
+DASHBOARD_JOB_MAX_PENDING = int(os.getenv("DASHBOARD_JOB_MAX_PENDING", "8"))
+DASHBOARD_JOB_DIR = os.getenv("DASHBOARD_JOB_DIR", os.path.join("data", "jobs"))
+DASHBOARD_JOB_RESULT_TTL = float(os.getenv("DASHBOARD_JOB_RESULT_TTL", "86400"))
+
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _occupancy_timeline(service, date_from: str, date_to: str, bucket_minutes: int = 60,
+                        restaurant_id: Optional[int] = None, fold: Optional[str] = None):
+    return service.get_occupancy_timeline(date.fromisoformat(date_from), date.fromisoformat(date_to),
+                                          bucket_minutes, restaurant_id, fold)
+
+
+def _reservation_counts(service, granularities=("day", "week", "month"), date_from: Optional[str] = None,
+                        date_to: Optional[str] = None, restaurant_id: Optional[int] = None):
+    return service.get_reservation_counts(granularities, date_from and date.fromisoformat(date_from),
+                                          date_to and date.fromisoformat(date_to), restaurant_id)
+
+
+def _dish_rankings(service, limit: int = 10, restaurant_id: Optional[int] = None):
+    return service.get_dish_rankings(limit, restaurant_id)
+
+
+REPORTS: Dict[str, Callable[..., Any]] = {
+    "occupancy_timeline": _occupancy_timeline,
+    "reservation_counts": _reservation_counts,
+    "dish_rankings": _dish_rankings,
+}
+
+# Parameters each report accepts, checked when the job is submitted rather than when it runs.
+REPORT_PARAMS: Dict[str, Type[SQLModel]] = {
+    "occupancy_timeline": OccupancyTimelineParams,
+    "reservation_counts": ReservationCountsParams,
+    "dish_rankings": DishRankingsParams,
+}
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def _write_json(path: str, payload: Dict[str, Any]):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as fh:
+        json.dump(payload, fh, default=str)
+    os.replace(tmp_path, path)
+
+
+def _validate_params(kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """The report's parameters as the worker will receive them; raises BadRequestException when invalid."""
+    try:
+        values = REPORT_PARAMS[kind].model_validate(params)
+    except ValidationError as e:
+        problems = "; ".join(f"{'.'.join(str(part) for part in error['loc']) or 'params'}: {error['msg']}"
+                             for error in e.errors())
+        raise BadRequestException(detail=f"Invalid parameters for '{kind}': {problems}")
+    date_from, date_to = getattr(values, "date_from", None), getattr(values, "date_to", None)
+    if date_from and date_to and date_to < date_from:
+        raise BadRequestException(detail="'date_to' must not be before 'date_from'.")
+    return values.model_dump(mode="json", exclude_unset=True)
+
+
+def _run_job(path: str):
+    """Runs one report in a worker process, recording its progress and result in the job file."""
+    with open(path) as fh:
+        job = json.load(fh)
+    job.update(status="running", started_at=_now())
+    _write_json(path, job)
+    try:
+        # Spawned workers import shared.database afresh, so this is their own engine (and shards).
+        with Session(engine) as session:
+            result = REPORTS[job["kind"]](DashboardService(session), **job["params"])
+        job.update(status="succeeded", result=result)
+    except Exception as e:
+        job.update(status="failed", error=f"{type(e).__name__}: {e}")
+    job["finished_at"] = _now()
+    _write_json(path, job)
+
+
+class ReportJobs:
+    """
+    Runs long dashboard reports in a bounded pool of worker processes.
+
+    Jobs and their results live as JSON files under ``directory`` so any API
+    worker can answer status requests, and finished jobs are deleted once they
+    are older than ``result_ttl`` seconds. At most ``max_pending`` jobs may be
+    queued or running; further submissions are refused.
+    """
+
+    def __init__(self, directory: str = DASHBOARD_JOB_DIR, max_workers: int = DASHBOARD_JOB_WORKERS,
+                 max_pending: int = DASHBOARD_JOB_MAX_PENDING, result_ttl: float = DASHBOARD_JOB_RESULT_TTL):
+        self.directory = directory
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Queues a report and returns its job record."""
+        if kind not in REPORTS:
+            raise BadRequestException(detail=f"Unknown report kind '{kind}'. Use one of {sorted(REPORTS)}.")
+        params = _validate_params(kind, params)
+        self.evict_expired()
+        job = {"id": uuid.uuid4().hex, "kind": kind, "params": params, "status": "queued",
+               "submitted_at": _now(), "started_at": None, "finished_at": None, "error": None, "result": None}
+        path = self._path(job["id"])
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                raise ServiceUnavailableException(detail="Too many report jobs in progress, try again later.",
+                                                  retry_after=30)
+            os.makedirs(self.directory, exist_ok=True)
+            _write_json(path, job)
+            future = self._pool().submit(_run_job, path)
+            self._pending[job["id"]] = future
+        future.add_done_callback(lambda f, job=job, path=path: self._finished(job, path, f))
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the job record (with its result once finished), or None if unknown or evicted."""
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        try:
+            with open(self._path(job_id)) as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return None
+
+    def evict_expired(self) -> int:
+        """Deletes finished jobs older than the result TTL."""
+        if not os.path.isdir(self.directory):
+            return 0
+        cutoff = time.time() - self.result_ttl
+        evicted = 0
+        for name in os.listdir(self.directory):
+            job_id, ext = os.path.splitext(name)
+            if ext != ".json" or job_id in self._pending:
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    evicted += 1
+            except FileNotFoundError:
+                pass
+        return evicted
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # "spawn" keeps workers from inheriting the API's threads and open connections.
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def _finished(self, job: Dict[str, Any], path: str, future: Future):
+        with self._lock:
+            self._pending.pop(job["id"], None)
+        if future.cancelled() or future.exception() is not None:
+            # The worker never got to record an outcome (pool shut down or crashed).
+            reason = "cancelled" if future.cancelled() else f"{type(future.exception()).__name__}: {future.exception()}"
+            job.update(status="failed", error=reason, finished_at=_now())
+            _write_json(path, job)
+
+
+report_jobs = ReportJobs()
\ No newline at end of file
@@ -0,0 +1,65 @@
+# src/dashboard/domain/occupancy.py
+from typing import Tuple
+
+import numpy as np
+
+# Seats and tables share one float64 accumulator: tables count in units of
+# 2**26 and guests below it. Both stay exact as long as a bucket holds fewer
+# than 2**26 guests and 2**26 tables (well inside the 53-bit mantissa), which
+# halves the number of scatter passes over the reservations.
+TABLE_UNIT = float(2 ** 26)
+
+
+def occupancy_matrices(restaurant_rows: np.ndarray, starts: np.ndarray, ends: np.ndarray, guests: np.ndarray,
+                       n_restaurants: int, range_start: float, n_buckets: int,
+                       bucket_seconds: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Seats and tables in use per restaurant and time bucket.
+
+    Every reservation adds its guests (and one table) to each bucket it
+    overlaps. Instead of looping over buckets, each interval writes +w at its
+    first bucket and -w one past its last into a flattened difference array
+    (one ``bincount`` per sign, seats and tables packed together), and a cumulative sum along the time axis turns
+    those deltas into occupancy. Cost is O(reservations + restaurants * buckets).
+
+    ``restaurant_rows`` holds the matrix row of each reservation; times are
+    epoch seconds. Returns two float32 arrays of shape (n_restaurants, n_buckets).
+    """
+    offsets_start = starts.astype(np.int64) - int(range_start)
+    offsets_end = ends.astype(np.int64) - int(range_start)
+    first = np.clip(offsets_start // bucket_seconds, 0, n_buckets)
+    past_last = np.clip(-(-offsets_end // bucket_seconds), 0, n_buckets)
+    # Intervals outside the range collapse to first == past_last, where +w and -w cancel out.
+    np.maximum(past_last, first, out=past_last)
+
+    width = n_buckets + 1
+    size = n_restaurants * width
+    row_offsets = restaurant_rows * width
+    opened = row_offsets + first
+    closed = row_offsets + past_last
+
+    weights = guests.astype(np.float64) + TABLE_UNIT
+    deltas = np.bincount(opened, weights=weights, minlength=size)
+    deltas -= np.bincount(closed, weights=weights, minlength=size)
+    packed = np.cumsum(deltas.reshape(n_restaurants, width), axis=1)[:, :n_buckets]
+    tables = np.floor(packed / TABLE_UNIT)
+    seats = packed - tables * TABLE_UNIT
+    return seats.astype(np.float32), tables.astype(np.float32)
+
+
+def utilization(in_use: np.ndarray, capacity: np.ndarray) -> np.ndarray:
+    """Divides each restaurant row by its capacity, leaving rows without capacity at zero."""
+    capacity = capacity.astype(np.float32)[:, None]
+    return np.divide(in_use, capacity, out=np.zeros_like(in_use), where=capacity > 0)
+
+
+def fold_hour_of_day(matrix: np.ndarray, first_hour: int, buckets_per_hour: int) -> np.ndarray:
+    """Averages a (restaurants x buckets) matrix into a (restaurants x 24) hour-of-day heatmap."""
+    n_buckets = matrix.shape[1]
+    hours = (first_hour + np.arange(n_buckets) // buckets_per_hour) % 24
+    # A (buckets x 24) one-hot matrix turns the fold into a single matrix product.
+    one_hot = np.zeros((n_buckets, 24), dtype=np.float32)
+    one_hot[np.arange(n_buckets), hours] = 1
+    counts = one_hot.sum(axis=0)
+    sums = matrix @ one_hot
+    return np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
\ No newline at end of file
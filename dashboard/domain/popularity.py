@@ -0,0 +1,418 @@
+# src/dashboard/domain/popularity.py
+import fcntl
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from reservations.domain.entities import Reservation, ReservationStatus
+from reservations.domain.archive import reservation_archive
+from shared.database import shard_router
+from shared.sharding import ShardSessions
+
+WINDOWS = (7, 30, 90)
+DISH_SKETCH_CAPACITY = int(os.getenv("DISH_SKETCH_CAPACITY", "64"))
+DISH_SKETCH_PATH = os.getenv("DISH_SKETCH_PATH", os.path.join("data", "dish_popularity.json"))
+DISH_SKETCH_FLUSH_SECONDS = float(os.getenv("DISH_SKETCH_FLUSH_SECONDS", "60"))
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitters summary (Metwally et al.) holding at most
+    ``capacity`` counters. An item evicted to make room passes its count on to
+    the newcomer, so counts are over-estimates bounded by the recorded error.
+    """
+    __slots__ = ("capacity", "counts", "errors")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[int, int] = {}
+        self.errors: Dict[int, int] = {}
+
+    def add(self, item: int, count: int = 1):
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            victim = min(self.counts, key=self.counts.__getitem__)
+            floor = self.counts.pop(victim)
+            self.errors.pop(victim)
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+
+    def remove(self, item: int, count: int = 1):
+        """Decrements a monitored item (used when a pre-order is withdrawn)."""
+        if item in self.counts:
+            self.counts[item] = max(self.counts[item] - count, 0)
+
+    def merge(self, other: "SpaceSaving"):
+        for item, count in other.counts.items():
+            self.add(item, count)
+
+    def top(self, k: int) -> List[Tuple[int, int]]:
+        ranked = sorted(self.counts.items(), key=lambda entry: (-entry[1], entry[0]))
+        return [(item, count) for item, count in ranked[:k] if count > 0]
+
+    def to_dict(self) -> dict:
+        return {"counts": {str(k): v for k, v in self.counts.items()},
+                "errors": {str(k): v for k, v in self.errors.items()}}
+
+    @classmethod
+    def from_dict(cls, capacity: int, data: dict) -> "SpaceSaving":
+        summary = cls(capacity)
+        summary.counts = {int(k): v for k, v in data["counts"].items()}
+        summary.errors = {int(k): v for k, v in data["errors"].items()}
+        return summary
+
+
+Summaries = Dict[Tuple[Optional[int], date], SpaceSaving]
+
+
+def counts_preorders(status_column):
+    """
+    Which reservations' pre-orders the sketch holds: every one but the cancelled,
+    whose pre-orders are withdrawn when they are cancelled. Replays use the same rule,
+    on a status column in queries and on a status value for archived reservations.
+    """
+    return status_column != ReservationStatus.CANCELLED
+
+
+def _record(summaries: Summaries, capacity: int, restaurant_id: int, day: date, item_ids: List[int], delta: int):
+    """Adds (or withdraws) item counts in the restaurant's and the global summary of ``day``."""
+    for scope in (restaurant_id, None):
+        summary = summaries.get((scope, day))
+        if summary is None:
+            if delta < 0:
+                continue
+            summary = summaries[(scope, day)] = SpaceSaving(capacity)
+        for item_id in item_ids:
+            if delta > 0:
+                summary.add(item_id, delta)
+            else:
+                summary.remove(item_id, -delta)
+
+
+def _prune(summaries: Summaries, today: date):
+    oldest = today - timedelta(days=max(WINDOWS) - 1)
+    for key in [key for key in summaries if key[1] < oldest]:
+        del summaries[key]
+
+
+def _dump(summaries: Summaries) -> List[dict]:
+    return [{"restaurant_id": scope, "day": day.isoformat(), **summary.to_dict()}
+            for (scope, day), summary in summaries.items()]
+
+
+def _parse(capacity: int, entries: List[dict]) -> Summaries:
+    return {(entry["restaurant_id"], date.fromisoformat(entry["day"])): SpaceSaving.from_dict(capacity, entry)
+            for entry in entries}
+
+
+def _merge_into(target: Summaries, capacity: int, summaries: Summaries):
+    for key, summary in summaries.items():
+        target.setdefault(key, SpaceSaving(capacity)).merge(summary)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # exists, owned by another user
+        return True
+    return True
+
+
+class DishPopularityTracker:
+    """
+    Top-k pre-ordered dishes per restaurant and globally over sliding windows.
+
+    Keeps one Space-Saving summary per (restaurant or global, reservation day)
+    for the last ``max(WINDOWS)`` days plus upcoming days, so memory depends on
+    the sketch capacity and not on menu size. A window query merges the daily
+    summaries from ``today - window + 1`` onwards, which includes pre-orders for
+    upcoming reservations.
+
+    On disk the sketch is a base built from reservation history by ``rebuild``
+    (DISH_SKETCH_PATH) plus one file per worker process
+    (``dish_popularity.<pid>.json``) with the pre-orders it added and withdrew
+    since that base. Each worker writes only its own file and serves the base
+    plus every worker's changes, re-reading the others' files at most every
+    DISH_SKETCH_FLUSH_SECONDS. Worker files name the base (``epoch``) they
+    apply to: an explicit rebuild starts a new epoch and drops them, as the
+    history it replayed already holds their pre-orders. A worker starting up
+    folds the files of exited workers into the base and removes them, so
+    restarts do not leave a growing trail of files behind.
+    """
+
+    def __init__(self, capacity: int = DISH_SKETCH_CAPACITY, path: Optional[str] = DISH_SKETCH_PATH,
+                 flush_interval: float = DISH_SKETCH_FLUSH_SECONDS):
+        self.capacity = capacity
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._epoch: Optional[str] = None
+        self._base: Summaries = {}
+        self._base_withdrawn: Summaries = {}  # withdrawals folded in from exited workers' files
+        self._base_mtime: Optional[float] = None
+        self._added: Summaries = {}
+        self._withdrawn: Summaries = {}
+        self._peers: Dict[str, Tuple[float, Summaries, Summaries]] = {}  # path -> (mtime, added, withdrawn)
+        self._summaries: Summaries = {}  # base plus every worker's changes, what top() reads
+        self._loaded = False
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    def delta_path(self, pid: Optional[int] = None) -> Optional[str]:
+        """This (or process ``pid``'s) worker file, next to the base."""
+        if not self.path:
+            return None
+        root, ext = os.path.splitext(self.path)
+        return f"{root}.{pid or os.getpid()}{ext}"
+
+    def _delta_paths(self) -> Dict[str, int]:
+        """Every worker file next to the base, with the pid that wrote it."""
+        root, ext = os.path.splitext(self.path)
+        directory, prefix = os.path.split(root)
+        if not os.path.isdir(directory or "."):
+            return {}
+        return {
+            os.path.join(directory, name): int(name[len(prefix) + 1:-len(ext)]) for name in os.listdir(directory or ".")
+            if name.startswith(prefix + ".") and name.endswith(ext) and name[len(prefix) + 1:-len(ext)].isdigit()
+        }
+
+    def _base_lock(self):
+        """Exclusive lock serializing the workers' rewrites of the base; released on close or process exit."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        lock_file = open(f"{self.path}.lock", "w")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def record(self, restaurant_id: int, day: date, item_ids: Iterable[int], delta: int = 1):
+        """Adds (or, with a negative delta, withdraws) pre-orders of a reservation on ``day``."""
+        item_ids = list(item_ids)
+        if not item_ids:
+            return
+        with self._lock:
+            _record(self._added if delta > 0 else self._withdrawn, self.capacity, restaurant_id, day, item_ids, abs(delta))
+            _record(self._summaries, self.capacity, restaurant_id, day, item_ids, delta)
+            _prune(self._summaries, date.today())
+            self._dirty = True
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def top(self, k: int, window_days: int, restaurant_id: Optional[int] = None,
+            today: Optional[date] = None) -> List[Tuple[int, int]]:
+        """Returns up to ``k`` (menu_item_id, count) pairs for the window, most popular first."""
+        if window_days not in WINDOWS:
+            raise ValueError(f"Window must be one of {list(WINDOWS)} days.")
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()  # also picks up the other workers' pre-orders
+        start = (today or date.today()) - timedelta(days=window_days - 1)
+        merged = SpaceSaving(self.capacity)
+        with self._lock:
+            for (scope, day), summary in self._summaries.items():
+                if scope == restaurant_id and day >= start:
+                    merged.merge(summary)
+        return merged.top(k)
+
+    def rebuild(self, session: Session, batch_size: int = 1000, replace: bool = True):
+        """
+        Recomputes the base from the reservations inside the largest window, on
+        every shard, and persists it. With ``replace`` off (a worker finding no
+        sketch at startup) a base another worker wrote meanwhile wins.
+        """
+        oldest = datetime.combine(date.today() - timedelta(days=max(WINDOWS) - 1), datetime.min.time())
+        query = select(Reservation.restaurant_id, Reservation.reservation_time, Reservation.preordered_menu_items) \
+            .where(Reservation.reservation_time >= oldest, counts_preorders(Reservation.status)) \
+            .execution_options(yield_per=batch_size)
+        base: Summaries = {}
+        base_lock = threading.Lock()
+
+        def replay(shard_session: Session):
+            for restaurant_id, reservation_time, item_ids in shard_session.exec(query):
+                if item_ids:
+                    with base_lock:
+                        _record(base, self.capacity, restaurant_id, reservation_time.date(), item_ids, 1)
+
+        ShardSessions(session, shard_router).fan_out(replay)
+        # Only reached when the retention window is shorter than the largest popularity window.
+        for reservation in reservation_archive.read(oldest.date()):
+            if counts_preorders(reservation.status) and reservation.preordered_menu_items:
+                _record(base, self.capacity, reservation.restaurant_id, reservation.reservation_time.date(),
+                        reservation.preordered_menu_items, 1)
+        _prune(base, date.today())
+        epoch = uuid.uuid4().hex
+        if self.path and not self._write_base(epoch, base, replace):
+            self.load()
+            return
+        with self._lock:
+            self._epoch, self._base, self._base_withdrawn = epoch, base, {}
+            self._added, self._withdrawn, self._peers = {}, {}, {}
+            self._dirty = False
+            self._summaries = self._merged()
+            self._loaded = True
+        if self.path:
+            for path in self._delta_paths():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _write_base(self, epoch: str, base: Summaries, replace: bool) -> bool:
+        """Atomically writes the base; False when ``replace`` is off and one already exists."""
+        with self._base_lock():
+            if not replace and os.path.exists(self.path):
+                return False
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as fh:
+                json.dump({"epoch": epoch, "summaries": _dump(base), "withdrawn": []}, fh)
+            os.replace(tmp_path, self.path)
+            self._base_mtime = os.path.getmtime(self.path)
+        return True
+
+    def _fold_exited_workers(self):
+        """
+        Merges the files of workers that are no longer running into the base,
+        keeping its epoch so live workers' files still apply, and removes them.
+        Their withdrawals are kept apart from the base counts, because the
+        pre-orders they withdraw may have been added by a worker still running.
+        A file with this process's pid was left by an earlier process, since a
+        worker only writes its own file once it has loaded.
+        """
+        with self._base_lock():
+            exited = [path for path, pid in self._delta_paths().items()
+                      if pid == os.getpid() or not _pid_alive(pid)]
+            if not exited:
+                return
+            with open(self.path) as fh:
+                data = json.load(fh)
+            base = _parse(self.capacity, data["summaries"])
+            withdrawn = _parse(self.capacity, data.get("withdrawn", []))
+            for path in exited:
+                delta = self._read_delta(path)
+                if delta is not None and delta[0] == data.get("epoch"):
+                    _merge_into(base, self.capacity, delta[1])
+                    _merge_into(withdrawn, self.capacity, delta[2])
+            _prune(base, date.today())
+            _prune(withdrawn, date.today())
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as fh:
+                json.dump({"epoch": data.get("epoch"), "summaries": _dump(base), "withdrawn": _dump(withdrawn)}, fh)
+            os.replace(tmp_path, self.path)
+            for path in exited:
+                os.remove(path)
+
+    def load(self) -> bool:
+        """Loads the persisted base and worker changes; returns False when there is no base."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        if not self._loaded:
+            self._fold_exited_workers()
+        with self._lock:
+            self._load_base()
+            self._sync_peers()
+            self._loaded = True
+        return True
+
+    def _load_base(self):
+        """Reads the base. Holds the lock."""
+        self._base_mtime = os.path.getmtime(self.path)
+        with open(self.path) as fh:
+            data = json.load(fh)
+        epoch = data.get("epoch")
+        if epoch != self._epoch:
+            self._peers = {}
+            if self._loaded:  # rebuilt elsewhere, from a history that holds this worker's pre-orders
+                self._added, self._withdrawn = {}, {}
+        self._epoch = epoch
+        self._base = _parse(self.capacity, data["summaries"])
+        self._base_withdrawn = _parse(self.capacity, data.get("withdrawn", []))
+
+    def _read_delta(self, path: str) -> Optional[Tuple[Optional[str], Summaries, Summaries]]:
+        try:
+            with open(path) as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):  # removed by a rebuild, or not a sketch file
+            return None
+        return data.get("epoch"), _parse(self.capacity, data["added"]), _parse(self.capacity, data["withdrawn"])
+
+    def _sync_peers(self):
+        """Re-reads the other workers' changed files and recomputes the served summaries. Holds the lock."""
+        own = self.delta_path()
+        peers = {}
+        for path in self._delta_paths():
+            if path == own:
+                continue
+            try:
+                mtime = os.path.getmtime(path)
+            except FileNotFoundError:
+                continue
+            cached = self._peers.get(path)
+            if cached is not None and cached[0] == mtime:
+                peers[path] = cached
+                continue
+            delta = self._read_delta(path)
+            if delta is not None and delta[0] == self._epoch:
+                peers[path] = (mtime, delta[1], delta[2])
+        self._peers = peers
+        self._summaries = self._merged()
+
+    def _merged(self) -> Summaries:
+        today = date.today()
+        merged: Summaries = {}
+        added = [self._base, self._added] + [peer[1] for peer in self._peers.values()]
+        withdrawn = [self._base_withdrawn, self._withdrawn] + [peer[2] for peer in self._peers.values()]
+        for summaries in added:
+            _prune(summaries, today)
+            _merge_into(merged, self.capacity, summaries)
+        for summaries in withdrawn:
+            _prune(summaries, today)
+            for key, summary in summaries.items():
+                if key in merged:
+                    for item_id, count in summary.counts.items():
+                        merged[key].remove(item_id, count)
+        return merged
+
+    def ensure_loaded(self, session: Session):
+        """Loads the persisted sketch or, when there is none, rebuilds it from history."""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded and not self.load():
+                self.rebuild(session, replace=False)
+
+    def flush(self):
+        """Writes this worker's changes if there are new ones, then picks up the base and the other workers' changes."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self.path:
+                return
+            payload = None
+            # Until the first load, changes stay in memory: the file would have no epoch yet.
+            if self._dirty and self._loaded:
+                payload = {"epoch": self._epoch, "added": _dump(self._added), "withdrawn": _dump(self._withdrawn)}
+                self._dirty = False
+        if payload is not None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.delta_path()}.tmp"
+            with open(tmp_path, "w") as fh:
+                json.dump(payload, fh)
+            os.replace(tmp_path, self.delta_path())
+        if not self._loaded or not os.path.exists(self.path):
+            return
+        with self._lock:
+            if os.path.getmtime(self.path) != self._base_mtime:
+                self._load_base()
+            self._sync_peers()
+
+
+dish_popularity = DishPopularityTracker()
\ No newline at end of file
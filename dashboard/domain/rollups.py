@@ -0,0 +1,145 @@
+# src/dashboard/domain/rollups.py
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, update
+from sqlmodel import Session, select
+
+from dashboard.domain.entities import ReservationDailyStats
+from reservations.domain.entities import Reservation, ReservationStatus
+from reservations.domain.archive import reservation_archive
+from shared.database import shard_router
+from shared.sql import bucket_date, date_bucket, insert_ignore
+
+
+class ReservationRollup:
+    """
+    Maintains the reservation_daily_stats rollup.
+
+    ReservationService calls ``refresh_days`` inside its own transaction for the
+    restaurant-days a write touches, so the rollup commits (or rolls back) with
+    the reservation. Each refresh re-aggregates a single restaurant-day, which
+    keeps distinct-table counts exact when reservations move or are cancelled,
+    while holding that day's row lock, so concurrent writes to the same day
+    take turns instead of overwriting each other's counts.
+    Days with archived reservations add the archive back in, so archiving
+    never changes the rollup.
+    """
+
+    def __init__(self, db_session: Session):
+        self.db_session = db_session
+
+    def _aggregate(self, *conditions):
+        dialect_name = self.db_session.get_bind().dialect.name
+        day = date_bucket(Reservation.reservation_time, "day", dialect_name).label("day")
+        active = Reservation.status != ReservationStatus.CANCELLED
+
+        def count_status(status: ReservationStatus):
+            return func.sum(case((Reservation.status == status, 1), else_=0))
+
+        query = select(
+            Reservation.restaurant_id,
+            day,
+            count_status(ReservationStatus.PENDING),
+            count_status(ReservationStatus.CONFIRMED),
+            count_status(ReservationStatus.CANCELLED),
+            count_status(ReservationStatus.COMPLETED),
+            func.sum(case((active, Reservation.num_guests), else_=0)),
+            func.count(func.distinct(case((active, Reservation.table_id)))),
+        ).where(*conditions).group_by(Reservation.restaurant_id, day)
+        for row in self.db_session.exec(query).all():
+            restaurant_id, bucket, pending, confirmed, cancelled, completed, guests, tables = row
+            yield ReservationDailyStats(
+                restaurant_id=restaurant_id, day=bucket_date(bucket),
+                pending_count=pending or 0, confirmed_count=confirmed or 0,
+                cancelled_count=cancelled or 0, completed_count=completed or 0,
+                total_guests=guests or 0, tables_used=tables or 0,
+            )
+
+    def _lock_day(self, restaurant_id: int, day: date):
+        """Creates the day's row if missing and locks it until the transaction ends (SQLite locks the whole file)."""
+        self.db_session.exec(insert_ignore(ReservationDailyStats, self.db_session.get_bind().dialect.name,
+                                           restaurant_id=restaurant_id, day=day))
+        self.db_session.exec(select(ReservationDailyStats.day).where(
+            ReservationDailyStats.restaurant_id == restaurant_id, ReservationDailyStats.day == day,
+        ).with_for_update()).first()
+
+    def refresh_day(self, restaurant_id: int, day: date):
+        """Recomputes one restaurant-day from its reservations. Does not commit."""
+        self._lock_day(restaurant_id, day)
+        start = datetime.combine(day, datetime.min.time())
+        fresh = next(self._aggregate(
+            Reservation.restaurant_id == restaurant_id,
+            Reservation.reservation_time >= start,
+            Reservation.reservation_time < start + timedelta(days=1),
+        ), None)
+        if reservation_archive.covers(day):
+            merged = {(restaurant_id, day): fresh} if fresh else {}
+            self._merge_archived(merged, reservation_archive.daily_totals(day, day, restaurant_id), restaurant_id)
+            fresh = merged.get((restaurant_id, day))
+        key = (ReservationDailyStats.restaurant_id == restaurant_id, ReservationDailyStats.day == day)
+        if fresh is None:
+            self.db_session.exec(delete(ReservationDailyStats).where(*key))
+        else:
+            self.db_session.exec(update(ReservationDailyStats).where(*key)
+                                 .values(**fresh.dict(exclude={"restaurant_id", "day"})))
+
+    def _merge_archived(self, stats: Dict[Tuple[int, date], ReservationDailyStats],
+                        archived: Dict[Tuple[int, date], Dict[str, Any]], restaurant_id: Optional[int] = None):
+        """Adds archived totals to freshly aggregated rows, counting distinct tables across hot and archived rows."""
+        if not archived:
+            return
+        days = [day for _, day in archived]
+        query = select(Reservation.restaurant_id, Reservation.reservation_time, Reservation.table_id).where(
+            Reservation.status != ReservationStatus.CANCELLED,
+            Reservation.reservation_time >= datetime.combine(min(days), datetime.min.time()),
+            Reservation.reservation_time < datetime.combine(max(days) + timedelta(days=1), datetime.min.time()),
+        )
+        if restaurant_id:
+            query = query.where(Reservation.restaurant_id == restaurant_id)
+        hot_tables = defaultdict(set)
+        for rid, reservation_time, table_id in self.db_session.exec(query):
+            hot_tables[(rid, reservation_time.date())].add(table_id)
+
+        for key, totals in archived.items():
+            row = stats.get(key)
+            if row is None:
+                row = stats[key] = ReservationDailyStats(
+                    restaurant_id=key[0], day=key[1], pending_count=0, confirmed_count=0, cancelled_count=0,
+                    completed_count=0, total_guests=0, tables_used=0,
+                )
+            row.pending_count += totals[ReservationStatus.PENDING]
+            row.confirmed_count += totals[ReservationStatus.CONFIRMED]
+            row.cancelled_count += totals[ReservationStatus.CANCELLED]
+            row.completed_count += totals[ReservationStatus.COMPLETED]
+            row.total_guests += totals["guests"]
+            row.tables_used = len(hot_tables[key] | totals["tables"])
+
+    def refresh_days(self, keys: Iterable[Tuple[int, date]]):
+        """Recomputes every distinct (restaurant_id, day) pair, in key order so concurrent writers lock alike. Does not commit."""
+        for restaurant_id, day in sorted(set(keys)):
+            self.refresh_day(restaurant_id, day)
+
+    def rebuild(self) -> int:
+        """Rebuilds the whole rollup from the reservation table and the archive, and commits. Returns the number of rows."""
+        self.db_session.exec(delete(ReservationDailyStats))
+        stats = {(row.restaurant_id, row.day): row for row in self._aggregate()}
+        bind = self.db_session.get_bind()
+        # With shards, each shard's rollup takes the archived reservations of its own restaurants.
+        keep = (lambda rid: shard_router.engine_for(rid) is bind) if shard_router.sharded else None
+        self._merge_archived(stats, reservation_archive.daily_totals(keep=keep))
+        rows = [row.dict() for row in stats.values()]
+        if rows:
+            self.db_session.exec(insert(ReservationDailyStats), params=rows)
+        self.db_session.commit()
+        return len(rows)
+
+    def backfill_if_empty(self) -> bool:
+        """Builds the rollup when it is empty but reservations exist (first start after upgrading)."""
+        if self.db_session.exec(select(ReservationDailyStats.day).limit(1)).first() is not None:
+            return False
+        if self.db_session.exec(select(Reservation.id).limit(1)).first() is None:
+            return False
+        self.rebuild()
+        return True
\ No newline at end of file
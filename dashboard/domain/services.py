@@ -1,78 +1,169 @@
 # src/dashboard/domain/services.py
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
-from collections import Counter
+from typing import List, Dict, Any, Optional, Sequence
+from datetime import date, datetime, timedelta
+from collections import Counter, defaultdict
+import numpy as np
 from sqlmodel import Session, select, func
 from reservations.domain.entities import Reservation, ReservationStatus
 from restaurants.domain.entities import Table, Restaurant
 from menu.domain.entities import MenuItem
+from dashboard.domain.entities import ReservationDailyStats
+from reservations.domain.archive import reservation_archive
+from dashboard.domain.popularity import dish_popularity, counts_preorders
+from dashboard.domain.occupancy import occupancy_matrices, utilization, fold_hour_of_day
+from shared.sql import GRANULARITIES, date_bucket, bucket_start, bucket_date, epoch_seconds
+from shared.database import shard_router
+from shared.sharding import ShardSessions
+
+TIMELINE_MAX_DAYS = 366
+# Reservations that hold their table for the interval, including ones already completed.
+OCCUPYING_STATUSES = [ReservationStatus.PENDING, ReservationStatus.CONFIRMED, ReservationStatus.COMPLETED]
 
 class DashboardService:
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, shards: Optional[ShardSessions] = None):
+        # Reservations and their rollup are read from every shard and merged here.
         self.db_session = db_session
+        self.shards = shards or ShardSessions(db_session, shard_router)
+
+    def get_reservations_by_period(self, period: str = "day", date_from: Optional[date] = None,
+                                   date_to: Optional[date] = None, restaurant_id: Optional[int] = None) -> Dict[str, Any]:
+        """Calculates total reservations grouped by day, week or month."""
+        return self.get_reservation_counts([period], date_from, date_to, restaurant_id)[period]
+
+    def get_reservation_counts(self, granularities: Sequence[str] = ("day", "week"), date_from: Optional[date] = None,
+                               date_to: Optional[date] = None, restaurant_id: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Counts non-cancelled reservations per day, week and/or month.
+
+        Reads the reservation_daily_stats rollup, grouping by the finest
+        requested bucket (day when several granularities are requested) and
+        folding the coarser series from those buckets, so the cost depends on
+        the number of days requested rather than on the number of reservations.
+        ``date_to`` is inclusive.
+        """
+        granularities = list(dict.fromkeys(granularities))
+        invalid = [g for g in granularities if g not in GRANULARITIES]
+        if not granularities or invalid:
+            raise ValueError(f"Granularity must be one of {list(GRANULARITIES)}.")
+
+        finest = granularities[0] if len(granularities) == 1 else "day"
+        counted = (ReservationDailyStats.pending_count + ReservationDailyStats.confirmed_count
+                   + ReservationDailyStats.completed_count)
+
+        def bucket_counts(session: Session):
+            bucket = date_bucket(ReservationDailyStats.day, finest, session.get_bind().dialect.name).label("bucket")
+            query = self._filter_daily_stats(select(bucket, func.sum(counted)), date_from, date_to, restaurant_id)
+            return session.exec(query.group_by(bucket)).all()
 
-    def get_reservations_by_period(self, period: str = "day") -> Dict[str, Any]:
-        """Calculates total reservations grouped by day or week."""
-        if period not in ["day", "week"]:
-            raise ValueError("Period must be 'day' or 'week'.")
-
-        reservations = self.db_session.exec(select(Reservation).where(
-            Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.CONFIRMED, ReservationStatus.COMPLETED])
-        )).all()
-
-        counts: Dict[str, int] = Counter()
-        for res in reservations:
-            if period == "day":
-                key = res.reservation_time.strftime("%Y-%m-%d")
-            elif period == "week":
-                # Get the start of the week (Monday)
-                start_of_week = res.reservation_time - timedelta(days=res.reservation_time.weekday())
-                key = start_of_week.strftime("%Y-%m-%d")
-            counts[key] += 1
-        return dict(sorted(counts.items()))
-
-    def get_top_preordered_dishes(self, limit: int = 5) -> List[Dict[str, Any]]:
-        """Identifies the top pre-ordered dishes."""
-        reservations = self.db_session.exec(select(Reservation).where(
-            Reservation.preordered_menu_items != [] # Only reservations with pre-orders
-        )).all()
-
-        dish_counts: Dict[int, int] = Counter()
-        for res in reservations:
-            for item_id in res.preordered_menu_items:
-                dish_counts[item_id] += 1
+        base_counts: Dict[date, int] = Counter()
+        for rows in self.shards.fan_out(bucket_counts):
+            for value, count in rows:
+                base_counts[bucket_date(value)] += count
+        series: Dict[str, Dict[str, int]] = {}
+        for granularity in granularities:
+            counts: Dict[date, int] = Counter()
+            for day, count in base_counts.items():
+                counts[bucket_start(day, granularity)] += count
+            series[granularity] = {key.strftime("%Y-%m-%d"): counts[key] for key in sorted(counts) if counts[key]}
+        return series
+
+    def get_daily_stats(self, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                        restaurant_id: Optional[int] = None) -> List[ReservationDailyStats]:
+        """Returns the per restaurant and day rollup rows (status counts, guests, tables used)."""
+        query = self._filter_daily_stats(select(ReservationDailyStats), date_from, date_to, restaurant_id)
+        query = query.order_by(ReservationDailyStats.day, ReservationDailyStats.restaurant_id)
+        if not self.shards.router.sharded:
+            return self.db_session.exec(query).all()
+        rows = [row for rows in self.shards.fan_out(lambda session: session.exec(query).all()) for row in rows]
+        return sorted(rows, key=lambda row: (row.day, row.restaurant_id))
+
+    @staticmethod
+    def _filter_daily_stats(query, date_from: Optional[date], date_to: Optional[date], restaurant_id: Optional[int]):
+        if date_from:
+            query = query.where(ReservationDailyStats.day >= date_from)
+        if date_to:
+            query = query.where(ReservationDailyStats.day <= date_to)
+        if restaurant_id:
+            query = query.where(ReservationDailyStats.restaurant_id == restaurant_id)
+        return query
+
+    def get_top_preordered_dishes(self, limit: int = 5, window_days: int = 90,
+                                  restaurant_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Identifies the top pre-ordered dishes over the last 7, 30 or 90 days, globally or for one restaurant."""
+        dish_popularity.ensure_loaded(self.db_session)
+        # Ask for extra candidates in case some dishes no longer exist.
+        candidates = dish_popularity.top(limit * 2, window_days, restaurant_id)
+        names = dict(self.db_session.exec(
+            select(MenuItem.id, MenuItem.name).where(MenuItem.id.in_([item_id for item_id, _ in candidates]))
+        ).all()) if candidates else {}
 
         top_dishes_data = []
-        for item_id, count in dish_counts.most_common(limit):
-            menu_item = self.db_session.get(MenuItem, item_id)
-            if menu_item:
+        for item_id, count in candidates:
+            if item_id in names:
                 top_dishes_data.append({
                     "menu_item_id": item_id,
-                    "name": menu_item.name,
+                    "name": names[item_id],
                     "count": count
                 })
-        return top_dishes_data
+        return top_dishes_data[:limit]
+
+    def get_dish_rankings(self, limit: int = 10, restaurant_id: Optional[int] = None,
+                          batch_size: int = 5000) -> List[Dict[str, Any]]:
+        """Ranks pre-ordered dishes per restaurant with exact counts over the whole reservation history, archive included."""
+        query = select(Reservation.restaurant_id, Reservation.preordered_menu_items).where(
+            counts_preorders(Reservation.status)
+        )
+        if restaurant_id:
+            query = query.where(Reservation.restaurant_id == restaurant_id)
+
+        def count_items(session: Session) -> Dict[int, Counter]:
+            shard_counts: Dict[int, Counter] = defaultdict(Counter)
+            for rid, item_ids in session.exec(query.execution_options(yield_per=batch_size)):
+                if item_ids:
+                    shard_counts[rid].update(item_ids)
+            return shard_counts
+
+        counts: Dict[int, Counter] = defaultdict(Counter)
+        for shard_counts in self.shards.fan_out(count_items):
+            for rid, counter in shard_counts.items():
+                counts[rid].update(counter)
+        for reservation in reservation_archive.read(restaurant_id=restaurant_id):
+            if counts_preorders(reservation.status) and reservation.preordered_menu_items:
+                counts[reservation.restaurant_id].update(reservation.preordered_menu_items)
+
+        rankings = {rid: counter.most_common(limit) for rid, counter in counts.items()}
+        item_ids = {item_id for ranking in rankings.values() for item_id, _ in ranking}
+        names = dict(self.db_session.exec(
+            select(MenuItem.id, MenuItem.name).where(MenuItem.id.in_(item_ids))
+        ).all()) if item_ids else {}
+        return [
+            {
+                "restaurant_id": rid,
+                "dishes": [{"menu_item_id": item_id, "name": names.get(item_id), "count": count}
+                           for item_id, count in rankings[rid]]
+            }
+            for rid in sorted(rankings)
+        ]
 
     def get_restaurant_occupancy(self) -> List[Dict[str, Any]]:
         """Calculates occupancy percentage for each restaurant."""
         restaurants = self.db_session.exec(select(Restaurant)).all()
+        table_counts = dict(self.db_session.exec(
+            select(Table.restaurant_id, func.count(Table.id)).group_by(Table.restaurant_id)
+        ).all())
+        # Count tables with active reservations for today or future
+        reserved_query = select(Reservation.restaurant_id, func.count(func.distinct(Reservation.table_id))).where(
+            Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.CONFIRMED]),
+            Reservation.reservation_time >= datetime.now()
+        ).group_by(Reservation.restaurant_id)
+        reserved_counts = {}
+        for rows in self.shards.fan_out(lambda session: session.exec(reserved_query).all()):
+            reserved_counts.update(rows)
+
         occupancy_data = []
         for restaurant in restaurants:
-            total_tables = self.db_session.exec(select(func.count(Table.id)).where(Table.restaurant_id == restaurant.id)).one_or_none() or 0
-            if total_tables is None:
-                total_tables = 0
-
-            # Count tables with active reservations for today or future
-            now = datetime.now()
-            reserved_tables_count = self.db_session.exec(
-                select(func.count(func.distinct(Reservation.table_id))).where(
-                    Reservation.restaurant_id == restaurant.id,
-                    Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.CONFIRMED]),
-                    Reservation.reservation_time >= now
-                )
-            ).one_or_none() or 0
-            if reserved_tables_count is None:
-                reserved_tables_count = 0
+            total_tables = table_counts.get(restaurant.id, 0)
+            reserved_tables_count = reserved_counts.get(restaurant.id, 0)
 
             occupancy_percentage = (reserved_tables_count / total_tables * 100) if total_tables > 0 else 0
             occupancy_data.append({
@@ -82,4 +173,103 @@ class DashboardService:
                 "reserved_tables": reserved_tables_count,
                 "occupancy_percentage": round(occupancy_percentage, 2)
             })
-        return occupancy_data
\ No newline at end of file
+        return occupancy_data
+
+    def get_occupancy_timeline(self, date_from: date, date_to: date, bucket_minutes: int = 60,
+                               restaurant_id: Optional[int] = None, fold: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Seat and table utilization per restaurant and time bucket.
+
+        Loads every reservation interval overlapping [date_from, date_to] with
+        a single query (plus one for capacities, and the archive partitions of
+        those months for historical ranges) and accumulates the intervals
+        with NumPy difference arrays. ``fold="hour_of_day"`` averages the
+        timeline into a 24-column heatmap.
+        """
+        if date_to < date_from:
+            raise ValueError("'to' must not be before 'from'.")
+        if (date_to - date_from).days + 1 > TIMELINE_MAX_DAYS:
+            raise ValueError(f"The range cannot exceed {TIMELINE_MAX_DAYS} days.")
+        if bucket_minutes <= 0 or 1440 % bucket_minutes:
+            raise ValueError("bucket_minutes must divide a day evenly (e.g. 15, 30, 60, 120).")
+        if fold not in (None, "hour_of_day"):
+            raise ValueError("fold must be 'hour_of_day' when given.")
+        if fold and bucket_minutes > 60:
+            raise ValueError("The hour_of_day fold needs buckets of at most 60 minutes.")
+
+        range_start = datetime.combine(date_from, datetime.min.time())
+        range_end = datetime.combine(date_to + timedelta(days=1), datetime.min.time())
+        bucket_seconds = bucket_minutes * 60
+        n_buckets = int((range_end - range_start).total_seconds()) // bucket_seconds
+
+        restaurant_query = select(Restaurant.id, Restaurant.name).order_by(Restaurant.id)
+        capacity_query = select(Table.restaurant_id, func.count(Table.id), func.sum(Table.capacity)).group_by(Table.restaurant_id)
+        if restaurant_id:
+            restaurant_query = restaurant_query.where(Restaurant.id == restaurant_id)
+            capacity_query = capacity_query.where(Table.restaurant_id == restaurant_id)
+
+        def load_intervals(session: Session):
+            dialect_name = session.get_bind().dialect.name
+            interval_query = select(
+                Reservation.restaurant_id,
+                epoch_seconds(Reservation.reservation_time, dialect_name),
+                epoch_seconds(Reservation.end_time, dialect_name),
+                Reservation.num_guests
+            ).where(
+                Reservation.status.in_(OCCUPYING_STATUSES),
+                Reservation.reservation_time < range_end,
+                Reservation.end_time > range_start
+            )
+            if restaurant_id:
+                interval_query = interval_query.where(Reservation.restaurant_id == restaurant_id)
+            return session.exec(interval_query).all()
+
+        restaurants = self.db_session.exec(restaurant_query).all()
+        ids = np.array([rid for rid, _ in restaurants], dtype=np.int64)
+        capacities = {rid: (tables or 0, seats or 0) for rid, tables, seats in self.db_session.exec(capacity_query).all()}
+        total_tables = np.array([capacities.get(rid, (0, 0))[0] for rid in ids], dtype=np.int64)
+        total_seats = np.array([capacities.get(rid, (0, 0))[1] for rid in ids], dtype=np.int64)
+
+        epoch = datetime(1970, 1, 1)
+        # A reservation overlapping the range may have started the day before it.
+        archived = [
+            (r.restaurant_id, (r.reservation_time - epoch).total_seconds(), (r.end_time - epoch).total_seconds(), r.num_guests)
+            for r in reservation_archive.read(date_from - timedelta(days=1), date_to, restaurant_id,
+                                              statuses=OCCUPYING_STATUSES)
+            if r.reservation_time < range_end and r.end_time > range_start
+        ]
+        intervals = np.array([row for rows in self.shards.fan_out(load_intervals) for row in rows] + archived,
+                             dtype=np.float64).reshape(-1, 4)
+        rows = np.searchsorted(ids, intervals[:, 0].astype(np.int64))
+        known = rows < len(ids)
+        known[known] = ids[rows[known]] == intervals[known, 0]
+        intervals, rows = intervals[known], rows[known]
+
+        epoch_start = (range_start - epoch).total_seconds()
+        seats, tables = occupancy_matrices(rows, intervals[:, 1], intervals[:, 2], intervals[:, 3],
+                                           len(ids), epoch_start, n_buckets, bucket_seconds)
+        seat_utilization = utilization(seats, total_seats)
+        table_utilization = utilization(tables, total_tables)
+
+        if fold:
+            buckets_per_hour = 60 // bucket_minutes
+            seat_utilization = fold_hour_of_day(seat_utilization, 0, buckets_per_hour)
+            table_utilization = fold_hour_of_day(table_utilization, 0, buckets_per_hour)
+            buckets = [f"{hour:02d}:00" for hour in range(24)]
+        else:
+            buckets = [(range_start + timedelta(seconds=i * bucket_seconds)).isoformat() for i in range(n_buckets)]
+
+        return {
+            "from": date_from.isoformat(),
+            "to": date_to.isoformat(),
+            "bucket_minutes": bucket_minutes,
+            "fold": fold,
+            "buckets": buckets,
+            "restaurants": [
+                {"restaurant_id": int(rid), "restaurant_name": name,
+                 "total_tables": int(table_count), "total_seats": int(seat_count)}
+                for (rid, name), table_count, seat_count in zip(restaurants, total_tables, total_seats)
+            ],
+            "seat_utilization": np.round(seat_utilization.astype(np.float64), 4).tolist(),
+            "table_utilization": np.round(table_utilization.astype(np.float64), 4).tolist()
+        }
\ No newline at end of file
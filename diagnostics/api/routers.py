@@ -0,0 +1,45 @@
+# src/diagnostics/api/routers.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from typing import List
+from auth.api.routers import require_role
+from diagnostics.domain.entities import ProfileSummary, SQLStatementStats, AdmissionStats
+from shared.admission import admission_control
+from shared.profiling import profile_store
+from shared.sql_stats import sql_stats, SQL_STATS_SORT_KEYS
+
+router = APIRouter(prefix="/diagnostics", tags=["diagnostics"], dependencies=[Depends(require_role(["admin"]))])
+
+@router.get("/profiles", response_model=List[ProfileSummary])
+def list_profiles():
+    """Lists the recent request profiles kept on disk, newest first (Admin only)."""
+    return profile_store.list()
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def download_profile(profile_id: str):
+    """Downloads a profile as collapsed stacks, one 'frame;frame;... count' line per stack (Admin only)."""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found.")
+    return PlainTextResponse(profile["collapsed"], headers={
+        "Content-Disposition": f'attachment; filename="{profile_id}.folded"'
+    })
+
+@router.get("/sql", response_model=List[SQLStatementStats])
+def get_sql_stats(sort: str = Query("total_ms", description=f"One of {list(SQL_STATS_SORT_KEYS)}"),
+                  limit: int = Query(50, ge=1, le=1000)):
+    """Aggregated statistics per SQL statement shape since start or the last reset, heaviest first (Admin only)."""
+    try:
+        return sql_stats.snapshot(sort, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.delete("/sql", status_code=status.HTTP_204_NO_CONTENT)
+def reset_sql_stats():
+    """Clears the SQL statistics (Admin only)."""
+    sql_stats.reset()
+
+@router.get("/admission", response_model=AdmissionStats)
+def get_admission_stats():
+    """In-flight, queued and shed requests per route class, and database pool wait times (Admin only)."""
+    return admission_control.snapshot()
\ No newline at end of file
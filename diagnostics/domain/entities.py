@@ -0,0 +1,49 @@
+# src/diagnostics/domain/entities.py
+from typing import Dict, List, Optional
+from sqlmodel import SQLModel
+
+
+class ProfileSummary(SQLModel):
+    id: str
+    method: str
+    path: str
+    query: str
+    status: Optional[int] = None
+    reason: str # "header" (requested by an admin) or "sampled"
+    duration_ms: float
+    samples: int
+    interval_ms: float
+    concurrent_requests: int # Other requests in flight, whose stacks may also appear
+    created_at: float
+
+class SQLStatementStats(SQLModel):
+    fingerprint: str # Statement with literals and parameters replaced by '?'
+    count: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    rows: int # Rows reported by the driver; SQLite does not report them for SELECTs
+    routes: Dict[str, int] # Up to five routes issuing the statement most often
+    example: str
+
+class AdmissionClassStats(SQLModel):
+    name: str # booking, auth, browse or admin
+    priority: int # 0 is served first
+    limit: int
+    queue_size: int
+    in_flight: int
+    waiting: int
+    admitted: int
+    queued: int
+    rejected: int # Shed at once: queue full, or not queueing while the pool is saturated
+    timed_out: int # Shed after waiting the whole queue timeout
+    pool_wait_ms: float # Moving average wait for a database connection
+    pool_wait_max_ms: float
+
+class AdmissionStats(SQLModel):
+    in_flight: int
+    max_in_flight: int
+    priority_reserve: int
+    saturated: bool
+    pool_wait_ms: float
+    classes: List[AdmissionClassStats]
\ No newline at end of file
@@ -4,23 +4,50 @@ from sqlmodel import Session
 from contextlib import asynccontextmanager
 from auth.api import routers
 from shared.database import SQLModel, engine # Import SQLModel and engine
-from shared.database import create_db_and_tables, get_session, engine
+from shared.database import create_db_and_tables, get_session, engine, shard_router
+from shared.sql import check_dialect
 from auth.api import routers as auth_routers
 from restaurants.api import routers as restaurants_routers
 from menu.api import routers as menu_routers
 from reservations.api import routers as reservations_routers
 from dashboard.api import routers as dashboard_routers
+from diagnostics.api import routers as diagnostics_routers
+from batch.api import routers as batch_routers
+from dashboard.domain.rollups import ReservationRollup
+from dashboard.domain.popularity import dish_popularity
+from dashboard.domain.cache import dashboard_cache
+from dashboard.domain.jobs import report_jobs
+from restaurants.domain.search import restaurant_search
+from shared.profiling import ProfilingMiddleware
+from shared.sql_stats import SQLRouteMiddleware
+from shared.admission import AdmissionMiddleware
+from shared.recorder import TrafficRecorderMiddleware, traffic_recorder
+from shared.cache import invalidation_bus
 
 
 # Event handler for application startup and shutdown
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Dashboard queries use dialect-specific SQL; refuse to start on a database they do not cover.
+    check_dialect(engine.dialect.name)
     # Create tables on startup (for development)
     print("Creating database tables...")
     create_db_and_tables()
     print("Database tables created.")
+    if any(shard_router.fan_out(lambda session: ReservationRollup(session).backfill_if_empty())):
+        print("Reservation daily stats rollup backfilled.")
+    with Session(engine) as session:
+        restaurant_search.prepare(session)
+    # Hear about writes made by the other workers (cache generations, listing ETags, dashboards)
+    invalidation_bus.start()
     yield
     # Clean up resources on shutdown (if needed)
+    dish_popularity.flush()
+    dashboard_cache.shutdown()
+    report_jobs.shutdown()
+    shard_router.shutdown()
+    traffic_recorder.shutdown()
+    invalidation_bus.shutdown()
     print("Application shutdown.")
 
 app = FastAPI(
@@ -36,6 +63,17 @@ app.include_router(restaurants_routers.router)
 app.include_router(menu_routers.router)
 app.include_router(reservations_routers.router)
 app.include_router(dashboard_routers.router)
+app.include_router(diagnostics_routers.router)
+app.include_router(batch_routers.router)
+
+# Opt-in request profiling: X-Profile header from an admin, or PROFILING_SAMPLE_RATE
+app.add_middleware(ProfilingMiddleware)
+# Attributes SQL statements to the route issuing them (see /diagnostics/sql)
+app.add_middleware(SQLRouteMiddleware)
+# Per route class concurrency limits; sheds excess work with 503 + Retry-After (see /diagnostics/admission)
+app.add_middleware(AdmissionMiddleware)
+# Opt-in sanitized traffic traces for benchmarks/replay.py (TRAFFIC_RECORDING)
+app.add_middleware(TrafficRecorderMiddleware)
 
 @app.get("/")
 def read_root():
@@ -1,13 +1,17 @@
 # src/menu/api/routers.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
 from sqlmodel import Session
-from typing import List
+from typing import List, Optional
 from shared.dependencies import get_current_active_user, require_role
-from menu.domain.entities import MenuItemCreate, MenuItemPublic, MenuItemUpdate
-from menu.domain.services import MenuService
+from menu.domain.entities import MenuItemCreate, MenuItemPublic, MenuItemUpdate, MenuItemSearchResult, MenuImportResult
+from menu.domain.allergens import ALLERGENS
+from menu.domain.services import MenuService, menu_page_cache
+from menu.domain.importer import MenuImporter, IMPORT_FORMATS, parse_menu_file, read_menu_file
 from shared.database import get_session
 from auth.api.routers import require_role
-from shared.exceptions import NotFoundException, ConflictException, BadRequestException
+from shared.exceptions import NotFoundException, ConflictException, BadRequestException, PayloadTooLargeException
+from shared.etag import revisions, menu_scope, not_modified, set_cache_headers
+from shared.pagination import NEXT_CURSOR_HEADER, PageParams, PageResponse, page_params
 
 router = APIRouter(prefix="/menu", tags=["menu"])
 
@@ -22,11 +26,67 @@ def create_menu_item(restaurant_id: int, menu_item_create: MenuItemCreate, db: S
     except (BadRequestException, ConflictException) as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST if isinstance(e, BadRequestException) else status.HTTP_409_CONFLICT, detail=e.detail)
 
+@router.post("/import", response_model=MenuImportResult, dependencies=[Depends(require_role(["admin"]))])
+def import_menu_items(file: UploadFile = File(..., description="CSV or JSON file of menu items"),
+                      restaurant_id: Optional[int] = Query(None, description="Restaurant for rows without restaurant_id"),
+                      format: Optional[str] = Query(None, description=f"One of {list(IMPORT_FORMATS)}; defaults to the file extension"),
+                      dry_run: bool = Query(False, description="Only report what would change"),
+                      db: Session = Depends(get_session)):
+    """Creates or updates many menu items, matched by restaurant and name, in one transaction (Admin only)."""
+    fmt = format or ("csv" if (file.filename or "").lower().endswith(".csv") else "json")
+    try:
+        rows = parse_menu_file(read_menu_file(file.file), fmt)
+        return MenuImporter(db).import_rows(rows, restaurant_id, dry_run)
+    except PayloadTooLargeException as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=e.detail)
+    except (BadRequestException, ConflictException) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST if isinstance(e, BadRequestException) else status.HTTP_409_CONFLICT, detail=e.detail)
+
 @router.get("/{restaurant_id}/items", response_model=List[MenuItemPublic])
-def get_menu_items(restaurant_id: int, db: Session = Depends(get_session)):
-    """Retrieves all menu items for a specific restaurant."""
+def get_menu_items(restaurant_id: int, request: Request, db: Session = Depends(get_session),
+                   page: PageParams = Depends(page_params),
+                   category: Optional[str] = Query(None, description="Filter by category"),
+                   available: Optional[bool] = Query(None, description="Filter by availability")):
+    """Retrieves menu items for a specific restaurant, paginated, with optional category/availability filters."""
+    etag = revisions.etag(menu_scope(restaurant_id))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     service = MenuService(db)
-    return service.get_menu_items_by_restaurant(restaurant_id)
+
+    def load():
+        rows = PageResponse(service.get_menu_item_rows(restaurant_id, page, category, available), page)
+        return rows.body, {name: value for name, value in rows.headers.items() if name.lower() == NEXT_CURSOR_HEADER.lower()}
+
+    key = f"{restaurant_id}:{page.limit}:{page.after_id}:{','.join(page.fields or [])}:{category}:{available}"
+    try:
+        body, headers = menu_page_cache.get_or_load(key, [menu_scope(restaurant_id)], load)
+    except BadRequestException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.detail)
+    rows = Response(content=body, media_type="application/json", headers=headers)
+    set_cache_headers(rows, etag)
+    return rows
+
+@router.get("/allergens", response_model=List[str])
+def get_allergens():
+    """Lists the allergen names in bit order: bit i of allergen_mask is the i-th allergen."""
+    return list(ALLERGENS)
+
+@router.get("/search", response_model=List[MenuItemSearchResult])
+def search_menu_items(db: Session = Depends(get_session),
+                      restaurant_id: int = Query(..., description="Restaurant whose menu is searched"),
+                      q: Optional[str] = Query(None, max_length=100, description="Text to match in name or description"),
+                      category: Optional[List[str]] = Query(None, description="One or more categories"),
+                      exclude_allergens: Optional[List[str]] = Query(None, description="Allergens to avoid, repeated or comma-separated"),
+                      available: bool = Query(True, description="Only available items"),
+                      limit: int = Query(50, ge=1, le=200), offset: int = Query(0, ge=0)):
+    """Searches a restaurant's menu by text and category, excluding dishes with the given allergens."""
+    service = MenuService(db)
+    excluded = [name for value in exclude_allergens or [] for name in value.split(",") if name.strip()]
+    try:
+        return service.search_menu_items(restaurant_id, q, category, excluded, available, limit, offset)
+    except BadRequestException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.detail)
 
 @router.put("/items/{item_id}", response_model=MenuItemPublic,
             dependencies=[Depends(require_role(["admin"]))])
@@ -0,0 +1,64 @@
+# src/menu/cli.py
+"""
+Admin commands for the menu module.
+
+    python -m menu.cli import menu.csv --restaurant-id 3 --dry-run
+    python -m menu.cli import all_menus.json
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from sqlmodel import Session
+
+import auth.domain.entities  # noqa: F401 - registers every table on the metadata
+import reservations.domain.entities  # noqa: F401
+from menu.domain.importer import MenuImporter, IMPORT_FORMATS, parse_menu_file, read_menu_file
+from shared.database import engine
+from shared.exceptions import BadRequestException, ConflictException, PayloadTooLargeException
+
+
+def import_items(args: argparse.Namespace) -> int:
+    """Upserts menu items from a CSV or JSON file in one transaction."""
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "json")
+    with open(args.path, "rb") as source:
+        try:
+            data = read_menu_file(source)
+        except PayloadTooLargeException as e:
+            print(e.detail, file=sys.stderr)
+            return 1
+    with Session(engine) as session:
+        try:
+            result = MenuImporter(session).import_rows(parse_menu_file(data, fmt), args.restaurant_id, args.dry_run)
+        except (BadRequestException, ConflictException) as e:
+            print(e.detail, file=sys.stderr)
+            return 1
+    if args.verbose:
+        for change in result["changes"]:
+            print(f"row {change['row']}: {change['action']} '{change['name']}' "
+                  f"(restaurant {change['restaurant_id']}) {change['changes']}")
+    prefix = "Would import" if args.dry_run else "Imported"
+    print(f"{prefix}: {result['created']} created, {result['updated']} updated, {result['unchanged']} unchanged.")
+    return 0
+
+
+COMMANDS = {
+    "import": import_items,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m menu.cli", description="Menu admin commands.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="Create or update menu items from CSV or JSON.")
+    import_parser.add_argument("path", help="CSV or JSON file")
+    import_parser.add_argument("--restaurant-id", type=int, help="Restaurant for rows without restaurant_id")
+    import_parser.add_argument("--format", choices=IMPORT_FORMATS, help="Defaults to the file extension")
+    import_parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    import_parser.add_argument("--verbose", action="store_true", help="Print every created or updated row")
+    args = parser.parse_args(argv)
+    return COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
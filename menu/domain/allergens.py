@@ -0,0 +1,50 @@
+# src/menu/domain/allergens.py
+import unicodedata
+from typing import Iterable, List, Optional
+
+# The 14 allergens of EU Regulation 1169/2011; the position is the bit in allergen_mask.
+ALLERGENS = (
+    "gluten", "crustaceans", "eggs", "fish", "peanuts", "soybeans", "milk",
+    "nuts", "celery", "mustard", "sesame", "sulphites", "lupin", "molluscs",
+)
+ALLERGEN_BITS = {name: 1 << index for index, name in enumerate(ALLERGENS)}
+ALL_ALLERGENS_MASK = (1 << len(ALLERGENS)) - 1
+# Other names guests and older reservations use for them (accent-free, lower case).
+ALLERGEN_ALIASES = {
+    "wheat": "gluten", "trigo": "gluten", "celiaco": "gluten", "celiaquia": "gluten",
+    "crustacean": "crustaceans", "crustaceo": "crustaceans", "crustaceos": "crustaceans", "marisco": "crustaceans",
+    "mariscos": "crustaceans", "egg": "eggs", "huevo": "eggs", "huevos": "eggs", "pescado": "fish",
+    "peanut": "peanuts", "cacahuete": "peanuts", "cacahuetes": "peanuts", "mani": "peanuts",
+    "soy": "soybeans", "soya": "soybeans", "soja": "soybeans", "dairy": "milk", "lactose": "milk",
+    "leche": "milk", "lactosa": "milk", "lacteos": "milk", "nut": "nuts", "tree nuts": "nuts",
+    "frutos secos": "nuts", "nueces": "nuts", "apio": "celery", "mostaza": "mustard", "sesamo": "sesame",
+    "sulfites": "sulphites", "sulfitos": "sulphites", "altramuz": "lupin", "altramuces": "lupin",
+    "mollusc": "molluscs", "mollusk": "molluscs", "mollusks": "molluscs", "molusco": "molluscs", "moluscos": "molluscs",
+}
+
+
+def canonical_allergen(name: str) -> Optional[str]:
+    """The ALLERGENS entry ``name`` refers to, through ALLERGEN_ALIASES; None if it is not one."""
+    key = unicodedata.normalize("NFKD", name.strip().lower())
+    key = " ".join("".join(char for char in key if not unicodedata.combining(char)).split())
+    return key if key in ALLERGEN_BITS else ALLERGEN_ALIASES.get(key)
+
+
+def allergen_mask(names: Iterable[str], strict: bool = True) -> int:
+    """Packs allergen names into a bitmask; unknown names raise ValueError, or are skipped if not ``strict``."""
+    mask = 0
+    unknown = []
+    for name in names or ():
+        canonical = canonical_allergen(name)
+        if canonical is None:
+            unknown.append(name)
+        else:
+            mask |= ALLERGEN_BITS[canonical]
+    if unknown and strict:
+        raise ValueError(f"Unknown allergens {unknown}. Must be among {list(ALLERGENS)}")
+    return mask
+
+
+def allergen_names(mask: int) -> List[str]:
+    """Unpacks a bitmask into allergen names, in ALLERGENS order."""
+    return [name for name, bit in ALLERGEN_BITS.items() if mask & bit]
\ No newline at end of file
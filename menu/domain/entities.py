@@ -1,5 +1,6 @@
 # src/menu/domain/entities.py
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
+from sqlalchemy import UniqueConstraint
 from sqlmodel import Field, SQLModel, Relationship
 
 class MenuItemBase(SQLModel):
@@ -8,13 +9,17 @@ class MenuItemBase(SQLModel):
     category: str # "Entrada", "Principal", "Postre", "Bebida"
     image_url: Optional[str] = None
     is_available: bool = True # For soft deletion
+    allergen_mask: int = Field(default=0, ge=0) # Bit i set = ALLERGENS[i] (menu/domain/allergens.py)
 
 class MenuItem(MenuItemBase, table=True):
+    # Imports and the admin API match items by name, so a name is unique within a restaurant.
+    __table_args__ = (UniqueConstraint("restaurant_id", "name", name="uq_menuitem_restaurant_name"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     restaurant_id: int = Field(foreign_key="restaurant.id")
 
 class MenuItemCreate(MenuItemBase):
-    pass
+    allergens: Optional[List[str]] = None # Allergen names; replaces allergen_mask when given
 
 class MenuItemUpdate(SQLModel):
     name: Optional[str] = None
@@ -22,7 +27,31 @@ class MenuItemUpdate(SQLModel):
     category: Optional[str] = None
     image_url: Optional[str] = None
     is_available: Optional[bool] = None
+    allergen_mask: Optional[int] = Field(default=None, ge=0)
+    allergens: Optional[List[str]] = None
 
 class MenuItemPublic(MenuItemBase):
     id: int
-    restaurant_id: int
\ No newline at end of file
+    restaurant_id: int
+
+class MenuItemSearchResult(MenuItemPublic):
+    allergens: List[str]
+    score: Optional[float] = None # Only for text queries
+
+class MenuItemImport(MenuItemUpdate):
+    name: str
+    restaurant_id: Optional[int] = None # Defaults to the restaurant the import targets
+
+class MenuImportChange(SQLModel):
+    row: int # 1-based position in the imported file
+    restaurant_id: int
+    name: str
+    action: str # "create" or "update"
+    changes: Dict[str, Any] # field -> new value
+
+class MenuImportResult(SQLModel):
+    dry_run: bool
+    created: int
+    updated: int
+    unchanged: int
+    changes: List[MenuImportChange]
\ No newline at end of file
@@ -0,0 +1,173 @@
+# src/menu/domain/importer.py
+import csv
+import io
+import json
+import os
+import re
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from menu.domain.allergens import allergen_mask
+from menu.domain.entities import MenuItem, MenuItemImport
+from menu.domain.search import menu_search
+from menu.domain.services import VALID_MENU_CATEGORIES
+from restaurants.domain.entities import Restaurant
+from shared.cache import invalidation_bus
+from shared.etag import menu_scope
+from shared.exceptions import BadRequestException, ConflictException, PayloadTooLargeException
+
+IMPORT_FORMATS = ("csv", "json")
+IMPORT_FIELDS = ["name", "description", "category", "image_url", "is_available", "allergen_mask"]
+MAX_REPORTED_ERRORS = 20
+# Larger import files are refused before being read into memory.
+MENU_IMPORT_MAX_BYTES = int(os.getenv("MENU_IMPORT_MAX_BYTES", str(5 * 1024 * 1024)))
+
+_LIST_SEPARATORS = re.compile(r"[;|,]")
+
+
+def read_menu_file(source: BinaryIO, max_bytes: int = MENU_IMPORT_MAX_BYTES) -> bytes:
+    """Reads an import file, reading at most one byte past ``max_bytes`` to tell that it is too large."""
+    data = source.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise PayloadTooLargeException(detail=f"Import file is larger than {max_bytes} bytes.")
+    return data
+
+
+def parse_menu_file(data: bytes, fmt: str) -> List[Dict[str, Any]]:
+    """
+    Reads import rows from CSV (one column per field, allergens separated by
+    ``;``, ``|`` or ``,``) or JSON (a list of objects, or ``{"items": [...]}``).
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise BadRequestException(detail=f"Invalid format. Must be one of {list(IMPORT_FORMATS)}")
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise BadRequestException(detail="Import file must be UTF-8 encoded.")
+    if fmt == "csv":
+        # Empty cells mean "not given", so updates keep the current value.
+        return [{key: value for key, value in row.items() if key and value not in (None, "")}
+                for row in csv.DictReader(io.StringIO(text))]
+    try:
+        rows = json.loads(text)
+    except ValueError as e:
+        raise BadRequestException(detail=f"Invalid JSON: {e}")
+    if isinstance(rows, dict):
+        rows = rows.get("items")
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise BadRequestException(detail="JSON import must be a list of menu item objects.")
+    return rows
+
+
+class MenuImporter:
+    """
+    Upserts many menu items at once, matched by (restaurant, name).
+
+    The whole batch is validated first: categories, allergens, restaurants
+    (one query) and name collisions, both inside the batch and against the
+    items already stored (one query for all the restaurants involved). The
+    differences are then applied as one batched insert and one batched update
+    in a single transaction, or only reported when ``dry_run`` is set.
+    """
+
+    def __init__(self, db_session: Session):
+        self.db_session = db_session
+
+    def import_rows(self, rows: List[Dict[str, Any]], restaurant_id: Optional[int] = None,
+                    dry_run: bool = False) -> dict:
+        errors = []
+        items = []
+        seen = {}
+        for number, row in enumerate(rows, start=1):
+            row = dict(row)
+            if isinstance(row.get("allergens"), str):
+                row["allergens"] = [name for name in _LIST_SEPARATORS.split(row["allergens"]) if name.strip()]
+            try:
+                item = MenuItemImport(**row)
+            except ValidationError as e:
+                errors.append(f"Row {number}: " + "; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                ))
+                continue
+            values = item.dict(exclude_unset=True, exclude={"restaurant_id", "allergens"})
+            if item.allergens is not None:
+                try:
+                    values["allergen_mask"] = allergen_mask(item.allergens)
+                except ValueError as e:
+                    errors.append(f"Row {number}: {e}")
+                    continue
+            target = item.restaurant_id or restaurant_id
+            if target is None:
+                errors.append(f"Row {number}: restaurant_id is required.")
+                continue
+            if "category" in values and values["category"] not in VALID_MENU_CATEGORIES:
+                errors.append(f"Row {number}: invalid category '{values['category']}'. Must be one of {VALID_MENU_CATEGORIES}")
+                continue
+            key = (target, item.name)
+            if key in seen:
+                errors.append(f"Row {number}: duplicate of row {seen[key]} ('{item.name}' in restaurant {target}).")
+                continue
+            seen[key] = number
+            items.append((number, target, values))
+
+        restaurant_ids = {target for _, target, _ in items}
+        if restaurant_ids:
+            found = set(self.db_session.exec(select(Restaurant.id).where(Restaurant.id.in_(restaurant_ids))).all())
+            errors.extend(f"Restaurant {rid} not found." for rid in sorted(restaurant_ids - found))
+
+        existing = {}
+        if restaurant_ids:
+            columns = [MenuItem.id, MenuItem.restaurant_id] + [getattr(MenuItem, field) for field in IMPORT_FIELDS]
+            for row in self.db_session.exec(select(*columns).where(MenuItem.restaurant_id.in_(restaurant_ids))).all():
+                current = dict(zip(["id", "restaurant_id"] + IMPORT_FIELDS, row))
+                existing[(current["restaurant_id"], current["name"])] = current
+
+        to_insert, to_update, changes = [], [], []
+        for number, target, values in items:
+            current = existing.get((target, values["name"]))
+            if current is None:
+                missing = [field for field in ("description", "category") if field not in values]
+                if missing:
+                    errors.append(f"Row {number}: new item '{values['name']}' needs {', '.join(missing)}.")
+                    continue
+                to_insert.append({"restaurant_id": target, **values})
+                changes.append({"row": number, "restaurant_id": target, "name": values["name"],
+                                "action": "create", "changes": values})
+                continue
+            changed = {field: value for field, value in values.items() if current[field] != value}
+            if changed:
+                to_update.append({"id": current["id"], **changed})
+                changes.append({"row": number, "restaurant_id": target, "name": values["name"],
+                                "action": "update", "changes": changed})
+
+        if errors:
+            more = f" (and {len(errors) - MAX_REPORTED_ERRORS} more)" if len(errors) > MAX_REPORTED_ERRORS else ""
+            raise BadRequestException(detail="Import rejected: " + " | ".join(errors[:MAX_REPORTED_ERRORS]) + more)
+
+        if not dry_run and (to_insert or to_update):
+            try:
+                if to_insert:
+                    self.db_session.exec(insert(MenuItem), params=to_insert)
+                if to_update:
+                    self.db_session.exec(update(MenuItem), params=to_update)
+                self.db_session.commit()
+            except IntegrityError:
+                # Another import or create added one of these names since they were read.
+                self.db_session.rollback()
+                raise ConflictException(detail="Import conflicts with concurrent changes to these restaurants; retry it.")
+            self.db_session.expire_all()
+            for rid in {change["restaurant_id"] for change in changes}:
+                invalidation_bus.publish(menu_scope(rid))
+                menu_search.invalidate(rid)
+
+        return {
+            "dry_run": dry_run,
+            "created": len(to_insert),
+            "updated": len(to_update),
+            "unchanged": len(items) - len(to_insert) - len(to_update),
+            "changes": changes,
+        }
\ No newline at end of file
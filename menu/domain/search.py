@@ -0,0 +1,137 @@
+# src/menu/domain/search.py
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlmodel import Session, select
+
+from menu.domain.allergens import allergen_names
+from menu.domain.entities import MenuItem, MenuItemPublic
+from shared.cache import ALL_SCOPES, invalidation_bus
+from shared.serialization import public_field_names
+from shared.text_index import TrigramIndex
+
+SEARCH_WEIGHTS = {"name": 1.0, "description": 0.5}
+PUBLIC_FIELDS = public_field_names(MenuItemPublic)
+
+
+class RestaurantMenuIndex:
+    """
+    One restaurant's menu held in memory: the public fields of every item, a
+    trigram index over name and description, and for each item its allergen
+    bitmask and a one-bit category code, so filters are single AND tests.
+    """
+
+    def __init__(self):
+        self.items: Dict[int, Dict[str, Any]] = {}
+        self.category_bits: Dict[str, int] = {}
+        self._category_of: Dict[int, int] = {}
+        self.text = TrigramIndex(SEARCH_WEIGHTS)
+
+    def add(self, item: Dict[str, Any]):
+        self.items[item["id"]] = item
+        bit = self.category_bits.setdefault(item["category"], 1 << len(self.category_bits))
+        self._category_of[item["id"]] = bit
+        self.text.add(item["id"], {"name": item["name"], "description": item["description"]})
+
+    def search(self, query: Optional[str], categories: Optional[Iterable[str]], excluded_mask: int,
+               available_only: bool) -> List[tuple]:
+        """Returns ``(item, score)`` pairs; ranked by score for text queries, else by id."""
+        wanted_categories = None
+        if categories:
+            wanted_categories = 0
+            for category in categories:
+                wanted_categories |= self.category_bits.get(category, 0)
+
+        if query:
+            candidates = self.text.search(query, limit=len(self.items))
+        else:
+            candidates = [(item_id, None) for item_id in sorted(self.items)]
+
+        results = []
+        for item_id, score in candidates:
+            item = self.items[item_id]
+            if item["allergen_mask"] & excluded_mask:
+                continue
+            if wanted_categories is not None and not self._category_of[item_id] & wanted_categories:
+                continue
+            if available_only and not item["is_available"]:
+                continue
+            results.append((item, score))
+        return results
+
+
+class MenuSearch:
+    """
+    Per-restaurant menu indexes, each loaded with one query on first use and
+    kept current by MenuService writes. Reservations also read them to check
+    pre-ordered dishes without querying every dish.
+    """
+
+    def __init__(self):
+        self._indexes: Dict[int, RestaurantMenuIndex] = {}
+        self._lock = threading.Lock()
+
+    def restaurant_index(self, session: Session, restaurant_id: int) -> RestaurantMenuIndex:
+        index = self._indexes.get(restaurant_id)
+        if index is not None:
+            return index
+        with self._lock:
+            index = self._indexes.get(restaurant_id)
+            if index is None:
+                index = RestaurantMenuIndex()
+                columns = [getattr(MenuItem, name) for name in PUBLIC_FIELDS]
+                for row in session.exec(select(*columns).where(MenuItem.restaurant_id == restaurant_id)).all():
+                    index.add(dict(zip(PUBLIC_FIELDS, row)))
+                self._indexes[restaurant_id] = index
+        return index
+
+    def index_item(self, menu_item: MenuItem):
+        """Adds or refreshes one item; a no-op until its restaurant's index has been loaded."""
+        index = self._indexes.get(menu_item.restaurant_id)
+        if index is not None:
+            with self._lock:
+                index.add({name: getattr(menu_item, name) for name in PUBLIC_FIELDS})
+
+    def invalidate(self, restaurant_id: int):
+        """Drops a restaurant's index after bulk writes; it is reloaded on next use."""
+        with self._lock:
+            self._indexes.pop(restaurant_id, None)
+
+    def clear(self):
+        """Drops every loaded index."""
+        with self._lock:
+            self._indexes.clear()
+
+    def get_items(self, session: Session, restaurant_id: int, item_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Returns the indexed items of a restaurant among ``item_ids``; other ids are simply absent."""
+        items = self.restaurant_index(session, restaurant_id).items
+        return {item_id: items[item_id] for item_id in item_ids if item_id in items}
+
+    def search(self, session: Session, restaurant_id: int, query: Optional[str] = None,
+               categories: Optional[List[str]] = None, excluded_mask: int = 0, available_only: bool = True,
+               limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        index = self.restaurant_index(session, restaurant_id)
+        with self._lock:
+            matches = index.search(query, categories, excluded_mask, available_only)
+        return [
+            {**item, "allergens": allergen_names(item["allergen_mask"]), "score": score}
+            for item, score in matches[offset:offset + limit]
+        ]
+
+
+menu_search = MenuSearch()
+
+
+def _drop_stale_menus(scopes, local: bool):
+    # This worker's own writes already updated its indexes; another worker's leave them stale.
+    if local:
+        return
+    if ALL_SCOPES in scopes:
+        menu_search.clear()
+        return
+    for scope in scopes:
+        if scope.startswith("restaurant:") and scope.endswith(":menu"):
+            menu_search.invalidate(int(scope.split(":")[1]))
+
+
+invalidation_bus.subscribe(_drop_stale_menus)
\ No newline at end of file
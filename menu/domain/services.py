@@ -1,11 +1,21 @@
 # src/menu/domain/services.py
 from typing import List, Optional
 from sqlmodel import Session, select
-from menu.domain.entities import MenuItem, MenuItemCreate, MenuItemUpdate
+from sqlalchemy.engine import Result
+from sqlalchemy.exc import IntegrityError
+from menu.domain.entities import MenuItem, MenuItemCreate, MenuItemPublic, MenuItemUpdate
+from menu.domain.allergens import allergen_mask
+from menu.domain.search import menu_search
 from shared.exceptions import NotFoundException, ConflictException, BadRequestException
+from shared.cache import Cache, invalidation_bus
+from shared.etag import menu_scope
+from shared.pagination import PageParams, select_fields, paginate
 
 VALID_MENU_CATEGORIES = ["Entrada", "Principal", "Postre", "Bebida"]
 
+# Encoded pages of menu listings, dropped when the restaurant's menu scope is published.
+menu_page_cache = Cache("menu-page")
+
 class MenuService:
     def __init__(self, db_session: Session):
         self.db_session = db_session
@@ -22,15 +32,54 @@ class MenuService:
         if existing_item:
             raise ConflictException(detail="Menu item with this name already exists for this restaurant.")
 
-        db_menu_item = MenuItem(restaurant_id=restaurant_id, **menu_item_create.dict())
+        item_data = menu_item_create.dict(exclude={"allergens"})
+        if menu_item_create.allergens is not None:
+            item_data["allergen_mask"] = self._allergen_mask(menu_item_create.allergens)
+
+        db_menu_item = MenuItem(restaurant_id=restaurant_id, **item_data)
         self.db_session.add(db_menu_item)
-        self.db_session.commit()
+        self._commit_unique_name()
         self.db_session.refresh(db_menu_item)
+        invalidation_bus.publish(menu_scope(restaurant_id))
+        menu_search.index_item(db_menu_item)
         return db_menu_item
 
-    def get_menu_items_by_restaurant(self, restaurant_id: int) -> List[MenuItem]:
-        """Retrieves all menu items for a given restaurant."""
-        return self.db_session.exec(select(MenuItem).where(MenuItem.restaurant_id == restaurant_id)).all()
+    def get_menu_item_rows(self, restaurant_id: int, page: PageParams,
+                           category: Optional[str] = None, is_available: Optional[bool] = None) -> Result:
+        """Retrieves a page of a restaurant's menu items as plain rows with the requested MenuItemPublic fields."""
+        if category is not None and category not in VALID_MENU_CATEGORIES:
+            raise BadRequestException(detail=f"Invalid category. Must be one of {VALID_MENU_CATEGORIES}")
+        query = select(*select_fields(MenuItem, MenuItemPublic, page.fields)).where(MenuItem.restaurant_id == restaurant_id)
+        if category is not None:
+            query = query.where(MenuItem.category == category)
+        if is_available is not None:
+            query = query.where(MenuItem.is_available == is_available)
+        return self.db_session.exec(paginate(query, MenuItem.id, page))
+
+    def search_menu_items(self, restaurant_id: int, query: Optional[str] = None, categories: Optional[List[str]] = None,
+                          exclude_allergens: Optional[List[str]] = None, available_only: bool = True,
+                          limit: int = 50, offset: int = 0) -> List[dict]:
+        """Searches a restaurant's menu by text, categories and allergens to exclude, from the in-memory index."""
+        invalid = [category for category in categories or [] if category not in VALID_MENU_CATEGORIES]
+        if invalid:
+            raise BadRequestException(detail=f"Invalid category. Must be one of {VALID_MENU_CATEGORIES}")
+        excluded = self._allergen_mask(exclude_allergens or [])
+        return menu_search.search(self.db_session, restaurant_id, query, categories, excluded, available_only, limit, offset)
+
+    @staticmethod
+    def _allergen_mask(names: List[str]) -> int:
+        try:
+            return allergen_mask(names)
+        except ValueError as e:
+            raise BadRequestException(detail=str(e))
+
+    def _commit_unique_name(self):
+        # The check above can race a concurrent create or import; the unique constraint settles it.
+        try:
+            self.db_session.commit()
+        except IntegrityError:
+            self.db_session.rollback()
+            raise ConflictException(detail="Menu item with this name already exists for this restaurant.")
 
     def get_menu_item_by_id(self, item_id: int) -> Optional[MenuItem]:
         """Retrieves a menu item by its ID."""
@@ -43,6 +92,10 @@ class MenuService:
             raise NotFoundException(detail="Menu item not found.")
 
         update_data = menu_item_update.dict(exclude_unset=True)
+        if "allergens" in update_data:
+            names = update_data.pop("allergens")
+            if names is not None:
+                update_data["allergen_mask"] = self._allergen_mask(names)
         if "category" in update_data and update_data["category"] not in VALID_MENU_CATEGORIES:
             raise BadRequestException(detail=f"Invalid category. Must be one of {VALID_MENU_CATEGORIES}")
 
@@ -59,8 +112,10 @@ class MenuService:
             setattr(menu_item, key, value)
 
         self.db_session.add(menu_item)
-        self.db_session.commit()
+        self._commit_unique_name()
         self.db_session.refresh(menu_item)
+        invalidation_bus.publish(menu_scope(menu_item.restaurant_id))
+        menu_search.index_item(menu_item)
         return menu_item
 
     def delete_menu_item(self, item_id: int):
@@ -74,6 +129,8 @@ class MenuService:
         self.db_session.add(menu_item)
         self.db_session.commit()
         self.db_session.refresh(menu_item)
+        invalidation_bus.publish(menu_scope(menu_item.restaurant_id))
+        menu_search.index_item(menu_item)
         # Or, if you truly want to delete and ensure no future reservations:
         # if not self.has_future_reservations(item_id):
         #    self.db_session.delete(menu_item)
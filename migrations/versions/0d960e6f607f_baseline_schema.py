@@ -0,0 +1,109 @@
+"""baseline schema
+
+Revision ID: 0d960e6f607f
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+The schema as create_db_and_tables() built it before revisions were tracked.
+Tables that already exist are left alone, so a database created that way can
+run ``alembic upgrade head`` directly. A database created from the current
+models is already at head and only needs ``alembic stamp head``.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d960e6f607f'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if "restaurant" not in existing:
+        op.create_table(
+            "restaurant",
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("location", sa.String(), nullable=False),
+            sa.Column("opening_time", sa.Time(), nullable=False),
+            sa.Column("closing_time", sa.Time(), nullable=False),
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_restaurant_name", "restaurant", ["name"], unique=True)
+    if "user" not in existing:
+        op.create_table(
+            "user",
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("role", sa.String(), nullable=False),
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("hashed_password", sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_user_email", "user", ["email"], unique=True)
+    if "menuitem" not in existing:
+        op.create_table(
+            "menuitem",
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("description", sa.String(), nullable=False),
+            sa.Column("category", sa.String(), nullable=False),
+            sa.Column("image_url", sa.String(), nullable=True),
+            sa.Column("is_available", sa.Boolean(), nullable=False),
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("restaurant_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["restaurant_id"], ["restaurant.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_menuitem_name", "menuitem", ["name"])
+    if "reservation" not in existing:
+        op.create_table(
+            "reservation",
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("restaurant_id", sa.Integer(), nullable=False),
+            sa.Column("num_guests", sa.Integer(), nullable=False),
+            sa.Column("reservation_time", sa.DateTime(), nullable=False),
+            sa.Column("status", sa.Enum("PENDING", "CONFIRMED", "CANCELLED", "COMPLETED", name="reservationstatus"),
+                      nullable=False),
+            sa.Column("notes", sa.String(), nullable=True),
+            sa.Column("special_requests", sa.JSON(), nullable=True),
+            sa.Column("allergens", sa.JSON(), nullable=True),
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+            sa.ForeignKeyConstraint(["restaurant_id"], ["restaurant.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_reservation_restaurant_id", "reservation", ["restaurant_id"])
+        op.create_index("ix_reservation_user_id", "reservation", ["user_id"])
+    if "table" not in existing:
+        op.create_table(
+            "table",
+            sa.Column("capacity", sa.Integer(), nullable=False),
+            sa.Column("location", sa.String(), nullable=False),
+            sa.Column("table_number", sa.Integer(), nullable=False),
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("restaurant_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["restaurant_id"], ["restaurant.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("table")
+    op.drop_index("ix_reservation_user_id", table_name="reservation")
+    op.drop_index("ix_reservation_restaurant_id", table_name="reservation")
+    op.drop_table("reservation")
+    sa.Enum(name="reservationstatus").drop(op.get_bind(), checkfirst=True)
+    op.drop_index("ix_menuitem_name", table_name="menuitem")
+    op.drop_table("menuitem")
+    op.drop_index("ix_user_email", table_name="user")
+    op.drop_table("user")
+    op.drop_index("ix_restaurant_name", table_name="restaurant")
+    op.drop_table("restaurant")
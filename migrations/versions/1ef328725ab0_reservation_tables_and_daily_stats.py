@@ -0,0 +1,95 @@
+"""reservation table, end time, pre-orders and daily stats rollup
+
+Revision ID: 1ef328725ab0
+Revises: 889f17246e94
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1ef328725ab0'
+down_revision: Union[str, None] = '889f17246e94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Length given to existing reservations, the default of ReservationCreate.duration_hours.
+DEFAULT_DURATION_HOURS = 2
+
+reservation = sa.table("reservation", sa.column("id", sa.Integer()), sa.column("restaurant_id", sa.Integer()),
+                       sa.column("num_guests", sa.Integer()), sa.column("reservation_time", sa.DateTime()),
+                       sa.column("end_time", sa.DateTime()), sa.column("table_id", sa.Integer()),
+                       sa.column("preordered_menu_items", sa.JSON()))
+table = sa.table("table", sa.column("id", sa.Integer()), sa.column("restaurant_id", sa.Integer()),
+                 sa.column("capacity", sa.Integer()))
+
+
+def _assign_tables(bind):
+    """Seats every existing reservation at the smallest table of its restaurant that fits, or the largest one."""
+    tables = {}
+    for row in bind.execute(sa.select(table.c.id, table.c.restaurant_id, table.c.capacity)
+                            .order_by(table.c.capacity, table.c.id)):
+        tables.setdefault(row.restaurant_id, []).append(row)
+    rows = bind.execute(sa.select(reservation.c.id, reservation.c.restaurant_id, reservation.c.num_guests)).all()
+    for row in rows:
+        candidates = tables.get(row.restaurant_id)
+        if not candidates:
+            raise RuntimeError(f"Reservation {row.id} belongs to restaurant {row.restaurant_id}, which has no "
+                               f"tables. Add a table to that restaurant before upgrading.")
+        fitting = [candidate for candidate in candidates if candidate.capacity >= row.num_guests]
+        chosen = fitting[0] if fitting else candidates[-1]
+        bind.execute(reservation.update().where(reservation.c.id == row.id).values(table_id=chosen.id))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    with op.batch_alter_table("reservation") as batch_op:
+        batch_op.add_column(sa.Column("table_id", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("end_time", sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column("preordered_menu_items", sa.JSON(), nullable=True))
+
+    if bind.dialect.name == "postgresql":
+        end_time = reservation.c.reservation_time + sa.text(f"interval '{DEFAULT_DURATION_HOURS} hours'")
+    else:
+        end_time = sa.func.datetime(reservation.c.reservation_time, f"+{DEFAULT_DURATION_HOURS} hours")
+    bind.execute(reservation.update().values(end_time=end_time, preordered_menu_items=[]))
+    _assign_tables(bind)
+
+    with op.batch_alter_table("reservation") as batch_op:
+        batch_op.alter_column("table_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column("end_time", existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_foreign_key("fk_reservation_table_id_table", "table", ["table_id"], ["id"])
+        batch_op.create_index("ix_reservation_table_id", ["table_id"])
+
+    # Filled from the reservations by the app on its next start (ReservationRollup.backfill_if_empty).
+    op.create_table(
+        "reservation_daily_stats",
+        sa.Column("restaurant_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("pending_count", sa.Integer(), nullable=False),
+        sa.Column("confirmed_count", sa.Integer(), nullable=False),
+        sa.Column("cancelled_count", sa.Integer(), nullable=False),
+        sa.Column("completed_count", sa.Integer(), nullable=False),
+        sa.Column("total_guests", sa.Integer(), nullable=False),
+        sa.Column("tables_used", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["restaurant_id"], ["restaurant.id"]),
+        sa.PrimaryKeyConstraint("restaurant_id", "day"),
+    )
+    op.create_index("ix_reservation_daily_stats_day", "reservation_daily_stats", ["day"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_reservation_daily_stats_day", table_name="reservation_daily_stats")
+    op.drop_table("reservation_daily_stats")
+    with op.batch_alter_table("reservation") as batch_op:
+        batch_op.drop_index("ix_reservation_table_id")
+        batch_op.drop_constraint("fk_reservation_table_id_table", type_="foreignkey")
+        batch_op.drop_column("preordered_menu_items")
+        batch_op.drop_column("end_time")
+        batch_op.drop_column("table_id")
@@ -0,0 +1,45 @@
+"""menu item allergen mask
+
+Revision ID: 2e95b3f08a25
+Revises: 4d350fcad264
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from menu.domain.allergens import allergen_mask
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e95b3f08a25'
+down_revision: Union[str, None] = '4d350fcad264'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+menuitem = sa.table("menuitem", sa.column("id", sa.Integer()), sa.column("allergens", sa.JSON()),
+                    sa.column("allergen_mask", sa.Integer()))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("menuitem") as batch_op:
+        batch_op.add_column(sa.Column("allergen_mask", sa.Integer(), nullable=False, server_default="0"))
+
+    # Databases that kept allergen names on the menu items get them packed into the mask;
+    # names that are not ALLERGENS or one of their aliases are skipped. The list column is left in place.
+    bind = op.get_bind()
+    if "allergens" not in {column["name"] for column in sa.inspect(bind).get_columns("menuitem")}:
+        return
+    for row in bind.execute(sa.select(menuitem.c.id, menuitem.c.allergens)).all():
+        mask = allergen_mask(row.allergens or [], strict=False)
+        if mask:
+            bind.execute(menuitem.update().where(menuitem.c.id == row.id).values(allergen_mask=mask))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("menuitem") as batch_op:
+        batch_op.drop_column("allergen_mask")
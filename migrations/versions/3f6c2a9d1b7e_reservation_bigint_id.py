@@ -0,0 +1,48 @@
+"""reservation bigint id
+
+Revision ID: 3f6c2a9d1b7e
+Revises: c47e9a1f5d23
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6c2a9d1b7e'
+down_revision: Union[str, None] = 'c47e9a1f5d23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Shards past the first hand out reservation ids above 10**12, out of INT4 range.
+    # SQLite's INTEGER is already 64-bit, so only Postgres needs the column and its sequence widened.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.alter_column("reservation", "id", existing_type=sa.Integer(), type_=sa.BigInteger(),
+                    existing_nullable=False)
+    op.execute("""
+        DO $$
+        BEGIN
+            EXECUTE format('ALTER SEQUENCE %s AS bigint', pg_get_serial_sequence('reservation', 'id'));
+        END $$
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("""
+        DO $$
+        BEGIN
+            EXECUTE format('ALTER SEQUENCE %s AS integer', pg_get_serial_sequence('reservation', 'id'));
+        END $$
+    """)
+    op.alter_column("reservation", "id", existing_type=sa.BigInteger(), type_=sa.Integer(),
+                    existing_nullable=False)
@@ -0,0 +1,33 @@
+"""restaurant latitude and longitude
+
+Revision ID: 4d350fcad264
+Revises: 1ef328725ab0
+Create Date: 2026-10-19 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d350fcad264'
+down_revision: Union[str, None] = '1ef328725ab0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable: existing restaurants have no coordinates and are left out of nearby searches until set.
+    with op.batch_alter_table("restaurant") as batch_op:
+        batch_op.add_column(sa.Column("latitude", sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column("longitude", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("restaurant") as batch_op:
+        batch_op.drop_column("longitude")
+        batch_op.drop_column("latitude")
@@ -0,0 +1,28 @@
+"""reservation time index
+
+Revision ID: 889f17246e94
+Revises: a979217be6aa
+Create Date: 2026-10-19 09:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '889f17246e94'
+down_revision: Union[str, None] = 'a979217be6aa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_reservation_reservation_time", "reservation", ["reservation_time"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_reservation_reservation_time", table_name="reservation")
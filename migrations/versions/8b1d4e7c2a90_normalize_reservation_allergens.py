@@ -0,0 +1,44 @@
+"""normalize reservation allergens
+
+Revision ID: 8b1d4e7c2a90
+Revises: 2e95b3f08a25
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from menu.domain.allergens import canonical_allergen
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1d4e7c2a90'
+down_revision: Union[str, None] = '2e95b3f08a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+reservation = sa.table("reservation", sa.column("id", sa.BigInteger()), sa.column("allergens", sa.JSON()))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Free-text allergens written before the allergen list existed ("lactosa", "Huevo") become
+    # ALLERGENS names so pre-orders are checked against them; unrecognized entries are kept as they are.
+    bind = op.get_bind()
+    for row in bind.execute(sa.select(reservation.c.id, reservation.c.allergens)).all():
+        names = row.allergens or []
+        normalized = []
+        for name in names:
+            value = canonical_allergen(name) or name.strip()
+            if value and value not in normalized:
+                normalized.append(value)
+        if normalized != names:
+            bind.execute(reservation.update().where(reservation.c.id == row.id).values(allergens=normalized))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The original spellings are not kept; normalized names remain valid for older code.
+    pass
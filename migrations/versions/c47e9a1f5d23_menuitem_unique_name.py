@@ -0,0 +1,45 @@
+"""menuitem unique name per restaurant
+
+Revision ID: c47e9a1f5d23
+Revises: 8b1d4e7c2a90
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47e9a1f5d23'
+down_revision: Union[str, None] = '8b1d4e7c2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+menuitem = sa.table("menuitem", sa.column("id", sa.Integer()), sa.column("restaurant_id", sa.Integer()),
+                    sa.column("name", sa.String()))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Concurrent imports could store a dish twice; the oldest row keeps the name and
+    # later copies get their id appended, so reservations pointing at them stay valid.
+    bind = op.get_bind()
+    seen = set()
+    rows = bind.execute(sa.select(menuitem.c.id, menuitem.c.restaurant_id, menuitem.c.name)
+                        .order_by(menuitem.c.id)).all()
+    for row in rows:
+        key = (row.restaurant_id, row.name)
+        if key in seen:
+            bind.execute(menuitem.update().where(menuitem.c.id == row.id)
+                         .values(name=f"{row.name} ({row.id})"))
+        seen.add(key)
+    with op.batch_alter_table("menuitem") as batch_op:
+        batch_op.create_unique_constraint("uq_menuitem_restaurant_name", ["restaurant_id", "name"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("menuitem") as batch_op:
+        batch_op.drop_constraint("uq_menuitem_restaurant_name", type_="unique")
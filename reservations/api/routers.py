@@ -1,24 +1,29 @@
 # src/reservations/api/routers.py
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 from typing import List, Optional
 from datetime import datetime, date
 from shared.dependencies import get_current_active_user, require_role
 from reservations.domain.entities import ReservationCreate, ReservationPublic, ReservationUpdate, ReservationStatus
 from reservations.domain.services import ReservationService
-from shared.database import get_session
+from reservations.domain.export import ReservationExporter, EXPORT_FORMATS, parquet_available
+from shared.database import get_session, get_shard_sessions, engine, shard_router
+from shared.sharding import ShardSessions
 from auth.api.routers import get_current_active_user, require_role
 from auth.domain.entities import User
 from shared.exceptions import NotFoundException, ConflictException, BadRequestException, ForbiddenException
+from shared.pagination import PageParams, PageResponse, page_params
 
 router = APIRouter(prefix="/reservations", tags=["reservations"])
 
 @router.post("/", response_model=ReservationPublic, status_code=status.HTTP_201_CREATED)
 def create_reservation(reservation_create: ReservationCreate,
                        current_user: User = Depends(get_current_active_user),
-                       db: Session = Depends(get_session)):
+                       db: Session = Depends(get_session),
+                       shards: ShardSessions = Depends(get_shard_sessions)):
     """Creates a new reservation for the current user."""
-    service = ReservationService(db)
+    service = ReservationService(db, shards)
     try:
         reservation = service.create_reservation(current_user.id, reservation_create)
         return reservation
@@ -30,30 +35,65 @@ def create_reservation(reservation_create: ReservationCreate,
 
 @router.get("/me", response_model=List[ReservationPublic])
 def get_my_reservations(current_user: User = Depends(get_current_active_user),
-                        db: Session = Depends(get_session)):
-    """Retrieves all active reservations for the current user."""
-    service = ReservationService(db)
-    return service.get_user_reservations(current_user.id)
+                        db: Session = Depends(get_session),
+                        shards: ShardSessions = Depends(get_shard_sessions),
+                        page: PageParams = Depends(page_params)):
+    """Retrieves the active reservations of the current user, paginated."""
+    service = ReservationService(db, shards)
+    try:
+        return PageResponse(service.get_user_reservation_rows(current_user.id, page), page)
+    except BadRequestException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.detail)
 
 @router.get("/", response_model=List[ReservationPublic],
             dependencies=[Depends(require_role(["admin"]))])
 def get_all_reservations(db: Session = Depends(get_session),
+                         shards: ShardSessions = Depends(get_shard_sessions),
+                         page: PageParams = Depends(page_params),
                          date: Optional[date] = Query(None, description="Filter by date (YYYY-MM-DD)"),
                          restaurant_id: Optional[int] = Query(None, description="Filter by restaurant ID")):
-    """Retrieves all reservations (Admin only), with optional filters."""
-    service = ReservationService(db)
+    """Retrieves reservations (Admin only), paginated, with optional filters."""
+    service = ReservationService(db, shards)
     filter_date_time: Optional[datetime] = None
     if date:
         filter_date_time = datetime.combine(date, datetime.min.time())
-    return service.filter_reservations(filter_date_time, restaurant_id)
+    try:
+        return PageResponse(service.filter_reservation_rows(page, filter_date_time, restaurant_id), page)
+    except BadRequestException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.detail)
+
+@router.get("/export", dependencies=[Depends(require_role(["admin"]))])
+def export_reservations(date_from: Optional[date] = Query(None, alias="from", description="First day (YYYY-MM-DD)"),
+                        date_to: Optional[date] = Query(None, alias="to", description="Last day, inclusive (YYYY-MM-DD)"),
+                        restaurant_id: Optional[int] = Query(None, description="Filter by restaurant ID"),
+                        format: str = Query("csv", description="csv or parquet"),
+                        details: bool = Query(False, description="Join restaurant and table columns")):
+    """Streams reservations as CSV or Parquet for analytics (Admin only)."""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Format must be one of {list(EXPORT_FORMATS)}.")
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Parquet export requires the optional 'pyarrow' package.")
+
+    def stream():
+        # The response outlives the request dependencies, so the export owns its session.
+        with Session(engine) as session, ShardSessions(session, shard_router) as shards:
+            exporter = ReservationExporter(session, shards=shards)
+            query = exporter.query(date_from, date_to, restaurant_id, details)
+            yield from (exporter.csv_stream(query, details) if format == "csv" else exporter.parquet_stream(query, details))
+
+    media_type = "text/csv" if format == "csv" else "application/vnd.apache.parquet"
+    filename = f"reservations_{date_from or 'start'}_{date_to or 'end'}.{format}"
+    return StreamingResponse(stream(), media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
 
 
 @router.patch("/{reservation_id}", response_model=ReservationPublic)
 def update_reservation(reservation_id: int, reservation_update: ReservationUpdate,
                        current_user: User = Depends(get_current_active_user),
-                       db: Session = Depends(get_session)):
+                       db: Session = Depends(get_session),
+                       shards: ShardSessions = Depends(get_shard_sessions)):
     """Updates an existing reservation (Client can update their own pending reservations, Admin can update any)."""
-    service = ReservationService(db)
+    service = ReservationService(db, shards)
     is_admin = current_user.role == "admin"
     try:
         updated_reservation = service.update_reservation(reservation_id, reservation_update, current_user.id, is_admin)
@@ -69,9 +109,10 @@ def update_reservation(reservation_id: int, reservation_update: ReservationUpdat
 @router.delete("/{reservation_id}", status_code=status.HTTP_204_NO_CONTENT)
 def cancel_reservation(reservation_id: int,
                        current_user: User = Depends(get_current_active_user),
-                       db: Session = Depends(get_session)):
+                       db: Session = Depends(get_session),
+                       shards: ShardSessions = Depends(get_shard_sessions)):
     """Cancels a reservation (Client can cancel their own, Admin can cancel any)."""
-    service = ReservationService(db)
+    service = ReservationService(db, shards)
     is_admin = current_user.role == "admin"
     try:
         service.cancel_reservation(reservation_id, current_user.id, is_admin)
@@ -0,0 +1,87 @@
+# src/reservations/cli.py
+"""
+Admin commands for the reservations module.
+
+    python -m reservations.cli export --from 2025-01-01 --to 2025-12-31 --output reservations.csv
+    python -m reservations.cli export --format parquet --details --output reservations.parquet
+    python -m reservations.cli archive --retention-days 365 --dry-run
+"""
+import argparse
+import sys
+from datetime import date
+from typing import List, Optional
+
+from sqlmodel import Session
+
+import auth.domain.entities  # noqa: F401 - registers every table on the metadata
+import menu.domain.entities  # noqa: F401
+from reservations.domain.archive import ReservationArchiver, RESERVATION_RETENTION_DAYS, ARCHIVE_BATCH_SIZE
+from reservations.domain.export import ReservationExporter, EXPORT_FORMATS, EXPORT_CHUNK_SIZE
+from shared.database import engine, shard_router
+from shared.sharding import ShardSessions
+from shared.exceptions import BadRequestException
+
+
+def export(args: argparse.Namespace) -> int:
+    """Streams reservations to a file (or stdout for CSV) in constant memory."""
+    if args.format == "parquet" and args.output == "-":
+        print("Parquet export needs --output.", file=sys.stderr)
+        return 2
+    with Session(engine) as session, ShardSessions(session, shard_router) as shards:
+        exporter = ReservationExporter(session, args.chunk_size, shards)
+        query = exporter.query(args.date_from, args.date_to, args.restaurant_id, args.details)
+        sink = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+        try:
+            if args.format == "csv":
+                rows = exporter.write_csv(query, sink, args.details)
+            else:
+                rows = exporter.write_parquet(query, sink, args.details)
+        except BadRequestException as e:
+            print(e.detail, file=sys.stderr)
+            return 1
+        finally:
+            if sink is not sys.stdout.buffer:
+                sink.close()
+    print(f"Exported {rows} reservations.", file=sys.stderr)
+    return 0
+
+
+def archive(args: argparse.Namespace) -> int:
+    """Moves old completed and cancelled reservations to the compressed archive partitions."""
+    try:
+        result = ReservationArchiver().run(args.retention_days, args.batch_size, args.dry_run)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    verb = "Would archive" if args.dry_run else "Archived"
+    print(f"{verb} {result['archived']} reservations from before {result['cutoff']}.", file=sys.stderr)
+    return 0
+
+
+COMMANDS = {
+    "export": export,
+    "archive": archive,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m reservations.cli", description="Reservation admin commands.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="Export reservations as CSV or Parquet.")
+    export_parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="First day (YYYY-MM-DD)")
+    export_parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Last day, inclusive (YYYY-MM-DD)")
+    export_parser.add_argument("--restaurant-id", type=int)
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    export_parser.add_argument("--details", action="store_true", help="Join restaurant and table columns")
+    export_parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    export_parser.add_argument("--output", default="-", help="Output file, '-' for stdout (CSV only)")
+    archive_parser = subparsers.add_parser("archive", help="Archive old completed and cancelled reservations.")
+    archive_parser.add_argument("--retention-days", type=int, default=RESERVATION_RETENTION_DAYS)
+    archive_parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    archive_parser.add_argument("--dry-run", action="store_true", help="Only count what would be archived")
+    args = parser.parse_args(argv)
+    return COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
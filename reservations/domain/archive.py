@@ -0,0 +1,233 @@
+# src/reservations/domain/archive.py
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func
+from sqlmodel import Session, select
+
+from reservations.domain.entities import Reservation, ReservationStatus
+from shared.database import shard_router
+from shared.sharding import ShardRouter
+
+RESERVATION_ARCHIVE_DIR = os.getenv("RESERVATION_ARCHIVE_DIR", "data/archive/reservations")
+# Completed and cancelled reservations older than this many days leave the hot table.
+RESERVATION_RETENTION_DAYS = int(os.getenv("RESERVATION_RETENTION_DAYS", "365"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
+ARCHIVABLE_STATUSES = (ReservationStatus.COMPLETED, ReservationStatus.CANCELLED)
+PARTITION_SUFFIX = ".jsonl.gz"
+TMP_SUFFIX = ".tmp"
+
+logger = logging.getLogger(__name__)
+
+
+def _month(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(month: date) -> date:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def _fsync_directory(path: str):
+    """Makes a rename inside ``path`` durable; not supported (nor needed) on Windows."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class ReservationArchive:
+    """
+    Cold storage for reservations: gzip-compressed JSON lines, one partition
+    directory per month of ``reservation_time`` (``2024-03/``).
+
+    Each archiving batch becomes a new file in its partitions, written under a
+    temporary name, synced and then renamed into place, so a partition only
+    ever holds complete batches and an interrupted run leaves at most an
+    ignored ``.tmp`` file behind. Readers only open the partitions whose month
+    overlaps the requested range and skip ids they have already seen, in case
+    a batch was archived twice after an interrupted run.
+    """
+
+    def __init__(self, directory: str = RESERVATION_ARCHIVE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def partition_path(self, month: date) -> str:
+        return os.path.join(self.directory, f"{month:%Y-%m}")
+
+    def months(self) -> List[date]:
+        """Months with a partition, oldest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        months = []
+        for name in os.listdir(self.directory):
+            try:
+                month = datetime.strptime(name, "%Y-%m").date()
+            except ValueError:
+                continue
+            if self._batches(os.path.join(self.directory, name)):
+                months.append(month)
+        return sorted(months)
+
+    def partitions(self, date_from: Optional[date] = None, date_to: Optional[date] = None) -> List[str]:
+        """Partition directories that can hold reservations in [date_from, date_to]; either bound may be open."""
+        return [
+            self.partition_path(month) for month in self.months()
+            if (date_from is None or _next_month(month) > date_from) and (date_to is None or month <= date_to)
+        ]
+
+    def covers(self, day: date) -> bool:
+        """Whether some reservations of ``day`` may be archived."""
+        return bool(self._batches(self.partition_path(_month(day))))
+
+    def append(self, reservations: Sequence[Reservation]) -> int:
+        """Writes reservations to their monthly partitions as one new batch file each and returns how many were written."""
+        by_month: Dict[date, List[str]] = defaultdict(list)
+        for reservation in reservations:
+            by_month[_month(reservation.reservation_time.date())].append(reservation.model_dump_json())
+        with self._lock:
+            for month, lines in sorted(by_month.items()):
+                partition = self.partition_path(month)
+                os.makedirs(partition, exist_ok=True)
+                self._sequence += 1
+                name = f"{time.time_ns():020d}-{os.getpid()}-{self._sequence}{PARTITION_SUFFIX}"
+                path = os.path.join(partition, name)
+                try:
+                    with open(path + TMP_SUFFIX, "wb") as raw:
+                        with gzip.GzipFile(fileobj=raw, mode="wb") as fh:
+                            fh.write(("\n".join(lines) + "\n").encode("utf-8"))
+                        raw.flush()
+                        os.fsync(raw.fileno())
+                    os.replace(path + TMP_SUFFIX, path)
+                except BaseException:
+                    if os.path.exists(path + TMP_SUFFIX):
+                        os.remove(path + TMP_SUFFIX)
+                    raise
+                _fsync_directory(partition)
+        return len(reservations)
+
+    def read(self, date_from: Optional[date] = None, date_to: Optional[date] = None,
+             restaurant_id: Optional[int] = None,
+             statuses: Optional[Sequence[ReservationStatus]] = None) -> Iterator[Reservation]:
+        """Archived reservations whose reservation_time falls in [date_from, date_to] (inclusive days)."""
+        start = datetime.combine(date_from, datetime.min.time()) if date_from else None
+        end = datetime.combine(date_to + timedelta(days=1), datetime.min.time()) if date_to else None
+        wanted = {ReservationStatus(s) for s in statuses} if statuses else None
+        for partition in self.partitions(date_from, date_to):
+            seen = set()
+            for path in self._batches(partition):
+                for row in self._rows(path):
+                    if row["id"] in seen or (restaurant_id and row["restaurant_id"] != restaurant_id):
+                        continue
+                    seen.add(row["id"])
+                    reservation = Reservation.model_validate(row)
+                    if start and reservation.reservation_time < start or end and reservation.reservation_time >= end:
+                        continue
+                    if wanted and reservation.status not in wanted:
+                        continue
+                    yield reservation
+
+    @staticmethod
+    def _batches(partition: str) -> List[str]:
+        """Committed batch files of a partition, oldest first."""
+        if not os.path.isdir(partition):
+            return []
+        return [os.path.join(partition, name) for name in sorted(os.listdir(partition))
+                if name.endswith(PARTITION_SUFFIX)]
+
+    @staticmethod
+    def _rows(path: str) -> Iterator[Dict[str, Any]]:
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            try:
+                for line in fh:
+                    if line.strip():
+                        yield json.loads(line)
+            except (EOFError, gzip.BadGzipFile, zlib.error) as exc:
+                # Batches are renamed into place only once synced, so this is damage on disk:
+                # keep serving the rest of the archive instead of failing every read.
+                logger.error("Skipping the unreadable rest of archive batch %s: %s", path, exc)
+
+    def daily_totals(self, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                     restaurant_id: Optional[int] = None,
+                     keep: Optional[Callable[[int], bool]] = None) -> Dict[Tuple[int, date], Dict[str, Any]]:
+        """
+        Per (restaurant_id, day) status counts, guests and the set of tables of
+        non-cancelled reservations, for merging into the daily rollup.
+        ``keep`` filters restaurants (e.g. to the ones on one shard).
+        """
+        totals: Dict[Tuple[int, date], Dict[str, Any]] = {}
+        for reservation in self.read(date_from, date_to, restaurant_id):
+            if keep is not None and not keep(reservation.restaurant_id):
+                continue
+            key = (reservation.restaurant_id, reservation.reservation_time.date())
+            day = totals.get(key)
+            if day is None:
+                day = totals[key] = {status: 0 for status in ReservationStatus} | {"guests": 0, "tables": set()}
+            day[reservation.status] += 1
+            if reservation.status != ReservationStatus.CANCELLED:
+                day["guests"] += reservation.num_guests
+                day["tables"].add(reservation.table_id)
+        return totals
+
+
+reservation_archive = ReservationArchive()
+
+
+class ReservationArchiver:
+    """
+    Moves completed and cancelled reservations older than the retention
+    window from every shard's hot table into the archive, in batches: each
+    batch is written (and synced) to its partitions first, then deleted and
+    committed, so a crash can at worst archive a batch twice, never lose it.
+
+    The daily rollup keeps the archived days; ReservationRollup merges the
+    archive back in whenever it recomputes one of them.
+    """
+
+    def __init__(self, archive: ReservationArchive = reservation_archive, router: ShardRouter = shard_router):
+        self.archive = archive
+        self.router = router
+
+    @staticmethod
+    def cutoff(retention_days: int, today: Optional[date] = None) -> datetime:
+        """Reservations starting before this midnight are past the retention window."""
+        return datetime.combine((today or date.today()) - timedelta(days=retention_days), datetime.min.time())
+
+    def run(self, retention_days: int = RESERVATION_RETENTION_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE,
+            dry_run: bool = False) -> Dict[str, Any]:
+        if retention_days < 1:
+            raise ValueError("The retention window must be at least one day.")
+        cutoff = self.cutoff(retention_days)
+        condition = (Reservation.status.in_(ARCHIVABLE_STATUSES), Reservation.reservation_time < cutoff)
+        archived = 0
+        for engine in self.router.engines:
+            with Session(engine) as session:
+                if dry_run:
+                    archived += session.exec(select(func.count(Reservation.id)).where(*condition)).one()
+                    continue
+                while True:
+                    batch = session.exec(select(Reservation).where(*condition).order_by(Reservation.id).limit(batch_size)).all()
+                    if not batch:
+                        break
+                    self.archive.append(batch)
+                    session.exec(delete(Reservation).where(Reservation.id.in_([reservation.id for reservation in batch])))
+                    session.commit()
+                    session.expunge_all()
+                    archived += len(batch)
+        return {"cutoff": cutoff.isoformat(), "dry_run": dry_run, "archived": archived}
\ No newline at end of file
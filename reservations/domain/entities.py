@@ -5,7 +5,7 @@ from enum import Enum
 
 from sqlmodel import Field, SQLModel, Relationship
 from sqlalchemy.dialects.postgresql import JSON
-from sqlalchemy import Column
+from sqlalchemy import BigInteger, Column, Integer
 
 
 class ReservationStatus(str, Enum):
@@ -18,28 +18,37 @@ class ReservationStatus(str, Enum):
 class ReservationBase(SQLModel):
     user_id: int = Field(foreign_key="user.id", index=True) # Asumiendo relación con User
     restaurant_id: int = Field(foreign_key="restaurant.id", index=True) # Asumiendo relación con Restaurant
+    table_id: int = Field(foreign_key="table.id", index=True)
     num_guests: int = Field(gt=0) # Número de personas para la reserva
-    reservation_time: datetime # Fecha y hora de la reserva
+    reservation_time: datetime = Field(index=True) # Fecha y hora de la reserva
     status: ReservationStatus = Field(default="pending") # <-- ¡CAMBIA ESTO!
     notes: Optional[str] = None
     special_requests: List[str] = Field(default_factory=list, sa_column=Column(JSON))
 
     allergens: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    preordered_menu_items: List[int] = Field(default_factory=list, sa_column=Column(JSON)) # IDs de platos pre-ordenados
 
 class Reservation(ReservationBase, table=True):
-    id: int | None = Field(default=None, primary_key=True)
+    # BIGINT: shard k hands out ids above k * SHARD_ID_SPAN (shared/sharding.py). SQLite only
+    # autoincrements INTEGER PRIMARY KEY columns, and its INTEGER is already 64-bit.
+    id: int | None = Field(default=None, sa_column=Column(BigInteger().with_variant(Integer, "sqlite"),
+                                                          primary_key=True, autoincrement=True))
+    end_time: datetime # reservation_time + duración, usado para detectar solapamientos
 
 
 class ReservationCreate(ReservationBase):
-    pass
+    duration_hours: float = Field(default=2, gt=0)
 
 class ReservationUpdate(SQLModel):
     num_guests: Optional[int] = None
     reservation_time: Optional[datetime] = None
     status: Optional[ReservationStatus] = None
     notes: Optional[str] = None
+    duration_hours: Optional[float] = Field(default=None, gt=0)
+    preordered_menu_items: Optional[List[int]] = None
     # Si actualizas special_requests, también debe ser List[str]
     special_requests: Optional[List[str]] = Field(default=None, sa_column=Column(JSON)) # Para updates, puede ser None
 
 class ReservationPublic(ReservationBase):
-    id: int
\ No newline at end of file
+    id: int
+    end_time: datetime
\ No newline at end of file
@@ -0,0 +1,228 @@
+# src/reservations/domain/export.py
+import csv
+import io
+import json
+import os
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import Any, BinaryIO, Iterator, List, Optional, Sequence
+
+from sqlalchemy import Select
+from sqlmodel import Session, select
+
+from reservations.domain.entities import Reservation
+from reservations.domain.archive import ReservationArchive, reservation_archive
+from restaurants.domain.entities import Restaurant, Table
+from shared.database import shard_router
+from shared.exceptions import BadRequestException
+from shared.sharding import ShardSessions
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet export is optional
+    pyarrow = None
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "5000"))
+EXPORT_FORMATS = ("csv", "parquet")
+
+# (column name, SQL expression, Arrow type name); list types are "list<...>".
+RESERVATION_COLUMNS = [
+    ("id", Reservation.id, "int64"),
+    ("user_id", Reservation.user_id, "int64"),
+    ("restaurant_id", Reservation.restaurant_id, "int64"),
+    ("table_id", Reservation.table_id, "int64"),
+    ("num_guests", Reservation.num_guests, "int32"),
+    ("reservation_time", Reservation.reservation_time, "timestamp"),
+    ("end_time", Reservation.end_time, "timestamp"),
+    ("status", Reservation.status, "string"),
+    ("notes", Reservation.notes, "string"),
+    ("special_requests", Reservation.special_requests, "list<string>"),
+    ("allergens", Reservation.allergens, "list<string>"),
+    ("preordered_menu_items", Reservation.preordered_menu_items, "list<int64>"),
+]
+DETAIL_COLUMNS = [
+    ("restaurant_name", Restaurant.name, "string"),
+    ("restaurant_location", Restaurant.location, "string"),
+    ("table_number", Table.table_number, "int32"),
+    ("table_capacity", Table.capacity, "int32"),
+    ("table_location", Table.location, "string"),
+]
+
+
+def parquet_available() -> bool:
+    return pyarrow is not None
+
+
+class ReservationExporter:
+    """
+    Streams reservations for a date range as CSV or Parquet.
+
+    Rows are read through a server-side cursor in chunks of ``chunk_size``
+    (``yield_per``) and written out chunk by chunk, CSV as text blocks and
+    Parquet as one row group per chunk, so memory stays bounded by the chunk
+    size whatever the number of rows.
+
+    With sharded reservations the shards are read one after the other (each
+    shard allocates a higher id range, so rows stay in id order) and the
+    detail columns, which live on the primary database, are filled in from
+    lookups loaded once instead of a join.
+
+    Archived reservations in the range come first, read from the archive
+    partitions of the requested months only.
+    """
+
+    def __init__(self, db_session: Session, chunk_size: int = EXPORT_CHUNK_SIZE,
+                 shards: Optional[ShardSessions] = None, archive: ReservationArchive = reservation_archive):
+        self.db_session = db_session
+        self.chunk_size = chunk_size
+        self.shards = shards or ShardSessions(db_session, shard_router)
+        self.archive = archive
+
+    @staticmethod
+    def columns(details: bool) -> List[tuple]:
+        return RESERVATION_COLUMNS + (DETAIL_COLUMNS if details else [])
+
+    def query(self, date_from: Optional[date] = None, date_to: Optional[date] = None,
+              restaurant_id: Optional[int] = None, details: bool = False) -> Select:
+        """Builds the export query; ``date_to`` is inclusive."""
+        join = details and not self.shards.router.sharded
+        query = select(*[expr.label(name) for name, expr, _ in self.columns(join)])
+        if join:
+            query = query.join(Restaurant, Restaurant.id == Reservation.restaurant_id) \
+                .outerjoin(Table, Table.id == Reservation.table_id)
+        if date_from:
+            query = query.where(Reservation.reservation_time >= datetime.combine(date_from, datetime.min.time()))
+        if date_to:
+            query = query.where(Reservation.reservation_time < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+        if restaurant_id:
+            query = query.where(Reservation.restaurant_id == restaurant_id)
+        # The archive has no SQL; the query carries the filters for chunks() to apply to it.
+        return query.order_by(Reservation.id).execution_options(archive_filter=(date_from, date_to, restaurant_id))
+
+    def chunks(self, query: Select, details: bool = False) -> Iterator[Sequence[Any]]:
+        """Yields lists of at most ``chunk_size`` rows from the archive, then a streaming cursor on each shard in turn."""
+        archive_filter = query.get_execution_options().get("archive_filter")
+        archived = archive_filter is not None and bool(self.archive.partitions(*archive_filter[:2]))
+        details_of = self._detail_lookup() if details and (archived or self.shards.router.sharded) else None
+        if archived:
+            rows = []
+            for reservation in self.archive.read(*archive_filter):
+                row = tuple(getattr(reservation, name) for name, _, _ in RESERVATION_COLUMNS)
+                rows.append(row + details_of(row) if details_of else row)
+                if len(rows) == self.chunk_size:
+                    yield rows
+                    rows = []
+            if rows:
+                yield rows
+        if not self.shards.router.sharded:
+            details_of = None  # joined by the query
+        for index in range(len(self.shards.router.engines)):
+            session = self.shards.for_shard(index)
+            result = session.exec(query.execution_options(stream_results=True, yield_per=self.chunk_size))
+            for partition in result.partitions():
+                yield partition if details_of is None else [tuple(row) + details_of(row) for row in partition]
+
+    def _detail_lookup(self):
+        """Maps an exported row to its DETAIL_COLUMNS values, read from the primary database."""
+        restaurants = {rid: (name, location) for rid, name, location
+                       in self.db_session.exec(select(Restaurant.id, Restaurant.name, Restaurant.location))}
+        tables = {tid: (number, capacity, location) for tid, number, capacity, location
+                  in self.db_session.exec(select(Table.id, Table.table_number, Table.capacity, Table.location))}
+        return lambda row: restaurants.get(row[2], (None, None)) + tables.get(row[3], (None, None, None))
+
+    def csv_stream(self, query: Select, details: bool = False) -> Iterator[bytes]:
+        """Yields the CSV export as one encoded block per chunk, header first."""
+        for block, _ in self._csv_blocks(query, details):
+            yield block
+
+    def _csv_blocks(self, query: Select, details: bool) -> Iterator[tuple]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([name for name, _, _ in self.columns(details)])
+        for rows in self.chunks(query, details):
+            writer.writerows([_csv_value(value) for value in row] for row in rows)
+            yield buffer.getvalue().encode("utf-8"), len(rows)
+            buffer.seek(0)
+            buffer.truncate(0)
+        if buffer.tell():  # no rows at all: still emit the header
+            yield buffer.getvalue().encode("utf-8"), 0
+
+    def parquet_stream(self, query: Select, details: bool = False) -> Iterator[bytes]:
+        """Yields the Parquet file in pieces, as each row group is written."""
+        sink = _DrainableSink()
+        for _ in self._write_row_groups(query, sink, details):
+            yield sink.drain()
+        yield sink.drain()  # footer
+
+    def write_parquet(self, query: Select, sink: BinaryIO, details: bool = False) -> int:
+        """Writes the export to ``sink`` as Parquet, one row group per chunk, and returns the row count."""
+        return sum(self._write_row_groups(query, sink, details))
+
+    def _write_row_groups(self, query: Select, sink: BinaryIO, details: bool) -> Iterator[int]:
+        if pyarrow is None:
+            raise BadRequestException(detail="Parquet export requires the optional 'pyarrow' package.")
+        columns = self.columns(details)
+        schema = pyarrow.schema([(name, _arrow_type(type_name)) for name, _, type_name in columns])
+        with pyarrow.parquet.ParquetWriter(pyarrow.PythonFile(sink, mode="w"), schema) as writer:
+            for rows in self.chunks(query, details):
+                arrays = [
+                    pyarrow.array([_arrow_value(row[index]) for row in rows], type=schema.field(index).type)
+                    for index in range(len(columns))
+                ]
+                writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+                yield len(rows)
+
+    def write_csv(self, query: Select, sink: BinaryIO, details: bool = False) -> int:
+        """Writes the CSV export to a binary ``sink`` and returns the row count."""
+        total = 0
+        for block, rows in self._csv_blocks(query, details):
+            sink.write(block)
+            total += rows
+        return total
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+def _arrow_value(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def _arrow_type(type_name: str):
+    if type_name.startswith("list<"):
+        return pyarrow.list_(_arrow_type(type_name[5:-1]))
+    if type_name == "timestamp":
+        return pyarrow.timestamp("us")
+    return getattr(pyarrow, type_name)()
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose written bytes can be taken out incrementally."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
\ No newline at end of file
@@ -2,15 +2,28 @@
 from typing import List, Optional
 from datetime import datetime, timedelta
 from sqlmodel import Session, select
-from reservations.domain.entities import Reservation, ReservationCreate, ReservationUpdate, ReservationStatus
+from sqlalchemy.engine import Result
+from reservations.domain.entities import Reservation, ReservationCreate, ReservationPublic, ReservationUpdate, ReservationStatus
 from restaurants.domain.entities import Restaurant, Table
-from menu.domain.entities import MenuItem
+from restaurants.domain.availability import publish_reservation
+from menu.domain.allergens import allergen_mask, allergen_names, canonical_allergen
+from menu.domain.search import menu_search
 from shared.exceptions import NotFoundException, ConflictException, BadRequestException, ForbiddenException
+from shared.pagination import PageParams, select_fields, paginate
+from shared.database import shard_router
+from shared.sharding import ShardSessions, fetch, merge_pages
+from dashboard.domain.rollups import ReservationRollup
+from dashboard.domain.popularity import dish_popularity
+from shared.cache import invalidation_bus, reservations_scope
 from notifications.services import notify_reservation_created, notify_reservation_cancelled, notify_preorder_registered
 
+ACTIVE_STATUSES = [ReservationStatus.PENDING, ReservationStatus.CONFIRMED]
+
 class ReservationService:
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, shards: Optional[ShardSessions] = None):
+        # Restaurants, tables and users live in db_session; reservations on their restaurant's shard.
         self.db_session = db_session
+        self.shards = shards or ShardSessions(db_session, shard_router)
 
     def create_reservation(self, user_id: int, reservation_create: ReservationCreate) -> Reservation:
         """Creates a new reservation with extensive validations."""
@@ -39,8 +52,10 @@ class ReservationService:
             # If closing time is next day (e.g., opens at 20:00, closes at 02:00), need more complex logic here
             # For simplicity, assuming same-day closing for now.
 
+        session = self.shards.for_restaurant(reservation_create.restaurant_id)
+
         # Validate no overlapping reservations for the same table
-        overlapping_table_reservations = self.db_session.exec(
+        overlapping_table_reservations = session.exec(
             select(Reservation).where(
                 Reservation.table_id == reservation_create.table_id,
                 Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.CONFIRMED]),
@@ -54,26 +69,14 @@ class ReservationService:
         # Validate client has no more than 1 active reservation in the same exact time
         # This means no two reservations can start at the exact same minute for the same user.
         # Broader overlap check (any overlap for the user)
-        overlapping_user_reservations = self.db_session.exec(
-            select(Reservation).where(
-                Reservation.user_id == user_id,
-                Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.CONFIRMED]),
-                Reservation.reservation_time < reservation_end_time,
-                Reservation.end_time > reservation_create.reservation_time
-            )
-        ).all()
-        if overlapping_user_reservations:
+        if self._user_has_overlap(user_id, reservation_create.reservation_time, reservation_end_time):
             raise ConflictException(detail="You already have an active reservation that overlaps with this time.")
 
 
-        # Validate pre-ordered menu items
+        # Validate pre-ordered menu items against the reservation's allergens
+        allergens = self._normalize_allergens(reservation_create.allergens)
         if reservation_create.preordered_menu_items:
-            if len(reservation_create.preordered_menu_items) > 5:
-                raise BadRequestException(detail="Maximum 5 pre-ordered dishes allowed per reservation.")
-            for item_id in reservation_create.preordered_menu_items:
-                menu_item = self.db_session.get(MenuItem, item_id)
-                if not menu_item or menu_item.restaurant_id != reservation_create.restaurant_id or not menu_item.is_available:
-                    raise BadRequestException(detail=f"Pre-ordered menu item (ID: {item_id}) not found, not available, or does not belong to this restaurant.")
+            self._validate_preorders(reservation_create.restaurant_id, reservation_create.preordered_menu_items, allergens)
 
         db_reservation = Reservation(
             user_id=user_id,
@@ -82,36 +85,96 @@ class ReservationService:
             reservation_time=reservation_create.reservation_time,
             end_time=reservation_end_time,
             num_guests=reservation_create.num_guests,
+            notes=reservation_create.notes,
+            special_requests=reservation_create.special_requests,
+            allergens=allergens,
             preordered_menu_items=reservation_create.preordered_menu_items
         )
 
-        self.db_session.add(db_reservation)
-        self.db_session.commit()
-        self.db_session.refresh(db_reservation)
+        session.add(db_reservation)
+        ReservationRollup(session).refresh_day(db_reservation.restaurant_id, db_reservation.reservation_time.date())
+        session.commit()
+        session.refresh(db_reservation)
+        invalidation_bus.publish(reservations_scope(db_reservation.restaurant_id))
+        publish_reservation(db_reservation, "created")
 
         # Send notifications
         notify_reservation_created(db_reservation.reservation_time, restaurant.name)
         if db_reservation.preordered_menu_items:
             notify_preorder_registered(len(db_reservation.preordered_menu_items))
+            dish_popularity.record(db_reservation.restaurant_id, db_reservation.reservation_time.date(),
+                                   db_reservation.preordered_menu_items)
 
         return db_reservation
 
-    def get_user_reservations(self, user_id: int) -> List[Reservation]:
-        """Retrieves active reservations for a specific user."""
-        return self.db_session.exec(
-            select(Reservation).where(
-                Reservation.user_id == user_id,
-                Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.CONFIRMED])
-            )
-        ).all()
+    def _user_has_overlap(self, user_id: int, start: datetime, end: datetime, exclude_id: Optional[int] = None) -> bool:
+        """Whether the user holds an active reservation overlapping [start, end) in any restaurant, on any shard."""
+        query = select(Reservation.id).where(
+            Reservation.user_id == user_id,
+            Reservation.status.in_(ACTIVE_STATUSES),
+            Reservation.reservation_time < end,
+            Reservation.end_time > start
+        )
+        if exclude_id is not None:
+            query = query.where(Reservation.id != exclude_id)
+        return any(self.shards.fan_out(lambda session: session.exec(query.limit(1)).first() is not None))
+
+    def _all(self, query, restaurant_id: Optional[int] = None) -> List[Reservation]:
+        """Runs a reservation query on the restaurant's shard, or on every shard ordered by id."""
+        if restaurant_id:
+            return self.shards.for_restaurant(restaurant_id).exec(query).all()
+        rows = [row for rows in self.shards.fan_out(lambda session: session.exec(query).all()) for row in rows]
+        return sorted(rows, key=lambda row: row.id) if self.shards.router.sharded else rows
+
+    def _page(self, query, page: PageParams, restaurant_id: Optional[int] = None) -> Result:
+        """Runs a paginated query on the restaurant's shard, or on every shard merging their pages."""
+        query = paginate(query, Reservation.id, page)
+        if restaurant_id or not self.shards.router.sharded:
+            return self.shards.for_restaurant(restaurant_id or 0).exec(query)
+        return merge_pages(self.shards.fan_out(lambda session: fetch(session.exec(query))), "id", page.limit)
+
+    @staticmethod
+    def _normalize_allergens(names: List[str]) -> List[str]:
+        """
+        Known allergens (and their aliases) become ALLERGENS names; anything
+        else the guests wrote is kept as given for the restaurant to read,
+        but cannot be checked against the dishes.
+        """
+        normalized = allergen_names(allergen_mask(names, strict=False))
+        for name in names or ():
+            if canonical_allergen(name) is None and name.strip() and name.strip() not in normalized:
+                normalized.append(name.strip())
+        return normalized
+
+    def _validate_preorders(self, restaurant_id: int, item_ids: List[int], allergens: List[str]):
+        """Checks pre-ordered dishes through the in-memory menu index, rejecting those with the guests' allergens."""
+        if len(item_ids) > 5:
+            raise BadRequestException(detail="Maximum 5 pre-ordered dishes allowed per reservation.")
+        items = menu_search.get_items(self.db_session, restaurant_id, item_ids)
+        avoided = allergen_mask(allergens, strict=False)  # free-text and legacy entries do not match dishes
+        for item_id in item_ids:
+            item = items.get(item_id)
+            if not item or not item["is_available"]:
+                raise BadRequestException(detail=f"Pre-ordered menu item (ID: {item_id}) not found, not available, or does not belong to this restaurant.")
+            if item["allergen_mask"] & avoided:
+                conflicts = allergen_names(item["allergen_mask"] & avoided)
+                raise BadRequestException(detail=f"Pre-ordered menu item '{item['name']}' (ID: {item_id}) contains {conflicts}, listed as allergens for this reservation.")
+
+    def get_user_reservation_rows(self, user_id: int, page: PageParams) -> Result:
+        """Retrieves a page of a user's active reservations as plain rows with the requested ReservationPublic fields."""
+        query = select(*select_fields(Reservation, ReservationPublic, page.fields)).where(
+            Reservation.user_id == user_id,
+            Reservation.status.in_(ACTIVE_STATUSES)
+        )
+        return self._page(query, page)
 
     def get_all_reservations(self) -> List[Reservation]:
         """Retrieves all reservations (Admin only)."""
-        return self.db_session.exec(select(Reservation)).all()
+        return self._all(select(Reservation))
 
     def get_reservation_by_id(self, reservation_id: int) -> Optional[Reservation]:
         """Retrieves a single reservation by ID."""
-        return self.db_session.get(Reservation, reservation_id)
+        return self.shards.get(Reservation, reservation_id)
 
     def cancel_reservation(self, reservation_id: int, current_user_id: int, is_admin: bool) -> Reservation:
         """Cancels a reservation."""
@@ -130,11 +193,17 @@ class ReservationService:
                 raise BadRequestException(detail="Reservations can only be cancelled at least 1 hour in advance.")
 
         reservation.status = ReservationStatus.CANCELLED
-        self.db_session.add(reservation)
-        self.db_session.commit()
-        self.db_session.refresh(reservation)
+        session = self.shards.session_of(reservation)
+        session.add(reservation)
+        ReservationRollup(session).refresh_day(reservation.restaurant_id, reservation.reservation_time.date())
+        session.commit()
+        session.refresh(reservation)
+        invalidation_bus.publish(reservations_scope(reservation.restaurant_id))
+        publish_reservation(reservation, "cancelled")
 
         notify_reservation_cancelled(reservation.id)
+        dish_popularity.record(reservation.restaurant_id, reservation.reservation_time.date(),
+                               reservation.preordered_menu_items or [], delta=-1)
         return reservation
 
     def update_reservation(self, reservation_id: int, reservation_update: ReservationUpdate, current_user_id: int, is_admin: bool) -> Reservation:
@@ -149,7 +218,11 @@ class ReservationService:
         if reservation.status != ReservationStatus.PENDING:
              raise BadRequestException(detail="Only pending reservations can be modified.")
 
+        session = self.shards.session_of(reservation)
         update_data = reservation_update.dict(exclude_unset=True)
+        previous_day = reservation.reservation_time.date()
+        previous_slot = (reservation.reservation_time, reservation.end_time)
+        previous_preorders = list(reservation.preordered_menu_items or [])
 
         if "reservation_time" in update_data or "duration_hours" in update_data:
             # Re-validate time and duration if changed
@@ -170,7 +243,7 @@ class ReservationService:
                 raise BadRequestException(detail="New reservation duration extends past restaurant closing time.")
 
             # Check for overlapping table reservations (excluding the current reservation)
-            overlapping_table_reservations = self.db_session.exec(
+            overlapping_table_reservations = session.exec(
                 select(Reservation).where(
                     Reservation.table_id == reservation.table_id,
                     Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.CONFIRMED]),
@@ -183,16 +256,7 @@ class ReservationService:
                 raise ConflictException(detail="Table is already reserved for the new requested time slot.")
 
             # Check for overlapping user reservations (excluding the current reservation)
-            overlapping_user_reservations = self.db_session.exec(
-                select(Reservation).where(
-                    Reservation.user_id == current_user_id,
-                    Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.CONFIRMED]),
-                    Reservation.id != reservation_id, # Exclude current reservation
-                    Reservation.reservation_time < new_end_time,
-                    Reservation.end_time > new_reservation_time
-                )
-            ).all()
-            if overlapping_user_reservations:
+            if self._user_has_overlap(current_user_id, new_reservation_time, new_end_time, exclude_id=reservation_id):
                 raise ConflictException(detail="You already have an active reservation that overlaps with the new time.")
 
             reservation.reservation_time = new_reservation_time
@@ -207,12 +271,8 @@ class ReservationService:
             reservation.num_guests = update_data["num_guests"]
 
         if "preordered_menu_items" in update_data:
-            if len(update_data["preordered_menu_items"]) > 5:
-                raise BadRequestException(detail="Maximum 5 pre-ordered dishes allowed per reservation.")
-            for item_id in update_data["preordered_menu_items"]:
-                menu_item = self.db_session.get(MenuItem, item_id)
-                if not menu_item or menu_item.restaurant_id != reservation.restaurant_id or not menu_item.is_available:
-                    raise BadRequestException(detail=f"Pre-ordered menu item (ID: {item_id}) not found, not available, or does not belong to this restaurant.")
+            self._validate_preorders(reservation.restaurant_id, update_data["preordered_menu_items"],
+                                     reservation.allergens or [])
             reservation.preordered_menu_items = update_data["preordered_menu_items"]
 
         if "status" in update_data and is_admin: # Only admin can change status
@@ -220,18 +280,35 @@ class ReservationService:
         elif "status" in update_data and not is_admin:
             raise ForbiddenException(detail="Clients cannot change reservation status directly.")
 
-        self.db_session.add(reservation)
-        self.db_session.commit()
-        self.db_session.refresh(reservation)
+        session.add(reservation)
+        ReservationRollup(session).refresh_days([
+            (reservation.restaurant_id, previous_day),
+            (reservation.restaurant_id, reservation.reservation_time.date()),
+        ])
+        session.commit()
+        session.refresh(reservation)
+        invalidation_bus.publish(reservations_scope(reservation.restaurant_id))
+        if reservation.status in (ReservationStatus.CANCELLED, ReservationStatus.COMPLETED):
+            action = reservation.status.value
+        else:
+            action = "updated"
+        publish_reservation(reservation, action, *previous_slot)
+
+        # An admin cancelling through this endpoint withdraws the pre-orders, as cancel_reservation does.
+        current_preorders = list(reservation.preordered_menu_items or []) \
+            if reservation.status != ReservationStatus.CANCELLED else []
+        if (previous_day, previous_preorders) != (reservation.reservation_time.date(), current_preorders):
+            dish_popularity.record(reservation.restaurant_id, previous_day, previous_preorders, delta=-1)
+            dish_popularity.record(reservation.restaurant_id, reservation.reservation_time.date(), current_preorders)
         return reservation
 
-    def filter_reservations(self, date: Optional[datetime] = None, restaurant_id: Optional[int] = None) -> List[Reservation]:
-        """Filters reservations by date and/or restaurant (Admin only)."""
-        query = select(Reservation)
+    def filter_reservation_rows(self, page: PageParams, date: Optional[datetime] = None, restaurant_id: Optional[int] = None) -> Result:
+        """Filters reservations by date and/or restaurant (Admin only), returning a page of plain rows with the requested fields."""
+        query = select(*select_fields(Reservation, ReservationPublic, page.fields))
         if date:
             start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
             end_of_day = start_of_day + timedelta(days=1)
             query = query.where(Reservation.reservation_time >= start_of_day, Reservation.reservation_time < end_of_day)
         if restaurant_id:
             query = query.where(Reservation.restaurant_id == restaurant_id)
-        return self.db_session.exec(query).all()
\ No newline at end of file
+        return self._page(query, page, restaurant_id)
\ No newline at end of file
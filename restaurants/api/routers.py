@@ -1,16 +1,22 @@
 # src/restaurants/api/routers.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 from typing import List, Optional
+from datetime import date, datetime
 from shared.dependencies import get_current_active_user, require_role
 from restaurants.domain.entities import (
-    RestaurantCreate, RestaurantPublic, RestaurantUpdate,
-    TableCreate, TablePublic, TableUpdate
+    RestaurantCreate, RestaurantPublic, RestaurantUpdate, RestaurantSearchResult, RestaurantNearbyResult,
+    TableCreate, TablePublic, TableUpdate, TableFloorPlan, TableFloorPlanResult
 )
 from restaurants.domain.services import RestaurantService
-from shared.database import get_session
+from restaurants.domain.availability import availability_events, availability_snapshot
+from shared.database import engine, get_session
 from auth.api.routers import require_role
 from shared.exceptions import NotFoundException, ConflictException, BadRequestException
+from shared.etag import revisions, RESTAURANTS_SCOPE, tables_scope, not_modified, set_cache_headers
+from shared.pagination import PageParams, PageResponse, page_params
 
 router = APIRouter(prefix="/restaurants", tags=["restaurants"])
 
@@ -26,10 +32,53 @@ def create_restaurant(restaurant_create: RestaurantCreate, db: Session = Depends
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST if isinstance(e, BadRequestException) else status.HTTP_409_CONFLICT, detail=e.detail)
 
 @router.get("/", response_model=List[RestaurantPublic])
-def get_restaurants(db: Session = Depends(get_session)):
-    """Retrieves all restaurants."""
+def get_restaurants(request: Request, db: Session = Depends(get_session),
+                    page: PageParams = Depends(page_params)):
+    """Retrieves restaurants, paginated by id, optionally restricted to some fields."""
+    etag = revisions.etag(RESTAURANTS_SCOPE)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     service = RestaurantService(db)
-    return service.get_restaurants()
+    try:
+        rows = PageResponse(service.get_restaurant_rows(page), page)
+    except BadRequestException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.detail)
+    set_cache_headers(rows, etag)
+    return rows
+
+@router.get("/search", response_model=List[RestaurantSearchResult])
+def search_restaurants(request: Request, response: Response, db: Session = Depends(get_session),
+                       q: str = Query(..., min_length=1, max_length=100, description="Name or location, partial or misspelled"),
+                       limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0)):
+    """Searches restaurants by name and location, ranked by relevance."""
+    etag = revisions.etag(RESTAURANTS_SCOPE)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    service = RestaurantService(db)
+    try:
+        results = service.search_restaurants(q, limit, offset)
+    except BadRequestException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.detail)
+    set_cache_headers(response, etag)
+    return results
+
+@router.get("/nearby", response_model=List[RestaurantNearbyResult])
+def get_nearby_restaurants(db: Session = Depends(get_session),
+                           lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+                           lon: float = Query(..., ge=-180, le=180, description="Longitude"),
+                           radius: float = Query(5, gt=0, le=50, description="Radius in km"),
+                           limit: int = Query(20, ge=1, le=100),
+                           party_size: Optional[int] = Query(None, ge=1, le=12, description="Only restaurants with a free table for this many guests"),
+                           at: Optional[datetime] = Query(None, description="Reservation start, required with party_size"),
+                           duration_hours: float = Query(2, gt=0, le=12)):
+    """Retrieves restaurants near a point, nearest first, optionally only those with availability."""
+    service = RestaurantService(db)
+    try:
+        return service.get_nearby_restaurants(lat, lon, radius, limit, party_size, at, duration_hours)
+    except BadRequestException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.detail)
 
 @router.get("/{restaurant_id}", response_model=RestaurantPublic)
 def get_restaurant(restaurant_id: int, db: Session = Depends(get_session)):
@@ -79,19 +128,65 @@ def create_table(restaurant_id: int, table_create: TableCreate, db: Session = De
     except (BadRequestException, ConflictException) as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST if isinstance(e, BadRequestException) else status.HTTP_409_CONFLICT, detail=e.detail)
 
+@router.put("/{restaurant_id}/tables:bulk", response_model=TableFloorPlanResult,
+            dependencies=[Depends(require_role(["admin"]))])
+def replace_floor_plan(restaurant_id: int, floor_plan: TableFloorPlan, db: Session = Depends(get_session)):
+    """Replaces a restaurant's tables with the given floor plan in one transaction (Admin only)."""
+    service = RestaurantService(db)
+    try:
+        return service.replace_floor_plan(restaurant_id, floor_plan.tables)
+    except NotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.detail)
+    except (BadRequestException, ConflictException) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST if isinstance(e, BadRequestException) else status.HTTP_409_CONFLICT, detail=e.detail)
+
 @router.get("/{restaurant_id}/tables", response_model=List[TablePublic])
-def get_tables_by_restaurant(restaurant_id: int, db: Session = Depends(get_session),
+def get_tables_by_restaurant(restaurant_id: int, request: Request, db: Session = Depends(get_session),
+                             page: PageParams = Depends(page_params),
                              capacity: Optional[int] = None, location: Optional[str] = None):
-    """Retrieves tables for a restaurant, with optional filtering by capacity and location."""
+    """Retrieves tables for a restaurant, paginated, with optional filtering by capacity and location."""
+    etag = revisions.etag(tables_scope(restaurant_id))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     service = RestaurantService(db)
     try:
-        if capacity or location:
-            tables = service.filter_tables(restaurant_id, capacity, location)
-        else:
-            tables = service.get_tables_by_restaurant(restaurant_id)
-        return tables
+        rows = PageResponse(service.get_table_rows(restaurant_id, page, capacity, location), page)
+        set_cache_headers(rows, etag)
+        return rows
     except NotFoundException as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.detail)
+    except BadRequestException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.detail)
+
+@router.get("/{restaurant_id}/availability/stream")
+async def stream_availability(restaurant_id: int,
+                              day: Optional[date] = Query(None, description="Day shown (YYYY-MM-DD), today by default")):
+    """
+    Server-sent events with the tables and reserved slots of one day: a
+    snapshot, then a delta whenever a reservation on that day changes.
+    Public, so slots are identified by an opaque slot_id, never by reservation.
+    """
+    day = day or date.today()
+
+    def load():
+        # The stream outlives the request dependencies, so every snapshot uses its own session.
+        with Session(engine) as session:
+            return availability_snapshot(session, restaurant_id, day)
+
+    events = availability_events(restaurant_id, day, lambda: run_in_threadpool(load))
+    try:
+        first = await events.__anext__()
+    except NotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.detail)
+
+    async def body():
+        yield first
+        async for event in events:
+            yield event
+
+    return StreamingResponse(body(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @router.put("/tables/{table_id}", response_model=TablePublic,
             dependencies=[Depends(require_role(["admin"]))])
@@ -0,0 +1,169 @@
+# src/restaurants/domain/availability.py
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, Sequence
+
+from sqlmodel import Session, select
+
+from reservations.domain.entities import Reservation, ReservationStatus
+from restaurants.domain.entities import Restaurant, Table
+from shared.cache import ALL_SCOPES, invalidation_bus
+from shared.database import shard_router
+from shared.exceptions import NotFoundException
+from shared.pubsub import pubsub
+from shared.security import SECRET_KEY
+from shared.sharding import ShardSessions
+
+# Seconds between SSE keep-alive comments on an idle stream.
+AVAILABILITY_HEARTBEAT_SECONDS = float(os.getenv("AVAILABILITY_HEARTBEAT_SECONDS", "15"))
+BLOCKING_STATUSES = (ReservationStatus.PENDING, ReservationStatus.CONFIRMED)
+
+
+def availability_topic(restaurant_id: int) -> str:
+    return f"availability:{restaurant_id}"
+
+
+def _days(start: datetime, end: datetime) -> Iterable[date]:
+    day = start.date()
+    while datetime.combine(day, datetime.min.time()) < end:
+        yield day
+        day += timedelta(days=1)
+
+
+def slot_id(reservation_id: int) -> str:
+    """Opaque, stable key of a reservation's slot: streams are public, so they never carry reservation ids."""
+    return hmac.new(SECRET_KEY.encode(), f"slot:{reservation_id}".encode(), hashlib.sha256).hexdigest()[:16]
+
+
+def _slot(reservation: Reservation) -> Dict[str, Any]:
+    return {
+        "slot_id": slot_id(reservation.id),
+        "table_id": reservation.table_id,
+        "reservation_time": reservation.reservation_time.isoformat(),
+        "end_time": reservation.end_time.isoformat(),
+    }
+
+
+def publish_reservation(reservation: Reservation, action: str, previous_start: datetime = None,
+                        previous_end: datetime = None):
+    """
+    Announces a reservation change to the restaurant's availability stream.
+
+    ``days`` lists every day the reservation covered before or covers now
+    (``current_days`` only the latter), so each stream can skip changes to
+    days it does not show.
+    """
+    current_days = set(_days(reservation.reservation_time, reservation.end_time))
+    days = set(current_days)
+    if previous_start is not None:
+        days.update(_days(previous_start, previous_end))
+    pubsub.publish(availability_topic(reservation.restaurant_id), {
+        "type": "reservation",
+        "action": action,
+        "status": reservation.status.value if isinstance(reservation.status, ReservationStatus) else reservation.status,
+        "blocking": reservation.status in BLOCKING_STATUSES,
+        "days": sorted(day.isoformat() for day in days),
+        "current_days": sorted(day.isoformat() for day in current_days),
+        **_slot(reservation),
+    })
+
+
+def publish_tables_changed(restaurant_id: int):
+    """Tells the restaurant's streams that its tables changed, so they send a fresh snapshot."""
+    pubsub.publish(availability_topic(restaurant_id), {"type": "tables"})
+
+
+def _refresh_from_other_workers(scopes: Sequence[str], local: bool):
+    # Streams only get deltas for writes made by their own worker. Another worker's reservation
+    # or table writes arrive as invalidation scopes without details, so they resend a snapshot.
+    if local:
+        return
+    if ALL_SCOPES in scopes:  # missed invalidations: every open stream resends its snapshot
+        for topic in pubsub.topics():
+            if topic.startswith("availability:"):
+                pubsub.publish(topic, {"type": "tables"})
+        return
+    for scope in scopes:
+        kind, _, rest = scope.partition(":")
+        restaurant_id, _, what = rest.partition(":")
+        if kind == "restaurant" and what in ("reservations", "tables") and restaurant_id.isdigit():
+            pubsub.publish(availability_topic(int(restaurant_id)), {"type": "tables"})
+
+
+invalidation_bus.subscribe(_refresh_from_other_workers)
+
+
+def availability_snapshot(session: Session, restaurant_id: int, day: date) -> Dict[str, Any]:
+    """The restaurant's tables and the slots blocked on ``day``, for a stream to start from."""
+    if not session.get(Restaurant, restaurant_id):
+        raise NotFoundException(detail="Restaurant not found.")
+    start = datetime.combine(day, datetime.min.time())
+    tables = session.exec(
+        select(Table.id, Table.table_number, Table.capacity, Table.location)
+        .where(Table.restaurant_id == restaurant_id).order_by(Table.table_number)
+    ).all()
+    with ShardSessions(session, shard_router) as shards:
+        reservations = shards.for_restaurant(restaurant_id).exec(
+            select(Reservation).where(
+                Reservation.restaurant_id == restaurant_id,
+                Reservation.status.in_(BLOCKING_STATUSES),
+                Reservation.reservation_time < start + timedelta(days=1),
+                Reservation.end_time > start,
+            ).order_by(Reservation.reservation_time)
+        ).all()
+    return {
+        "type": "snapshot",
+        "day": day.isoformat(),
+        "tables": [{"id": tid, "table_number": number, "capacity": capacity, "location": location}
+                   for tid, number, capacity, location in tables],
+        "reserved": [_slot(reservation) for reservation in reservations],
+    }
+
+
+def _event(name: str, data: Dict[str, Any]) -> str:
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def availability_events(restaurant_id: int, day: date, load_snapshot,
+                              heartbeat: float = AVAILABILITY_HEARTBEAT_SECONDS) -> AsyncIterator[str]:
+    """
+    Server-sent events for one restaurant and day: a ``snapshot`` first, then
+    one ``reservation`` delta per change touching that day made on this
+    worker, and a fresh snapshot whenever the tables change or another worker
+    changes the restaurant's reservations. The first snapshot raises
+    NotFoundException for an unknown restaurant.
+
+    The subscription is taken before the snapshot is loaded, so no change can
+    fall between the two. ``load_snapshot`` is an awaitable factory so the
+    database work stays off the event loop. A subscriber that falls behind
+    is dropped by the pub/sub; the stream then ends and EventSource clients
+    reconnect and start over from a new snapshot.
+    """
+    subscription = pubsub.subscribe(availability_topic(restaurant_id))
+    wanted = day.isoformat()
+    try:
+        yield _event("snapshot", await load_snapshot())
+        while True:
+            try:
+                message = await subscription.get(timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if message is None:
+                return
+            if message["type"] == "tables":
+                try:
+                    yield _event("snapshot", await load_snapshot())
+                except NotFoundException:  # the restaurant was deleted
+                    return
+            elif wanted in message["days"]:
+                delta = {key: value for key, value in message.items() if key not in ("type", "days", "current_days")}
+                # Still blocking this day only if the reservation was not moved off it.
+                delta["blocking"] = message["blocking"] and wanted in message["current_days"]
+                yield _event("reservation", delta)
+    finally:
+        subscription.close()
\ No newline at end of file
@@ -8,6 +8,8 @@ class RestaurantBase(SQLModel):
     location: str
     opening_time: time
     closing_time: time
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180)
 
 class Restaurant(RestaurantBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -21,10 +23,19 @@ class RestaurantUpdate(SQLModel):
     location: Optional[str] = None
     opening_time: Optional[time] = None
     closing_time: Optional[time] = None
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180)
 
 class RestaurantPublic(RestaurantBase):
     id: int
 
+class RestaurantSearchResult(RestaurantPublic):
+    score: float
+
+class RestaurantNearbyResult(RestaurantPublic):
+    distance_km: float
+    available_tables: Optional[int] = None # Only when filtering by party size and time
+
 class TableBase(SQLModel):
     capacity: int
     location: str # e.g., "terraza", "interior"
@@ -44,4 +55,14 @@ class TableUpdate(SQLModel):
 
 class TablePublic(TableBase):
     id: int
-    restaurant_id: int
\ No newline at end of file
+    restaurant_id: int
+
+class TableFloorPlan(SQLModel):
+    tables: List[TableCreate] # The complete set of tables; missing table numbers are removed
+
+class TableFloorPlanResult(SQLModel):
+    created: int
+    updated: int
+    deleted: int
+    unchanged: int
+    tables: List[TablePublic]
\ No newline at end of file
@@ -0,0 +1,160 @@
+# src/restaurants/domain/geo.py
+import math
+import os
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlmodel import Session, select
+
+from restaurants.domain.entities import Restaurant
+from shared.cache import ALL_SCOPES, invalidation_bus
+from shared.etag import RESTAURANTS_SCOPE
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+# Grid cell size in degrees (0.05 is ~5.5 km north-south).
+GEO_CELL_DEGREES = float(os.getenv("GEO_CELL_DEGREES", "0.05"))
+
+Cell = Tuple[int, int]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class GeoGridIndex:
+    """
+    Uniform latitude/longitude grid of point ids.
+
+    A radius query only visits the cells overlapping the circle's bounding box
+    and then checks the exact haversine distance, so its cost depends on the
+    restaurants around the point rather than on the total count.
+    """
+
+    def __init__(self, cell_degrees: float = GEO_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self._cells: Dict[Cell, Set[int]] = {}
+        self._points: Dict[int, Tuple[float, float]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _cell(self, lat: float, lon: float) -> Cell:
+        lon = (lon + 180.0) % 360.0 - 180.0
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def add(self, point_id: int, lat: float, lon: float):
+        with self._lock:
+            self.remove(point_id)
+            self._points[point_id] = (lat, lon)
+            self._cells.setdefault(self._cell(lat, lon), set()).add(point_id)
+
+    def remove(self, point_id: int):
+        with self._lock:
+            point = self._points.pop(point_id, None)
+            if point is None:
+                return
+            cell = self._cell(*point)
+            members = self._cells.get(cell)
+            if members is not None:
+                members.discard(point_id)
+                if not members:
+                    del self._cells[cell]
+
+    def clear(self):
+        with self._lock:
+            self._cells.clear()
+            self._points.clear()
+
+    def within(self, lat: float, lon: float, radius_km: float, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Returns ``(point_id, distance_km)`` pairs within ``radius_km``, nearest first."""
+        lat_delta = radius_km / KM_PER_DEGREE
+        # Near the poles the longitude span grows without bound; cap it at the whole circle.
+        cos_lat = max(math.cos(math.radians(min(abs(lat) + lat_delta, 90.0))), 1e-6)
+        lon_delta = min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+        min_row = math.floor(max(lat - lat_delta, -90.0) / self.cell_degrees)
+        max_row = math.floor(min(lat + lat_delta, 90.0) / self.cell_degrees)
+        # Columns are computed unwrapped and folded back onto [-180, 180) so the antimeridian is handled.
+        min_col = math.floor((lon - lon_delta) / self.cell_degrees)
+        max_col = math.floor((lon + lon_delta) / self.cell_degrees)
+        wrap = round(360 / self.cell_degrees)
+
+        found = []
+        with self._lock:
+            columns = {(col + wrap // 2) % wrap - wrap // 2 for col in range(min_col, max_col + 1)} \
+                if max_col - min_col < wrap else None
+            for row in range(min_row, max_row + 1):
+                if columns is None:
+                    cells = [cell for cell in self._cells if cell[0] == row]
+                else:
+                    cells = [(row, col) for col in columns]
+                for cell in cells:
+                    for point_id in self._cells.get(cell, ()):
+                        distance = haversine_km(lat, lon, *self._points[point_id])
+                        if distance <= radius_km:
+                            found.append((point_id, distance))
+        found.sort(key=lambda item: (item[1], item[0]))
+        return found[:limit] if limit else found
+
+
+class RestaurantGeo:
+    """Restaurant locations in a GeoGridIndex, loaded once and kept current by RestaurantService writes."""
+
+    def __init__(self):
+        self.index = GeoGridIndex()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def ensure_loaded(self, session: Session):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self.index.clear()
+            rows = session.exec(select(Restaurant.id, Restaurant.latitude, Restaurant.longitude).where(
+                Restaurant.latitude.is_not(None), Restaurant.longitude.is_not(None)
+            )).all()
+            for rid, lat, lon in rows:
+                self.index.add(rid, lat, lon)
+            self._loaded = True
+
+    def index_restaurant(self, restaurant: Restaurant):
+        """Adds, moves or drops one restaurant; a no-op until the index has been loaded."""
+        if not self._loaded:
+            return
+        if restaurant.latitude is None or restaurant.longitude is None:
+            self.index.remove(restaurant.id)
+        else:
+            self.index.add(restaurant.id, restaurant.latitude, restaurant.longitude)
+
+    def invalidate(self):
+        """Drops the index after another worker's writes; it is reloaded on next use."""
+        with self._lock:
+            self._loaded = False
+
+    def remove_restaurant(self, restaurant_id: int):
+        if self._loaded:
+            self.index.remove(restaurant_id)
+
+    def nearby(self, session: Session, lat: float, lon: float, radius_km: float) -> List[Tuple[int, float]]:
+        self.ensure_loaded(session)
+        return self.index.within(lat, lon, radius_km)
+
+
+restaurant_geo = RestaurantGeo()
+
+
+def _drop_stale_index(scopes, local: bool):
+    # This worker's own writes already updated the index; another worker's leave it stale.
+    if not local and (RESTAURANTS_SCOPE in scopes or ALL_SCOPES in scopes):
+        restaurant_geo.invalidate()
+
+
+invalidation_bus.subscribe(_drop_stale_index)
\ No newline at end of file
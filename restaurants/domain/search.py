@@ -0,0 +1,112 @@
+# src/restaurants/domain/search.py
+import os
+import threading
+from typing import Any, Dict, List
+
+from sqlalchemy import or_, text
+from sqlmodel import Session, func, select
+
+from restaurants.domain.entities import Restaurant
+from shared.cache import ALL_SCOPES, invalidation_bus
+from shared.etag import RESTAURANTS_SCOPE
+from shared.text_index import TrigramIndex
+
+# "memory" (in-process trigram index) or "postgres" (pg_trgm GIN indexes).
+RESTAURANT_SEARCH_BACKEND = os.getenv("RESTAURANT_SEARCH_BACKEND", "memory")
+SEARCH_WEIGHTS = {"name": 1.0, "location": 0.6}
+
+PG_TRGM_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_restaurant_name_trgm ON restaurant USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_restaurant_location_trgm ON restaurant USING gin (location gin_trgm_ops)",
+]
+
+
+class RestaurantSearch:
+    """
+    Ranked restaurant search by name and location.
+
+    The default backend is an in-process TrigramIndex loaded once from the
+    database and kept current by RestaurantService writes. With
+    RESTAURANT_SEARCH_BACKEND=postgres the query runs against pg_trgm GIN
+    indexes instead, which also keeps several API processes consistent.
+    """
+
+    def __init__(self, backend: str = RESTAURANT_SEARCH_BACKEND):
+        self.backend = backend
+        self.index = TrigramIndex(SEARCH_WEIGHTS)
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def uses_database(self, session: Session) -> bool:
+        return self.backend == "postgres" and session.get_bind().dialect.name == "postgresql"
+
+    def prepare(self, session: Session):
+        """Creates the pg_trgm extension and indexes when the postgres backend is selected."""
+        if self.uses_database(session):
+            for statement in PG_TRGM_DDL:
+                session.exec(text(statement))
+            session.commit()
+
+    def ensure_loaded(self, session: Session):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            rows = session.exec(select(Restaurant.id, Restaurant.name, Restaurant.location)).all()
+            self.index.rebuild((rid, {"name": name, "location": location}) for rid, name, location in rows)
+            self._loaded = True
+
+    def index_restaurant(self, restaurant: Restaurant):
+        """Adds or refreshes one restaurant; a no-op until the index has been loaded."""
+        if self._loaded:
+            self.index.add(restaurant.id, {"name": restaurant.name, "location": restaurant.location})
+
+    def invalidate(self):
+        """Drops the index after another worker's writes; it is reloaded on next use."""
+        with self._lock:
+            self._loaded = False
+
+    def remove_restaurant(self, restaurant_id: int):
+        if self._loaded:
+            self.index.remove(restaurant_id)
+
+    def search(self, session: Session, query: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """Returns restaurants matching ``query`` as dicts with a ``score``, best match first."""
+        if self.uses_database(session):
+            return self._search_postgres(session, query, limit, offset)
+        self.ensure_loaded(session)
+        ranked = self.index.search(query, limit, offset)
+        if not ranked:
+            return []
+        restaurants = {r.id: r for r in session.exec(
+            select(Restaurant).where(Restaurant.id.in_([rid for rid, _ in ranked]))
+        ).all()}
+        return [{**restaurants[rid].model_dump(), "score": score} for rid, score in ranked if rid in restaurants]
+
+    @staticmethod
+    def _search_postgres(session: Session, query: str, limit: int, offset: int) -> List[Dict[str, Any]]:
+        score = func.greatest(
+            func.word_similarity(query, Restaurant.name) * SEARCH_WEIGHTS["name"],
+            func.word_similarity(query, Restaurant.location) * SEARCH_WEIGHTS["location"],
+        ).label("score")
+        statement = select(Restaurant, score).where(or_(
+            Restaurant.name.op("%>")(query),
+            Restaurant.location.op("%>")(query),
+            Restaurant.name.ilike(f"{query}%"),
+        )).order_by(score.desc(), Restaurant.id).offset(offset).limit(limit)
+        return [{**restaurant.model_dump(), "score": round(float(value), 4)}
+                for restaurant, value in session.exec(statement).all()]
+
+
+restaurant_search = RestaurantSearch()
+
+
+def _drop_stale_index(scopes, local: bool):
+    # This worker's own writes already updated the index; another worker's leave it stale.
+    if not local and (RESTAURANTS_SCOPE in scopes or ALL_SCOPES in scopes):
+        restaurant_search.invalidate()
+
+
+invalidation_bus.subscribe(_drop_stale_index)
\ No newline at end of file
@@ -1,14 +1,31 @@
 # src/restaurants/domain/services.py
 from typing import List, Optional
-from sqlmodel import Session, select
-from datetime import time
+from sqlmodel import Session, select, func
+from sqlalchemy import delete, insert, update
+from sqlalchemy.engine import Result
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, time, timedelta
 
-from restaurants.domain.entities import Restaurant, RestaurantCreate, RestaurantUpdate, Table, TableCreate, TableUpdate
+from restaurants.domain.entities import (
+    Restaurant, RestaurantCreate, RestaurantPublic, RestaurantUpdate,
+    Table, TableCreate, TablePublic, TableUpdate
+)
+from reservations.domain.entities import Reservation, ReservationStatus
+from restaurants.domain.search import restaurant_search
+from restaurants.domain.geo import restaurant_geo
+from restaurants.domain.availability import publish_tables_changed
 from shared.exceptions import NotFoundException, ConflictException, BadRequestException
+from shared.cache import invalidation_bus
+from shared.etag import RESTAURANTS_SCOPE, tables_scope, menu_scope
+from shared.pagination import PageParams, select_fields, paginate
+from shared.database import shard_router
+from shared.sharding import ShardSessions
 
 class RestaurantService:
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, shards: Optional[ShardSessions] = None):
+        # Reservations are only read here, from the shards (see ReservationService).
         self.db_session = db_session
+        self.shards = shards or ShardSessions(db_session, shard_router)
 
     def create_restaurant(self, restaurant_create: RestaurantCreate) -> Restaurant:
         """Creates a new restaurant."""
@@ -22,11 +39,76 @@ class RestaurantService:
         self.db_session.add(db_restaurant)
         self.db_session.commit()
         self.db_session.refresh(db_restaurant)
+        invalidation_bus.publish(RESTAURANTS_SCOPE)
+        restaurant_search.index_restaurant(db_restaurant)
+        restaurant_geo.index_restaurant(db_restaurant)
         return db_restaurant
 
-    def get_restaurants(self) -> List[Restaurant]:
-        """Retrieves all restaurants."""
-        return self.db_session.exec(select(Restaurant)).all()
+    def get_restaurant_rows(self, page: PageParams) -> Result:
+        """Retrieves a page of restaurants as plain rows with the requested RestaurantPublic fields."""
+        query = select(*select_fields(Restaurant, RestaurantPublic, page.fields))
+        return self.db_session.exec(paginate(query, Restaurant.id, page))
+
+    def search_restaurants(self, query: str, limit: int = 20, offset: int = 0) -> List[dict]:
+        """Searches restaurants by name and location with prefix and fuzzy matching, best match first."""
+        if not query.strip():
+            raise BadRequestException(detail="Search query must not be empty.")
+        return restaurant_search.search(self.db_session, query, limit, offset)
+
+    def get_nearby_restaurants(self, lat: float, lon: float, radius_km: float, limit: int = 20,
+                               party_size: Optional[int] = None, at: Optional[datetime] = None,
+                               duration_hours: float = 2) -> List[dict]:
+        """
+        Restaurants within ``radius_km`` of a point, nearest first. With
+        ``party_size`` and ``at`` only restaurants open then with a free table
+        big enough for the whole ``duration_hours`` are returned.
+        """
+        if (party_size is None) != (at is None):
+            raise BadRequestException(detail="party_size and at must be given together.")
+        ranked = restaurant_geo.nearby(self.db_session, lat, lon, radius_km)
+        if party_size is None:
+            ranked = ranked[:limit]
+        if not ranked:
+            return []
+        ids = [rid for rid, _ in ranked]
+        restaurants = {r.id: r for r in self.db_session.exec(select(Restaurant).where(Restaurant.id.in_(ids))).all()}
+
+        free_tables = None
+        if party_size is not None:
+            end = at + timedelta(hours=duration_hours)
+            busy_query = select(Reservation.table_id).where(
+                Reservation.restaurant_id.in_(ids),
+                Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.CONFIRMED]),
+                Reservation.reservation_time < end,
+                Reservation.end_time > at
+            ).distinct()
+            busy_tables = {tid for rows in self.shards.fan_out(lambda session: session.exec(busy_query).all()) for tid in rows}
+            free_tables = dict(self.db_session.exec(
+                select(Table.restaurant_id, func.count(Table.id)).where(
+                    Table.restaurant_id.in_(ids),
+                    Table.capacity >= party_size,
+                    Table.id.not_in(busy_tables)
+                ).group_by(Table.restaurant_id)
+            ).all())
+
+        results = []
+        for rid, distance in ranked:
+            restaurant = restaurants.get(rid)
+            if restaurant is None:
+                continue
+            if free_tables is not None:
+                open_then = restaurant.opening_time <= at.time() < restaurant.closing_time and \
+                    (end.date() > at.date() or end.time() <= restaurant.closing_time)
+                if not free_tables.get(rid) or not open_then:
+                    continue
+            results.append({
+                **restaurant.model_dump(),
+                "distance_km": round(distance, 3),
+                "available_tables": free_tables.get(rid) if free_tables is not None else None
+            })
+            if len(results) >= limit:
+                break
+        return results
 
     def get_restaurant_by_id(self, restaurant_id: int) -> Optional[Restaurant]:
         """Retrieves a restaurant by its ID."""
@@ -48,6 +130,9 @@ class RestaurantService:
         self.db_session.add(restaurant)
         self.db_session.commit()
         self.db_session.refresh(restaurant)
+        invalidation_bus.publish(RESTAURANTS_SCOPE)
+        restaurant_search.index_restaurant(restaurant)
+        restaurant_geo.index_restaurant(restaurant)
         return restaurant
 
     def delete_restaurant(self, restaurant_id: int):
@@ -60,6 +145,10 @@ class RestaurantService:
 
         self.db_session.delete(restaurant)
         self.db_session.commit()
+        invalidation_bus.publish(RESTAURANTS_SCOPE, tables_scope(restaurant_id), menu_scope(restaurant_id))
+        restaurant_search.remove_restaurant(restaurant_id)
+        restaurant_geo.remove_restaurant(restaurant_id)
+        publish_tables_changed(restaurant_id)
 
     def create_table(self, restaurant_id: int, table_create: TableCreate) -> Table:
         """Creates a new table for a restaurant."""
@@ -81,14 +170,81 @@ class RestaurantService:
         self.db_session.add(db_table)
         self.db_session.commit()
         self.db_session.refresh(db_table)
+        invalidation_bus.publish(tables_scope(restaurant_id))
+        publish_tables_changed(restaurant_id)
         return db_table
 
-    def get_tables_by_restaurant(self, restaurant_id: int) -> List[Table]:
-        """Retrieves all tables for a given restaurant."""
+    def replace_floor_plan(self, restaurant_id: int, tables: List[TableCreate]) -> dict:
+        """
+        Makes a restaurant's tables match ``tables``, matched by table_number.
+
+        Existing tables are loaded with one query and the differences are
+        applied as one batched insert, one batched update and one delete in a
+        single transaction. Tables still referenced by active reservations are
+        never removed.
+        """
         restaurant = self.get_restaurant_by_id(restaurant_id)
         if not restaurant:
             raise NotFoundException(detail="Restaurant not found.")
-        return restaurant.tables
+
+        wanted = {}
+        for table in tables:
+            if not (2 <= table.capacity <= 12):
+                raise BadRequestException(detail=f"Table {table.table_number}: capacity must be between 2 and 12.")
+            if table.table_number in wanted:
+                raise BadRequestException(detail=f"Table number {table.table_number} appears more than once.")
+            wanted[table.table_number] = table
+
+        existing = {table.table_number: table for table in self.db_session.exec(
+            select(Table).where(Table.restaurant_id == restaurant_id)
+        ).all()}
+        to_insert = [
+            {"restaurant_id": restaurant_id, **table.dict()}
+            for number, table in wanted.items() if number not in existing
+        ]
+        to_update = [
+            {"id": existing[number].id, "capacity": table.capacity, "location": table.location}
+            for number, table in wanted.items()
+            if number in existing and (existing[number].capacity, existing[number].location) != (table.capacity, table.location)
+        ]
+        to_delete = {table.id: number for number, table in existing.items() if number not in wanted}
+
+        if to_delete:
+            busy_query = select(Reservation.table_id).where(
+                Reservation.table_id.in_(to_delete),
+                Reservation.status.in_([ReservationStatus.PENDING, ReservationStatus.CONFIRMED]),
+                Reservation.end_time > datetime.now()
+            ).distinct()
+            busy = [tid for rows in self.shards.fan_out(lambda session: session.exec(busy_query).all()) for tid in rows]
+            if busy:
+                numbers = ", ".join(str(number) for number in sorted(to_delete[table_id] for table_id in busy))
+                raise ConflictException(detail=f"Tables {numbers} have active reservations and cannot be removed.")
+
+        try:
+            if to_insert:
+                self.db_session.exec(insert(Table), params=to_insert)
+            if to_update:
+                self.db_session.exec(update(Table), params=to_update)
+            if to_delete:
+                self.db_session.exec(delete(Table).where(Table.id.in_(to_delete)))
+            self.db_session.commit()
+        except IntegrityError:
+            self.db_session.rollback()
+            raise ConflictException(detail="Removed tables are still referenced by past reservations.")
+        self.db_session.expire_all()
+        if to_insert or to_update or to_delete:
+            invalidation_bus.publish(tables_scope(restaurant_id))
+            publish_tables_changed(restaurant_id)
+
+        return {
+            "created": len(to_insert),
+            "updated": len(to_update),
+            "deleted": len(to_delete),
+            "unchanged": len(wanted) - len(to_insert) - len(to_update),
+            "tables": self.db_session.exec(
+                select(Table).where(Table.restaurant_id == restaurant_id).order_by(Table.table_number)
+            ).all()
+        }
 
     def get_table_by_id(self, table_id: int) -> Optional[Table]:
         """Retrieves a table by its ID."""
@@ -110,6 +266,8 @@ class RestaurantService:
         self.db_session.add(table)
         self.db_session.commit()
         self.db_session.refresh(table)
+        invalidation_bus.publish(tables_scope(table.restaurant_id))
+        publish_tables_changed(table.restaurant_id)
         return table
 
     def delete_table(self, table_id: int):
@@ -118,14 +276,21 @@ class RestaurantService:
         if not table:
             raise NotFoundException(detail="Table not found.")
         # TODO: Add check for existing reservations for this table
+        restaurant_id = table.restaurant_id
         self.db_session.delete(table)
         self.db_session.commit()
+        invalidation_bus.publish(tables_scope(restaurant_id))
+        publish_tables_changed(restaurant_id)
 
-    def filter_tables(self, restaurant_id: int, capacity: Optional[int] = None, location: Optional[str] = None) -> List[Table]:
-        """Filters tables by capacity and/or location for a given restaurant."""
-        query = select(Table).where(Table.restaurant_id == restaurant_id)
+    def get_table_rows(self, restaurant_id: int, page: PageParams,
+                       capacity: Optional[int] = None, location: Optional[str] = None) -> Result:
+        """Retrieves a page of a restaurant's tables as plain rows with the requested TablePublic fields."""
+        restaurant = self.get_restaurant_by_id(restaurant_id)
+        if not restaurant:
+            raise NotFoundException(detail="Restaurant not found.")
+        query = select(*select_fields(Table, TablePublic, page.fields)).where(Table.restaurant_id == restaurant_id)
         if capacity is not None:
             query = query.where(Table.capacity >= capacity)
         if location:
             query = query.where(Table.location == location)
-        return self.db_session.exec(query).all()
\ No newline at end of file
+        return self.db_session.exec(paginate(query, Table.id, page))
\ No newline at end of file
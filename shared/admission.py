@@ -0,0 +1,276 @@
+# src/shared/admission.py
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Per route class "name:concurrency:queue"; classes are listed by priority, highest first.
+ADMISSION_LIMITS = os.getenv("ADMISSION_LIMITS", "booking:16:32,auth:8:16,browse:12:24,admin:4:4")
+# Requests allowed in flight over all classes (keep it under the 40 anyio worker threads)...
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "32"))
+# ...of which these slots can only be taken by the highest-priority class (booking writes).
+ADMISSION_PRIORITY_RESERVE = int(os.getenv("ADMISSION_PRIORITY_RESERVE", "8"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "1.0"))
+# Average wait for a pool connection above which the two lowest classes stop queueing.
+ADMISSION_POOL_WAIT_MS = float(os.getenv("ADMISSION_POOL_WAIT_MS", "100"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "2"))
+POOL_WAIT_DECAY = 0.2  # weight of the newest sample in the moving average
+POOL_WAIT_STALE_SECONDS = 5.0
+
+# (methods or None for any, path prefix, route class), first match wins.
+ROUTE_CLASSES: List[Tuple[Optional[set], str, str]] = [
+    (None, "/auth", "auth"),
+    ({"POST", "PUT", "PATCH", "DELETE"}, "/reservations", "booking"),
+    ({"GET", "HEAD"}, "/reservations/me", "browse"),
+    (None, "/reservations", "admin"),
+    (None, "/dashboard", "admin"),
+    ({"GET", "HEAD"}, "/restaurants", "browse"),
+    ({"GET", "HEAD"}, "/menu", "browse"),
+    (None, "/restaurants", "admin"),
+    (None, "/menu", "admin"),
+]
+# Never limited: long-lived streams, and what operators need to look at an overloaded instance.
+# POST /batch is not classified either: BatchExecutor admits each of its sub-requests in its own class.
+EXEMPT_PREFIXES = ("/diagnostics", "/docs", "/redoc", "/openapi.json")
+EXEMPT_SUFFIXES = ("/availability/stream",)
+
+_current_class: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("admission_class", default=None)
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """The route class of a request, or None when it is not subject to admission control."""
+    if path.startswith(EXEMPT_PREFIXES) or path.endswith(EXEMPT_SUFFIXES):
+        return None
+    for methods, prefix, name in ROUTE_CLASSES:
+        if path.startswith(prefix) and (methods is None or method in methods):
+            return name
+    return None
+
+
+def parse_limits(value: str) -> List[Tuple[str, int, int]]:
+    """Parses ``name:concurrency:queue,...`` into (name, concurrency, queue) tuples, keeping the order."""
+    limits = []
+    for entry in value.split(","):
+        if entry.strip():
+            name, concurrency, queue = entry.strip().split(":")
+            limits.append((name, int(concurrency), int(queue)))
+    return limits
+
+
+class RouteClass:
+    def __init__(self, name: str, priority: int, limit: int, queue_size: int):
+        self.name = name
+        self.priority = priority
+        self.limit = limit
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.stats = {"admitted": 0, "queued": 0, "rejected": 0, "timed_out": 0}
+        self.pool_wait_ms = 0.0
+        self.pool_wait_max_ms = 0.0
+
+
+class AdmissionController:
+    """
+    Per route class concurrency limits with short bounded queues.
+
+    A request runs at once when its class is under its limit and the global
+    in-flight cap allows it; otherwise it waits in its class's FIFO queue for
+    up to ``queue_timeout`` seconds, and is rejected outright when that queue
+    is full. Only the first (highest-priority) class may use the last
+    ``priority_reserve`` global slots, and freed slots go to queued requests
+    in priority order. While connections take longer than ``pool_wait_ms``
+    to get out of the pool, the two lowest classes stop queueing, so
+    dashboards and listings are shed before booking writes.
+
+    Everything but ``record_pool_wait`` runs on the event loop.
+    """
+
+    def __init__(self, limits: str = ADMISSION_LIMITS, max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+                 priority_reserve: int = ADMISSION_PRIORITY_RESERVE, queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+                 pool_wait_ms: float = ADMISSION_POOL_WAIT_MS):
+        self.classes: Dict[str, RouteClass] = {
+            name: RouteClass(name, priority, limit, queue_size)
+            for priority, (name, limit, queue_size) in enumerate(parse_limits(limits))
+        }
+        self.by_priority = sorted(self.classes.values(), key=lambda route_class: route_class.priority)
+        self.max_in_flight = max_in_flight
+        self.priority_reserve = min(priority_reserve, max_in_flight)
+        self.queue_timeout = queue_timeout
+        self.pool_wait_threshold_ms = pool_wait_ms
+        self.pool_wait_ms = 0.0
+        self._pool_wait_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return sum(route_class.in_flight for route_class in self.by_priority)
+
+    def saturated(self) -> bool:
+        """Whether the pool is currently slow to hand out connections."""
+        return self.pool_wait_ms > self.pool_wait_threshold_ms and \
+            time.monotonic() - self._pool_wait_at < POOL_WAIT_STALE_SECONDS
+
+    def _can_run(self, route_class: RouteClass) -> bool:
+        if route_class.in_flight >= route_class.limit:
+            return False
+        cap = self.max_in_flight if route_class.priority == 0 else self.max_in_flight - self.priority_reserve
+        return self.in_flight < cap
+
+    def _queue_limit(self, route_class: RouteClass) -> int:
+        if self.saturated() and route_class.priority >= len(self.by_priority) - 2 and route_class.priority > 0:
+            return 0
+        return route_class.queue_size
+
+    async def acquire(self, name: str) -> bool:
+        """Takes a slot for the class, waiting in its queue if needed; False means shed the request."""
+        route_class = self.classes[name]
+        if not route_class.waiters and self._can_run(route_class):
+            route_class.in_flight += 1
+            route_class.stats["admitted"] += 1
+            return True
+        if len(route_class.waiters) >= self._queue_limit(route_class):
+            route_class.stats["rejected"] += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        route_class.waiters.append(waiter)
+        route_class.stats["queued"] += 1
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            route_class.stats["timed_out"] += 1
+            return False
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self.release(name)  # granted just as the client went away
+            raise
+        finally:
+            if waiter in route_class.waiters:
+                route_class.waiters.remove(waiter)
+
+    def release(self, name: str):
+        self.classes[name].in_flight -= 1
+        self._wake()
+
+    async def run(self, name: str, call: Callable[[], Awaitable[Any]]) -> bool:
+        """Awaits ``call()`` holding a slot of the class; False (without calling) means shed the request."""
+        if not await self.acquire(name):
+            return False
+        token = _current_class.set(name)
+        try:
+            await call()
+        finally:
+            _current_class.reset(token)
+            self.release(name)
+        return True
+
+    def _wake(self):
+        """Hands free slots to queued requests, highest priority first."""
+        for route_class in self.by_priority:
+            while route_class.waiters and self._can_run(route_class):
+                waiter = route_class.waiters.popleft()
+                if waiter.done():  # timed out or cancelled meanwhile
+                    continue
+                route_class.in_flight += 1
+                route_class.stats["admitted"] += 1
+                waiter.set_result(None)
+
+    def record_pool_wait(self, name: Optional[str], seconds: float):
+        """Called from worker threads with the time a session waited for its connection."""
+        elapsed_ms = seconds * 1000
+        with self._lock:
+            self.pool_wait_ms += POOL_WAIT_DECAY * (elapsed_ms - self.pool_wait_ms)
+            self._pool_wait_at = time.monotonic()
+            route_class = self.classes.get(name)
+            if route_class is not None:
+                route_class.pool_wait_ms += POOL_WAIT_DECAY * (elapsed_ms - route_class.pool_wait_ms)
+                route_class.pool_wait_max_ms = max(route_class.pool_wait_max_ms, elapsed_ms)
+
+    def attach(self, session_class=Session):
+        """Times how long each session waits for its first connection (pool checkout plus connect)."""
+        event.listen(session_class, "after_transaction_create", _mark_transaction_start)
+        event.listen(session_class, "after_begin", self._after_begin)
+
+    def _after_begin(self, session, transaction, connection):
+        started = session.info.pop("admission_started", None)
+        if started is not None:
+            self.record_pool_wait(session.info.get("admission_class"), time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "priority_reserve": self.priority_reserve,
+            "saturated": self.saturated(),
+            "pool_wait_ms": round(self.pool_wait_ms, 3),
+            "classes": [
+                {
+                    "name": route_class.name,
+                    "priority": route_class.priority,
+                    "limit": route_class.limit,
+                    "queue_size": route_class.queue_size,
+                    "in_flight": route_class.in_flight,
+                    "waiting": len(route_class.waiters),
+                    **route_class.stats,
+                    "pool_wait_ms": round(route_class.pool_wait_ms, 3),
+                    "pool_wait_max_ms": round(route_class.pool_wait_max_ms, 3),
+                }
+                for route_class in self.by_priority
+            ],
+        }
+
+
+def _mark_transaction_start(session, transaction):
+    if transaction.parent is None:
+        session.info["admission_started"] = time.perf_counter()
+        session.info["admission_class"] = _current_class.get()
+
+
+admission_control = AdmissionController()
+
+
+def busy_detail(name: str) -> str:
+    return f"Server busy ({name} requests), retry later."
+
+
+class AdmissionMiddleware:
+    """
+    Applies ``admission_control`` to every classified request. Shed requests
+    get a 503 with ``Retry-After`` before any routing, authentication or
+    database work is done for them.
+    """
+
+    def __init__(self, app, controller: AdmissionController = admission_control,
+                 retry_after: int = ADMISSION_RETRY_AFTER):
+        self.app = app
+        self.controller = controller
+        self.retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        name = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if name is None or name not in self.controller.classes:
+            await self.app(scope, receive, send)
+            return
+        if not await self.controller.run(name, lambda: self.app(scope, receive, send)):
+            await self._reject(send, name)
+
+    async def _reject(self, send, name: str):
+        body = json.dumps({"detail": busy_detail(name)}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
\ No newline at end of file
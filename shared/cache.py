@@ -0,0 +1,511 @@
+# src/shared/cache.py
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from shared.database import DATABASE_URL
+from shared.etag import revisions, is_revision_scope
+
+try:
+    import redis
+except ImportError:  # only needed for CACHE_BACKEND=kv with a CACHE_URL
+    redis = None
+
+# local: per-process LRU; shm: one store shared by the workers of a host; kv: external key-value store.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local")
+# Transport of the invalidation bus; defaults to shm for local caches so every local worker hears about writes.
+CACHE_BUS = os.getenv("CACHE_BUS", "kv" if CACHE_BACKEND == "kv" else "shm")
+# redis://host:port/db for the kv backend and bus; empty uses an in-process stand-in (tests, single worker).
+CACHE_URL = os.getenv("CACHE_URL", "")
+CACHE_TTL = float(os.getenv("CACHE_TTL", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+# One store per user and database, so unrelated deployments on a host never share entries.
+CACHE_SHM_PATH = os.getenv("CACHE_SHM_PATH", os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+    f"elbuensabor-cache-{getattr(os, 'getuid', lambda: 0)()}-"
+    f"{hashlib.sha256(DATABASE_URL.encode()).hexdigest()[:12]}.sqlite3"))
+# How often each worker picks up invalidations published by the others.
+CACHE_BUS_POLL_INTERVAL = float(os.getenv("CACHE_BUS_POLL_INTERVAL", "0.2"))
+# Seconds published invalidations stay readable by workers that poll late.
+CACHE_BUS_RETENTION = float(os.getenv("CACHE_BUS_RETENTION", "60"))
+# A missing kv bus message still absent after this long was lost, not half-published.
+CACHE_BUS_SETTLE_SECONDS = float(os.getenv("CACHE_BUS_SETTLE_SECONDS", "1.0"))
+KV_PREFIX = os.getenv("CACHE_KV_PREFIX", "elbuensabor:")
+EVICTION_CHECK_EVERY = 100  # shm sets between size checks
+# Delivered instead of the scopes of messages a worker missed: subscribers drop everything they derive.
+ALL_SCOPES = "*"
+
+MISSING = object()
+
+
+def user_scope(email: str) -> str:
+    """Invalidation scope of a user's principal."""
+    return f"user:{email}"
+
+
+def reservations_scope(restaurant_id: int) -> str:
+    """Invalidation scope of a restaurant's reservations."""
+    return f"restaurant:{restaurant_id}:reservations"
+
+
+class CacheBackend(ABC):
+    """
+    Storage for cached values and per-scope generation counters.
+
+    Cached keys embed the generations of their scopes, so bumping a scope
+    makes every entry that depends on it unreachable at once, and a value
+    loaded before a concurrent write is stored under the old generation
+    where nobody looks for it. ``shared`` backends keep one set of
+    generations for all workers; the others need the invalidation bus to
+    bump each worker's own.
+    """
+    shared = False
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float):
+        ...
+
+    @abstractmethod
+    def generations(self, scopes: Sequence[str]) -> List[int]:
+        ...
+
+    @abstractmethod
+    def bump(self, scopes: Sequence[str]):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+
+class LocalCacheBackend(CacheBackend):
+    """In-process LRU; values are returned as stored, so callers must not mutate them."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generations(self, scopes: Sequence[str]) -> List[int]:
+        return [self._generations.get(scope, 0) for scope in scopes]
+
+    def bump(self, scopes: Sequence[str]):
+        with self._lock:
+            for scope in scopes:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedMemoryBackend(CacheBackend):
+    """
+    SQLite database on a memory-backed filesystem (/dev/shm), shared by the
+    workers of one host; also carries the invalidation bus between them.
+    Entries are evicted oldest-written first once there are more than
+    ``max_entries``. Values are pickled, so the file is created private to
+    the user running the app, on first use rather than at import.
+    """
+    shared = True
+
+    def __init__(self, path: str = CACHE_SHM_PATH, max_entries: int = CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._sets = 0
+        self._created = False
+        self._create_lock = threading.Lock()
+
+    def _create(self):
+        with self._create_lock:
+            if self._created:
+                return
+            # Created 0600 up front (SQLite gives its -wal and -shm files the same mode); an
+            # existing file is used as it is.
+            os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600))
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            try:
+                connection.executescript("""
+                    CREATE TABLE IF NOT EXISTS cache_entry (key TEXT PRIMARY KEY, value BLOB, expires_at REAL, written_at REAL);
+                    CREATE INDEX IF NOT EXISTS ix_cache_entry_written_at ON cache_entry (written_at);
+                    CREATE TABLE IF NOT EXISTS cache_generation (scope TEXT PRIMARY KEY, generation INTEGER NOT NULL);
+                    CREATE TABLE IF NOT EXISTS cache_bus (seq INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT, scopes TEXT, at REAL);
+                """)
+            finally:
+                connection.close()
+            self._created = True
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            if not self._created:
+                self._create()
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")  # a cache in memory: losing it on a crash is fine
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Any:
+        row = self._connect().execute("SELECT value, expires_at FROM cache_entry WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= time.time():
+            return MISSING
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float):
+        now = time.time()
+        connection = self._connect()
+        connection.execute("INSERT OR REPLACE INTO cache_entry (key, value, expires_at, written_at) VALUES (?, ?, ?, ?)",
+                           (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), now + ttl, now))
+        self._sets += 1
+        if self._sets % EVICTION_CHECK_EVERY == 0:
+            connection.execute("DELETE FROM cache_entry WHERE expires_at <= ?", (now,))
+            excess = connection.execute("SELECT COUNT(*) FROM cache_entry").fetchone()[0] - self.max_entries
+            if excess > 0:
+                connection.execute("DELETE FROM cache_entry WHERE key IN "
+                                   "(SELECT key FROM cache_entry ORDER BY written_at LIMIT ?)", (excess,))
+
+    def generations(self, scopes: Sequence[str]) -> List[int]:
+        if not scopes:
+            return []
+        rows = dict(self._connect().execute(
+            f"SELECT scope, generation FROM cache_generation WHERE scope IN ({', '.join('?' * len(scopes))})",
+            list(scopes)).fetchall())
+        return [rows.get(scope, 0) for scope in scopes]
+
+    def bump(self, scopes: Sequence[str]):
+        self._connect().executemany(
+            "INSERT INTO cache_generation (scope, generation) VALUES (?, 1) "
+            "ON CONFLICT(scope) DO UPDATE SET generation = generation + 1", [(scope,) for scope in scopes])
+
+    def clear(self):
+        self._connect().execute("DELETE FROM cache_entry")
+
+    def publish(self, origin: str, scopes: Sequence[str]):
+        now = time.time()
+        connection = self._connect()
+        connection.execute("INSERT INTO cache_bus (origin, scopes, at) VALUES (?, ?, ?)",
+                           (origin, json.dumps(list(scopes)), now))
+        connection.execute("DELETE FROM cache_bus WHERE at < ?", (now - CACHE_BUS_RETENTION,))
+
+    def poll(self, cursor: Optional[int]) -> Tuple[int, List[Tuple[str, List[str]]], bool]:
+        """
+        Messages published after ``cursor``, and whether some of them were
+        deleted before they could be read (or the sequence went back, the
+        store having been recreated); a None cursor only returns the current
+        position. SQLite serializes writers, so sequence numbers are
+        committed in order and a hole below the newest one was made by the
+        retention delete.
+        """
+        connection = self._connect()
+        row = connection.execute("SELECT seq FROM sqlite_sequence WHERE name = 'cache_bus'").fetchone()
+        last = row[0] if row else 0
+        if cursor is None:
+            return last, [], False
+        if last < cursor:
+            return last, [], True
+        rows = connection.execute("SELECT seq, origin, scopes FROM cache_bus WHERE seq > ? AND seq <= ? ORDER BY seq",
+                                  (cursor, last)).fetchall()
+        return last, [(origin, json.loads(scopes)) for _, origin, scopes in rows], len(rows) < last - cursor
+
+
+class LocalKeyValueStore:
+    """
+    In-process stand-in for the subset of the Redis API the kv backend uses
+    (get, set with px, mget, incr). It is not shared between processes.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def _value(self, name: str) -> Any:
+        entry = self._data.get(name)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[name]
+            return None
+        return entry[0]
+
+    def get(self, name: str) -> Any:
+        with self._lock:
+            return self._value(name)
+
+    def mget(self, names: Sequence[str]) -> List[Any]:
+        with self._lock:
+            return [self._value(name) for name in names]
+
+    def set(self, name: str, value: Any, px: Optional[int] = None):
+        with self._lock:
+            self._data[name] = (value, time.monotonic() + px / 1000 if px else None)
+        return True
+
+    def incr(self, name: str) -> int:
+        with self._lock:
+            value = int(self._value(name) or 0) + 1
+            self._data[name] = (str(value).encode(), None)
+            return value
+
+    def flushdb(self):
+        with self._lock:
+            self._data.clear()
+
+
+class KeyValueBackend(CacheBackend):
+    """
+    External key-value store (Redis, or anything speaking the same commands)
+    shared by every worker on every host; also carries the invalidation bus.
+    Expiry and eviction are left to the store.
+    """
+    shared = True
+
+    def __init__(self, client=None, prefix: str = KV_PREFIX, settle_seconds: float = CACHE_BUS_SETTLE_SECONDS):
+        self.client = client if client is not None else _kv_client()
+        self.prefix = prefix
+        self.settle_seconds = settle_seconds
+        self._missing: Optional[Tuple[int, float]] = None  # (bus seq, when it was first found missing)
+
+    def get(self, key: str) -> Any:
+        value = self.client.get(self.prefix + key)
+        return MISSING if value is None else pickle.loads(value)
+
+    def set(self, key: str, value: Any, ttl: float):
+        self.client.set(self.prefix + key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), px=max(int(ttl * 1000), 1))
+
+    def generations(self, scopes: Sequence[str]) -> List[int]:
+        if not scopes:
+            return []
+        return [int(value or 0) for value in self.client.mget([f"{self.prefix}gen:{scope}" for scope in scopes])]
+
+    def bump(self, scopes: Sequence[str]):
+        for scope in scopes:
+            self.client.incr(f"{self.prefix}gen:{scope}")
+
+    def clear(self):
+        self.prefix = f"{KV_PREFIX}{uuid.uuid4().hex[:8]}:"  # entries of the old prefix expire on their own
+
+    def publish(self, origin: str, scopes: Sequence[str]):
+        seq = self.client.incr(f"{KV_PREFIX}bus:seq")
+        self.client.set(f"{KV_PREFIX}bus:{seq}", json.dumps([origin, list(scopes)]),
+                        px=int(CACHE_BUS_RETENTION * 1000))
+
+    def poll(self, cursor: Optional[int]) -> Tuple[int, List[Tuple[str, List[str]]], bool]:
+        """
+        Messages published after ``cursor``, and whether some of them expired
+        before they could be read (or the sequence went back, the store
+        having been flushed); a None cursor only returns the current
+        position. A publisher takes its sequence
+        number before writing the message, so a missing message only counts
+        as lost once it has stayed missing for ``settle_seconds``; until then
+        the cursor waits in front of it.
+        """
+        seq = int(self.client.get(f"{KV_PREFIX}bus:seq") or 0)
+        if cursor is None:
+            return seq, [], False
+        if seq < cursor:
+            return seq, [], True
+        if seq == cursor:
+            return cursor, [], False
+        values = self.client.mget([f"{KV_PREFIX}bus:{n}" for n in range(cursor + 1, seq + 1)])
+        messages, lost = [], False
+        for n, value in enumerate(values, cursor + 1):
+            if value is None:
+                now = time.monotonic()
+                if self._missing is None or self._missing[0] != n:
+                    self._missing = (n, now)
+                if now - self._missing[1] < self.settle_seconds:
+                    return n - 1, messages, lost
+                lost = True
+            else:
+                messages.append(tuple(json.loads(value)))
+        self._missing = None
+        return seq, messages, lost
+
+
+def _kv_client():
+    if not CACHE_URL:
+        return LocalKeyValueStore()
+    if redis is None:
+        raise RuntimeError("CACHE_URL is set but the 'redis' package is not installed.")
+    return redis.Redis.from_url(CACHE_URL)
+
+
+def create_backend(kind: str) -> CacheBackend:
+    if kind == "local":
+        return LocalCacheBackend()
+    if kind == "shm":
+        return SharedMemoryBackend()
+    if kind == "kv":
+        return KeyValueBackend()
+    raise ValueError(f"Unknown cache backend '{kind}'. Must be one of ['local', 'shm', 'kv']")
+
+
+Subscriber = Callable[[Sequence[str], bool], None]
+
+
+class InvalidationBus:
+    """
+    Tells every worker which scopes a write changed.
+
+    ``publish`` runs the subscribers of this process at once (after the
+    write's commit, before its response) and appends the scopes to the
+    transport; once started, a daemon thread polls the transport and runs
+    the subscribers for what other workers published, ``local`` telling the
+    two apart. With no transport the bus only reaches this process.
+
+    A worker that polls too late (paused, or the store unreachable for
+    longer than CACHE_BUS_RETENTION) cannot know which scopes it missed, so
+    its subscribers get ALL_SCOPES and drop everything they keep locally.
+    """
+
+    def __init__(self, transport=None, poll_interval: float = CACHE_BUS_POLL_INTERVAL):
+        self.transport = transport
+        self.poll_interval = poll_interval
+        self.origin = uuid.uuid4().hex
+        self.metrics = {"published": 0, "received": 0, "poll_errors": 0, "gaps": 0}
+        self._subscribers: List[Subscriber] = []
+        self._cursor: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def subscribe(self, subscriber: Subscriber):
+        self._subscribers.append(subscriber)
+
+    def publish(self, *scopes: str):
+        self._deliver(scopes, True)
+        self.metrics["published"] += 1
+        if self.transport is not None:
+            self.transport.publish(self.origin, scopes)
+
+    def _deliver(self, scopes: Sequence[str], local: bool):
+        for subscriber in self._subscribers:
+            subscriber(scopes, local)
+
+    def start(self):
+        """Starts polling for other workers' invalidations (from the app's startup)."""
+        if self._thread is None and self.transport is not None:
+            with self._lock:
+                if self._thread is None:
+                    self._cursor, _, _ = self.transport.poll(None)
+                    self._thread = threading.Thread(target=self._run, name="invalidation-bus", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self.poll()
+
+    def poll(self):
+        """Delivers what other workers published since the last poll."""
+        try:
+            self._cursor, messages, lost = self.transport.poll(self._cursor)
+        except Exception:  # the store being briefly unavailable must not kill the poller
+            self.metrics["poll_errors"] += 1
+            return
+        if lost:
+            self.metrics["gaps"] += 1
+            self._deliver((ALL_SCOPES,), False)
+        for origin, scopes in messages:
+            if origin != self.origin:
+                self.metrics["received"] += 1
+                self._deliver(scopes, False)
+
+    def shutdown(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self._stop.clear()
+
+
+class Cache:
+    """
+    A namespace of cached values on the configured backend.
+
+    ``get_or_load`` keys each value by the current generations of the scopes
+    it depends on; services publish those scopes on the invalidation bus
+    after a write, which bumps the generations, so entries never outlive
+    the data they were built from by more than one bus poll, however long
+    their TTL.
+    """
+
+    def __init__(self, namespace: str, ttl: float = CACHE_TTL, backend: Optional[CacheBackend] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self._backend = backend
+        self.metrics = {"hits": 0, "misses": 0}
+
+    @property
+    def backend(self) -> CacheBackend:
+        return self._backend or cache_backend
+
+    def get_or_load(self, key: str, scopes: Sequence[str], loader: Callable[[], Any]) -> Any:
+        backend = self.backend
+        generations = ".".join(str(generation) for generation in backend.generations(scopes))
+        full_key = f"{self.namespace}:{key}@{generations}"
+        value = backend.get(full_key)
+        if value is not MISSING:
+            self.metrics["hits"] += 1
+            return value
+        self.metrics["misses"] += 1
+        value = loader()
+        backend.set(full_key, value, self.ttl)
+        return value
+
+
+cache_backend = create_backend(CACHE_BACKEND)
+invalidation_bus = InvalidationBus(
+    None if CACHE_BUS == "local" else cache_backend if CACHE_BUS == CACHE_BACKEND else create_backend(CACHE_BUS))
+
+
+def _bump_generations(scopes: Sequence[str], local: bool):
+    # A shared backend's generations were bumped once, by the worker that published.
+    if local or not cache_backend.shared:
+        if ALL_SCOPES in scopes:
+            cache_backend.clear()
+        else:
+            cache_backend.bump(scopes)
+
+
+def _bump_revisions(scopes: Sequence[str], local: bool):
+    # Revisions live in the database, so only the worker that made the write bumps them.
+    if local:
+        revisions.bump(*[scope for scope in scopes if is_revision_scope(scope)])
+
+
+invalidation_bus.subscribe(_bump_generations)
+invalidation_bus.subscribe(_bump_revisions)
\ No newline at end of file
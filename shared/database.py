@@ -1,20 +1,71 @@
 # src/shared/database.py
-from typing import Generator
+import contextvars
+from typing import Generator, Optional
+from fastapi import Depends
 from sqlmodel import create_engine, Session, SQLModel
 from dotenv import load_dotenv
 import os
 
+from shared.admission import admission_control
+from shared.sharding import ShardRouter, ShardSessions, parse_shard_map
+from shared.sql_stats import sql_stats
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://user:password@db:5432/elbuensabor")
 
-engine = create_engine(DATABASE_URL, echo=True)
+# SQLite connections are handed between anyio worker threads, so the
+# same-thread check has to be disabled for local runs against a file.
+def _connect_args(url: str) -> dict:
+    return {"check_same_thread": False} if url.startswith("sqlite") else {}
+
+# Raw statement echo is for local debugging only; sql_stats aggregates statements instead.
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() in ("1", "true", "yes")
+
+engine = create_engine(DATABASE_URL, echo=SQL_ECHO, connect_args=_connect_args(DATABASE_URL))
+sql_stats.attach(engine)
+admission_control.attach()
+
+# Reservation data is split by restaurant over DATABASE_SHARDS (comma-separated
+# URLs; the primary DATABASE_URL may be listed first to serve as shard 0).
+# Everything else, and reservation data when no shards are configured, stays
+# in the primary database.
+SHARDED_TABLES = ("reservation", "reservation_daily_stats")
+DATABASE_SHARDS = [url.strip() for url in os.getenv("DATABASE_SHARDS", "").split(",") if url.strip()]
+
+
+def _shard_engine(url: str):
+    if url == DATABASE_URL:
+        return engine
+    shard_engine = create_engine(url, echo=SQL_ECHO, connect_args=_connect_args(url))
+    sql_stats.attach(shard_engine)
+    return shard_engine
+
+
+shard_router = ShardRouter(
+    [_shard_engine(url) for url in DATABASE_SHARDS] or [engine],
+    lookup=parse_shard_map(os.getenv("DATABASE_SHARD_MAP")),  # "restaurant_id:shard,..." pinned placements
+    virtual_nodes=int(os.getenv("DATABASE_SHARD_VNODES", "64")),
+)
 
 def create_db_and_tables():
     """Creates all database tables defined by SQLModel metadata."""
     SQLModel.metadata.create_all(engine)
+    shard_router.create_all(SQLModel.metadata, SHARDED_TABLES, primary=engine)
+
+# Set by POST /batch so that its read sub-requests share one session instead of opening their own.
+batch_session: contextvars.ContextVar[Optional[Session]] = contextvars.ContextVar("batch_session", default=None)
 
 def get_session() -> Generator[Session, None, None]:
     """Dependency to get a database session."""
+    shared = batch_session.get()
+    if shared is not None:
+        yield shared  # owned and closed by the batch
+        return
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+def get_shard_sessions(db: Session = Depends(get_session)) -> Generator[ShardSessions, None, None]:
+    """Dependency giving the request's sessions on the reservation shards."""
+    with ShardSessions(db, shard_router) as shards:
+        yield shards
\ No newline at end of file
@@ -1,19 +1,32 @@
 # src/shared/dependencies.py
-from typing import Generator
+import contextvars
+import os
+from typing import Any, Dict, Generator, Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session
 
 from shared.database import get_session
 from shared.security import decode_access_token
+from shared.cache import Cache, user_scope
 from auth.domain.entities import User, TokenData
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "300"))
+# Authenticated users by email, without their password hash; AuthService writes drop them.
+principal_cache = Cache("principal", ttl=PRINCIPAL_CACHE_TTL)
+
+# (token, user) authenticated once by POST /batch for all of its sub-requests.
+batch_user: contextvars.ContextVar[Optional[Tuple[str, User]]] = contextvars.ContextVar("batch_user", default=None)
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_session)) -> User:
     """
     Dependencia para obtener el usuario autenticado actual a partir del token JWT.
     """
+    authenticated = batch_user.get()
+    if authenticated is not None and authenticated[0] == token:
+        return authenticated[1]
     token_data = decode_access_token(token)
     email = token_data.get("sub")
     if email is None:
@@ -22,14 +35,18 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             detail="Credenciales de autenticación inválidas",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+    principal = principal_cache.get_or_load(email, [user_scope(email)], lambda: _load_principal(db, email))
+    if principal is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales de autenticación inválidas",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return user
+    return User(**principal, hashed_password="")
+
+def _load_principal(db: Session, email: str) -> Optional[Dict[str, Any]]:
+    user = db.query(User).filter(User.email == email).first()
+    return None if user is None else user.model_dump(exclude={"hashed_password"})
 
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """
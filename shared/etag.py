@@ -0,0 +1,114 @@
+# src/shared/etag.py
+import os
+from typing import Dict, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Field, SQLModel, select
+
+from shared.database import engine
+
+# max-age handed to browsers and proxies for revision-tagged listings. The default
+# of 0 makes them revalidate every time, which is cheap thanks to the ETag.
+LISTING_CACHE_MAX_AGE = int(os.getenv("LISTING_CACHE_MAX_AGE", "0"))
+
+RESTAURANTS_SCOPE = "restaurants"
+
+
+def tables_scope(restaurant_id: int) -> str:
+    """Revision scope of a restaurant's table listing."""
+    return f"restaurant:{restaurant_id}:tables"
+
+
+def menu_scope(restaurant_id: int) -> str:
+    """Revision scope of a restaurant's menu listing."""
+    return f"restaurant:{restaurant_id}:menu"
+
+
+def is_revision_scope(scope: str) -> bool:
+    """Whether a scope is one of the listing scopes above."""
+    return scope == RESTAURANTS_SCOPE or scope.startswith("restaurant:") and scope.endswith((":tables", ":menu"))
+
+
+class ListingRevision(SQLModel, table=True):
+    """Revision counter of one cacheable listing, shared by every worker through the database."""
+    __tablename__ = "listing_revision"
+
+    scope: str = Field(primary_key=True)
+    revision: int = Field(default=0)
+
+
+class RevisionRegistry:
+    """
+    Revision counters for cacheable listings.
+
+    Services bump a scope after committing a write that changes the listing, and
+    routers derive the ETag from the current revision, so a conditional GET costs
+    one primary-key lookup instead of the listing query. The counters live in the
+    database rather than in process memory, so every worker issues and validates
+    the same ETags and sees writes made through the others.
+    """
+
+    def __init__(self, bind: Engine = engine):
+        self._bind = bind
+
+    def get(self, *scopes: str) -> Dict[str, int]:
+        """Returns the current revision of each scope; scopes never written are at 0."""
+        query = select(ListingRevision.scope, ListingRevision.revision).where(ListingRevision.scope.in_(scopes))
+        with self._bind.connect() as connection:
+            found = dict(connection.execute(query).all())
+        return {scope: found.get(scope, 0) for scope in scopes}
+
+    def bump(self, *scopes: str):
+        """Marks the given scopes as changed."""
+        table = ListingRevision.__table__
+        with self._bind.begin() as connection:
+            for scope in sorted(set(scopes)):
+                increment = table.update().where(table.c.scope == scope).values(revision=table.c.revision + 1)
+                if connection.execute(increment).rowcount:
+                    continue
+                try:
+                    with connection.begin_nested():
+                        connection.execute(table.insert().values(scope=scope, revision=1))
+                except IntegrityError:
+                    # Another worker created the row first; count this write on top of theirs.
+                    connection.execute(increment)
+
+    def etag(self, *scopes: str) -> str:
+        """Builds a weak ETag covering the given scopes."""
+        current = self.get(*scopes)
+        return f'W/"{".".join(str(current[scope]) for scope in scopes)}"'
+
+
+revisions = RevisionRegistry()
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110, 13.1.2)."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def set_cache_headers(response: Response, etag: str):
+    """Adds ETag and Cache-Control headers to a listing response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = f"public, max-age={LISTING_CACHE_MAX_AGE}, must-revalidate"
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Returns a 304 response when the client's If-None-Match matches the ETag, otherwise None."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match or not _etag_matches(if_none_match, etag):
+        return None
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag)
+    return response
\ No newline at end of file
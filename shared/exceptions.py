@@ -14,4 +14,13 @@ class ForbiddenException(Exception):
 
 class BadRequestException(Exception):
     def __init__(self, detail: str = "Bad request"):
-        self.detail = detail
\ No newline at end of file
+        self.detail = detail
+
+class PayloadTooLargeException(Exception):
+    def __init__(self, detail: str = "Payload too large"):
+        self.detail = detail
+
+class ServiceUnavailableException(Exception):
+    def __init__(self, detail: str = "Service temporarily unavailable", retry_after: int = 1):
+        self.detail = detail
+        self.retry_after = retry_after
\ No newline at end of file
@@ -0,0 +1,93 @@
+# src/shared/pagination.py
+import base64
+import binascii
+from dataclasses import dataclass
+from typing import Any, List, Optional, Type
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy.engine import Result
+from sqlmodel import SQLModel
+
+from shared.exceptions import BadRequestException
+from shared.serialization import encode_rows, public_columns, public_field_names
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class PageParams:
+    limit: int
+    after_id: Optional[int] = None
+    fields: Optional[List[str]] = None
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encodes the id of the last row of a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decodes a cursor produced by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, _, value = raw.partition(":")
+        if prefix != "id":
+            raise ValueError(raw)
+        return int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor.")
+
+
+def page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of rows to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+) -> PageParams:
+    """Dependency parsing the shared limit/cursor/fields query parameters."""
+    field_list = [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+    return PageParams(limit=limit, after_id=decode_cursor(cursor) if cursor else None, fields=field_list or None)
+
+
+def select_fields(table_model: Type[SQLModel], public_model: Type[SQLModel], fields: Optional[List[str]]) -> List[Any]:
+    """
+    Returns the columns to SELECT for a sparse field selection.
+
+    Without ``fields`` every field of the public model is selected. ``id`` is
+    always included because it is the pagination key.
+    """
+    if not fields:
+        return public_columns(table_model, public_model)
+    available = public_field_names(public_model)
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise BadRequestException(detail=f"Unknown fields {unknown}. Must be among {available}")
+    names = ["id"] + [name for name in dict.fromkeys(fields) if name != "id"]
+    return [getattr(table_model, name) for name in names]
+
+
+def paginate(query, id_column, page: PageParams):
+    """Applies keyset pagination on ``id_column``, fetching one extra row to detect a next page."""
+    if page.after_id is not None:
+        query = query.where(id_column > page.after_id)
+    return query.order_by(id_column).limit(page.limit + 1)
+
+
+class PageResponse(Response):
+    """
+    JSON page encoded straight from a result built with ``paginate``.
+
+    The body stays a plain list; when more rows exist, the cursor for the next
+    page is returned in the X-Next-Cursor header.
+    """
+    media_type = "application/json"
+
+    def __init__(self, result: Result, page: PageParams, **kwargs):
+        keys = list(result.keys())
+        rows = result.all()
+        headers = dict(kwargs.pop("headers", None) or {})
+        if len(rows) > page.limit:
+            rows = rows[:page.limit]
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1][keys.index("id")])
+        super().__init__(content=encode_rows(keys, rows), headers=headers, **kwargs)
\ No newline at end of file
@@ -0,0 +1,237 @@
+# src/shared/profiling.py
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from shared.security import decode_access_token
+
+# Share of requests profiled without being asked to (0 disables sampling).
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+# Number of recent profiles kept on disk; older ones are deleted.
+PROFILE_RING_SIZE = int(os.getenv("PROFILE_RING_SIZE", "50"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+PROFILE_HEADER = b"x-profile"
+PROFILE_ADMIN_SCOPE = "admin:write"
+
+# Leaf functions of threads that are parked waiting for work, not doing any.
+_IDLE_LEAVES = {
+    ("threading.py", "wait"), ("queue.py", "get"), ("selectors.py", "select"),
+    ("threading.py", "_wait_for_tstate_lock"),
+}
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        filename = filename.split(marker, 1)[1]
+    elif filename.startswith(os.getcwd() + os.sep):
+        filename = os.path.relpath(filename)
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{code.co_name}"
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of every busy thread at a fixed interval.
+
+    Sync endpoints and dependencies run in the threadpool, where cProfile
+    (which only sees the thread that enables it) would miss them, so the
+    sampler looks at all threads and skips the ones parked waiting for work.
+    Stacks are counted in collapsed form, one ``root;...;leaf count`` line
+    per distinct stack, ready for flamegraph tools such as speedscope.
+    """
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Bounded ring of recent profiles on disk, one JSON file each, newest kept."""
+
+    def __init__(self, directory: str = PROFILE_DIR, ring_size: int = PROFILE_RING_SIZE):
+        self.directory = directory
+        self.ring_size = ring_size
+        self._lock = threading.Lock()
+
+    def _path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.json")
+
+    def save(self, profile: Dict[str, Any]):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(profile["id"])
+        with open(path + ".tmp", "w") as f:
+            json.dump(profile, f)
+        os.replace(path + ".tmp", path)
+        with self._lock:
+            ids = self._ids()
+            for stale in ids[:max(len(ids) - self.ring_size, 0)]:
+                try:
+                    os.remove(self._path(stale))
+                except FileNotFoundError:
+                    pass
+
+    def _ids(self) -> List[str]:
+        """Profile ids, oldest first (ids start with a millisecond timestamp)."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".json"))
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        if os.sep in profile_id or profile_id.startswith("."):
+            return None
+        try:
+            with open(self._path(profile_id)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries of the stored profiles, newest first."""
+        summaries = []
+        for profile_id in reversed(self._ids()):
+            profile = self.get(profile_id)
+            if profile is not None:
+                profile.pop("collapsed", None)
+                summaries.append(profile)
+        return summaries
+
+
+profile_store = ProfileStore()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles a request when an admin sends
+    ``X-Profile: 1`` (with their bearer token) or when the request falls in
+    PROFILING_SAMPLE_RATE. The profile is saved to ``profile_store`` and its
+    id is returned in the ``X-Profile-Id`` response header.
+
+    Unprofiled requests only pay for a header lookup and, when sampling is
+    enabled, one random number.
+    """
+
+    def __init__(self, app, sample_rate: float = PROFILING_SAMPLE_RATE, store: ProfileStore = profile_store):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.store = store
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self.in_flight += 1
+        try:
+            reason = self._reason(scope)
+            if reason is None:
+                await self.app(scope, receive, send)
+            else:
+                await self._profile(scope, receive, send, reason)
+        finally:
+            self.in_flight -= 1
+
+    def _reason(self, scope) -> Optional[str]:
+        requested = False
+        authorization = None
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                requested = value not in (b"", b"0")
+            elif name == b"authorization":
+                authorization = value
+        if requested and authorization is not None and _is_admin(authorization):
+            return "header"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def _profile(self, scope, receive, send, reason: str):
+        profile_id = f"{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}"
+        status_code = None
+
+        async def send_with_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode())
+                ]}
+            await send(message)
+
+        sampler = StackSampler()
+        concurrent = self.in_flight - 1
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stop()
+            elapsed = time.perf_counter() - started
+            # Writing the file and pruning the ring is disk I/O, kept off the event loop.
+            await run_in_threadpool(self.store.save, {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status_code,
+                "reason": reason,
+                "duration_ms": round(elapsed * 1000, 3),
+                "samples": sampler.samples,
+                "interval_ms": sampler.interval * 1000,
+                # Other requests running meanwhile also show up in the samples.
+                "concurrent_requests": max(concurrent, self.in_flight - 1),
+                "created_at": time.time(),
+                "collapsed": sampler.collapsed(),
+            })
+
+
+def _is_admin(authorization: bytes) -> bool:
+    scheme, _, token = authorization.decode("latin-1").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        payload = decode_access_token(token)
+    except HTTPException:
+        return False
+    return PROFILE_ADMIN_SCOPE in payload.get("scopes", [])
\ No newline at end of file
@@ -0,0 +1,113 @@
+# src/shared/pubsub.py
+import asyncio
+import os
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+# Messages buffered per subscriber before it is considered too slow and dropped.
+PUBSUB_QUEUE_SIZE = int(os.getenv("PUBSUB_QUEUE_SIZE", "64"))
+
+
+class Subscription:
+    """
+    One subscriber's bounded queue, bound to the event loop it was created on.
+
+    A subscriber that lets its queue fill up is dropped rather than slowing
+    down publishers or growing without bound: ``dropped`` is set and ``get``
+    returns None from then on, so the consumer can end its stream and let the
+    client reconnect and resynchronise.
+    """
+
+    def __init__(self, hub: "PubSub", topic: str, maxsize: int):
+        self.hub = hub
+        self.topic = topic
+        self.closed = False
+        self.dropped = False
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    def _deliver(self, message: Any):
+        """Runs on the subscriber's loop."""
+        if self.closed:
+            return
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped = True
+            self.hub.metrics["dropped"] += 1
+            self.close()
+
+    async def get(self, timeout: Optional[float] = None) -> Any:
+        """Waits for the next message; raises asyncio.TimeoutError after ``timeout`` seconds, None once closed."""
+        if self.dropped or (self.closed and self._queue.empty()):
+            return None
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.hub.unsubscribe(self)
+        try:
+            self._queue.put_nowait(None)  # wakes a pending get()
+        except asyncio.QueueFull:
+            pass
+
+
+class PubSub:
+    """
+    In-process topic publish/subscribe.
+
+    ``publish`` may be called from any thread (services run in the threadpool)
+    and never blocks: each message is handed to the subscribers' event loops,
+    which append it to their bounded queues. An idle subscriber costs one
+    queue and one waiting coroutine.
+    """
+
+    def __init__(self, queue_size: int = PUBSUB_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.metrics = {"published": 0, "delivered": 0, "dropped": 0}
+
+    def subscribe(self, topic: str, maxsize: Optional[int] = None) -> Subscription:
+        """Must be called from a running event loop."""
+        subscription = Subscription(self, topic, maxsize or self.queue_size)
+        with self._lock:
+            self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._topics.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[subscription.topic]
+
+    def publish(self, topic: str, message: Any) -> int:
+        """Queues ``message`` for every subscriber of ``topic`` and returns how many there were."""
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        self.metrics["published"] += 1
+        for subscription in subscribers:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription._deliver, message)
+            except RuntimeError:  # the subscriber's loop is closed
+                self.unsubscribe(subscription)
+        self.metrics["delivered"] += len(subscribers)
+        return len(subscribers)
+
+    def topics(self) -> List[str]:
+        """Topics with at least one subscriber."""
+        with self._lock:
+            return list(self._topics)
+
+    def subscriber_count(self, topic: Optional[str] = None) -> int:
+        with self._lock:
+            if topic is not None:
+                return len(self._topics.get(topic, ()))
+            return sum(len(subscribers) for subscribers in self._topics.values())
+
+
+pubsub = PubSub()
\ No newline at end of file
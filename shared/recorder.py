@@ -0,0 +1,317 @@
+# src/shared/recorder.py
+import hashlib
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from fastapi import HTTPException
+from starlette.routing import Match
+
+from shared.security import SECRET_KEY, decode_access_token
+
+# Opt-in: record sanitized request traces for benchmarks/replay.py.
+TRAFFIC_RECORDING = os.getenv("TRAFFIC_RECORDING", "false").lower() in ("1", "true", "yes")
+# Share of requests recorded while recording is on.
+TRAFFIC_SAMPLE_RATE = float(os.getenv("TRAFFIC_SAMPLE_RATE", "1.0"))
+TRAFFIC_DIR = os.getenv("TRAFFIC_DIR", "data/traffic")
+# A trace file is closed and a new one started past either limit; only the newest files are kept.
+TRAFFIC_FILE_MAX_BYTES = int(os.getenv("TRAFFIC_FILE_MAX_BYTES", str(64 * 1024 * 1024)))
+TRAFFIC_FILE_MAX_SECONDS = float(os.getenv("TRAFFIC_FILE_MAX_SECONDS", "3600"))
+TRAFFIC_FILES_KEEP = int(os.getenv("TRAFFIC_FILES_KEEP", "48"))
+# Traces waiting for the writer thread; further ones are dropped rather than slowing requests down.
+TRAFFIC_QUEUE_SIZE = int(os.getenv("TRAFFIC_QUEUE_SIZE", "10000"))
+# Bodies larger than this are recorded by size only.
+TRAFFIC_MAX_BODY_BYTES = int(os.getenv("TRAFFIC_MAX_BODY_BYTES", "65536"))
+# Users are recorded as a keyed hash of their email, stable across workers and restarts.
+TRAFFIC_USER_SALT = os.getenv("TRAFFIC_USER_SALT", SECRET_KEY)
+TRACE_PREFIX = "traffic-"
+TRACE_SUFFIX = ".jsonl"
+REDACTED = "<redacted>"
+# Query values never written out, matched as substrings of the lower-cased key.
+SENSITIVE_KEYS = ("password", "token", "secret", "email", "username", "phone")
+# Query values rounded to two decimals (about a kilometre) instead of being kept as sent.
+COARSE_KEYS = ("lat", "lon")
+SHAPE_MAX_ITEMS = 50
+# Operator tooling and never-ending streams are not part of the traffic mix.
+EXCLUDED_PREFIXES = ("/diagnostics", "/docs", "/redoc", "/openapi.json")
+EXCLUDED_SUFFIXES = ("/availability/stream",)
+
+_DATETIME = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_TIME = re.compile(r"^\d{2}:\d{2}(:\d{2})?$")
+_STOP = object()
+
+
+def body_shape(value: Any) -> Any:
+    """
+    The structure of a JSON value without its contents: objects keep their
+    keys, lists keep their length (up to SHAPE_MAX_ITEMS), scalars become
+    their type name, and strings that look like dates, times or emails
+    say so, which is all the replayer needs to synthesize a similar body.
+    """
+    if isinstance(value, dict):
+        return {str(key): body_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [body_shape(item) for item in value[:SHAPE_MAX_ITEMS]]
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, str):
+        if _DATETIME.match(value):
+            return "datetime"
+        if _DATE.match(value):
+            return "date"
+        if _TIME.match(value):
+            return "time"
+        if "@" in value:
+            return "email"
+    return "str"
+
+
+def sanitize_query(query_string: bytes) -> List[Tuple[str, str]]:
+    pairs = []
+    for key, value in parse_qsl(query_string.decode("latin-1"), keep_blank_values=True):
+        lowered = key.lower()
+        if any(marker in lowered for marker in SENSITIVE_KEYS):
+            value = REDACTED
+        elif lowered in COARSE_KEYS:
+            try:
+                value = f"{float(value):.2f}"
+            except ValueError:
+                value = REDACTED
+        pairs.append((key, value))
+    return pairs
+
+
+def user_key(email: str) -> str:
+    return hashlib.sha256(f"{TRAFFIC_USER_SALT}:{email}".encode()).hexdigest()[:12]
+
+
+def _caller(authorization: Optional[bytes]) -> Tuple[str, Optional[str]]:
+    """(role, user key) of the bearer token: admin, client, user, anonymous or invalid."""
+    if authorization is None:
+        return "anonymous", None
+    scheme, _, token = authorization.decode("latin-1").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return "invalid", None
+    try:
+        payload = decode_access_token(token)
+    except HTTPException:
+        return "invalid", None
+    scopes = payload.get("scopes", [])
+    role = "admin" if "admin:write" in scopes else "client" if "client:write" in scopes else "user"
+    return role, user_key(payload["sub"]) if payload.get("sub") else None
+
+
+def _route_of(raw: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Route template and path params; requests answered before routing (e.g. shed) are matched here."""
+    route = raw["route"]
+    if route is not None:
+        return route.path, raw["path_params"]
+    app = raw["app"]
+    if app is not None:
+        scope = {"type": "http", "method": raw["method"], "path": raw["path"], "root_path": ""}
+        for candidate in app.router.routes:
+            match, child_scope = candidate.matches(scope)
+            if match != Match.NONE and hasattr(candidate, "path"):
+                return candidate.path, child_scope.get("path_params", {})
+    return raw["path"], {}
+
+
+class TrafficRecorder:
+    """
+    Writes request traces as JSON lines to rotating files in ``directory``.
+
+    Requests only hand their raw details to a bounded queue; a writer thread
+    does the sanitizing (token decoding, body parsing, hashing) and the file
+    I/O, so recording costs the event loop a few dict operations per request.
+    Each process writes its own files (the pid is in the name), so several
+    uvicorn workers can record into one directory.
+    """
+
+    def __init__(self, directory: str = TRAFFIC_DIR, max_bytes: int = TRAFFIC_FILE_MAX_BYTES,
+                 max_seconds: float = TRAFFIC_FILE_MAX_SECONDS, keep: int = TRAFFIC_FILES_KEEP,
+                 queue_size: int = TRAFFIC_QUEUE_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.keep = keep
+        self.recorded = 0
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._file = None
+        self._file_opened_at = 0.0
+
+    def submit(self, raw: Dict[str, Any]):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="traffic-recorder", daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(raw)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self):
+        """Writes out the queued traces and closes the current file."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            raw = self._queue.get()
+            while raw is not _STOP:
+                try:
+                    self._write(self.trace(raw))
+                except Exception:  # one bad trace must not stop the recording
+                    self.dropped += 1
+                try:
+                    raw = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if self._file is not None:
+                self._file.flush()
+            if raw is _STOP:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                return
+
+    @staticmethod
+    def trace(raw: Dict[str, Any]) -> Dict[str, Any]:
+        """The sanitized trace of a request: no header, body or credential values leave this method."""
+        route, path_params = _route_of(raw)
+        role, user = _caller(raw["authorization"])
+        content_type = raw["content_type"].split(";")[0].strip().lower()
+        body = raw["body"]
+        shape: Any = None
+        if body and raw["body_bytes"] <= TRAFFIC_MAX_BODY_BYTES:
+            if content_type == "application/json":
+                shape = body_shape(json.loads(body))
+            elif content_type == "application/x-www-form-urlencoded":
+                form = parse_qsl(body.decode("latin-1"), keep_blank_values=True)
+                shape = {key: "str" for key, _ in form}
+                if user is None:  # a login: who it is for, so the replayer logs in as the same user
+                    username = next((value for key, value in form if key == "username"), None)
+                    user = user_key(username) if username else None
+        return {
+            "ts": round(raw["started_at"], 6),
+            "method": raw["method"],
+            "route": route,
+            "path_params": path_params,
+            "query": sanitize_query(raw["query_string"]),
+            "content_type": content_type or None,
+            "body_bytes": raw["body_bytes"],
+            "body": shape,
+            "status": raw["status"],
+            "duration_ms": round(raw["duration"] * 1000, 3),
+            "role": role,
+            "user": user,
+        }
+
+    def _write(self, trace: Dict[str, Any]):
+        if self._file is None or self._file.tell() >= self.max_bytes or \
+                time.time() - self._file_opened_at >= self.max_seconds:
+            self._rotate()
+        self._file.write(json.dumps(trace, default=str) + "\n")
+        self.recorded += 1
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        os.makedirs(self.directory, exist_ok=True)
+        self._file_opened_at = time.time()
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(self._file_opened_at))
+        self._file = open(os.path.join(self.directory, f"{TRACE_PREFIX}{stamp}-{os.getpid()}{TRACE_SUFFIX}"), "a")
+        files = sorted(name for name in os.listdir(self.directory)
+                       if name.startswith(TRACE_PREFIX) and name.endswith(TRACE_SUFFIX))
+        for stale in files[:max(len(files) - self.keep, 0)]:
+            try:
+                os.remove(os.path.join(self.directory, stale))
+            except FileNotFoundError:
+                pass
+
+
+traffic_recorder = TrafficRecorder()
+
+
+class TrafficRecorderMiddleware:
+    """
+    Records a sanitized trace of each request (route template, path params,
+    query, body shape, status, duration and caller role) when
+    TRAFFIC_RECORDING is on. Added outermost, so requests shed by admission
+    control are recorded too and durations include their queueing.
+    """
+
+    def __init__(self, app, recorder: TrafficRecorder = traffic_recorder, enabled: bool = TRAFFIC_RECORDING,
+                 sample_rate: float = TRAFFIC_SAMPLE_RATE):
+        self.app = app
+        self.recorder = recorder
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or scope["path"].startswith(EXCLUDED_PREFIXES) \
+                or scope["path"].endswith(EXCLUDED_SUFFIXES) \
+                or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        chunks: List[bytes] = []
+        body_bytes = 0
+        status_code = 500
+
+        async def receive_and_keep():
+            nonlocal body_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                body_bytes += len(chunk)
+                if body_bytes <= TRAFFIC_MAX_BODY_BYTES:
+                    chunks.append(chunk)
+            return message
+
+        async def send_and_keep(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive_and_keep, send_and_keep)
+        finally:
+            duration = time.perf_counter() - started
+            headers = dict(scope["headers"])
+            self.recorder.submit({
+                "started_at": started_at,
+                "duration": duration,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": scope.get("route"),
+                "path_params": scope.get("path_params", {}),
+                "app": scope.get("app"),
+                "query_string": scope.get("query_string", b""),
+                "authorization": headers.get(b"authorization"),
+                "content_type": headers.get(b"content-type", b"").decode("latin-1"),
+                "body": b"".join(chunks),
+                "body_bytes": body_bytes,
+                "status": status_code,
+            })
\ No newline at end of file
@@ -0,0 +1,26 @@
+# src/shared/serialization.py
+from typing import Any, Iterable, List, Sequence, Type
+
+import orjson
+from sqlmodel import SQLModel
+
+
+def public_field_names(public_model: Type[SQLModel]) -> List[str]:
+    """Returns the field names of a public (response) model, in declaration order."""
+    return list(getattr(public_model, "model_fields", None) or public_model.__fields__)
+
+
+def public_columns(table_model: Type[SQLModel], public_model: Type[SQLModel]) -> List[Any]:
+    """Returns the table columns backing every field of a public (response) model."""
+    return [getattr(table_model, name) for name in public_field_names(public_model)]
+
+
+def encode_rows(keys: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    """
+    Encodes result rows as a JSON array of objects keyed by column name.
+
+    Used by list endpoints that select Core rows instead of ORM instances, which
+    skips both identity-map hydration and the ``response_model`` validation pass;
+    the selected columns must already match the public model.
+    """
+    return orjson.dumps([dict(zip(keys, row)) for row in rows])
\ No newline at end of file
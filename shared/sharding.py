@@ -0,0 +1,227 @@
+# src/shared/sharding.py
+import bisect
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Type, TypeVar
+
+from sqlalchemy import BigInteger, ForeignKeyConstraint, MetaData, text
+from sqlalchemy.engine import Engine, Result
+from sqlalchemy.engine.result import IteratorResult, SimpleResultMetaData
+from sqlmodel import Session, SQLModel
+
+T = TypeVar("T")
+
+# Shard k allocates ids above k * SHARD_ID_SPAN, so ids stay unique across shards
+# and the shard that created a row can be read back from its id. Ranges past the first
+# exceed INT4, so sharded tables need BIGINT ids (see migrations/versions).
+SHARD_ID_SPAN = 10 ** 12
+DEFAULT_VIRTUAL_NODES = 64
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+def parse_shard_map(value: Optional[str]) -> Dict[int, int]:
+    """Parses a ``restaurant_id:shard,...`` lookup table, e.g. ``"1:0,7:2"``."""
+    mapping = {}
+    for entry in (value or "").split(","):
+        if entry.strip():
+            restaurant_id, _, shard = entry.partition(":")
+            mapping[int(restaurant_id)] = int(shard)
+    return mapping
+
+
+class ShardRouter:
+    """
+    Maps a restaurant to one of N database engines.
+
+    Restaurants listed in the lookup table go to their fixed shard; the rest
+    are placed on a consistent-hash ring with ``virtual_nodes`` points per
+    shard, so adding a shard moves only about 1/N of the restaurants. With a
+    single engine every call resolves to it and nothing else changes.
+    """
+
+    def __init__(self, engines: Sequence[Engine], lookup: Optional[Dict[int, int]] = None,
+                 virtual_nodes: int = DEFAULT_VIRTUAL_NODES):
+        if not engines:
+            raise ValueError("At least one shard engine is required.")
+        self.engines = list(engines)
+        self.lookup = dict(lookup or {})
+        invalid = {shard for shard in self.lookup.values() if not 0 <= shard < len(self.engines)}
+        if invalid:
+            raise ValueError(f"Shard map refers to unknown shards {sorted(invalid)}.")
+        ring = sorted((_hash(f"shard-{index}-{node}"), index)
+                      for index in range(len(self.engines)) for node in range(virtual_nodes))
+        self._ring_keys = [key for key, _ in ring]
+        self._ring_shards = [index for _, index in ring]
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def sharded(self) -> bool:
+        return len(self.engines) > 1
+
+    def shard_for(self, restaurant_id: int) -> int:
+        shard = self.lookup.get(restaurant_id)
+        if shard is not None:
+            return shard
+        if not self.sharded:
+            return 0
+        position = bisect.bisect(self._ring_keys, _hash(f"restaurant-{restaurant_id}")) % len(self._ring_keys)
+        return self._ring_shards[position]
+
+    def engine_for(self, restaurant_id: int) -> Engine:
+        return self.engines[self.shard_for(restaurant_id)]
+
+    def shard_of_id(self, row_id: int) -> Optional[int]:
+        """The shard that allocated ``row_id``, or None if the id is out of range."""
+        shard = (row_id - 1) // SHARD_ID_SPAN
+        return shard if 0 <= shard < len(self.engines) else None
+
+    def fan_out(self, fn: Callable[[Session], T], engines: Optional[Iterable[Engine]] = None) -> List[T]:
+        """
+        Runs ``fn`` with a fresh session on each shard in parallel and returns
+        the results in shard order. With a single shard it runs inline.
+        """
+        engines = list(engines) if engines is not None else self.engines
+
+        def run(engine: Engine) -> T:
+            with Session(engine) as session:
+                return fn(session)
+
+        if len(engines) == 1:
+            return [run(engines[0])]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=len(self.engines), thread_name_prefix="shard")
+        return list(self._executor.map(run, engines))
+
+    def create_all(self, metadata: MetaData, table_names: Sequence[str], primary: Engine):
+        """
+        Creates the sharded tables on every shard other than ``primary`` and
+        gives each shard its own id range.
+
+        Shards hold only the sharded tables, so their copies are created
+        without foreign keys to tables living elsewhere; the services validate
+        those references against the primary database.
+        """
+        if primary in self.engines and self.engines.index(primary) != 0:
+            raise ValueError("The primary database can only be used as shard 0.")
+        for index, engine in enumerate(self.engines):
+            if engine is primary:
+                continue
+            shard_metadata = MetaData()
+            for name in table_names:
+                table = metadata.tables[name].to_metadata(shard_metadata)
+                for constraint in [c for c in table.constraints if isinstance(c, ForeignKeyConstraint)]:
+                    table.constraints.discard(constraint)
+                for column in table.columns:
+                    column.foreign_keys.clear()
+                table.foreign_keys.clear()
+                # AUTOINCREMENT makes SQLite honour the seeded sqlite_sequence value.
+                table.kwargs["sqlite_autoincrement"] = True
+            shard_metadata.create_all(engine)
+            if index:
+                self._seed_ids(engine, shard_metadata, index * SHARD_ID_SPAN)
+
+    @staticmethod
+    def _seed_ids(engine: Engine, metadata: MetaData, start: int):
+        with engine.begin() as connection:
+            for table in metadata.sorted_tables:
+                if "id" not in table.columns or not table.columns["id"].primary_key:
+                    continue
+                if connection.execute(text(f'SELECT MAX(id) FROM "{table.name}"')).scalar() is not None:
+                    continue
+                if engine.dialect.name != "sqlite" and not isinstance(table.columns["id"].type, BigInteger):
+                    raise ValueError(f"Sharded table {table.name!r} needs a BIGINT id to hold id range {start}.")
+                if engine.dialect.name == "sqlite":
+                    connection.execute(text("DELETE FROM sqlite_sequence WHERE name = :name"), {"name": table.name})
+                    connection.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"),
+                                       {"name": table.name, "seq": start})
+                elif engine.dialect.name == "postgresql":
+                    connection.execute(text("SELECT setval(pg_get_serial_sequence(:name, 'id'), :seq)"),
+                                       {"name": table.name, "seq": start})
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+class ShardSessions:
+    """
+    The sessions one request uses on the shards, opened on first use.
+
+    The shard that is also the primary database reuses the request's primary
+    session, so an unsharded setup keeps working with a single session and a
+    single transaction.
+    """
+
+    def __init__(self, primary: Session, router: "ShardRouter"):
+        self.primary = primary
+        self.router = router
+        self._sessions: Dict[int, Session] = {}
+
+    def __enter__(self) -> "ShardSessions":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def for_shard(self, index: int) -> Session:
+        engine = self.router.engines[index]
+        if engine is self.primary.get_bind():
+            return self.primary
+        session = self._sessions.get(index)
+        if session is None:
+            session = self._sessions[index] = Session(engine)
+        return session
+
+    def for_restaurant(self, restaurant_id: int) -> Session:
+        return self.for_shard(self.router.shard_for(restaurant_id))
+
+    def get(self, model: Type[SQLModel], row_id: int) -> Optional[Any]:
+        """
+        Loads a sharded row by id: first from the shard its id range points
+        at, then from the others in case its restaurant has been moved.
+        """
+        hint = self.router.shard_of_id(row_id)
+        order = ([hint] if hint is not None else []) + [i for i in range(len(self.router.engines)) if i != hint]
+        for index in order:
+            row = self.for_shard(index).get(model, row_id)
+            if row is not None:
+                return row
+        return None
+
+    def session_of(self, row: SQLModel) -> Session:
+        """The session a row loaded through ``get`` belongs to."""
+        return Session.object_session(row) or self.primary
+
+    def fan_out(self, fn: Callable[[Session], T]) -> List[T]:
+        """Runs ``fn`` on every shard; unsharded it simply runs on the primary session."""
+        if not self.router.sharded:
+            return [fn(self.for_shard(0))]
+        return self.router.fan_out(fn)
+
+    def close(self):
+        for session in self._sessions.values():
+            session.close()
+        self._sessions.clear()
+
+
+def fetch(result: Result) -> tuple:
+    """Materializes a result as ``(keys, rows)`` so it outlives its (shard) session."""
+    return list(result.keys()), result.all()
+
+
+def merge_pages(pages: Iterable[tuple], key: str, limit: int) -> Result:
+    """
+    Merges per-shard keyset pages, given as ``fetch`` output of queries built
+    with ``paginate``, into one result holding the first ``limit + 1`` rows by
+    ``key``, so PageResponse still detects the next page.
+    """
+    keys, rows = None, []
+    for page_keys, page_rows in pages:
+        keys = keys or page_keys
+        rows.extend(page_rows)
+    index = keys.index(key)
+    rows.sort(key=lambda row: row[index])
+    return IteratorResult(SimpleResultMetaData(keys), iter([tuple(row) for row in rows[:limit + 1]]))
\ No newline at end of file
@@ -0,0 +1,70 @@
+# src/shared/sql.py
+from datetime import date, datetime, timedelta
+from typing import Any, Union
+
+from sqlalchemy import Integer, cast, func
+from sqlalchemy.dialects import postgresql, sqlite
+
+GRANULARITIES = ("day", "week", "month")
+SUPPORTED_DIALECTS = ("postgresql", "sqlite")
+
+
+def check_dialect(dialect_name: str):
+    """Raises ValueError for a database the dialect-specific SQL here has no variant for."""
+    if dialect_name not in SUPPORTED_DIALECTS:
+        raise ValueError(f"Unsupported database dialect '{dialect_name}'. Must be one of {list(SUPPORTED_DIALECTS)}.")
+
+
+def date_bucket(column, granularity: str, dialect_name: str):
+    """
+    SQL expression truncating a date/timestamp column to the start of its day,
+    week (Monday) or month, for use in GROUP BY.
+
+    Postgres uses date_trunc; SQLite has no equivalent, so the same boundaries
+    are computed with date() modifiers.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Granularity must be one of {list(GRANULARITIES)}.")
+    check_dialect(dialect_name)
+    if dialect_name == "postgresql":
+        return func.date_trunc(granularity, column)
+    if granularity == "day":
+        return func.date(column)
+    if granularity == "week":
+        # 'weekday 0' advances to the next Sunday (or stays on one), so -6 days lands on Monday.
+        return func.date(column, "weekday 0", "-6 days")
+    return func.date(column, "start of month")
+
+
+def insert_ignore(table, dialect_name: str, **values):
+    """INSERT of one row that does nothing when it conflicts with an existing key (ON CONFLICT DO NOTHING)."""
+    check_dialect(dialect_name)
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    return dialect_insert(table).values(**values).on_conflict_do_nothing()
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    """Python counterpart of date_bucket for an already truncated day."""
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Granularity must be one of {list(GRANULARITIES)}.")
+
+
+def bucket_date(value: Union[str, date, datetime, Any]) -> date:
+    """Normalizes a bucket value (ISO string on SQLite, date/timestamp on Postgres) to a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+def epoch_seconds(column, dialect_name: str):
+    """SQL expression converting a naive timestamp column to seconds since the epoch (read as UTC)."""
+    check_dialect(dialect_name)
+    if dialect_name == "postgresql":
+        return func.extract("epoch", column)
+    return cast(func.strftime("%s", column), Integer)
\ No newline at end of file
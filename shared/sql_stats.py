@@ -0,0 +1,163 @@
+# src/shared/sql_stats.py
+import contextvars
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statements slower than this are logged with their route (0 logs every statement).
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+# Distinct statement shapes tracked; further shapes are counted under OTHER_FINGERPRINT.
+SQL_STATS_MAX_FINGERPRINTS = int(os.getenv("SQL_STATS_MAX_FINGERPRINTS", "1000"))
+SQL_STATS_SORT_KEYS = ("total_ms", "mean_ms", "max_ms", "count", "rows")
+OTHER_FINGERPRINT = "<other statements>"
+STATEMENT_PREVIEW_CHARS = 500
+
+logger = logging.getLogger("sql.slow")
+
+_current_scope: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("sql_stats_scope", default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\$\d+|\?")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_ROWS = re.compile(r"(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """
+    Normalizes a SQL statement to its shape: literals and bound parameters
+    become ``?``, IN lists of any length become ``IN (...)`` and multi-row
+    VALUES lists collapse to one row, so the same query issued with
+    different arguments is counted once.
+    """
+    shape = _STRING.sub("?", statement)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("IN (...)", shape)
+    shape = _VALUES_ROWS.sub(r"\1, ...", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+def current_route() -> Optional[str]:
+    """The route template (or path) of the request running in this context, if any."""
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path")
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+class SQLRouteMiddleware:
+    """
+    Makes the current request visible to the SQL hooks. The ASGI scope is
+    stored in a context variable (copied into threadpool workers); the router
+    adds the matched route to that same scope later, so statements are
+    attributed to route templates rather than raw paths.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
+
+
+class SQLStats:
+    """
+    Per-fingerprint statement statistics collected from engine events:
+    count, total, mean and max duration, rows and the routes issuing them.
+    """
+
+    def __init__(self, slow_query_ms: float = SQL_SLOW_QUERY_MS, max_fingerprints: int = SQL_STATS_MAX_FINGERPRINTS):
+        self.slow_query_ms = slow_query_ms
+        self.max_fingerprints = max_fingerprints
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def attach(self, engine: Engine):
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    # The start time lives on the statement's execution context, which is dropped with it
+    # whether or not the statement succeeds; statements run without one (dialect setup) are not timed.
+    @staticmethod
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.sql_stats_started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "sql_stats_started", None)
+        if started is not None:
+            self.record(statement, (time.perf_counter() - started) * 1000, cursor.rowcount)
+
+    def record(self, statement: str, elapsed_ms: float, rows: int = -1):
+        shape = fingerprint(statement)
+        route = current_route()
+        with self._lock:
+            stats = self._stats.get(shape)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    shape = OTHER_FINGERPRINT
+                    stats = self._stats.get(shape)
+                if stats is None:
+                    stats = self._stats[shape] = {
+                        "count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "routes": Counter(),
+                        "example": statement[:STATEMENT_PREVIEW_CHARS],
+                    }
+            stats["count"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            if rows > 0:  # drivers report -1 when the count is unknown (e.g. SQLite SELECTs)
+                stats["rows"] += rows
+            stats["routes"][route or "<no request>"] += 1
+        if elapsed_ms >= self.slow_query_ms:
+            logger.warning("Slow query %.1f ms in %s: %s", elapsed_ms, route or "<no request>",
+                           _SPACE.sub(" ", statement).strip()[:STATEMENT_PREVIEW_CHARS])
+
+    def snapshot(self, sort: str = "total_ms", limit: int = 50) -> List[Dict[str, Any]]:
+        """Aggregates per fingerprint, heaviest first by ``sort``."""
+        if sort not in SQL_STATS_SORT_KEYS:
+            raise ValueError(f"Sort must be one of {list(SQL_STATS_SORT_KEYS)}.")
+        with self._lock:
+            rows = [
+                {
+                    "fingerprint": shape,
+                    "count": stats["count"],
+                    "total_ms": round(stats["total_ms"], 3),
+                    "mean_ms": round(stats["total_ms"] / stats["count"], 3),
+                    "max_ms": round(stats["max_ms"], 3),
+                    "rows": stats["rows"],
+                    "routes": dict(stats["routes"].most_common(5)),
+                    "example": stats["example"],
+                }
+                for shape, stats in self._stats.items()
+            ]
+        rows.sort(key=lambda row: row[sort], reverse=True)
+        return rows[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.started_at = time.time()
+
+
+sql_stats = SQLStats()
\ No newline at end of file
@@ -0,0 +1,116 @@
+# src/shared/text_index.py
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercases, strips accents and turns punctuation into single spaces."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def trigrams(text: str, open_end: bool = False) -> Set[str]:
+    """
+    pg_trgm style trigrams of every word: two leading blanks and one trailing
+    blank. With ``open_end`` the last word gets no trailing blank, so a query
+    still being typed matches words it is a prefix of.
+    """
+    words = normalize(text).split()
+    grams = set()
+    for index, word in enumerate(words):
+        padded = f"  {word}" if open_end and index == len(words) - 1 else f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    In-memory trigram inverted index over documents made of weighted text fields.
+
+    ``search`` scores a document by the share of the query's trigrams found in
+    its best field (times the field weight), plus a bonus when a word of that
+    field starts with the query's last word, which covers both prefix and
+    misspelling tolerant ("fuzzy") lookups. Documents are added, replaced and
+    removed one at a time, so the index follows writes incrementally.
+    """
+
+    def __init__(self, weights: Dict[str, float], min_score: float = 0.4, prefix_bonus: float = 0.5):
+        self.weights = weights
+        self.min_score = min_score
+        self.prefix_bonus = prefix_bonus
+        self._fields: Dict[Hashable, Dict[str, Tuple[str, Set[str]]]] = {}
+        self._postings: Dict[Tuple[str, str], Set[Hashable]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def add(self, doc_id: Hashable, fields: Dict[str, Optional[str]]):
+        """Indexes a document, replacing any previous version with the same id."""
+        with self._lock:
+            self.remove(doc_id)
+            indexed = {}
+            for field in self.weights:
+                text = normalize(fields.get(field) or "")
+                grams = trigrams(text)
+                indexed[field] = (text, grams)
+                for gram in grams:
+                    self._postings.setdefault((field, gram), set()).add(doc_id)
+            self._fields[doc_id] = indexed
+
+    def remove(self, doc_id: Hashable):
+        with self._lock:
+            indexed = self._fields.pop(doc_id, None)
+            if not indexed:
+                return
+            for field, (_, grams) in indexed.items():
+                for gram in grams:
+                    postings = self._postings.get((field, gram))
+                    if postings is not None:
+                        postings.discard(doc_id)
+                        if not postings:
+                            del self._postings[(field, gram)]
+
+    def rebuild(self, documents: Iterable[Tuple[Hashable, Dict[str, Optional[str]]]]):
+        with self._lock:
+            self._fields.clear()
+            self._postings.clear()
+            for doc_id, fields in documents:
+                self.add(doc_id, fields)
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> List[Tuple[Hashable, float]]:
+        """Returns ``(doc_id, score)`` pairs ranked by score, then id."""
+        query_grams = trigrams(query, open_end=True)
+        if not query_grams:
+            return []
+        words = normalize(query).split()
+        last_word = words[-1]
+        with self._lock:
+            hits: Dict[str, Counter] = {field: Counter() for field in self.weights}
+            for field in self.weights:
+                for gram in query_grams:
+                    hits[field].update(self._postings.get((field, gram), ()))
+
+            scored = []
+            candidates = set().union(*(counter.keys() for counter in hits.values()))
+            for doc_id in candidates:
+                best = 0.0
+                for field, weight in self.weights.items():
+                    shared = hits[field].get(doc_id, 0)
+                    if not shared:
+                        continue
+                    score = shared / len(query_grams)
+                    text = self._fields[doc_id][field][0]
+                    if any(word.startswith(last_word) for word in text.split()):
+                        score += self.prefix_bonus
+                    best = max(best, score * weight)
+                if best >= self.min_score:
+                    scored.append((doc_id, round(best, 4)))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[offset:offset + limit]
\ No newline at end of file
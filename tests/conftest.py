@@ -0,0 +1,127 @@
+# src/tests/conftest.py
+import itertools
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+
+# shared.database reads DATABASE_URL at import time, so the throwaway SQLite
+# file has to be configured before the application is imported.
+TEST_DIR = tempfile.mkdtemp(prefix="elbuensabor-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}"
+os.environ["DISH_SKETCH_PATH"] = os.path.join(TEST_DIR, "dish_popularity.json")
+# Dashboard responses are computed on every request; cache behaviour is tested on its own instances.
+os.environ["DASHBOARD_CACHE_TTL"] = "0"
+os.environ["DASHBOARD_CACHE_MAX_STALE"] = "0"
+os.environ["CACHE_SHM_PATH"] = os.path.join(TEST_DIR, "cache.sqlite3")
+os.environ["DASHBOARD_JOB_DIR"] = os.path.join(TEST_DIR, "jobs")
+os.environ["PROFILE_DIR"] = os.path.join(TEST_DIR, "profiles")
+os.environ["RESERVATION_ARCHIVE_DIR"] = os.path.join(TEST_DIR, "archive")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+import main
+from auth.domain.entities import User
+from shared.database import engine
+from shared.security import create_access_token, get_password_hash
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+_names = itertools.count(1)
+_weeks = itertools.count(0)
+
+
+def unique_name(prefix: str) -> str:
+    """Returns a name that no other test has used, for columns with unique constraints."""
+    return f"{prefix} {next(_names)}"
+
+
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db_session(client):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture(scope="session")
+def users(client):
+    """One admin and one client account shared by the whole test session."""
+    with Session(engine) as session:
+        admin = User(email="admin@tests.local", name="Admin", role="admin", hashed_password=get_password_hash("secret"))
+        customer = User(email="client@tests.local", name="Client", role="client", hashed_password=get_password_hash("secret"))
+        session.add_all([admin, customer])
+        session.commit()
+        return {"admin": admin.id, "client": customer.id}
+
+
+def _headers(email: str, scopes: list) -> dict:
+    """Bearer headers with the scopes /auth/token grants for the user's role."""
+    return {"Authorization": f"Bearer {create_access_token({'sub': email, 'scopes': scopes})}"}
+
+
+@pytest.fixture(scope="session")
+def admin_headers(users):
+    return _headers("admin@tests.local", ["admin:read", "admin:write", "client:read", "client:write"])
+
+
+@pytest.fixture(scope="session")
+def client_headers(users):
+    return _headers("client@tests.local", ["client:read", "client:write"])
+
+
+@pytest.fixture
+def make_restaurant(client, admin_headers):
+    """Creates a restaurant through the API, with ``tables`` tables of capacity 4 and ``items`` menu items."""
+    def factory(tables: int = 2, items: int = 2, opening_time: str = "12:00", closing_time: str = "23:00") -> dict:
+        response = client.post("/restaurants/", json={"name": unique_name("Restaurant"), "location": "Centro",
+                                                      "opening_time": opening_time, "closing_time": closing_time},
+                               headers=admin_headers)
+        assert response.status_code == 201, response.text
+        restaurant = response.json()
+        restaurant["tables"] = []
+        for number in range(1, tables + 1):
+            response = client.post(f"/restaurants/{restaurant['id']}/tables",
+                                   json={"capacity": 4, "location": "interior", "table_number": number},
+                                   headers=admin_headers)
+            assert response.status_code == 201, response.text
+            restaurant["tables"].append(response.json()["id"])
+        restaurant["items"] = []
+        for number in range(1, items + 1):
+            response = client.post(f"/menu/{restaurant['id']}/items",
+                                   json={"name": f"Plato {number}", "description": "De la casa", "category": "Principal"},
+                                   headers=admin_headers)
+            assert response.status_code == 201, response.text
+            restaurant["items"].append(response.json()["id"])
+        return restaurant
+    return factory
+
+@pytest.fixture
+def day() -> date:
+    """A future Monday; the week starting on it is booked by this test only, so overlap checks never cross tests."""
+    return date(2029, 12, 31) + timedelta(weeks=next(_weeks))
+
+
+@pytest.fixture
+def reserve(client, users, client_headers):
+    """Books ``restaurant``'s table at index ``table`` through the API and returns the created reservation."""
+    def factory(restaurant: dict, when: datetime, table: int = 0, guests: int = 2, items=(), headers=None,
+                duration_hours: float = 2, expected_status: int = 201, allergens=()) -> dict:
+        payload = {"user_id": users["client"], "restaurant_id": restaurant["id"],
+                   "table_id": restaurant["tables"][table], "num_guests": guests,
+                   "reservation_time": when.isoformat(), "duration_hours": duration_hours,
+                   "preordered_menu_items": list(items), "allergens": list(allergens)}
+        response = client.post("/reservations/", json=payload, headers=headers or client_headers)
+        assert response.status_code == expected_status, response.text
+        return response.json()
+    return factory
\ No newline at end of file
@@ -0,0 +1,110 @@
+# src/tests/test_admission.py
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from shared.admission import AdmissionController, AdmissionMiddleware, classify, parse_limits
+
+
+@pytest.mark.parametrize("method, path, expected", [
+    ("POST", "/reservations/", "booking"),
+    ("DELETE", "/reservations/12", "booking"),
+    ("GET", "/reservations/me", "browse"),
+    ("GET", "/reservations/", "admin"),
+    ("GET", "/restaurants/3/tables", "browse"),
+    ("PUT", "/restaurants/3/tables:bulk", "admin"),
+    ("POST", "/auth/token", "auth"),
+    ("GET", "/dashboard/reservations", "admin"),
+    ("GET", "/restaurants/3/availability/stream", None),
+    ("GET", "/diagnostics/admission", None),
+])
+def test_requests_are_classified_by_method_and_path(method, path, expected):
+    assert classify(method, path) == expected
+
+
+def test_limits_keep_their_priority_order():
+    assert parse_limits("booking:16:32, admin:4:4") == [("booking", 16, 32), ("admin", 4, 4)]
+
+
+def test_full_classes_queue_then_shed():
+    async def scenario():
+        controller = AdmissionController("booking:1:1", max_in_flight=10, priority_reserve=0, queue_timeout=1)
+        assert await controller.acquire("booking")
+        queued = asyncio.create_task(controller.acquire("booking"))
+        await asyncio.sleep(0)
+        assert not await controller.acquire("booking")  # queue full
+        controller.release("booking")
+        assert await queued
+        stats = controller.snapshot()["classes"][0]
+        assert (stats["admitted"], stats["queued"], stats["rejected"], stats["in_flight"]) == (2, 1, 1, 1)
+    asyncio.run(scenario())
+
+
+def test_queued_requests_time_out():
+    async def scenario():
+        controller = AdmissionController("admin:1:1", queue_timeout=0.01)
+        assert await controller.acquire("admin")
+        assert not await controller.acquire("admin")
+        assert controller.snapshot()["classes"][0]["timed_out"] == 1
+        assert len(controller.classes["admin"].waiters) == 0
+    asyncio.run(scenario())
+
+
+def test_reserved_slots_and_freed_slots_go_to_bookings_first():
+    async def scenario():
+        controller = AdmissionController("booking:5:5,browse:5:5", max_in_flight=2, priority_reserve=1,
+                                         queue_timeout=1)
+        assert await controller.acquire("browse")
+        browse = asyncio.create_task(controller.acquire("browse"))  # the last slot is reserved
+        await asyncio.sleep(0)
+        assert not browse.done()
+        assert await controller.acquire("booking")
+        booking = asyncio.create_task(controller.acquire("booking"))
+        await asyncio.sleep(0)
+        controller.release("browse")
+        assert await booking
+        assert (controller.classes["booking"].in_flight, controller.classes["browse"].in_flight) == (2, 0)
+        controller.release("booking")
+        controller.release("booking")
+        assert await browse
+    asyncio.run(scenario())
+
+
+def test_slow_pool_stops_the_lowest_classes_from_queueing():
+    async def scenario():
+        controller = AdmissionController("booking:1:4,auth:1:4,browse:1:4,admin:1:4", pool_wait_ms=50,
+                                         queue_timeout=0.05)
+        for name in controller.classes:
+            assert await controller.acquire(name)
+        controller.record_pool_wait("browse", 1.0)
+        assert controller.saturated()
+        assert controller.classes["browse"].pool_wait_max_ms == 1000
+        for name in ("browse", "admin"):
+            assert not await controller.acquire(name)
+            assert controller.classes[name].stats["rejected"] == 1
+        # Bookings and logins still wait for a slot.
+        for name in ("booking", "auth"):
+            assert not await controller.acquire(name)
+            assert controller.classes[name].stats["timed_out"] == 1
+    asyncio.run(scenario())
+
+
+def test_shed_requests_get_503_with_retry_after():
+    app = FastAPI()
+
+    @app.get("/menu/items")
+    def items():
+        return []
+
+    app.add_middleware(AdmissionMiddleware, controller=AdmissionController("browse:0:0"), retry_after=7)
+    response = TestClient(app).get("/menu/items")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "7"
+    assert "browse" in response.json()["detail"]
+
+
+def test_admission_stats_are_reported(client, admin_headers):
+    stats = client.get("/diagnostics/admission", headers=admin_headers).json()
+    assert [route_class["name"] for route_class in stats["classes"]] == ["booking", "auth", "browse", "admin"]
\ No newline at end of file
@@ -0,0 +1,95 @@
+# src/tests/test_archive.py
+import csv
+import gzip
+import io
+import os
+from datetime import date, datetime, timedelta
+
+from sqlmodel import select
+
+from dashboard.domain.entities import ReservationDailyStats
+from dashboard.domain.rollups import ReservationRollup
+from dashboard.domain.services import DashboardService
+from reservations.domain.archive import ReservationArchive, ReservationArchiver
+from reservations.domain.entities import Reservation, ReservationStatus
+
+# Long past the retention window, so only this module's reservations are archived.
+OLD_DAY = date(2001, 3, 5)
+
+
+def _reservation(reservation_id: int, when: datetime, status=ReservationStatus.COMPLETED, restaurant_id: int = 1,
+                 table_id: int = 1, items=(), guests: int = 2) -> Reservation:
+    return Reservation(id=reservation_id, user_id=1, restaurant_id=restaurant_id, table_id=table_id,
+                       num_guests=guests, reservation_time=when, end_time=when + timedelta(hours=2),
+                       status=status, preordered_menu_items=list(items))
+
+
+def test_archive_reads_only_the_months_asked_for(tmp_path):
+    archive = ReservationArchive(str(tmp_path))
+    archive.append([_reservation(1, datetime(2001, 1, 31, 20)), _reservation(2, datetime(2001, 2, 1, 13)),
+                    _reservation(3, datetime(2001, 3, 9, 20), status=ReservationStatus.CANCELLED, restaurant_id=2)])
+    assert [month.month for month in archive.months()] == [1, 2, 3]
+    assert [os.path.basename(path) for path in archive.partitions(date(2001, 2, 1), date(2001, 2, 28))] == ["2001-02"]
+    assert [r.id for r in archive.read(date(2001, 1, 31), date(2001, 2, 1))] == [1, 2]
+    assert [r.id for r in archive.read(restaurant_id=2)] == [3]
+    assert [r.id for r in archive.read(statuses=[ReservationStatus.COMPLETED])] == [1, 2]
+    assert archive.covers(date(2001, 3, 1)) and not archive.covers(date(2001, 4, 1))
+
+
+def test_archive_survives_repeated_and_interrupted_batches(tmp_path):
+    archive = ReservationArchive(str(tmp_path))
+    batch = [_reservation(1, datetime(2001, 1, 10, 20)), _reservation(2, datetime(2001, 1, 11, 20))]
+    archive.append(batch)
+    archive.append(batch)  # archived again after a crash before the delete
+    partition = archive.partition_path(date(2001, 1, 1))
+    with open(os.path.join(partition, "99999999999999999999-1-1.jsonl.gz.tmp"), "wb") as fh:
+        fh.write(b"half written")
+    with open(os.path.join(partition, "99999999999999999999-1-2.jsonl.gz"), "wb") as fh:
+        fh.write(gzip.compress(batch[0].model_dump_json().encode() + b"\n")[:-12])  # truncated on disk
+    assert [r.id for r in archive.read()] == [1, 2]
+
+
+def test_archiving_keeps_rollups_rankings_and_exports(client, admin_headers, db_session, make_restaurant):
+    restaurant = make_restaurant(tables=2, items=2)
+    rid, (table_a, table_b), (dish_a, dish_b) = restaurant["id"], restaurant["tables"], restaurant["items"]
+    when = datetime.combine(OLD_DAY, datetime.min.time()) + timedelta(hours=20)
+    reservations = [
+        _reservation(None, when, restaurant_id=rid, table_id=table_a, items=[dish_a, dish_b], guests=3),
+        _reservation(None, when, ReservationStatus.CANCELLED, restaurant_id=rid, table_id=table_b, items=[dish_b]),
+        # Still confirmed: not archivable whatever its age.
+        _reservation(None, when - timedelta(hours=6), ReservationStatus.CONFIRMED, restaurant_id=rid,
+                     table_id=table_b, items=[dish_b]),
+    ]
+    db_session.add_all(reservations)
+    db_session.commit()
+    ids = [reservation.id for reservation in reservations]
+    ReservationRollup(db_session).refresh_day(rid, OLD_DAY)
+    db_session.commit()
+
+    def daily():
+        row = db_session.exec(select(ReservationDailyStats).where(ReservationDailyStats.restaurant_id == rid)).one()
+        db_session.expire_all()
+        return row.model_dump()
+
+    def ranking():
+        [result] = DashboardService(db_session).get_dish_rankings(restaurant_id=rid)
+        return {dish["menu_item_id"]: dish["count"] for dish in result["dishes"]}
+
+    before = daily()
+    assert ranking() == {dish_a: 1, dish_b: 2}
+
+    assert ReservationArchiver().run(retention_days=30, dry_run=True)["archived"] == 2
+    assert ReservationArchiver().run(retention_days=30, batch_size=1)["archived"] == 2
+    hot = db_session.exec(select(Reservation.id).where(Reservation.restaurant_id == rid)).all()
+    assert hot == [ids[2]]
+
+    ReservationRollup(db_session).refresh_day(rid, OLD_DAY)
+    db_session.commit()
+    assert daily() == before
+    # The cancelled reservation's pre-orders stay out of the rankings once archived, too.
+    assert ranking() == {dish_a: 1, dish_b: 2}
+
+    response = client.get("/reservations/export", headers=admin_headers,
+                          params={"restaurant_id": rid, "from": OLD_DAY.isoformat(), "to": OLD_DAY.isoformat()})
+    exported = list(csv.DictReader(io.StringIO(response.content.decode("utf-8"))))
+    assert sorted(int(row["id"]) for row in exported) == sorted(ids)
\ No newline at end of file
@@ -0,0 +1,97 @@
+# src/tests/test_availability_stream.py
+import asyncio
+import json
+import threading
+from datetime import date, datetime, time
+
+from sqlmodel import Session
+
+from restaurants.domain.availability import (availability_events, availability_snapshot, availability_topic,
+                                             slot_id)
+from shared.database import engine
+from shared.pubsub import PubSub, pubsub
+
+
+def _parse(event: str) -> tuple:
+    name, data = event.strip().split("\n")
+    return name[len("event: "):], json.loads(data[len("data: "):])
+
+
+def test_slow_subscribers_are_dropped_without_blocking_publishers():
+    async def scenario():
+        hub = PubSub(queue_size=2)
+        slow, fast = hub.subscribe("topic"), hub.subscribe("topic", maxsize=10)
+        # Publishing from another thread, as services in the threadpool do.
+        publisher = threading.Thread(target=lambda: [hub.publish("topic", n) for n in range(3)])
+        publisher.start()
+        publisher.join()
+        await asyncio.sleep(0)
+        assert slow.dropped and await slow.get() is None
+        assert [await fast.get(timeout=1) for _ in range(3)] == [0, 1, 2]
+        assert hub.subscriber_count("topic") == 1 and hub.metrics["dropped"] == 1
+        fast.close()
+        assert hub.subscriber_count() == 0
+    asyncio.run(scenario())
+
+
+def test_stream_sends_a_snapshot_then_deltas_for_its_day():
+    async def scenario():
+        calls = []
+
+        async def load():
+            calls.append(1)
+            return {"type": "snapshot", "tables": [], "reserved": []}
+
+        events = availability_events(7, date(2030, 1, 7), load, heartbeat=0.05)
+        assert _parse(await events.__anext__())[0] == "snapshot"
+        topic = availability_topic(7)
+        # A reservation moved from the 7th to the 8th: still reported on the 7th, but no longer blocking it.
+        pubsub.publish(topic, {"type": "reservation", "slot_id": "s", "blocking": True,
+                               "days": ["2030-01-07", "2030-01-08"], "current_days": ["2030-01-08"]})
+        name, delta = _parse(await events.__anext__())
+        assert (name, delta) == ("reservation", {"slot_id": "s", "blocking": False})
+        pubsub.publish(topic, {"type": "reservation", "slot_id": "t", "blocking": True,
+                               "days": ["2030-01-09"], "current_days": ["2030-01-09"]})
+        assert await events.__anext__() == ": keep-alive\n\n"
+        pubsub.publish(topic, {"type": "tables"})
+        assert _parse(await events.__anext__())[0] == "snapshot" and len(calls) == 2
+        await events.aclose()
+        assert pubsub.subscriber_count(topic) == 0
+    asyncio.run(scenario())
+
+
+def test_reservation_writes_are_published(client, client_headers, make_restaurant, day, reserve):
+    restaurant = make_restaurant()
+
+    async def scenario():
+        subscription = pubsub.subscribe(availability_topic(restaurant["id"]))
+        reservation = reserve(restaurant, datetime.combine(day, time(20)))
+        created = await subscription.get(timeout=1)
+        client.delete(f"/reservations/{reservation['id']}", headers=client_headers)
+        cancelled = await subscription.get(timeout=1)
+        subscription.close()
+        return reservation, created, cancelled
+
+    reservation, created, cancelled = asyncio.run(scenario())
+    assert (created["action"], created["blocking"], created["days"]) == ("created", True, [day.isoformat()])
+    assert created["slot_id"] == slot_id(reservation["id"]) and "id" not in created
+    assert (cancelled["action"], cancelled["blocking"]) == ("cancelled", False)
+
+    with Session(engine) as session:
+        assert availability_snapshot(session, restaurant["id"], day)["reserved"] == []
+
+
+def test_snapshot_lists_tables_and_blocked_slots(client, make_restaurant, day, reserve):
+    restaurant = make_restaurant(tables=2)
+    reservation = reserve(restaurant, datetime.combine(day, time(22, 30)), table=1, duration_hours=3)
+    with Session(engine) as session:
+        today = availability_snapshot(session, restaurant["id"], day)
+        tomorrow = availability_snapshot(session, restaurant["id"], date.fromordinal(day.toordinal() + 1))
+    assert [table["id"] for table in today["tables"]] == restaurant["tables"]
+    # The reservation runs past midnight, so it blocks both days.
+    for snapshot in (today, tomorrow):
+        assert [slot["slot_id"] for slot in snapshot["reserved"]] == [slot_id(reservation["id"])]
+
+
+def test_unknown_restaurant_stream_is_not_found(client):
+    assert client.get("/restaurants/999999999/availability/stream").status_code == 404
\ No newline at end of file
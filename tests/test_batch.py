@@ -0,0 +1,65 @@
+# src/tests/test_batch.py
+from datetime import datetime, time
+
+import pytest
+
+
+def _batch(client, headers, *requests, expected_status=200):
+    response = client.post("/batch", headers=headers, json={"requests": list(requests)})
+    assert response.status_code == expected_status, response.text
+    return response.json()
+
+
+def test_responses_keep_request_order(client, admin_headers, make_restaurant):
+    restaurants = [make_restaurant(tables=1, items=0) for _ in range(3)]
+    requests = [{"id": f"r{index}", "path": f"/restaurants/{restaurant['id']}"}
+                for index, restaurant in enumerate(restaurants)]
+    requests.insert(1, {"path": "/restaurants/999999999"})
+    responses = _batch(client, admin_headers, *requests)["responses"]
+    assert [response["id"] for response in responses] == ["r0", "1", "r1", "r2"]
+    assert [response["status"] for response in responses] == [200, 404, 200, 200]
+    assert [response["body"]["id"] for response in responses if response["status"] == 200] == \
+        [restaurant["id"] for restaurant in restaurants]
+
+
+def test_reads_after_a_write_see_it(client, admin_headers, make_restaurant):
+    restaurant = make_restaurant(tables=1, items=0)
+    items_path = f"/menu/{restaurant['id']}/items"
+    before, created, after = _batch(
+        client, admin_headers,
+        {"path": items_path},
+        {"method": "post", "path": items_path, "body": {"name": "Sopa", "description": "Del día", "category": "Entrada"}},
+        {"path": items_path},
+    )["responses"]
+    assert before["body"] == []
+    assert created["status"] == 201
+    assert [item["id"] for item in after["body"]] == [created["body"]["id"]]
+
+
+def test_sub_requests_run_as_the_batch_user(client, client_headers, users, make_restaurant, day):
+    restaurant = make_restaurant(tables=1, items=0)
+    booking = {"user_id": users["client"], "restaurant_id": restaurant["id"], "table_id": restaurant["tables"][0],
+               "num_guests": 2, "reservation_time": datetime.combine(day, time(20)).isoformat()}
+    created, mine, admin_only = _batch(
+        client, client_headers,
+        {"method": "POST", "path": "/reservations/", "body": booking},
+        {"path": "/reservations/me?limit=100", "headers": {"Authorization": "Bearer forged"}},
+        {"path": "/dashboard/reservations"},
+    )["responses"]
+    assert created["status"] == 201
+    assert created["body"]["id"] in [reservation["id"] for reservation in mine["body"]]
+    assert admin_only["status"] == 403
+
+
+@pytest.mark.parametrize("requests", [
+    [{"method": "POST", "path": "/batch", "body": {"requests": [{"path": "/restaurants/"}]}}],
+    [{"path": "/restaurants/1/availability/stream"}],
+    [{"method": "OPTIONS", "path": "/restaurants/"}],
+    [{"path": "/restaurants/"}] * 21,
+])
+def test_unsupported_batches_are_rejected(client, admin_headers, requests):
+    _batch(client, admin_headers, *requests, expected_status=400)
+
+
+def test_batches_need_authentication(client):
+    _batch(client, {}, {"path": "/restaurants/"}, expected_status=401)
\ No newline at end of file
@@ -0,0 +1,135 @@
+# src/tests/test_cache.py
+import pytest
+
+import shared.cache
+from dashboard.domain.cache import dashboard_cache
+from menu.domain.search import menu_search
+from shared.cache import (
+    ALL_SCOPES, Cache, InvalidationBus, KeyValueBackend, LocalCacheBackend, LocalKeyValueStore, SharedMemoryBackend,
+    invalidation_bus,
+)
+from shared.etag import RESTAURANTS_SCOPE, revisions
+
+
+@pytest.fixture(params=["local", "shm", "kv"])
+def backend(request, tmp_path):
+    if request.param == "local":
+        return LocalCacheBackend()
+    if request.param == "shm":
+        return SharedMemoryBackend(path=str(tmp_path / "cache.sqlite3"))
+    return KeyValueBackend(client=LocalKeyValueStore())
+
+
+def test_publishing_a_scope_makes_dependent_entries_unreachable(backend):
+    cache = Cache("test", backend=backend)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return {"n": len(loads)}
+
+    assert cache.get_or_load("key", ["a", "b"], loader) == {"n": 1}
+    assert cache.get_or_load("key", ["a", "b"], loader) == {"n": 1}
+    backend.bump(["c"])
+    assert cache.get_or_load("key", ["a", "b"], loader) == {"n": 1}
+    backend.bump(["b"])
+    assert cache.get_or_load("key", ["a", "b"], loader) == {"n": 2}
+    assert cache.metrics == {"hits": 2, "misses": 2}
+
+
+def test_shared_memory_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first, second = SharedMemoryBackend(path=path), SharedMemoryBackend(path=path)
+    first.set("key", [1, 2], ttl=60)
+    first.bump(["scope"])
+    assert second.get("key") == [1, 2]
+    assert second.generations(["scope", "other"]) == [1, 0]
+    first.set("short", "value", ttl=-1)
+    assert second.get("short") is shared.cache.MISSING
+
+
+def _buses(transport_factory):
+    received = {"first": [], "second": []}
+    buses = {}
+    for name in received:
+        bus = InvalidationBus(transport_factory())
+        bus.subscribe(lambda scopes, local, name=name: received[name].append((list(scopes), local)))
+        bus._cursor, _, _ = bus.transport.poll(None)
+        buses[name] = bus
+    return buses["first"], buses["second"], received
+
+
+@pytest.fixture(params=["shm", "kv"])
+def transport_factory(request, tmp_path):
+    if request.param == "shm":
+        return lambda: SharedMemoryBackend(path=str(tmp_path / "bus.sqlite3"))
+    store = LocalKeyValueStore()
+    return lambda: KeyValueBackend(client=store, settle_seconds=0)
+
+
+def test_bus_delivers_to_other_workers_once(transport_factory):
+    first, second, received = _buses(transport_factory)
+    first.publish("restaurant:1:menu")
+    second.poll()
+    first.poll()
+    second.poll()
+    assert received == {"first": [(["restaurant:1:menu"], True)], "second": [(["restaurant:1:menu"], False)]}
+    assert second.metrics["gaps"] == 0
+
+
+def test_bus_flushes_everything_when_messages_were_lost(transport_factory, monkeypatch):
+    first, second, received = _buses(transport_factory)
+    first.publish("restaurant:1:menu")
+    # Past the retention window: the message is deleted (shm) or has expired (kv) before the second worker polls.
+    monkeypatch.setattr(shared.cache, "CACHE_BUS_RETENTION", -1.0)
+    first.publish("restaurant:2:menu")
+    if isinstance(first.transport, KeyValueBackend):
+        first.transport.client.flushdb()
+        first.transport.client.set("elbuensabor:bus:seq", b"2")
+    second.poll()
+    assert received["second"] == [([ALL_SCOPES], False)]
+    assert second.metrics["gaps"] == 1
+    second.poll()
+    assert second.metrics["gaps"] == 1
+
+
+def test_bus_notices_a_recreated_store(tmp_path):
+    path = tmp_path / "bus.sqlite3"
+    first, second, received = _buses(lambda: SharedMemoryBackend(path=str(path)))
+    first.publish("restaurant:1:menu")
+    second.poll()
+    second.transport._local.connection.execute("DELETE FROM sqlite_sequence")
+    second.transport._local.connection.execute("DELETE FROM cache_bus")
+    second.poll()
+    assert received["second"] == [(["restaurant:1:menu"], False), ([ALL_SCOPES], False)]
+    assert second._cursor == 0
+
+
+def test_kv_bus_waits_for_half_published_messages():
+    store = LocalKeyValueStore()
+    first, second = (KeyValueBackend(client=store, settle_seconds=60) for _ in range(2))
+    cursor, _, _ = second.poll(None)
+    store.incr("elbuensabor:bus:seq")  # a publisher between taking its number and writing its message
+    first.publish("origin", ["restaurant:1:menu"])
+    assert second.poll(cursor) == (cursor, [], False)
+    store.set(f"elbuensabor:bus:{cursor + 1}", b'["origin", ["restaurant:2:menu"]]')
+    assert second.poll(cursor) == (cursor + 2, [("origin", ["restaurant:2:menu"]), ("origin", ["restaurant:1:menu"])],
+                                   False)
+
+
+def test_revisions_are_bumped_once_by_the_writing_worker(client):
+    before = revisions.get(RESTAURANTS_SCOPE)[RESTAURANTS_SCOPE]
+    invalidation_bus._deliver((RESTAURANTS_SCOPE,), False)
+    assert revisions.get(RESTAURANTS_SCOPE)[RESTAURANTS_SCOPE] == before
+    invalidation_bus.publish(RESTAURANTS_SCOPE)
+    assert revisions.get(RESTAURANTS_SCOPE)[RESTAURANTS_SCOPE] == before + 1
+
+
+def test_a_gap_drops_what_this_worker_derived(client, make_restaurant):
+    restaurant = make_restaurant(tables=1, items=1)
+    assert client.get("/menu/search", params={"restaurant_id": restaurant["id"]}).status_code == 200
+    assert menu_search._indexes
+    dashboard_cache.note_writes(3)
+    invalidation_bus._deliver((ALL_SCOPES,), False)
+    assert not menu_search._indexes
+    assert dashboard_cache.metrics()["entries"] == 0
\ No newline at end of file
@@ -0,0 +1,53 @@
+# src/tests/test_dashboard_buckets.py
+from datetime import date, datetime
+
+import pytest
+
+from dashboard.domain.services import DashboardService
+from reservations.domain.entities import Reservation
+from shared.sql import bucket_start, check_dialect, date_bucket
+
+
+def test_bucket_start_matches_calendar_boundaries():
+    sunday = date(2031, 3, 9)
+    assert bucket_start(sunday, "day") == sunday
+    assert bucket_start(sunday, "week") == date(2031, 3, 3)
+    assert bucket_start(sunday, "month") == date(2031, 3, 1)
+
+
+def test_unsupported_dialects_and_granularities_raise_value_error():
+    with pytest.raises(ValueError):
+        check_dialect("mssql")
+    with pytest.raises(ValueError):
+        date_bucket(Reservation.reservation_time, "day", "mssql")
+    with pytest.raises(ValueError):
+        date_bucket(Reservation.reservation_time, "year", "sqlite")
+
+
+def test_counts_fold_days_into_weeks_and_months(client, client_headers, db_session, make_restaurant, reserve):
+    restaurant = make_restaurant(tables=1, items=0)
+    for when in (datetime(2045, 3, 12, 20), datetime(2045, 3, 13, 13), datetime(2045, 3, 13, 21),
+                 datetime(2045, 4, 1, 12)):
+        reserve(restaurant, when)
+    cancelled = reserve(restaurant, datetime(2045, 3, 13, 17))
+    assert client.delete(f"/reservations/{cancelled['id']}", headers=client_headers).status_code == 204
+
+    series = DashboardService(db_session).get_reservation_counts(
+        ["day", "week", "month"], date(2045, 3, 1), date(2045, 4, 30), restaurant["id"])
+    assert series["day"] == {"2045-03-12": 1, "2045-03-13": 2, "2045-04-01": 1}
+    assert series["week"] == {"2045-03-06": 1, "2045-03-13": 2, "2045-03-27": 1}
+    assert series["month"] == {"2045-03-01": 3, "2045-04-01": 1}
+
+
+def test_endpoint_filters_by_inclusive_range(client, admin_headers, make_restaurant, reserve):
+    restaurant = make_restaurant(tables=1, items=0)
+    for day in (1, 2, 3):
+        reserve(restaurant, datetime(2046, 5, day, 20))
+
+    response = client.get("/dashboard/reservations", headers=admin_headers,
+                          params={"from": "2046-05-02", "to": "2046-05-03", "restaurant_id": restaurant["id"],
+                                  "granularity": "day"})
+    assert response.status_code == 200
+    assert response.json() == {"daily_reservations": {"2046-05-02": 1, "2046-05-03": 1}}
+    assert client.get("/dashboard/reservations", params={"granularity": "year"},
+                      headers=admin_headers).status_code == 400
\ No newline at end of file
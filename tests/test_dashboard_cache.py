@@ -0,0 +1,89 @@
+# src/tests/test_dashboard_cache.py
+import threading
+import time
+from contextlib import nullcontext
+
+from dashboard.domain.cache import DashboardCache
+
+
+class CountingLoader:
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, session):
+        with self._lock:
+            self.calls += 1
+            calls = self.calls
+        time.sleep(self.delay)
+        return calls
+
+
+def _cache(**kwargs) -> DashboardCache:
+    return DashboardCache(session_factory=lambda: nullcontext(None), **kwargs)
+
+
+def _wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_fresh_entries_are_served_without_recomputing():
+    cache, loader = _cache(ttl=60, max_stale=60), CountingLoader()
+    assert cache.get("counts", {"granularity": ["day"]}, loader, None) == 1
+    assert cache.get("counts", {"granularity": ["day"]}, loader, None) == 1
+    assert cache.get("counts", {"granularity": ["week"]}, loader, None) == 2
+    assert cache.metrics()["hits"] == 1
+
+
+def test_stale_entries_are_served_while_one_refresh_runs():
+    cache, loader = _cache(ttl=0.05, max_stale=60), CountingLoader(delay=0.1)
+    cache.get("counts", {}, loader, None)
+    time.sleep(0.06)
+    assert cache.get("counts", {}, loader, None) == 1
+    assert cache.get("counts", {}, loader, None) == 1
+    _wait_for(lambda: cache.metrics()["refreshes"] == 1)
+    assert cache.get("counts", {}, loader, None) == 2
+    assert loader.calls == 2
+    cache.shutdown()
+
+
+def test_writes_past_the_threshold_turn_entries_stale():
+    cache, loader = _cache(ttl=60, max_stale=60, write_threshold=2), CountingLoader()
+    cache.get("counts", {}, loader, None)
+    cache.note_writes()
+    assert cache.get("counts", {}, loader, None) == 1
+    assert cache.metrics()["hits"] == 1
+    cache.note_writes()
+    cache.get("counts", {}, loader, None)
+    _wait_for(lambda: cache.get("counts", {}, loader, None) == 2)
+    cache.shutdown()
+
+
+def test_concurrent_misses_share_one_computation():
+    cache, loader = _cache(ttl=60, max_stale=60), CountingLoader(delay=0.2)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("slow", {}, loader, None))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [1] * 5
+    assert loader.calls == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache, loader = _cache(ttl=60, max_stale=60, max_entries=2), CountingLoader()
+    for day in ("mon", "tue", "wed"):
+        cache.get("counts", {"day": day}, loader, None)
+    assert cache.metrics()["evictions"] == 1
+    assert cache.get("counts", {"day": "mon"}, loader, None) == 4
+
+
+def test_metrics_endpoint_is_admin_only(client, admin_headers, client_headers):
+    assert client.get("/dashboard/cache/metrics", headers=client_headers).status_code == 403
+    metrics = client.get("/dashboard/cache/metrics", headers=admin_headers).json()
+    assert {"hits", "stale_hits", "misses", "hit_ratio", "settings"} <= set(metrics)
\ No newline at end of file
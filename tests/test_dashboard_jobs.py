@@ -0,0 +1,73 @@
+# src/tests/test_dashboard_jobs.py
+import json
+import os
+import time
+from datetime import datetime, time as clock
+
+import pytest
+
+from dashboard.domain.jobs import ReportJobs
+from shared.exceptions import BadRequestException, ServiceUnavailableException
+
+
+def _wait_for_job(client, headers, job_id, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/dashboard/jobs/{job_id}", headers=headers).json()
+        if job["status"] in ("succeeded", "failed") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.2)
+
+
+def test_report_runs_in_a_worker_and_its_result_is_polled(client, admin_headers, make_restaurant, day, reserve):
+    restaurant = make_restaurant()
+    reserve(restaurant, datetime.combine(day, clock(20)), items=restaurant["items"])
+    response = client.post("/dashboard/jobs", headers=admin_headers,
+                           json={"kind": "dish_rankings", "params": {"restaurant_id": restaurant["id"]}})
+    assert response.status_code == 202
+    assert response.json()["status"] == "queued"
+
+    job = _wait_for_job(client, admin_headers, response.json()["id"])
+    assert job["status"] == "succeeded", job["error"]
+    [ranking] = job["result"]
+    assert ranking["restaurant_id"] == restaurant["id"]
+    assert sorted(dish["menu_item_id"] for dish in ranking["dishes"]) == sorted(restaurant["items"])
+
+
+@pytest.mark.parametrize("payload", [
+    {"kind": "slow_report", "params": {}},
+    {"kind": "dish_rankings", "params": {"limit": 0}},
+    {"kind": "dish_rankings", "params": {"unexpected": 1}},
+    {"kind": "occupancy_timeline", "params": {"date_from": "2030-01-08", "date_to": "2030-01-01"}},
+])
+def test_invalid_reports_are_refused_on_submit(client, admin_headers, payload):
+    assert client.post("/dashboard/jobs", headers=admin_headers, json=payload).status_code == 400
+
+
+def test_unknown_and_malformed_job_ids_are_not_found(client, admin_headers):
+    assert client.get(f"/dashboard/jobs/{'0' * 32}", headers=admin_headers).status_code == 404
+    assert client.get("/dashboard/jobs/..%2Fsecrets", headers=admin_headers).status_code == 404
+
+
+def test_jobs_are_admin_only(client, client_headers):
+    response = client.post("/dashboard/jobs", headers=client_headers, json={"kind": "dish_rankings", "params": {}})
+    assert response.status_code == 403
+
+
+def test_submissions_past_the_pending_limit_are_refused(tmp_path):
+    jobs = ReportJobs(directory=str(tmp_path), max_pending=0)
+    with pytest.raises(ServiceUnavailableException):
+        jobs.submit("dish_rankings", {})
+    with pytest.raises(BadRequestException):
+        jobs.submit("dish_rankings", {"limit": "many"})
+
+
+def test_finished_jobs_past_the_ttl_are_evicted(tmp_path):
+    jobs = ReportJobs(directory=str(tmp_path), result_ttl=60)
+    old, recent = tmp_path / f"{'a' * 32}.json", tmp_path / f"{'b' * 32}.json"
+    for path in (old, recent):
+        path.write_text(json.dumps({"status": "succeeded"}))
+    os.utime(old, (time.time() - 120, time.time() - 120))
+    assert jobs.evict_expired() == 1
+    assert jobs.get("a" * 32) is None
+    assert jobs.get("b" * 32) == {"status": "succeeded"}
\ No newline at end of file
@@ -0,0 +1,58 @@
+# src/tests/test_etag.py
+from shared.etag import RESTAURANTS_SCOPE, RevisionRegistry, revisions, tables_scope
+
+
+def test_restaurant_listing_revalidates_until_a_write(client, admin_headers, make_restaurant):
+    restaurant = make_restaurant(tables=0, items=0)
+    response = client.get("/restaurants/")
+    etag = response.headers["etag"]
+    assert response.status_code == 200
+    assert "must-revalidate" in response.headers["cache-control"]
+
+    cached = client.get("/restaurants/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    client.put(f"/restaurants/{restaurant['id']}", json={"location": "Norte"}, headers=admin_headers)
+    changed = client.get("/restaurants/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_table_and_menu_listings_are_scoped_per_restaurant(client, admin_headers, make_restaurant):
+    restaurant, other = make_restaurant(), make_restaurant()
+    tables = client.get(f"/restaurants/{restaurant['id']}/tables").headers["etag"]
+    menu = client.get(f"/menu/{restaurant['id']}/items").headers["etag"]
+
+    client.post(f"/restaurants/{other['id']}/tables", json={"capacity": 2, "location": "terraza", "table_number": 9},
+                headers=admin_headers)
+    assert client.get(f"/restaurants/{restaurant['id']}/tables", headers={"If-None-Match": tables}).status_code == 304
+
+    client.delete(f"/restaurants/tables/{restaurant['tables'][0]}", headers=admin_headers)
+    assert client.get(f"/restaurants/{restaurant['id']}/tables", headers={"If-None-Match": tables}).status_code == 200
+
+    assert client.get(f"/menu/{restaurant['id']}/items", headers={"If-None-Match": menu}).status_code == 304
+    client.delete(f"/menu/items/{restaurant['items'][0]}", headers=admin_headers)
+    assert client.get(f"/menu/{restaurant['id']}/items", headers={"If-None-Match": menu}).status_code == 200
+
+
+def test_if_none_match_uses_weak_comparison(client):
+    etag = client.get("/restaurants/").headers["etag"]
+    assert etag.startswith('W/"')
+    opaque = etag[2:]
+    assert client.get("/restaurants/", headers={"If-None-Match": f'"stale", {opaque}'}).status_code == 304
+    assert client.get("/restaurants/", headers={"If-None-Match": "*"}).status_code == 304
+    assert client.get("/restaurants/", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_revisions_are_shared_between_registries(client):
+    # Each uvicorn worker has its own registry; they must agree through the database.
+    other_worker = RevisionRegistry()
+    scope = tables_scope(987654)
+    assert other_worker.etag(RESTAURANTS_SCOPE, scope) == revisions.etag(RESTAURANTS_SCOPE, scope)
+
+    before = revisions.get(scope)[scope]
+    other_worker.bump(scope, scope)
+    assert revisions.get(scope)[scope] == before + 1
+    assert other_worker.etag(scope) == revisions.etag(scope)
\ No newline at end of file
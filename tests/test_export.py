@@ -0,0 +1,84 @@
+# src/tests/test_export.py
+import csv
+import io
+import json
+from datetime import datetime, time, timedelta
+
+import pytest
+from sqlmodel import Session
+
+from reservations import cli
+from reservations.domain.export import ReservationExporter
+from shared.database import engine
+
+
+def _csv_rows(payload: bytes):
+    return list(csv.DictReader(io.StringIO(payload.decode("utf-8"))))
+
+
+@pytest.fixture
+def booked(make_restaurant, day, reserve):
+    """A restaurant with one reservation on ``day`` and one the day after."""
+    restaurant = make_restaurant()
+    first = reserve(restaurant, datetime.combine(day, time(20)), items=restaurant["items"][:1])
+    second = reserve(restaurant, datetime.combine(day + timedelta(days=1), time(13)), table=1)
+    return restaurant, first, second
+
+
+def test_csv_export_filters_by_date_and_joins_details(client, admin_headers, booked, day):
+    restaurant, first, _ = booked
+    response = client.get("/reservations/export", headers=admin_headers,
+                          params={"from": day.isoformat(), "to": day.isoformat(),
+                                  "restaurant_id": restaurant["id"], "details": True})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    [row] = _csv_rows(response.content)
+    assert int(row["id"]) == first["id"]
+    assert row["restaurant_name"] == restaurant["name"]
+    assert row["table_number"] == "1"
+    assert json.loads(row["preordered_menu_items"]) == restaurant["items"][:1]
+
+
+def test_csv_is_written_one_block_per_chunk(booked):
+    restaurant, first, second = booked
+    with Session(engine) as session:
+        exporter = ReservationExporter(session, chunk_size=1)
+        blocks = list(exporter.csv_stream(exporter.query(restaurant_id=restaurant["id"])))
+    assert len(blocks) == 2
+    assert [int(row["id"]) for row in _csv_rows(b"".join(blocks))] == [first["id"], second["id"]]
+
+
+def test_empty_export_still_has_a_header(client, admin_headers):
+    response = client.get("/reservations/export", headers=admin_headers, params={"restaurant_id": 10 ** 9})
+    assert response.content.decode("utf-8").startswith("id,user_id,restaurant_id")
+    assert _csv_rows(response.content) == []
+
+
+def test_parquet_export_writes_a_row_group_per_chunk(client, admin_headers, booked):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    restaurant, first, second = booked
+    response = client.get("/reservations/export", headers=admin_headers,
+                          params={"restaurant_id": restaurant["id"], "format": "parquet"})
+    assert response.status_code == 200
+    table = parquet.read_table(io.BytesIO(response.content))
+    assert table.column("id").to_pylist() == [first["id"], second["id"]]
+    assert table.column("preordered_menu_items").to_pylist()[0] == restaurant["items"][:1]
+
+    sink = io.BytesIO()
+    with Session(engine) as session:
+        exporter = ReservationExporter(session, chunk_size=1)
+        assert exporter.write_parquet(exporter.query(restaurant_id=restaurant["id"]), sink) == 2
+    assert parquet.ParquetFile(io.BytesIO(sink.getvalue())).metadata.num_row_groups == 2
+
+
+def test_export_rejects_unknown_formats_and_non_admins(client, admin_headers, client_headers):
+    assert client.get("/reservations/export", headers=admin_headers, params={"format": "xlsx"}).status_code == 400
+    assert client.get("/reservations/export", headers=client_headers).status_code == 403
+
+
+def test_cli_exports_to_a_file(booked, tmp_path):
+    restaurant, first, second = booked
+    output = tmp_path / "reservations.csv"
+    assert cli.main(["export", "--restaurant-id", str(restaurant["id"]), "--chunk-size", "1",
+                     "--output", str(output)]) == 0
+    assert [int(row["id"]) for row in _csv_rows(output.read_bytes())] == [first["id"], second["id"]]
\ No newline at end of file
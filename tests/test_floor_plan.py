@@ -0,0 +1,42 @@
+# src/tests/test_floor_plan.py
+from datetime import datetime, time
+
+
+def _table(number: int, capacity: int = 4, location: str = "interior") -> dict:
+    return {"table_number": number, "capacity": capacity, "location": location}
+
+
+def _put(client, headers, restaurant, tables):
+    return client.put(f"/restaurants/{restaurant['id']}/tables:bulk", json={"tables": tables}, headers=headers)
+
+
+def test_floor_plan_creates_updates_and_deletes_by_table_number(client, admin_headers, make_restaurant):
+    restaurant = make_restaurant(tables=3)
+    response = _put(client, admin_headers, restaurant, [_table(1), _table(2, capacity=6), _table(4, location="terraza")])
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["created"], result["updated"], result["deleted"], result["unchanged"]) == (1, 1, 1, 1)
+    assert [(t["table_number"], t["capacity"], t["location"]) for t in result["tables"]] == \
+        [(1, 4, "interior"), (2, 6, "interior"), (4, 4, "terraza")]
+    # Matched tables keep their ids.
+    assert [t["id"] for t in result["tables"][:2]] == restaurant["tables"][:2]
+
+
+def test_floor_plan_refuses_to_delete_a_busy_table(client, admin_headers, make_restaurant, day, reserve):
+    restaurant = make_restaurant(tables=2)
+    reserve(restaurant, datetime.combine(day, time(20)), table=1)
+    response = _put(client, admin_headers, restaurant, [_table(1, capacity=8)])
+    assert response.status_code == 409
+    assert "2" in response.json()["detail"]
+
+    # Nothing was applied, not even the update of the table that stays.
+    tables = client.get(f"/restaurants/{restaurant['id']}/tables").json()
+    assert sorted((t["table_number"], t["capacity"]) for t in tables) == [(1, 4), (2, 4)]
+
+
+def test_floor_plan_validates_the_whole_plan(client, admin_headers, client_headers, make_restaurant):
+    restaurant = make_restaurant(tables=1)
+    assert _put(client, admin_headers, restaurant, [_table(3), _table(3)]).status_code == 400
+    assert _put(client, admin_headers, restaurant, [_table(3, capacity=20)]).status_code == 400
+    assert _put(client, admin_headers, {"id": 10 ** 9}, [_table(1)]).status_code == 404
+    assert _put(client, client_headers, restaurant, [_table(1)]).status_code == 403
\ No newline at end of file
@@ -0,0 +1,71 @@
+# src/tests/test_geo.py
+from datetime import datetime, time
+
+import pytest
+
+from restaurants.domain.geo import GeoGridIndex, haversine_km
+
+# Ushuaia: far from anything else the suite creates.
+LAT, LON = -54.8019, -68.3030
+
+
+def test_haversine_matches_known_distances():
+    assert haversine_km(0, 0, 0, 1) == pytest.approx(111.19, abs=0.01)
+    assert haversine_km(LAT, LON, LAT, LON) == 0
+
+
+def test_within_checks_exact_distance_across_cells():
+    index = GeoGridIndex(cell_degrees=0.01)
+    index.add(1, 0.0, 0.0)
+    index.add(2, 0.0, 0.03)     # ~3.3 km east, three cells away
+    index.add(3, 0.03, 0.03)    # ~4.7 km, outside a 4 km radius
+    index.add(4, 1.0, 1.0)
+    assert [point for point, _ in index.within(0.0, 0.0, 4)] == [1, 2]
+    assert [point for point, _ in index.within(0.0, 0.0, 5, limit=2)] == [1, 2]
+
+
+def test_within_wraps_around_the_antimeridian():
+    index = GeoGridIndex()
+    index.add(1, -17.0, 179.99)
+    index.add(2, -17.0, -179.99)
+    assert {point for point, _ in index.within(-17.0, 179.995, 5)} == {1, 2}
+
+
+def test_moved_and_removed_points_leave_their_cells():
+    index = GeoGridIndex()
+    index.add(1, 10.0, 10.0)
+    index.add(1, 20.0, 20.0)
+    assert index.within(10.0, 10.0, 1) == []
+    index.remove(1)
+    assert index.within(20.0, 20.0, 1) == [] and len(index) == 0
+
+
+def _place(client, headers, restaurant, lat, lon):
+    response = client.put(f"/restaurants/{restaurant['id']}", json={"latitude": lat, "longitude": lon}, headers=headers)
+    assert response.status_code == 200, response.text
+
+
+def test_nearby_follows_writes_and_filters_by_availability(client, admin_headers, make_restaurant, day, reserve):
+    near, far = make_restaurant(tables=1), make_restaurant(tables=1)
+    _place(client, admin_headers, near, LAT, LON)
+    _place(client, admin_headers, far, LAT + 0.03, LON)
+    results = client.get("/restaurants/nearby", params={"lat": LAT, "lon": LON, "radius": 5}).json()
+    assert [r["id"] for r in results] == [near["id"], far["id"]]
+    assert results[0]["distance_km"] == 0 and results[1]["distance_km"] == pytest.approx(3.34, abs=0.01)
+
+    at = datetime.combine(day, time(20))
+    reserve(near, at)
+    params = {"lat": LAT, "lon": LON, "radius": 5, "party_size": 2}
+    busy = client.get("/restaurants/nearby", params={**params, "at": at.isoformat()}).json()
+    assert [(r["id"], r["available_tables"]) for r in busy] == [(far["id"], 1)]
+    later = client.get("/restaurants/nearby", params={**params, "at": datetime.combine(day, time(22)).isoformat()}).json()
+    assert [r["id"] for r in later] == [near["id"], far["id"]]
+    closed = client.get("/restaurants/nearby", params={**params, "at": datetime.combine(day, time(10)).isoformat()}).json()
+    assert closed == []
+
+    _place(client, admin_headers, far, None, None)
+    assert [r["id"] for r in client.get("/restaurants/nearby", params={"lat": LAT, "lon": LON}).json()] == [near["id"]]
+
+
+def test_party_size_and_time_go_together(client):
+    assert client.get("/restaurants/nearby", params={"lat": LAT, "lon": LON, "party_size": 2}).status_code == 400
\ No newline at end of file
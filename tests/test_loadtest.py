@@ -0,0 +1,45 @@
+# src/tests/test_loadtest.py
+import argparse
+
+import pytest
+
+from benchmarks.loadtest import SLO, LoadReport, parse_mix, percentile
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(n) for n in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([], 99) == 0.0
+
+
+def test_parse_mix_rejects_unknown_scenarios_and_empty_mixes():
+    assert parse_mix("login=1,browse=6,book") == {"login": 1.0, "browse": 6.0, "book": 1.0}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("login=1,teleport=2")
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("login=0")
+
+
+def test_slo_parse_keeps_colons_in_the_route():
+    slo = SLO.parse("GET /restaurants/{restaurant_id}:p95=150")
+    assert (slo.route, slo.metric, slo.threshold) == ("GET /restaurants/{restaurant_id}", "p95", 150.0)
+    with pytest.raises(argparse.ArgumentTypeError):
+        SLO.parse("GET /restaurants/:p90=150")
+
+
+def test_slo_violations_per_route_and_wildcard():
+    report = LoadReport()
+    for latency in (10.0, 20.0, 30.0, 400.0):
+        report.record("GET /restaurants/", latency, 200)
+    report.record("POST /reservations/", 50.0, 500)
+    report.record("POST /reservations/", 60.0, 201)
+    summary = report.summary()
+
+    assert summary["POST /reservations/"]["error_rate"] == 0.5
+    assert summary["GET /restaurants/"]["statuses"] == {"200": 4}
+    assert SLO.parse("GET /restaurants/:p50=100").violations(summary) == []
+    assert len(SLO.parse("GET /restaurants/:p99=100").violations(summary)) == 1
+    assert len(SLO.parse("*:error_rate=0.1").violations(summary)) == 1
+    assert SLO.parse("GET /missing:p50=1").violations(summary) == ["GET /missing: no samples recorded"]
\ No newline at end of file
@@ -0,0 +1,82 @@
+# src/tests/test_menu_import.py
+import io
+import json
+
+import pytest
+
+from menu.domain.allergens import allergen_mask
+from menu.domain.importer import read_menu_file
+from shared.exceptions import PayloadTooLargeException
+
+CSV_MENU = (
+    "name,description,category,allergens\n"
+    "Tortilla,De patatas,Principal,huevo;lactosa\n"
+    "Flan,Casero,Postre,eggs|milk\n"
+)
+
+
+def _import(client, headers, restaurant, content, filename="menu.csv", **params):
+    return client.post("/menu/import", headers=headers, params={"restaurant_id": restaurant["id"], **params},
+                       files={"file": (filename, content.encode("utf-8"))})
+
+
+def _menu(client, restaurant):
+    return {item["name"]: item for item in client.get(f"/menu/{restaurant['id']}/items").json()}
+
+
+def test_dry_run_reports_changes_without_writing(client, admin_headers, make_restaurant):
+    restaurant = make_restaurant(items=0)
+    response = _import(client, admin_headers, restaurant, CSV_MENU, dry_run=True)
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["dry_run"], result["created"], result["updated"]) == (True, 2, 0)
+    assert [change["action"] for change in result["changes"]] == ["create", "create"]
+    assert _menu(client, restaurant) == {}
+
+
+def test_import_creates_then_updates_by_name(client, admin_headers, make_restaurant):
+    restaurant = make_restaurant(items=0)
+    assert _import(client, admin_headers, restaurant, CSV_MENU).json()["created"] == 2
+    assert _menu(client, restaurant)["Tortilla"]["allergen_mask"] == allergen_mask(["eggs", "milk"])
+
+    items = json.dumps([{"name": "Tortilla", "description": "De patatas y cebolla"},
+                        {"name": "Flan", "category": "Postre"},
+                        {"name": "Gazpacho", "description": "Frío", "category": "Entrada"}])
+    result = _import(client, admin_headers, restaurant, items, filename="menu.json").json()
+    assert (result["created"], result["updated"], result["unchanged"]) == (1, 1, 1)
+    assert result["changes"][0]["changes"] == {"description": "De patatas y cebolla"}
+    menu = _menu(client, restaurant)
+    assert menu["Tortilla"]["description"] == "De patatas y cebolla"
+    assert menu["Tortilla"]["allergen_mask"] == allergen_mask(["eggs", "milk"])  # not given, so kept
+    assert menu["Gazpacho"]["category"] == "Entrada"
+
+
+def test_duplicate_names_in_the_file_reject_the_whole_import(client, admin_headers, make_restaurant):
+    restaurant = make_restaurant(items=0)
+    response = _import(client, admin_headers, restaurant, CSV_MENU + "Tortilla,Otra,Principal,\n")
+    assert response.status_code == 400
+    assert "Row 3: duplicate of row 1" in response.json()["detail"]
+    assert _menu(client, restaurant) == {}
+
+
+@pytest.mark.parametrize("content, message", [
+    ("name,description,category\nSopa,Caliente,Sopas\n", "invalid category"),
+    ("name,allergens\nSopa,pimienta\n", "Unknown allergens"),
+    ("name\nSopa\n", "needs description, category"),
+])
+def test_invalid_rows_are_reported(client, admin_headers, make_restaurant, content, message):
+    restaurant = make_restaurant(items=0)
+    response = _import(client, admin_headers, restaurant, content)
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
+
+
+def test_unknown_restaurants_and_non_admins_are_refused(client, admin_headers, client_headers, make_restaurant):
+    assert _import(client, admin_headers, {"id": 10 ** 9}, CSV_MENU).status_code == 400
+    assert _import(client, client_headers, make_restaurant(items=0), CSV_MENU).status_code == 403
+
+
+def test_oversized_files_are_refused_before_parsing():
+    with pytest.raises(PayloadTooLargeException):
+        read_menu_file(io.BytesIO(b"x" * 11), max_bytes=10)
+    assert read_menu_file(io.BytesIO(b"x" * 10), max_bytes=10) == b"x" * 10
\ No newline at end of file
@@ -0,0 +1,79 @@
+# src/tests/test_menu_search.py
+from datetime import datetime, time
+
+import pytest
+
+from menu.domain.allergens import ALLERGENS, allergen_mask, allergen_names, canonical_allergen
+
+
+def test_allergen_names_and_aliases_pack_into_bits():
+    assert canonical_allergen(" Lácteos ") == "milk"
+    assert canonical_allergen("Frutos  secos") == "nuts"
+    mask = allergen_mask(["huevo", "gluten"])
+    assert allergen_names(mask) == ["gluten", "eggs"]
+    assert allergen_mask(["gluten", "pimienta"], strict=False) == allergen_mask(["gluten"])
+    with pytest.raises(ValueError):
+        allergen_mask(["pimienta"])
+
+
+def _item(client, headers, restaurant, name, category="Principal", allergens=(), description="De la casa"):
+    response = client.post(f"/menu/{restaurant['id']}/items", headers=headers,
+                           json={"name": name, "description": description, "category": category,
+                                 "allergens": list(allergens)})
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+@pytest.fixture
+def menu(client, admin_headers, make_restaurant):
+    restaurant = make_restaurant(items=0)
+    items = {
+        "tortilla": _item(client, admin_headers, restaurant, "Tortilla de patatas", allergens=["huevos"]),
+        "ensalada": _item(client, admin_headers, restaurant, "Ensalada de la huerta", category="Entrada"),
+        "flan": _item(client, admin_headers, restaurant, "Flan casero", category="Postre", allergens=["eggs", "milk"]),
+    }
+    return restaurant, items
+
+
+def _search(client, restaurant, **params):
+    response = client.get("/menu/search", params={"restaurant_id": restaurant["id"], **params})
+    assert response.status_code == 200, response.text
+    return [item["name"] for item in response.json()]
+
+
+def test_items_round_trip_allergen_names(client, admin_headers, menu):
+    _, items = menu
+    assert items["flan"]["allergen_mask"] == allergen_mask(["eggs", "milk"])
+    assert client.get("/menu/allergens").json() == list(ALLERGENS)
+    response = client.put(f"/menu/items/{items['flan']['id']}", headers=admin_headers, json={"allergens": ["milk"]})
+    assert response.json()["allergen_mask"] == allergen_mask(["milk"])
+    response = client.put(f"/menu/items/{items['flan']['id']}", headers=admin_headers, json={"allergens": ["pimienta"]})
+    assert response.status_code == 400
+
+
+def test_search_filters_by_text_category_and_allergens(client, menu):
+    restaurant, _ = menu
+    assert _search(client, restaurant, q="tortila") == ["Tortilla de patatas"]
+    assert sorted(_search(client, restaurant, category=["Entrada", "Postre"])) == ["Ensalada de la huerta", "Flan casero"]
+    assert _search(client, restaurant, exclude_allergens="eggs,milk") == ["Ensalada de la huerta"]
+    assert _search(client, restaurant, exclude_allergens="lactosa", category="Postre") == []
+
+
+def test_search_follows_menu_writes(client, admin_headers, menu):
+    restaurant, items = menu
+    _search(client, restaurant)  # loads the restaurant's index
+    client.put(f"/menu/items/{items['tortilla']['id']}", headers=admin_headers, json={"name": "Tortilla vegana", "allergens": []})
+    assert "Tortilla vegana" in _search(client, restaurant, exclude_allergens="eggs")
+    _item(client, admin_headers, restaurant, "Gazpacho andaluz", category="Entrada")
+    assert _search(client, restaurant, q="gazpacho") == ["Gazpacho andaluz"]
+    client.delete(f"/menu/items/{items['ensalada']['id']}", headers=admin_headers)
+    assert "Ensalada de la huerta" not in _search(client, restaurant)
+
+
+def test_preorders_with_the_guests_allergens_are_rejected(client, menu, day, reserve):
+    restaurant, items = menu
+    restaurant["tables"] = [table["id"] for table in client.get(f"/restaurants/{restaurant['id']}/tables").json()]
+    when = datetime.combine(day, time(20))
+    reserve(restaurant, when, items=[items["flan"]["id"]], allergens=["Lactosa"], expected_status=400)
+    reservation = reserve(restaurant, when, items=[items["ensalada"]["id"]], allergens=["Lactosa", "picante"])
+    assert reservation["allergens"] == ["milk", "picante"]
\ No newline at end of file
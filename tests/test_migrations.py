@@ -0,0 +1,104 @@
+# src/tests/test_migrations.py
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlmodel import SQLModel
+
+from menu.domain.allergens import allergen_names
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _alembic(database_url: str, *args: str):
+    result = subprocess.run([sys.executable, "-m", "alembic", *args], cwd=ROOT,
+                            env=dict(os.environ, DATABASE_URL=database_url), capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_upgrade_head_builds_the_model_schema(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    _alembic(database_url, "upgrade", "head")
+
+    inspector = sa.inspect(sa.create_engine(database_url))
+    for table in SQLModel.metadata.sorted_tables:
+        migrated = {column["name"]: column for column in inspector.get_columns(table.name)}
+        assert set(migrated) == {column.name for column in table.columns}, table.name
+        for column in table.columns:
+            assert migrated[column.name]["nullable"] == column.nullable, f"{table.name}.{column.name}"
+        indexed = {tuple(index["column_names"]) for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            assert tuple(column.name for column in index.columns) in indexed, index.name
+
+    _alembic(database_url, "downgrade", "base")
+    assert sa.inspect(sa.create_engine(database_url)).get_table_names() == ["alembic_version"]
+
+
+def test_upgrade_seats_existing_reservations(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    _alembic(database_url, "upgrade", "889f17246e94")
+    engine = sa.create_engine(database_url)
+    with engine.begin() as connection:
+        connection.execute(sa.text(
+            "INSERT INTO restaurant (id, name, location, opening_time, closing_time) "
+            "VALUES (1, 'Legacy', 'Centro', '12:00:00', '23:00:00')"))
+        connection.execute(sa.text(
+            "INSERT INTO \"user\" (id, email, name, role, hashed_password) VALUES (1, 'a@b.c', 'A', 'client', 'x')"))
+        for table_id, capacity in ((1, 8), (2, 2), (3, 4)):
+            connection.execute(sa.text(
+                "INSERT INTO \"table\" (id, capacity, location, table_number, restaurant_id) "
+                f"VALUES ({table_id}, {capacity}, 'interior', {table_id}, 1)"))
+        for reservation_id, guests in ((1, 3), (2, 10)):
+            connection.execute(sa.text(
+                "INSERT INTO reservation (id, user_id, restaurant_id, num_guests, reservation_time, status) "
+                f"VALUES ({reservation_id}, 1, 1, {guests}, '2030-01-05 20:00:00.000000', 'CONFIRMED')"))
+
+    _alembic(database_url, "upgrade", "head")
+    reservation = sa.table("reservation", sa.column("id"), sa.column("table_id"), sa.column("end_time", sa.DateTime()),
+                           sa.column("preordered_menu_items", sa.JSON()))
+    with engine.connect() as connection:
+        rows = connection.execute(sa.select(reservation).order_by(reservation.c.id)).all()
+    # Smallest table that fits, else the largest one.
+    assert [row.table_id for row in rows] == [3, 1]
+    assert rows[0].end_time == datetime(2030, 1, 5, 22, 0)
+    assert rows[0].preordered_menu_items == []
+
+def test_upgrade_packs_legacy_allergens(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'allergens.db'}"
+    _alembic(database_url, "upgrade", "4d350fcad264")
+    engine = sa.create_engine(database_url)
+    with engine.begin() as connection:
+        connection.execute(sa.text(
+            "INSERT INTO restaurant (id, name, location, opening_time, closing_time) "
+            "VALUES (1, 'Legacy', 'Centro', '12:00:00', '23:00:00')"))
+        connection.execute(sa.text("ALTER TABLE menuitem ADD COLUMN allergens JSON"))
+        for item_id, allergens in ((1, '["Huevo", "lactosa", "picante"]'), (2, None)):
+            connection.execute(sa.text(
+                "INSERT INTO menuitem (id, name, description, category, is_available, restaurant_id, allergens) "
+                "VALUES (:id, :name, 'x', 'Principal', 1, 1, :allergens)"),
+                {"id": item_id, "name": f"Plato {item_id}", "allergens": allergens})
+
+    _alembic(database_url, "upgrade", "head")
+    with engine.connect() as connection:
+        masks = connection.execute(sa.text("SELECT allergen_mask FROM menuitem ORDER BY id")).scalars().all()
+    assert [allergen_names(mask) for mask in masks] == [["eggs", "milk"], []]
+
+def test_upgrade_renames_duplicate_menu_items(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'duplicates.db'}"
+    _alembic(database_url, "upgrade", "8b1d4e7c2a90")
+    engine = sa.create_engine(database_url)
+    with engine.begin() as connection:
+        connection.execute(sa.text(
+            "INSERT INTO restaurant (id, name, location, opening_time, closing_time) "
+            "VALUES (1, 'Legacy', 'Centro', '12:00:00', '23:00:00')"))
+        for item_id in (1, 2):
+            connection.execute(sa.text(
+                "INSERT INTO menuitem (id, name, description, category, is_available, restaurant_id, allergen_mask) "
+                f"VALUES ({item_id}, 'Sopa', 'x', 'Entrada', 1, 1, 0)"))
+
+    _alembic(database_url, "upgrade", "head")
+    with engine.connect() as connection:
+        names = connection.execute(sa.text("SELECT name FROM menuitem ORDER BY id")).scalars().all()
+    assert names == ["Sopa", "Sopa (2)"]
\ No newline at end of file
@@ -0,0 +1,57 @@
+# src/tests/test_occupancy.py
+from datetime import datetime, time
+
+import numpy as np
+
+from dashboard.domain.occupancy import fold_hour_of_day, occupancy_matrices, utilization
+
+
+def test_difference_arrays_match_a_per_bucket_loop():
+    rng = np.random.default_rng(7)
+    n_restaurants, n_buckets, bucket_seconds = 3, 48, 1800
+    rows = rng.integers(0, n_restaurants, 200)
+    starts = rng.integers(-7200, n_buckets * bucket_seconds, 200).astype(np.float64)
+    ends = starts + rng.integers(1, 4 * 3600, 200)
+    guests = rng.integers(1, 9, 200).astype(np.float64)
+
+    seats, tables = occupancy_matrices(rows, starts, ends, guests, n_restaurants, 0.0, n_buckets, bucket_seconds)
+
+    expected_seats = np.zeros((n_restaurants, n_buckets))
+    expected_tables = np.zeros((n_restaurants, n_buckets))
+    for row, start, end, count in zip(rows, starts, ends, guests):
+        for bucket in range(n_buckets):
+            if start < (bucket + 1) * bucket_seconds and end > bucket * bucket_seconds:
+                expected_seats[row, bucket] += count
+                expected_tables[row, bucket] += 1
+    assert np.array_equal(seats, expected_seats)
+    assert np.array_equal(tables, expected_tables)
+
+
+def test_utilization_and_hour_of_day_fold():
+    in_use = np.array([[2, 4, 4, 0], [1, 1, 1, 1]], dtype=np.float32)
+    ratios = utilization(in_use, np.array([8, 0]))
+    assert ratios.tolist() == [[0.25, 0.5, 0.5, 0.0], [0.0, 0.0, 0.0, 0.0]]
+    folded = fold_hour_of_day(ratios, 23, buckets_per_hour=2)
+    assert folded.shape == (2, 24)
+    assert folded[0, 23] == 0.375 and folded[0, 0] == 0.25
+
+
+def test_timeline_counts_seats_and_tables_of_live_reservations(client, admin_headers, make_restaurant, reserve, day):
+    restaurant = make_restaurant(tables=2, items=0)
+    reserve(restaurant, datetime.combine(day, time(13)), table=0, guests=3)
+    cancelled = reserve(restaurant, datetime.combine(day, time(13)), table=1, guests=4, headers=admin_headers)
+    client.delete(f"/reservations/{cancelled['id']}", headers=admin_headers)
+
+    response = client.get("/dashboard/occupancy/timeline", headers=admin_headers,
+                          params={"from": day.isoformat(), "to": day.isoformat(), "restaurant_id": restaurant["id"]})
+    assert response.status_code == 200, response.text
+    timeline = response.json()
+    assert timeline["restaurants"][0]["total_seats"] == 8
+    seats, tables = timeline["seat_utilization"][0], timeline["table_utilization"][0]
+    assert [hour for hour, ratio in enumerate(seats) if ratio] == [13, 14]
+    assert (seats[13], tables[13]) == (0.375, 0.5)
+
+
+def test_timeline_rejects_invalid_buckets(client, admin_headers):
+    for params in ({"bucket_minutes": 7}, {"bucket_minutes": 120, "fold": "hour_of_day"}, {"fold": "weekday"}):
+        assert client.get("/dashboard/occupancy/timeline", params=params, headers=admin_headers).status_code == 400
\ No newline at end of file
@@ -0,0 +1,80 @@
+# src/tests/test_pagination.py
+from datetime import datetime, time
+
+from shared.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+def _walk(client, url, **params):
+    """Follows X-Next-Cursor until the last page, returning the pages' rows."""
+    pages = []
+    while True:
+        response = client.get(url, params=params)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        if NEXT_CURSOR_HEADER not in response.headers:
+            return pages
+        params["cursor"] = response.headers[NEXT_CURSOR_HEADER]
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(1234567)) == 1234567
+
+
+def test_table_listing_follows_the_cursor_in_id_order(client, make_restaurant):
+    restaurant = make_restaurant(tables=5, items=0)
+    pages = _walk(client, f"/restaurants/{restaurant['id']}/tables", limit=2)
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [row["id"] for page in pages for row in page] == restaurant["tables"]
+
+
+def test_exact_last_page_has_no_cursor(client, make_restaurant):
+    restaurant = make_restaurant(tables=2, items=0)
+    response = client.get(f"/restaurants/{restaurant['id']}/tables", params={"limit": 2})
+    assert len(response.json()) == 2
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_sparse_fields_always_keep_the_id(client, make_restaurant):
+    restaurant = make_restaurant(tables=1, items=2)
+    tables = client.get(f"/restaurants/{restaurant['id']}/tables", params={"fields": "capacity"}).json()
+    assert tables == [{"id": restaurant["tables"][0], "capacity": 4}]
+    items = client.get(f"/menu/{restaurant['id']}/items", params={"fields": "name,id,name"}).json()
+    assert [set(row) for row in items] == [{"id", "name"}, {"id", "name"}]
+
+
+def test_unknown_fields_and_bad_cursors_are_rejected(client, admin_headers, make_restaurant):
+    restaurant = make_restaurant(tables=1, items=1)
+    for url in ("/restaurants/", f"/restaurants/{restaurant['id']}/tables", f"/menu/{restaurant['id']}/items"):
+        response = client.get(url, params={"fields": "id,hashed_password"})
+        assert response.status_code == 400
+        assert "hashed_password" in response.json()["detail"]
+    assert client.get("/reservations/", params={"fields": "secret"}, headers=admin_headers).status_code == 400
+    assert client.get("/restaurants/", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/restaurants/", params={"limit": 0}).status_code == 422
+
+
+def test_menu_filters_by_category_and_availability(client, admin_headers, make_restaurant):
+    restaurant = make_restaurant(tables=0, items=3)
+    first, second, third = restaurant["items"]
+    client.put(f"/menu/items/{second}", json={"category": "Postre"}, headers=admin_headers)
+    client.put(f"/menu/items/{third}", json={"is_available": False}, headers=admin_headers)
+
+    url = f"/menu/{restaurant['id']}/items"
+    assert [row["id"] for row in client.get(url, params={"category": "Postre"}).json()] == [second]
+    assert [row["id"] for row in client.get(url, params={"available": True}).json()] == [first, second]
+    assert [row["id"] for row in client.get(url, params={"available": False, "category": "Principal"}).json()] == [third]
+
+def test_reservation_listings_are_paginated(client, admin_headers, client_headers, make_restaurant, reserve, day):
+    restaurant = make_restaurant(tables=3, items=0)
+    booked = [reserve(restaurant, datetime.combine(day, time(hour)), table=n)["id"]
+              for n, hour in enumerate((12, 15, 18))]
+
+    response = client.get("/reservations/", params={"restaurant_id": restaurant["id"], "limit": 2},
+                          headers=admin_headers)
+    assert [row["id"] for row in response.json()] == booked[:2]
+    rest = client.get("/reservations/", headers=admin_headers,
+                      params={"restaurant_id": restaurant["id"], "cursor": response.headers[NEXT_CURSOR_HEADER]})
+    assert [row["id"] for row in rest.json()] == booked[2:]
+
+    mine = client.get("/reservations/me", params={"limit": 500, "fields": "restaurant_id"}, headers=client_headers)
+    assert {"id": booked[0], "restaurant_id": restaurant["id"]} in mine.json()
\ No newline at end of file
@@ -0,0 +1,115 @@
+# src/tests/test_popularity.py
+import json
+import os
+import subprocess
+import sys
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from dashboard.domain.popularity import DishPopularityTracker, SpaceSaving, _dump, _record, dish_popularity
+
+
+def test_space_saving_keeps_heavy_hitters_within_capacity():
+    summary = SpaceSaving(capacity=3)
+    stream = [1] * 50 + [2] * 30 + list(range(100, 140)) + [1] * 10
+    for item in stream:
+        summary.add(item)
+    assert len(summary.counts) == 3
+    top_item, count = summary.top(1)[0]
+    assert top_item == 1
+    # Counts over-estimate by at most the recorded error.
+    assert count - summary.errors[1] <= 60 <= count
+
+
+def test_space_saving_merge_adds_counts_and_remove_floors_at_zero():
+    left, right = SpaceSaving(capacity=4), SpaceSaving(capacity=4)
+    left.add(1, 5)
+    left.add(2, 1)
+    right.add(1, 2)
+    right.add(3, 4)
+    left.merge(right)
+    assert left.top(3) == [(1, 7), (3, 4), (2, 1)]
+    left.remove(2, 5)
+    assert left.top(3) == [(1, 7), (3, 4)]
+
+
+def test_windows_merge_only_the_days_they_cover():
+    tracker = DishPopularityTracker(capacity=8, path=None)
+    today = date(2030, 6, 30)
+    tracker.record(1, today, [10, 11])
+    tracker.record(1, today - timedelta(days=20), [11])
+    tracker.record(1, today - timedelta(days=60), [12, 12, 12])
+    tracker.record(2, today, [12])
+
+    assert tracker.top(5, 7, restaurant_id=1, today=today) == [(10, 1), (11, 1)]
+    assert tracker.top(5, 30, restaurant_id=1, today=today) == [(11, 2), (10, 1)]
+    assert tracker.top(5, 90, restaurant_id=1, today=today) == [(12, 3), (11, 2), (10, 1)]
+    assert tracker.top(1, 90, today=today) == [(12, 4)]
+    with pytest.raises(ValueError):
+        tracker.top(5, 14, today=today)
+
+
+def _dishes(client, admin_headers, restaurant):
+    response = client.get("/dashboard/dishes", params={"restaurant_id": restaurant["id"], "window": 7},
+                          headers=admin_headers)
+    assert response.status_code == 200
+    return {dish["menu_item_id"]: dish["count"] for dish in response.json()}
+
+
+def test_cancelling_withdraws_pre_orders(client, admin_headers, client_headers, make_restaurant, reserve, day):
+    restaurant = make_restaurant(tables=2, items=2)
+    first, second = restaurant["items"]
+    reserve(restaurant, datetime.combine(day, time(13)), table=0, items=[first, second])
+    cancelled = reserve(restaurant, datetime.combine(day, time(20)), table=1, items=[first])
+    assert _dishes(client, admin_headers, restaurant) == {first: 2, second: 1}
+
+    assert client.delete(f"/reservations/{cancelled['id']}", headers=client_headers).status_code == 204
+    assert _dishes(client, admin_headers, restaurant) == {first: 1, second: 1}
+
+
+def test_rebuild_skips_cancelled_reservations(client, client_headers, db_session, make_restaurant, reserve, day):
+    restaurant = make_restaurant(tables=2, items=2)
+    first, second = restaurant["items"]
+    reserve(restaurant, datetime.combine(day, time(13)), table=0, items=[first])
+    cancelled = reserve(restaurant, datetime.combine(day, time(20)), table=1, items=[second])
+    client.delete(f"/reservations/{cancelled['id']}", headers=client_headers)
+
+    tracker = DishPopularityTracker(path=None)
+    tracker.rebuild(db_session)
+    assert tracker.top(5, 7, restaurant_id=restaurant["id"]) == dish_popularity.top(5, 7, restaurant_id=restaurant["id"])
+    assert tracker.top(5, 7, restaurant_id=restaurant["id"]) == [(first, 1)]
+
+
+def _exited_pid() -> int:
+    child = subprocess.Popen([sys.executable, "-c", "pass"])
+    child.wait()
+    return child.pid
+
+
+def test_startup_folds_exited_workers_files_into_the_base(db_session, tmp_path):
+    path = str(tmp_path / "dish_popularity.json")
+    tracker = DishPopularityTracker(capacity=8, path=path)
+    tracker.rebuild(db_session)
+    with open(path) as fh:
+        epoch = json.load(fh)["epoch"]
+
+    day = date.today() + timedelta(days=1)
+    added, withdrawn = {}, {}
+    _record(added, 8, 999001, day, [1, 1, 2], 1)
+    _record(withdrawn, 8, 999001, day, [2], 1)
+    leftover = tracker.delta_path(_exited_pid())
+    with open(leftover, "w") as fh:
+        json.dump({"epoch": epoch, "added": _dump(added), "withdrawn": _dump(withdrawn)}, fh)
+    stale = tracker.delta_path(_exited_pid())
+    with open(stale, "w") as fh:
+        json.dump({"epoch": "an-older-base", "added": _dump(added), "withdrawn": []}, fh)
+
+    restarted = DishPopularityTracker(capacity=8, path=path)
+    assert restarted.load()
+    assert not os.path.exists(leftover) and not os.path.exists(stale)
+    assert restarted.top(5, 7, restaurant_id=999001) == [(1, 2)]
+    # The folded counts now live in the base, so every later worker sees them too.
+    another = DishPopularityTracker(capacity=8, path=path)
+    another.load()
+    assert another.top(5, 7, restaurant_id=999001) == [(1, 2)]
\ No newline at end of file
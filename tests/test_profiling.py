@@ -0,0 +1,55 @@
+# src/tests/test_profiling.py
+import threading
+import time
+
+from shared.profiling import ProfileStore, StackSampler
+
+
+def _spin(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_records_busy_threads_as_collapsed_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin, args=(stop,))
+    worker.start()
+    sampler = StackSampler(interval=0.001)
+    sampler.start()
+    time.sleep(0.05)
+    sampler.stop()
+    stop.set()
+    worker.join()
+    assert sampler.samples > 0
+    # One "root;...;leaf count" line per stack.
+    stacks = dict(line.rsplit(" ", 1) for line in sampler.collapsed().splitlines())
+    [spinning] = [stack for stack in stacks if stack.endswith("test_profiling.py:_spin")]
+    assert spinning.startswith("threading.py:_bootstrap;") and int(stacks[spinning]) > 0
+
+
+def test_store_keeps_only_the_newest_profiles(tmp_path):
+    store = ProfileStore(directory=str(tmp_path), ring_size=2)
+    for number in range(3):
+        store.save({"id": f"{number:013d}-abc", "collapsed": "a;b 1"})
+    assert [profile["id"] for profile in store.list()] == ["0000000000002-abc", "0000000000001-abc"]
+    assert "collapsed" not in store.list()[0]
+    assert store.get("0000000000000-abc") is None
+    assert store.get("../0000000000002-abc") is None
+
+
+def test_admins_can_profile_a_request_and_download_it(client, admin_headers):
+    response = client.get("/restaurants/", headers={**admin_headers, "X-Profile": "1"})
+    profile_id = response.headers["x-profile-id"]
+    [summary] = [p for p in client.get("/diagnostics/profiles", headers=admin_headers).json() if p["id"] == profile_id]
+    assert (summary["path"], summary["status"], summary["reason"]) == ("/restaurants/", 200, "header")
+
+    download = client.get(f"/diagnostics/profiles/{profile_id}", headers=admin_headers)
+    assert download.status_code == 200
+    assert download.headers["content-disposition"] == f'attachment; filename="{profile_id}.folded"'
+    assert client.get("/diagnostics/profiles/missing", headers=admin_headers).status_code == 404
+
+
+def test_profiling_is_admin_only(client, client_headers):
+    assert "x-profile-id" not in client.get("/restaurants/", headers={**client_headers, "X-Profile": "1"}).headers
+    assert "x-profile-id" not in client.get("/restaurants/", headers={"X-Profile": "1"}).headers
+    assert client.get("/diagnostics/profiles", headers=client_headers).status_code == 403
\ No newline at end of file
@@ -0,0 +1,110 @@
+# src/tests/test_recorder.py
+import argparse
+import json
+import os
+from datetime import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.loadtest import ADMIN_EMAIL, Fixture
+from benchmarks.replay import TraceMapper, compare, load_traces
+from shared.recorder import REDACTED, TrafficRecorder, TrafficRecorderMiddleware, body_shape, sanitize_query, user_key
+
+
+def test_body_shape_keeps_structure_not_values():
+    body = {"name": "Ana", "email": "ana@example.com", "guests": 2, "price": 9.5, "vip": True, "note": None,
+            "at": "2030-01-07T20:00:00", "day": "2030-01-07", "opens": "12:00", "items": [1, 2, 3]}
+    assert body_shape(body) == {"name": "str", "email": "email", "guests": "int", "price": "float", "vip": "bool",
+                                "note": "null", "at": "datetime", "day": "date", "opens": "time",
+                                "items": ["int", "int", "int"]}
+
+
+def test_sanitize_query_redacts_credentials_and_coarsens_coordinates():
+    query = b"access_token=abc&Email=a%40b.c&lat=-34.603722&lon=oops&limit=20"
+    assert sanitize_query(query) == [("access_token", REDACTED), ("Email", REDACTED), ("lat", "-34.60"),
+                                     ("lon", REDACTED), ("limit", "20")]
+
+
+def _recorded(tmp_path, requests):
+    recorder = TrafficRecorder(directory=str(tmp_path))
+    client = TestClient(TrafficRecorderMiddleware(main.app, recorder=recorder, enabled=True))
+    for method, url, kwargs in requests:
+        client.request(method, url, **kwargs)
+    recorder.shutdown()
+    return load_traces([str(tmp_path)])
+
+
+def test_middleware_records_sanitized_traces(tmp_path, client, admin_headers, make_restaurant):
+    restaurant = make_restaurant(tables=1, items=0)
+    traces = _recorded(tmp_path, [
+        ("GET", f"/restaurants/{restaurant['id']}?token=secret", {"headers": admin_headers}),
+        ("POST", "/auth/token", {"data": {"username": "admin@tests.local", "password": "secret"}}),
+        ("POST", f"/menu/{restaurant['id']}/items", {"headers": admin_headers, "json": {"name": "Flan secreto"}}),
+        ("GET", "/diagnostics/sql", {"headers": admin_headers}),
+    ])
+    written = "".join(open(os.path.join(tmp_path, name)).read() for name in os.listdir(tmp_path))
+    assert "secret" not in written and "Flan" not in written and "tests.local" not in written
+
+    read, login, create = traces
+    assert (read["route"], read["path_params"], read["status"]) == \
+        ("/restaurants/{restaurant_id}", {"restaurant_id": str(restaurant["id"])}, 200)
+    assert read["query"] == [["token", REDACTED]]
+    assert (read["role"], read["user"]) == ("admin", user_key("admin@tests.local"))
+    assert login["body"] == {"username": "str", "password": "str"}
+    assert (login["role"], login["user"]) == ("anonymous", user_key("admin@tests.local"))
+    assert create["body"] == {"name": "str"} and create["status"] == 422
+    assert [trace["ts"] for trace in traces] == sorted(trace["ts"] for trace in traces)
+
+
+def test_recorder_rotates_and_keeps_the_newest_files(tmp_path):
+    for stamp in ("20000101T000000", "20000101T000001", "20000101T000002"):
+        (tmp_path / f"traffic-{stamp}-1.jsonl").write_text(json.dumps({"ts": int(stamp[-1])}) + "\n")
+    recorder = TrafficRecorder(directory=str(tmp_path), max_bytes=1, keep=2)
+    recorder._write({"ts": 3})
+    recorder._file.close()
+    assert len(os.listdir(tmp_path)) == 2
+    assert [trace["ts"] for trace in load_traces([str(tmp_path)])] == [2, 3]
+
+
+def _fixture() -> Fixture:
+    return Fixture(restaurants=[(1, time(12), time(23)), (2, time(12), time(23))],
+                   tables={1: [(10, 4), (11, 2)], 2: [(20, 6)]}, menu_items={1: [100, 101], 2: [200]},
+                   clients=[(7, "client1@loadtest.local"), (8, "client2@loadtest.local")])
+
+
+def test_trace_mapper_is_deterministic_and_keeps_ids_consistent():
+    trace = {"ts": 1.0, "method": "POST", "route": "/reservations/", "path_params": {}, "query": [],
+             "content_type": "application/json", "role": "client", "user": "abc",
+             "body": {"user_id": "int", "restaurant_id": "int", "table_id": "int", "num_guests": "int",
+                      "reservation_time": "datetime", "preordered_menu_items": ["int"]}}
+    admin = dict(trace, route="/restaurants/{restaurant_id}", method="GET", path_params={"restaurant_id": 99},
+                 body=None, role="admin", user="def")
+    requests = [TraceMapper(_fixture(), {}, [trace, admin], seed=3).request(n, t) for n, t in enumerate([trace, admin])]
+    assert requests == [TraceMapper(_fixture(), {}, [trace, admin], seed=3).request(n, t)
+                        for n, t in enumerate([trace, admin])]
+
+    body = requests[0]["json"]
+    tables = dict(_fixture().tables)[body["restaurant_id"]]
+    capacity = dict(tables)[body["table_id"]]
+    assert 1 <= body["num_guests"] <= capacity
+    assert set(body["preordered_menu_items"]) <= set(_fixture().menu_items[body["restaurant_id"]])
+    assert body["user_id"] in (7, 8)
+    assert requests[1]["url"] in ("/restaurants/1", "/restaurants/2")
+    assert TraceMapper(_fixture(), {}, [admin], seed=3).account(admin) == (ADMIN_EMAIL, 0)
+
+
+def test_compare_fails_on_regressions(tmp_path, capsys):
+    def summary(path, p95):
+        metrics = {"count": 10, "p50_ms": 10.0, "p95_ms": p95, "p99_ms": p95}
+        with open(path, "w") as fh:
+            json.dump({"routes": {"GET /restaurants/": metrics}}, fh)
+        return str(path)
+
+    args = argparse.Namespace(before=summary(tmp_path / "before.json", 20.0), after=summary(tmp_path / "after.json", 30.0),
+                              metric="p95", max_regression=10.0, min_delta_ms=1.0)
+    assert compare(args) == 1
+    assert "Regression: GET /restaurants/: p95 20.0 -> 30.0 ms" in capsys.readouterr().out
+    args.max_regression = 60.0
+    assert compare(args) == 0
\ No newline at end of file
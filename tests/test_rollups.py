@@ -0,0 +1,65 @@
+# src/tests/test_rollups.py
+from datetime import datetime, time, timedelta
+
+from sqlmodel import select
+
+from dashboard.domain.entities import ReservationDailyStats
+from dashboard.domain.rollups import ReservationRollup
+
+
+def _daily(client, admin_headers, restaurant):
+    response = client.get("/dashboard/reservations/daily", params={"restaurant_id": restaurant["id"]},
+                          headers=admin_headers)
+    assert response.status_code == 200
+    return {row["day"]: row for row in response.json()}
+
+
+def test_create_counts_guests_and_distinct_tables(client, admin_headers, make_restaurant, reserve, day):
+    restaurant = make_restaurant(tables=2, items=0)
+    reserve(restaurant, datetime.combine(day, time(13)), table=0, guests=3)
+    reserve(restaurant, datetime.combine(day, time(18)), table=0, guests=2, headers=admin_headers)
+    reserve(restaurant, datetime.combine(day, time(20)), table=1, guests=4)
+
+    stats = _daily(client, admin_headers, restaurant)[day.isoformat()]
+    assert (stats["pending_count"], stats["total_guests"], stats["tables_used"]) == (3, 9, 2)
+
+
+def test_cancel_moves_the_reservation_to_the_cancelled_count(client, admin_headers, client_headers,
+                                                              make_restaurant, reserve, day):
+    restaurant = make_restaurant(tables=2, items=0)
+    kept = reserve(restaurant, datetime.combine(day, time(13)), table=0, guests=2)
+    cancelled = reserve(restaurant, datetime.combine(day, time(20)), table=1, guests=4)
+    assert client.delete(f"/reservations/{cancelled['id']}", headers=client_headers).status_code == 204
+
+    stats = _daily(client, admin_headers, restaurant)[day.isoformat()]
+    assert (stats["pending_count"], stats["cancelled_count"]) == (1, 1)
+    # Cancelled reservations free their guests and table.
+    assert (stats["total_guests"], stats["tables_used"]) == (kept["num_guests"], 1)
+
+
+def test_moving_a_reservation_refreshes_both_days(client, admin_headers, client_headers, make_restaurant,
+                                                  reserve, day):
+    restaurant = make_restaurant(tables=1, items=0)
+    reservation = reserve(restaurant, datetime.combine(day, time(13)))
+    next_day = day + timedelta(days=1)
+    response = client.patch(f"/reservations/{reservation['id']}", headers=client_headers,
+                            json={"reservation_time": datetime.combine(next_day, time(19)).isoformat()})
+    assert response.status_code == 200, response.text
+
+    daily = _daily(client, admin_headers, restaurant)
+    assert day.isoformat() not in daily
+    assert daily[next_day.isoformat()]["pending_count"] == 1
+
+
+def test_rebuild_matches_incremental_refreshes(db_session, make_restaurant, reserve, day):
+    restaurant = make_restaurant(tables=2, items=0)
+    reserve(restaurant, datetime.combine(day, time(13)), table=0)
+    reserve(restaurant, datetime.combine(day + timedelta(days=2), time(20)), table=1, guests=3)
+    query = (select(ReservationDailyStats).where(ReservationDailyStats.restaurant_id == restaurant["id"])
+             .order_by(ReservationDailyStats.day))
+    incremental = [row.model_dump() for row in db_session.exec(query).all()]
+
+    ReservationRollup(db_session).rebuild()
+    db_session.expire_all()
+    assert [row.model_dump() for row in db_session.exec(query).all()] == incremental
+    assert len(incremental) == 2
\ No newline at end of file
@@ -0,0 +1,59 @@
+# src/tests/test_search.py
+from shared.text_index import TrigramIndex, normalize
+
+
+def _index() -> TrigramIndex:
+    index = TrigramIndex({"name": 1.0, "location": 0.6})
+    index.add(1, {"name": "La Parrilla de Ñuñoa", "location": "Santiago"})
+    index.add(2, {"name": "Pizzería Napoli", "location": "Valparaíso"})
+    index.add(3, {"name": "Sushi Valpo", "location": "Viña del Mar"})
+    return index
+
+
+def test_normalize_strips_accents_and_punctuation():
+    assert normalize("  Pizzería—Napoli! ") == "pizzeria napoli"
+
+
+def test_index_matches_prefixes_misspellings_and_accents():
+    index = _index()
+    assert [doc for doc, _ in index.search("pizz")] == [2]
+    assert [doc for doc, _ in index.search("parila")] == [1]
+    assert [doc for doc, _ in index.search("nunoa")] == [1]
+    assert index.search("zzzz") == []
+
+
+def test_name_matches_outrank_location_matches():
+    ranked = _index().search("valp")
+    assert [doc for doc, _ in ranked] == [3, 2]
+    assert ranked[0][1] > ranked[1][1]
+
+
+def test_index_follows_replacements_and_removals():
+    index = _index()
+    index.add(2, {"name": "Trattoria Roma", "location": "Valparaíso"})
+    assert index.search("napoli") == []
+    assert [doc for doc, _ in index.search("roma")] == [2]
+    index.remove(2)
+    assert index.search("roma") == []
+    assert len(index) == 2
+
+
+def test_search_endpoint_follows_restaurant_writes(client, admin_headers):
+    name = "Cevichería Máncora"
+    response = client.post("/restaurants/", json={"name": name, "location": "Lima", "opening_time": "12:00",
+                                                  "closing_time": "23:00"}, headers=admin_headers)
+    restaurant = response.json()
+    assert client.get("/restaurants/search", params={"q": "mancor"}).json()[0]["id"] == restaurant["id"]
+    assert client.get("/restaurants/search", params={"q": "cevicheira"}).json()[0]["id"] == restaurant["id"]
+
+    client.put(f"/restaurants/{restaurant['id']}", json={"name": "Anticuchería Grau"}, headers=admin_headers)
+    assert restaurant["id"] not in [r["id"] for r in client.get("/restaurants/search", params={"q": "mancora"}).json()]
+    assert client.get("/restaurants/search", params={"q": "anticucheria"}).json()[0]["id"] == restaurant["id"]
+
+    client.delete(f"/restaurants/{restaurant['id']}", headers=admin_headers)
+    assert restaurant["id"] not in [r["id"] for r in client.get("/restaurants/search", params={"q": "anticucheria"}).json()]
+
+
+def test_blank_search_query_is_a_bad_request(client):
+    assert client.get("/restaurants/search", params={"q": "   "}).status_code == 400
+    assert client.get("/restaurants/search").status_code == 422
\ No newline at end of file
@@ -0,0 +1,30 @@
+# src/tests/test_serialization.py
+from datetime import datetime, time
+
+import orjson
+
+from menu.domain.entities import MenuItemPublic
+from restaurants.domain.entities import RestaurantPublic, TablePublic
+from shared.serialization import encode_rows
+
+
+def test_encode_rows_keys_rows_by_column_and_formats_times():
+    payload = encode_rows(["id", "opening_time", "at"], [(1, time(12, 0), datetime(2026, 1, 2, 20, 30))])
+    assert orjson.loads(payload) == [{"id": 1, "opening_time": "12:00:00", "at": "2026-01-02T20:30:00"}]
+
+
+def test_row_listings_validate_against_their_public_models(client, make_restaurant):
+    restaurant = make_restaurant(tables=2, items=3)
+
+    restaurants = client.get("/restaurants/").json()
+    mine = [RestaurantPublic.model_validate(row) for row in restaurants if row["id"] == restaurant["id"]]
+    assert mine[0].opening_time == time(12, 0)
+    assert set(restaurants[0]) == set(RestaurantPublic.model_fields)
+
+    tables = client.get(f"/restaurants/{restaurant['id']}/tables").json()
+    assert [TablePublic.model_validate(row).id for row in tables] == restaurant["tables"]
+    assert set(tables[0]) == set(TablePublic.model_fields)
+
+    items = client.get(f"/menu/{restaurant['id']}/items").json()
+    assert sorted(MenuItemPublic.model_validate(row).id for row in items) == restaurant["items"]
+    assert set(items[0]) == set(MenuItemPublic.model_fields)
\ No newline at end of file
@@ -0,0 +1,136 @@
+# src/tests/test_sharding.py
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+import sqlalchemy as sa
+from sqlmodel import Session, SQLModel
+
+from reservations.domain.entities import Reservation, ReservationStatus
+from shared.sharding import SHARD_ID_SPAN, ShardRouter, ShardSessions, fetch, merge_pages, parse_shard_map
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _engines(tmp_path, count: int):
+    return [sa.create_engine(f"sqlite:///{tmp_path / f'shard{index}.db'}") for index in range(count)]
+
+
+def test_shard_map_pins_restaurants():
+    assert parse_shard_map(" 1:0, 7:2 ,") == {1: 0, 7: 2}
+    router = ShardRouter([sa.create_engine("sqlite://")] * 3, lookup={7: 2})
+    assert router.shard_for(7) == 2
+    with pytest.raises(ValueError):
+        ShardRouter([sa.create_engine("sqlite://")], lookup={7: 1})
+
+
+def test_adding_a_shard_moves_only_restaurants_onto_it():
+    engines = [sa.create_engine("sqlite://") for _ in range(4)]
+    before, after = ShardRouter(engines[:3]), ShardRouter(engines)
+    moved = {rid: after.shard_for(rid) for rid in range(1, 3001) if after.shard_for(rid) != before.shard_for(rid)}
+    assert set(moved.values()) == {3}
+    assert 0.1 < len(moved) / 3000 < 0.4
+    assert ShardRouter(engines[:1]).shard_for(12345) == 0
+
+
+def test_each_shard_hands_out_its_own_id_range(tmp_path):
+    primary, *others = engines = _engines(tmp_path, 3)
+    SQLModel.metadata.create_all(primary)
+    router = ShardRouter(engines, lookup={1: 0, 2: 1, 3: 2})
+    router.create_all(SQLModel.metadata, ("reservation", "reservation_daily_stats"), primary=primary)
+    # Shards only hold the sharded tables, without foreign keys to the primary database.
+    assert sa.inspect(others[0]).get_table_names() == ["reservation", "reservation_daily_stats"]
+    assert sa.inspect(others[0]).get_foreign_keys("reservation") == []
+
+    start = datetime(2030, 1, 7, 20)
+    ids = {}
+    with Session(primary) as session, ShardSessions(session, router) as shards:
+        for restaurant_id in (1, 2, 3):
+            db = shards.for_restaurant(restaurant_id)
+            reservation = Reservation(user_id=1, restaurant_id=restaurant_id, table_id=1, num_guests=2,
+                                      reservation_time=start, end_time=start + timedelta(hours=2),
+                                      status=ReservationStatus.PENDING, preordered_menu_items=[])
+            db.add(reservation)
+            db.commit()
+            ids[restaurant_id] = reservation.id
+        assert shards.for_shard(0) is session
+    assert ids == {1: 1, 2: SHARD_ID_SPAN + 1, 3: 2 * SHARD_ID_SPAN + 1}
+    assert [router.shard_of_id(row_id) for row_id in ids.values()] == [0, 1, 2]
+    assert router.shard_of_id(3 * SHARD_ID_SPAN + 1) is None
+
+    # A restaurant moved to another shard keeps its rows readable by id.
+    moved = ShardRouter(engines, lookup={2: 2})
+    with Session(primary) as session, ShardSessions(session, moved) as shards:
+        assert shards.get(Reservation, ids[2]).restaurant_id == 2
+        assert shards.get(Reservation, 10 ** 15) is None
+        assert [len(rows) for rows in shards.fan_out(lambda s: s.exec(sa.select(Reservation.id)).all())] == [1, 1, 1]
+    moved.shutdown()
+
+
+def test_merge_pages_keeps_the_first_rows_by_key():
+    pages = [(["id", "name"], [(1, "a"), (5, "e"), (9, "i")]),
+             (["id", "name"], [(2, "b"), (3, "c")]),
+             (["id", "name"], [])]
+    merged = merge_pages(pages, key="id", limit=3)
+    assert list(merged.keys()) == ["id", "name"]
+    # limit + 1 rows, so the caller can still tell there is a next page.
+    assert [tuple(row) for row in merged.all()] == [(1, "a"), (2, "b"), (3, "c"), (5, "e")]
+
+
+def test_fetch_materializes_results(tmp_path):
+    [engine] = _engines(tmp_path, 1)
+    with engine.connect() as connection:
+        keys, rows = fetch(connection.execute(sa.text("SELECT 1 AS id, 'x' AS name")))
+    assert (keys, [tuple(row) for row in rows]) == (["id", "name"], [(1, "x")])
+
+
+SHARDED_APP_SCRIPT = """
+import json
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+import main
+from auth.domain.entities import User
+from shared.database import engine
+from shared.security import create_access_token
+
+with TestClient(main.app) as client:
+    with Session(engine) as session:
+        session.add(User(email="admin@shards.local", name="Admin", role="admin", hashed_password="x"))
+        session.commit()
+    headers = {"Authorization": "Bearer " + create_access_token(
+        {"sub": "admin@shards.local", "scopes": ["admin:read", "admin:write", "client:read", "client:write"]})}
+    when = (datetime.now() + timedelta(days=30)).replace(hour=20, minute=0, second=0, microsecond=0)
+    created = []
+    for day, name in enumerate(("Uno", "Dos")):
+        restaurant = client.post("/restaurants/", headers=headers, json={
+            "name": name, "location": "Centro", "opening_time": "12:00", "closing_time": "23:00"}).json()
+        table = client.post(f"/restaurants/{restaurant['id']}/tables", headers=headers, json={
+            "capacity": 4, "location": "interior", "table_number": 1}).json()
+        response = client.post("/reservations/", headers=headers, json={
+            "user_id": 1, "restaurant_id": restaurant["id"], "table_id": table["id"], "num_guests": 2,
+            "reservation_time": (when + timedelta(days=day)).isoformat()})
+        assert response.status_code == 201, response.text
+        created.append(response.json()["id"])
+    listed = [r["id"] for r in client.get("/reservations/", headers=headers).json()]
+    cancelled = client.delete(f"/reservations/{created[1]}", headers=headers).status_code
+    print("RESULT", json.dumps({"created": created, "listed": listed, "cancelled": cancelled}))
+"""
+
+
+def test_reservations_are_routed_to_their_restaurants_shard(tmp_path):
+    primary = f"sqlite:///{tmp_path / 'primary.db'}"
+    env = dict(os.environ, DATABASE_URL=primary, DATABASE_SHARDS=f"{primary},sqlite:///{tmp_path / 'shard1.db'}",
+               DATABASE_SHARD_MAP="1:0,2:1", DISH_SKETCH_PATH=str(tmp_path / "dishes.json"),
+               DASHBOARD_JOB_DIR=str(tmp_path / "jobs"), PROFILE_DIR=str(tmp_path / "profiles"))
+    result = subprocess.run([sys.executable, "-c", SHARDED_APP_SCRIPT], cwd=ROOT, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr[-2000:]
+    [line] = [line for line in result.stdout.splitlines() if line.startswith("RESULT ")]
+    outcome = json.loads(line[len("RESULT "):])
+    assert outcome["created"] == [1, SHARD_ID_SPAN + 1]
+    assert sorted(outcome["listed"]) == outcome["created"]
+    assert outcome["cancelled"] == 204
\ No newline at end of file
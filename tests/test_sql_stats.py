@@ -0,0 +1,51 @@
+# src/tests/test_sql_stats.py
+import logging
+
+import pytest
+
+from shared.sql_stats import OTHER_FINGERPRINT, SQLStats, fingerprint
+
+
+@pytest.mark.parametrize("statement, shape", [
+    ("SELECT * FROM t WHERE id = 42 AND name = 'O''Brien'", "SELECT * FROM t WHERE id = ? AND name = ?"),
+    ("SELECT * FROM t WHERE id IN (?, ?, ?)", "SELECT * FROM t WHERE id IN (...)"),
+    ("SELECT * FROM t WHERE id IN (%(id_1)s, %(id_2)s)", "SELECT * FROM t WHERE id IN (...)"),
+    ("INSERT INTO t (a, b) VALUES ($1, $2), ($3, $4)", "INSERT INTO t (a, b) VALUES (?, ?), ..."),
+    ("SELECT t1.col2 FROM t1\n  LIMIT :param_1", "SELECT t1.col2 FROM t1 LIMIT ?"),
+])
+def test_fingerprint_normalizes_literals_and_lists(statement, shape):
+    assert fingerprint(statement) == shape
+
+
+def test_stats_aggregate_per_fingerprint_and_cap_distinct_shapes():
+    stats = SQLStats(slow_query_ms=10 ** 6, max_fingerprints=2)
+    stats.record("SELECT 1 FROM a WHERE id = 1", 2.0, rows=1)
+    stats.record("SELECT 1 FROM a WHERE id = 2", 4.0, rows=-1)
+    stats.record("SELECT 1 FROM b", 1.0)
+    stats.record("SELECT 1 FROM c", 1.0)
+    by_shape = {row["fingerprint"]: row for row in stats.snapshot(sort="count")}
+    a = by_shape["SELECT ? FROM a WHERE id = ?"]
+    assert (a["count"], a["total_ms"], a["mean_ms"], a["max_ms"], a["rows"]) == (2, 6.0, 3.0, 4.0, 1)
+    assert a["routes"] == {"<no request>": 2}
+    assert set(by_shape) == {"SELECT ? FROM a WHERE id = ?", "SELECT ? FROM b", OTHER_FINGERPRINT}
+    with pytest.raises(ValueError):
+        stats.snapshot(sort="name")
+    stats.reset()
+    assert stats.snapshot() == []
+
+
+def test_slow_statements_are_logged(caplog):
+    stats = SQLStats(slow_query_ms=5)
+    with caplog.at_level(logging.WARNING, logger="sql.slow"):
+        stats.record("SELECT fast", 1.0)
+        stats.record("SELECT   slow", 8.0)
+    assert [record.getMessage() for record in caplog.records] == ["Slow query 8.0 ms in <no request>: SELECT slow"]
+
+
+def test_statements_are_attributed_to_route_templates(client, admin_headers, make_restaurant):
+    restaurant = make_restaurant(tables=0, items=0)
+    assert client.delete("/diagnostics/sql", headers=admin_headers).status_code == 204
+    client.get(f"/restaurants/{restaurant['id']}")
+    rows = client.get("/diagnostics/sql", headers=admin_headers, params={"sort": "count"}).json()
+    assert any("GET /restaurants/{restaurant_id}" in row["routes"] for row in rows)
+    assert client.get("/diagnostics/sql", headers=admin_headers, params={"sort": "name"}).status_code == 400
\ No newline at end of file